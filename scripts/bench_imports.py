@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Measure how long each CLI entry point takes to import.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter per
+entry point, keeps the best of several runs, and lists the slowest imports
+underneath. Startup cost is what every `nexus <command>`, cron job and
+`invoke` task pays before doing any work.
+
+Usage: uv run scripts/bench_imports.py [runs] [--top N]
+"""
+
+import re
+import subprocess
+import sys
+
+from nexus.cli.main import COMMANDS
+
+# `import time:   self [us] | cumulative | imported package`
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _importtime(module: str) -> list[tuple[int, int, str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            _, cumulative, indent, name = match.groups()
+            rows.append((int(cumulative), len(indent), name))
+    return rows
+
+
+def _measure(module: str, runs: int) -> list[tuple[int, int, str]]:
+    # The best run is the least disturbed by the rest of the machine
+    return min(
+        (_importtime(module) for _ in range(runs)),
+        key=lambda rows: rows[-1][0],
+    )
+
+
+def main() -> None:
+    """Print the import time of every entry point."""
+    args = sys.argv[1:]
+    top = 5
+    if "--top" in args:
+        index = args.index("--top")
+        top = int(args[index + 1])
+        del args[index : index + 2]
+    runs = int(args[0]) if args else 5
+
+    modules = {"nexus": "nexus.cli.main"}
+    modules.update(
+        (f"nexus {name}", path.split(":")[0]) for name, (path, _) in COMMANDS.items()
+    )
+
+    print(f"Import time per entry point, best of {runs} runs:")
+    for command, module in modules.items():
+        rows = _measure(module, runs)
+        print(f"\n  {command:<20} {rows[-1][0] / 1000:8.1f} ms  ({module})")
+        # Direct children of the entry point module, slowest first
+        children = [r for r in rows[:-1] if r[1] == rows[-1][1] + 2]
+        for cumulative, _, name in sorted(children, reverse=True)[:top]:
+            print(f"    {name:<40} {cumulative / 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
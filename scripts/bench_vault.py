@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Compare in-process vault decryption with forking `ansible-vault view`.
+
+Encrypts a throwaway vault with ansible-vault, then times reading it back
+both ways. Requires ansible-vault on PATH.
+
+Usage: uv run scripts/bench_vault.py [runs]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import yaml
+
+from nexus.utils import read_vault
+
+PASSWORD = "benchmark-password"
+VAULT = {f"secret_{i}": f"value-{i}" for i in range(50)}
+
+
+def _time(label: str, runs: int, func: Callable[[], None]) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        func()
+    per_call = (time.perf_counter() - start) / runs
+    print(f"  {label:<22} {per_call * 1000:8.1f} ms/call")
+    return per_call
+
+
+def main() -> None:
+    """Time both ways of reading a vault and print the speedup."""
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    with tempfile.TemporaryDirectory() as tmp:
+        password_file = Path(tmp) / "vault_pass"
+        password_file.write_text(PASSWORD)
+        vault_path = Path(tmp) / "vault.yml"
+        vault_path.write_text(yaml.safe_dump(VAULT))
+        env = {**os.environ, "ANSIBLE_VAULT_PASSWORD_FILE": str(password_file)}
+        subprocess.run(
+            ["ansible-vault", "encrypt", str(vault_path)],
+            env=env,
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            check=True,
+        )
+        os.environ["ANSIBLE_VAULT_PASSWORD_FILE"] = str(password_file)
+
+        def fork() -> None:
+            result = subprocess.run(
+                ["ansible-vault", "view", str(vault_path)],
+                env=env,
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            assert yaml.safe_load(result.stdout) == VAULT
+
+        def native() -> None:
+            assert read_vault(vault_path) == VAULT
+
+        print(f"Reading a {len(VAULT)}-key vault, {runs} runs:")
+        forked = _time("ansible-vault view", runs, fork)
+        in_process = _time("read_vault (in-process)", runs, native)
+        print(f"  speedup: {forked / in_process:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
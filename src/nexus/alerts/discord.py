@@ -1,10 +1,10 @@
 import json
 import logging
 import os
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-import aiohttp
-from discord import Embed, Webhook
+if TYPE_CHECKING:
+    from discord import Embed
 
 DISCORD_WEBHOOK_URL = os.environ.get("DISCORD_WEBHOOK_URL")
 LOG_FILE = "/tmp/nexus-alerts.log"
@@ -26,6 +26,11 @@ async def send_alert(alert_data: dict[str, Any]) -> None:
         logger.warning("No Discord webhook URL configured")
         return
 
+    # aiohttp and discord.py take longer to import than the rest of the CLI
+    # combined, so they're only loaded once there's an alert to send
+    import aiohttp
+    from discord import Webhook
+
     try:
         async with aiohttp.ClientSession() as session:
             webhook = Webhook.from_url(DISCORD_WEBHOOK_URL, session=session)
@@ -40,7 +45,9 @@ async def send_alert(alert_data: dict[str, Any]) -> None:
         logger.error(f"Failed to send alert: {e}")
 
 
-def _create_embed(alert_data: dict[str, Any]) -> Embed:
+def _create_embed(alert_data: dict[str, Any]) -> "Embed":
+    from discord import Embed
+
     status = alert_data.get("status", "firing").capitalize()
 
     if status == "firing":
@@ -87,7 +87,7 @@ class TestSendAlert:
             ),
             patch("nexus.alerts.discord.LOG_FILE", str(tmp_path / "alerts.log")),
             patch("aiohttp.ClientSession") as mock_client,
-            patch("nexus.alerts.discord.Webhook") as mock_webhook_class,
+            patch("discord.Webhook") as mock_webhook_class,
         ):
             mock_client.return_value.__aenter__.return_value = mock_session
             mock_client.return_value.__aexit__.return_value = None
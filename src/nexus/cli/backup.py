@@ -2,7 +2,16 @@ import logging
 
 import click
 
-from nexus.restore.backup import push_backup
+from nexus.config import TEXTFILE_PATH
+from nexus.restore.backup import (
+    BACKUP_MODES,
+    DEFAULT_BACKUP_PARALLELISM,
+    export_backup_metrics,
+    prune_backups,
+    push_backup,
+)
+from nexus.restore.progress import ProgressPrinter
+from nexus.utils import format_size
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
@@ -17,21 +26,106 @@ logger = logging.getLogger(__name__)
     help="Repository to back up.",
 )
 @click.option("--dry-run", is_flag=True, help="Preview backup without executing.")
-def main(target: str, dry_run: bool) -> None:
+@click.option(
+    "--parallel",
+    type=click.IntRange(min=1),
+    default=DEFAULT_BACKUP_PARALLELISM,
+    show_default=True,
+    help="Number of plans to back up at once.",
+)
+@click.option(
+    "--mode",
+    type=click.Choice(BACKUP_MODES),
+    default="direct",
+    show_default=True,
+    help="'copy' backs up locally once and replicates to R2 with restic copy.",
+)
+@click.option("--no-prune", is_flag=True, help="Back up without pruning.")
+@click.option("--prune-only", is_flag=True, help="Prune without backing up.")
+@click.option(
+    "--textfile",
+    is_flag=True,
+    help="Also export backup metrics for node-exporter's textfile collector.",
+)
+@click.option(
+    "--metrics-only",
+    is_flag=True,
+    help="Refresh snapshot catalogs and export metrics without backing up.",
+)
+def main(
+    target: str,
+    dry_run: bool,
+    parallel: int,
+    mode: str,
+    no_prune: bool,
+    prune_only: bool,
+    textfile: bool,
+    metrics_only: bool,
+) -> None:
     """Trigger a restic backup for Nexus repositories.
 
     Reads repo URIs and retention policies from the Backrest configuration,
-    runs a backup followed by pruning to enforce retention limits.
+    backs up every targeted plan concurrently, then prunes to enforce
+    retention limits. Pruning can be skipped and run separately later.
 
     Args:
         target: Which repositories to back up: "local", "r2", or "all".
         dry_run: Preview backup commands without executing them.
+        parallel: Maximum number of plans backed up at once.
+        mode: "direct" backs up every repo from source; "copy" backs up the
+            local repo and replicates its snapshot to the others.
+        no_prune: Skip pruning after the backup.
+        prune_only: Only prune, without taking a new backup.
+        textfile: Write each plan's outcome to TEXTFILE_PATH as well.
+        metrics_only: Only export repository freshness and size metrics.
     """
+    if no_prune and prune_only:
+        raise click.UsageError("--no-prune and --prune-only are mutually exclusive")
+
+    if metrics_only:
+        try:
+            stats = export_backup_metrics(target=target)
+        except Exception as e:
+            logger.error(f"Exporting backup metrics failed: {e}")
+            raise SystemExit(1) from None
+        for repo in stats:
+            size = format_size(repo.size_bytes) if repo.size_bytes else "?"
+            print(f"  {repo.repo_id:<6} {repo.snapshots:>4} snapshots  {size:>9}")
+        return
+
+    progress = ProgressPrinter()
     try:
-        push_backup(target=target, dry_run=dry_run)
+        if prune_only:
+            prune_backups(target=target, dry_run=dry_run)
+            return
+
+        results = push_backup(
+            target=target,
+            dry_run=dry_run,
+            parallelism=parallel,
+            prune=not no_prune,
+            mode=mode,
+            progress=progress,
+            textfile_dir=TEXTFILE_PATH if textfile else None,
+        )
     except Exception as e:
+        progress.close()
         logger.error(f"Backup failed: {e}")
         raise SystemExit(1) from None
+    progress.close()
+
+    for result in results:
+        if result.copied_from:
+            print(
+                f"  {result.plan_id:<16} {result.duration:7.1f}s  "
+                f"copied {result.snapshot_id} from {result.copied_from}"
+            )
+            continue
+        print(
+            f"  {result.plan_id:<16} {result.duration:7.1f}s  "
+            f"{result.files_new:>7} new  {result.files_changed:>7} changed  "
+            f"{format_size(result.data_added):>9} added"
+        )
 
 
 if __name__ == "__main__":
@@ -16,13 +16,22 @@ logger = logging.getLogger(__name__)
     show_default=True,
     help="Repository to list snapshots from.",
 )
-def main(target: str) -> None:
+@click.option(
+    "--refresh",
+    is_flag=True,
+    help="Refresh the local snapshot catalog from the repository first.",
+)
+def main(target: str, refresh: bool) -> None:
     """List available restic backup snapshots.
 
+    Snapshots come from a local catalog that is refreshed incrementally when
+    it is more than a few minutes old.
+
     Args:
         target: Which repository to list snapshots from: "local" or "r2".
+        refresh: Refresh the catalog regardless of its age.
     """
-    snapshots = list_backups(target=target)
+    snapshots = list_backups(target=target, refresh=refresh)
     if not snapshots:
         logger.info("No backup snapshots found")
         return
@@ -1,23 +1,96 @@
 import logging
+from typing import Optional
 
 import click
 
-from nexus.utils import run_command
+from nexus.restore.verify import DEFAULT_SLICES, VerifyReport, run_verification
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
 
+def _print_report(report: VerifyReport) -> None:
+    for result in report.slices:
+        status = "ok" if result.passed else "FAILED"
+        print(
+            f"  {result.repo_id:<6} slice {result.slice}/{result.slices}  "
+            f"{status}  ({result.duration:.1f}s)"
+        )
+        if result.error:
+            print(f"         {result.error}")
+
+    sample = report.sample_restore
+    if sample:
+        status = "ok" if sample.passed else "FAILED"
+        print(
+            f"  sample restore of {sample.service or '?'}  {status}  "
+            f"({sample.files} files, {sample.compared} compared, "
+            f"{sample.duration:.1f}s)"
+        )
+        if sample.error:
+            print(f"         {sample.error}")
+        for rel in sample.mismatched:
+            print(f"         mismatch: {rel}")
+
+
 @click.command()
-def main() -> None:
-    """Verify backup repository integrity."""
+@click.option(
+    "--target",
+    type=click.Choice(["local", "r2", "all"]),
+    default="all",
+    show_default=True,
+    help="Repository to verify.",
+)
+@click.option(
+    "--slices",
+    type=click.IntRange(min=1),
+    default=DEFAULT_SLICES,
+    show_default=True,
+    help="Number of slices each repository's data is read in, one per run.",
+)
+@click.option(
+    "--sample-restore/--no-sample-restore",
+    default=None,
+    help="Force or skip the sample restore. By default it runs once a week.",
+)
+@click.option(
+    "--service",
+    default=None,
+    help="Service for the sample restore. Defaults to the smallest one.",
+)
+def main(
+    target: str,
+    slices: int,
+    sample_restore: Optional[bool],
+    service: Optional[str],
+) -> None:
+    """Verify backup repository integrity, one data slice per run.
+
+    Args:
+        target: Which repository to verify: "local", "r2", or "all".
+        slices: Number of `--read-data-subset` slices per repository.
+        sample_restore: Force (True) or skip (False) the sample restore.
+        service: Service to restore for the sample restore.
+    """
     try:
-        run_command(["docker", "exec", "backrest", "restic", "-r", "/repos", "check"])
-        logger.info("Backup repositories verified successfully")
+        report = run_verification(
+            target=target,
+            slices=slices,
+            sample_restore_due=sample_restore,
+            service=service,
+        )
     except Exception as e:
         logger.error(f"Backup verification failed: {e}")
         raise SystemExit(1) from None
 
+    print("\nBackup verification:")
+    _print_report(report)
+
+    if not report.passed:
+        logger.error("Backup verification failed")
+        raise SystemExit(1)
+    logger.info("Backup repositories verified successfully")
+
 
 if __name__ == "__main__":
     main()
@@ -4,29 +4,34 @@ import shutil
 import subprocess
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 import click
-import yaml
 
 from nexus.config import (
-    PRESETS,
     TERRAFORM_PATH,
     VAULT_PATH,
     get_all_services,
+    load_presets,
     resolve_preset,
 )
 from nexus.deploy.ansible import run_ansible
+from nexus.deploy.pipeline import Stage, format_timings, run_pipeline, write_trace
+from nexus.deploy.planner import DeployPlan, plan_deploy, record_deploy
+from nexus.deploy.reconcile import record_compose_spec
 from nexus.deploy.terraform import get_r2_credentials, run_terraform
 from nexus.generate.access_rules import sync_access_rules
+from nexus.generate.compose import write_compose
 from nexus.generate.dashboard import (
     generate_bookmarks_config,
     generate_dashboard_config,
     generate_settings_config,
     generate_widgets_config,
 )
+from nexus.graph import CycleError, get_service_graph
+from nexus.loader import dump_yaml
 from nexus.types import R2Credentials
-from nexus.utils import read_vault
+from nexus.utils import VaultSession
 
 
 def _check_dependencies() -> list[str]:
@@ -130,19 +135,56 @@ def _start_cloudflared(token: str) -> None:
     logging.info("✅ Cloudflared started in background")
 
 
+def _start_tunnel(dry_run: bool) -> None:
+    if _is_cloudflared_running():
+        logging.info("✅ Cloudflared already running")
+        return
+
+    token = _get_tunnel_token()
+    if not token:
+        logging.warning("Could not get tunnel token. Start manually:")
+        logging.info("  cd terraform && terraform output -raw tunnel_token")
+        logging.info("  cloudflared tunnel run --token <token>")
+    elif dry_run:
+        logging.info("[DRY RUN] Would start cloudflared tunnel")
+    else:
+        _start_cloudflared(token)
+
+
+def _get_r2_credentials(services: list[str]) -> dict[str, Optional[R2Credentials]]:
+    credentials: dict[str, Optional[R2Credentials]] = {}
+    if "foundryvtt" in services:
+        credentials["foundry"] = get_r2_credentials("foundry")
+        if credentials["foundry"]:
+            logging.info("✅ Retrieved Foundry R2 credentials from Terraform")
+        else:
+            logging.warning("R2 credentials not available for foundryvtt")
+    if "backups" in services:
+        credentials["backups"] = get_r2_credentials("backups")
+        if credentials["backups"]:
+            logging.info("✅ Retrieved Backups R2 credentials from Terraform")
+        else:
+            logging.warning(
+                "R2 credentials not available for backups - local backups only"
+            )
+    return credentials
+
+
 def _generate_configs(
     services: list[str],
     domain: Optional[str],
     data_dir: Optional[str] = None,
     dry_run: bool = False,
+    session: Optional[VaultSession] = None,
 ) -> None:
     logging.info("Generating configurations...")
+    session = session or VaultSession()
 
     # Generate access rules from service manifests
     if dry_run:
         logging.info("[DRY RUN] Would generate access rules from service manifests")
     else:
-        rules_path = sync_access_rules(services)
+        rules_path = sync_access_rules(services, session=session)
         logging.info(f"Generated access rules: {rules_path}")
 
     # Resolve data_dir: arg -> env -> vault -> default
@@ -150,11 +192,7 @@ def _generate_configs(
         data_dir = os.environ.get("NEXUS_DATA_DIRECTORY")
 
     if not data_dir:
-        try:
-            vault = read_vault()
-            data_dir = vault.get("nexus_data_directory")
-        except Exception:
-            pass
+        data_dir = session.get("nexus_data_directory")
 
     if not data_dir:
         data_dir = "~/nexus-data"
@@ -167,7 +205,7 @@ def _generate_configs(
 
     vault = {}
     try:
-        vault = read_vault()
+        vault = session.read()
     except Exception:
         logging.warning("Could not read vault secrets for dashboard generation.")
 
@@ -190,19 +228,47 @@ def _generate_configs(
 
         logging.info(f"Writing dashboard config to {dashboard_config_path}")
         with dashboard_config_path.open("w") as f:
-            yaml.dump(dashboard_config, f, default_flow_style=False, sort_keys=False)
+            dump_yaml(dashboard_config, f)
 
         logging.info(f"Writing settings to {settings_path}")
         with settings_path.open("w") as f:
-            yaml.dump(settings_config, f, default_flow_style=False, sort_keys=False)
+            dump_yaml(settings_config, f)
 
         logging.info(f"Writing bookmarks to {bookmarks_path}")
         with bookmarks_path.open("w") as f:
-            yaml.dump(bookmarks_config, f, default_flow_style=False, sort_keys=False)
+            dump_yaml(bookmarks_config, f)
 
         logging.info(f"Writing widgets to {widgets_path}")
         with widgets_path.open("w") as f:
-            yaml.dump(widgets_config, f, default_flow_style=False, sort_keys=False)
+            dump_yaml(widgets_config, f)
+
+
+def _validate_preset(
+    ctx: click.Context, param: click.Parameter, value: Optional[str]
+) -> Optional[str]:
+    # Checked here rather than with click.Choice so presets.yml is only read
+    # when --preset is given, not on every import or --help
+    if value is None:
+        return None
+    try:
+        presets = load_presets()
+    except FileNotFoundError:
+        presets = {}
+    if value not in presets:
+        choices = ", ".join(sorted(presets)) or "none defined"
+        raise click.BadParameter(f"{value!r} is not one of: {choices}.")
+    return value
+
+
+def _describe_plan(plan: DeployPlan) -> str:
+    stages = []
+    if plan.terraform:
+        stages.append("Terraform")
+    if plan.full:
+        stages.append("all services")
+    elif plan.changed:
+        stages.append(", ".join(plan.changed))
+    return " + ".join(stages) if stages else "None (everything up to date)"
 
 
 @click.command()
@@ -212,9 +278,10 @@ def _generate_configs(
 @click.option(
     "-p",
     "--preset",
-    type=click.Choice(list(PRESETS.keys())),
+    type=str,
     default=None,
-    help="Use a service preset.",
+    callback=_validate_preset,
+    help="Use a service preset from config/presets.yml.",
 )
 @click.option(
     "-d", "--domain", type=str, default=None, help="Base domain (e.g., example.com)."
@@ -238,6 +305,18 @@ def _generate_configs(
     default=False,
     help="Preview changes without making them.",
 )
+@click.option(
+    "--profile",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    default=None,
+    help="Write a Chrome trace of the deploy stages to this file.",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    default=False,
+    help="Redeploy every stage and service, even if unchanged.",
+)
 @click.option(
     "-y",
     "--yes",
@@ -255,6 +334,8 @@ def main(
     skip_ansible: bool,
     skip_cloudflared: bool,
     dry_run: bool,
+    profile: Optional[Path],
+    force: bool,
     yes: bool,
 ) -> None:
     """Execute the complete Nexus deployment pipeline.
@@ -263,6 +344,11 @@ def main(
     secrets, provisions Cloudflare infrastructure via Terraform, starts the
     tunnel connector, and deploys services through Ansible.
 
+    Stages whose inputs haven't changed since the last successful deploy
+    are skipped, and Ansible only recreates services that changed. The
+    remaining stages run as a DAG: config generation overlaps Terraform, and
+    cloudflared and R2 credential lookup start as soon as Terraform is done.
+
     Args:
         services: Specific service names to deploy. Overrides preset.
         verbose: Enable debug-level logging output.
@@ -273,6 +359,8 @@ def main(
         skip_ansible: Skip Ansible deployment phase.
         skip_cloudflared: Skip starting the cloudflared tunnel connector.
         dry_run: Preview changes without applying them.
+        profile: Where to write a Chrome trace of the deploy stages.
+        force: Redeploy every stage and service, even if unchanged.
         yes: Skip all confirmation prompts.
 
     Raises:
@@ -339,23 +427,46 @@ def main(
         services_list = resolve_preset("home")
         logging.info("No services specified, using 'home' preset")
 
+    # Start order, so Ansible brings dependencies up first
+    graph = get_service_graph()
+    try:
+        services_list = graph.order(services_list)
+    except CycleError as e:
+        logging.error(str(e))
+        logging.info("Fix the dependencies in the services' service.yml")
+        sys.exit(1)
+    missing_deps = {
+        dep for svc in services_list for dep in graph.dependencies(svc, transitive=True)
+    }.difference(services_list)
+    if missing_deps:
+        logging.warning(
+            f"Not deploying dependencies: {', '.join(sorted(missing_deps))}"
+            " (they must already be running)"
+        )
+
+    # Decrypted at most once, on first use, and shared by every step below
+    session = VaultSession()
+
     # Get domain from vault if not specified
     if not domain:
         domain = os.environ.get("NEXUS_DOMAIN")
         if not domain:
-            try:
-                vault = read_vault()
-                domain = vault.get("nexus_domain")
-                if domain == "example.com":
-                    domain = None
-            except Exception:
-                pass
+            domain = session.get("nexus_domain")
+            if domain == "example.com":
+                domain = None
 
     if not domain:
         logging.error("Domain not configured!")
         logging.info("Set nexus_domain in vault.yml or use --domain")
         sys.exit(1)
 
+    try:
+        vault = session.read()
+    except Exception:
+        logging.warning("Could not read vault; vault changes won't be detected.")
+        vault = {}
+    plan = plan_deploy(services_list, domain, vault, force=force)
+
     # Show deployment plan
     vault_status = "Encrypted" if _is_vault_encrypted() else "⚠️  NOT ENCRYPTED"
     network_status = "Exists" if _check_docker_network() else "Will create"
@@ -364,6 +475,7 @@ def main(
     print(f"Domain: {domain}")
     print(f"Vault: {vault_status}")
     print(f"Docker Network: {network_status}")
+    print(f"Changes: {_describe_plan(plan)}")
     print(f"Dry Run: {'Yes' if dry_run else 'No'}")
     print("=" * 60)
 
@@ -400,73 +512,96 @@ def main(
             _encrypt_vault()
 
     # =========================================================================
-    # Step 5: Run Terraform for DNS/Tunnel
+    # Steps 5-8: Terraform, cloudflared, configs, R2 credentials and Ansible,
+    # run as a DAG so independent stages overlap
     # =========================================================================
-    if not skip_dns:
+    stages: list[Stage] = []
+
+    def terraform_stage(_: dict[str, Any]) -> None:
         logging.info("\n🌐 Setting up Cloudflare Tunnel...")
         try:
-            run_terraform(services_list, domain, dry_run)
+            run_terraform(services_list, domain, dry_run, session=session)
         except ValueError as e:
             logging.error(f"Terraform error: {e}")
             logging.info("Fix vault.yml configuration and retry, or use --skip-dns")
-            sys.exit(1)
-
-    # =========================================================================
-    # Step 6: Start cloudflared
-    # =========================================================================
-    if not skip_cloudflared and not skip_dns:
-        if _is_cloudflared_running():
-            logging.info("✅ Cloudflared already running")
-        else:
-            token = _get_tunnel_token()
-            if token:
-                if dry_run:
-                    logging.info("[DRY RUN] Would start cloudflared tunnel")
-                else:
-                    _start_cloudflared(token)
-            else:
-                logging.warning("Could not get tunnel token. Start manually:")
-                logging.info("  cd terraform && terraform output -raw tunnel_token")
-                logging.info("  cloudflared tunnel run --token <token>")
+            raise
+        if not dry_run:
+            record_deploy(plan, terraform=True)
 
-    # =========================================================================
-    # Step 7: Generate configs
-    # =========================================================================
-    _generate_configs(services_list, domain, dry_run=dry_run)
-
-    # =========================================================================
-    # Step 7.5: Retrieve R2 credentials from Terraform (if applicable)
-    # =========================================================================
-    r2_credentials: Optional[R2Credentials] = None
-    backups_r2_credentials: Optional[R2Credentials] = None
-    if not skip_dns:
-        if "foundryvtt" in services_list:
-            r2_credentials = get_r2_credentials("foundry")
-            if r2_credentials:
-                logging.info("✅ Retrieved Foundry R2 credentials from Terraform")
-            else:
-                logging.warning("R2 credentials not available for foundryvtt")
-        if "backups" in services_list:
-            backups_r2_credentials = get_r2_credentials("backups")
-            if backups_r2_credentials:
-                logging.info("✅ Retrieved Backups R2 credentials from Terraform")
-            else:
-                logging.warning(
-                    "R2 credentials not available for backups - local backups only"
-                )
-
-    # =========================================================================
-    # Step 8: Deploy with Ansible
-    # =========================================================================
-    if not skip_ansible:
+    def ansible_stage(inputs: dict[str, Any]) -> None:
+        credentials = inputs.get("r2_credentials", {})
         logging.info("\n🚀 Deploying services...")
         run_ansible(
             services_list,
             dry_run,
-            r2_credentials=r2_credentials,
-            backups_r2_credentials=backups_r2_credentials,
+            r2_credentials=credentials.get("foundry"),
+            backups_r2_credentials=credentials.get("backups"),
+            compose_services=None if plan.full else plan.compose_services,
+        )
+        if not dry_run:
+            record_deploy(plan, services=True)
+            # So `nexus up` only recreates what changes after this deploy
+            record_compose_spec(None if plan.full else plan.compose_services)
+
+    # The tunnel token and R2 credentials are Terraform outputs
+    after_terraform: tuple[str, ...] = ()
+    if not skip_dns and not plan.terraform:
+        logging.info("\n🌐 Cloudflare Tunnel and DNS unchanged, skipping Terraform")
+    elif not skip_dns:
+        stages.append(Stage("terraform", terraform_stage))
+        after_terraform = ("terraform",)
+
+    if not skip_cloudflared and not skip_dns:
+        stages.append(
+            Stage("cloudflared", lambda _: _start_tunnel(dry_run), after_terraform)
         )
 
+    # Cheap when nothing changed: the file is only rewritten if its content
+    # differs. Clashing service files fail here rather than in compose
+    stages.append(
+        Stage("compose", lambda _: write_compose(services_list, dry_run=dry_run))
+    )
+
+    def configs_stage(_: dict[str, Any]) -> None:
+        _generate_configs(services_list, domain, dry_run=dry_run, session=session)
+        if not dry_run:
+            record_deploy(plan, configs=True)
+
+    # Dashboard and access rules only need the manifests and the vault
+    if plan.configs:
+        stages.append(Stage("configs", configs_stage))
+    else:
+        logging.info("Configs unchanged, skipping config generation")
+
+    if not skip_ansible and not plan.ansible:
+        logging.info("\n🚀 Services unchanged since the last deploy, skipping Ansible")
+    elif not skip_ansible:
+        ansible_needs: tuple[str, ...] = ("compose",)
+        if plan.configs:
+            ansible_needs += ("configs",)
+        if not skip_dns:
+            stages.append(
+                Stage(
+                    "r2_credentials",
+                    lambda _: _get_r2_credentials(services_list),
+                    after_terraform,
+                )
+            )
+            ansible_needs += ("r2_credentials",)
+        stages.append(Stage("ansible", ansible_stage, ansible_needs))
+
+    report = run_pipeline(stages)
+
+    if report.stages:
+        print("\nStage timings:")
+        print(format_timings(report))
+    if profile:
+        logging.info(f"Wrote deploy trace to {write_trace(report, profile)}")
+    if not report.succeeded:
+        failed = [s.name for s in report.stages if s.status != "ok"]
+        logging.error(f"Deployment failed: {', '.join(failed)} did not complete")
+        sys.exit(1)
+
     # =========================================================================
     # Done!
     # =========================================================================
@@ -474,15 +609,10 @@ def main(
         logging.info("\n[Dry Run Complete] No changes were made.")
     else:
         # Check if Tailscale OAuth credentials are configured
-        tailscale_configured = False
-        try:
-            vault = read_vault()
-            tailscale_oauth_id = vault.get("tailscale_oauth_client_id", "")
-            tailscale_configured = bool(
-                tailscale_oauth_id and tailscale_oauth_id != "CHANGE_ME"
-            )
-        except Exception:
-            pass
+        tailscale_oauth_id = session.get("tailscale_oauth_client_id", "")
+        tailscale_configured = bool(
+            tailscale_oauth_id and tailscale_oauth_id != "CHANGE_ME"
+        )
 
         print("\n" + "=" * 60)
         print("  ✅ Deployment Complete!")
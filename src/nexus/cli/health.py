@@ -6,6 +6,7 @@ from typing import Optional
 import click
 
 from nexus.config import get_all_services
+from nexus.graph import get_service_graph
 from nexus.health.checks import (
     ServiceHealth,
     check_all_services,
@@ -59,7 +60,11 @@ def main(
     if domain:
         ssl_status = check_ssl_certificates(domain)
 
-    services_to_check = CRITICAL_SERVICES if critical_only else get_all_services()
+    # Dependencies first, so a root cause is listed before what it breaks
+    graph = get_service_graph()
+    services_to_check = graph.order(
+        CRITICAL_SERVICES if critical_only else get_all_services(), strict=False
+    )
 
     health_checks: list[ServiceHealth] = []
     for service in services_to_check:
@@ -90,6 +95,9 @@ def main(
             print(f"      Error: {check.error}")
         if not check.healthy:
             all_healthy = False
+            affected = graph.dependents(check.name, transitive=True)
+            if affected:
+                print(f"      Affects: {', '.join(affected)}")
 
     if ssl_status:
         print("\nSSL Certificates:")
@@ -99,10 +107,16 @@ def main(
 
     if disk_space:
         print("\nDisk Space:")
-        print(f"  Total: {disk_space.get('total', 'N/A')}")
-        print(f"  Used: {disk_space.get('used', 'N/A')}")
-        print(f"  Available: {disk_space.get('available', 'N/A')}")
-        print(f"  Usage: {disk_space.get('usage_percent', 'N/A')}")
+        for label, usage in disk_space.items():
+            print(f"  {label} ({usage.get('path', 'N/A')}):")
+            print(
+                f"    Used: {usage.get('used', 'N/A')} of "
+                f"{usage.get('total', 'N/A')} ({usage.get('usage_percent', 'N/A')})"
+            )
+            print(f"    Available: {usage.get('available', 'N/A')}")
+            print(f"    Inodes: {usage.get('inode_percent', 'N/A')}")
+            if "days_to_full" in usage:
+                print(f"    Full in: ~{usage['days_to_full']} days")
 
     print("\n" + "=" * 60)
 
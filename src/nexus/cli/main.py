@@ -0,0 +1,80 @@
+import importlib
+from typing import Any, Optional
+
+import click
+
+from nexus import __version__
+
+# Subcommand name -> ("module:attribute", short help). Modules are only
+# imported when their subcommand runs, so `nexus <cmd>` pays for <cmd>'s
+# imports alone and `nexus --help` imports none of them.
+COMMANDS: dict[str, tuple[str, str]] = {
+    "deploy": ("nexus.cli.deploy:main", "Deploy services."),
+    "up": ("nexus.cli.up:main", "Start containers whose definition changed."),
+    "health": ("nexus.cli.health:main", "Check the health of services."),
+    "backup": ("nexus.cli.backup:main", "Back up service data with restic."),
+    "backup-list": ("nexus.cli.backup_list:main", "List backup snapshots."),
+    "backup-verify": (
+        "nexus.cli.backup_verify:main",
+        "Verify backup repositories.",
+    ),
+    "restore": ("nexus.cli.restore:main", "Restore service data from a backup."),
+    "ops": ("nexus.cli.operations:main", "Run maintenance tasks."),
+    "alert-bot": ("nexus.cli.alert_bot:main", "Run the Discord alert bot."),
+}
+
+
+class LazyGroup(click.Group):
+    """A click group whose subcommands are imported on first use.
+
+    Args:
+        lazy_commands: Subcommand name -> ("module:attribute", short help).
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        lazy_commands: Optional[dict[str, tuple[str, str]]] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        return sorted({*super().list_commands(ctx), *self.lazy_commands})
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        if cmd_name not in self.lazy_commands:
+            return super().get_command(ctx, cmd_name)
+        import_path, _ = self.lazy_commands[cmd_name]
+        module_name, attr = import_path.split(":")
+        command = getattr(importlib.import_module(module_name), attr)
+        if not isinstance(command, click.Command):
+            raise TypeError(f"{import_path} is not a click command")
+        return command
+
+    def format_commands(
+        self, ctx: click.Context, formatter: click.HelpFormatter
+    ) -> None:
+        # click's default loads every subcommand to read its help
+        rows = []
+        for name in self.list_commands(ctx):
+            if name in self.lazy_commands:
+                rows.append((name, self.lazy_commands[name][1]))
+                continue
+            command = super().get_command(ctx, name)
+            if command is not None and not command.hidden:
+                rows.append((name, command.get_short_help_str()))
+        if rows:
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
+
+
+@click.group(cls=LazyGroup, lazy_commands=COMMANDS)
+@click.version_option(__version__, prog_name="nexus")
+def main() -> None:
+    """Deploy and operate the Nexus homelab."""
+
+
+if __name__ == "__main__":
+    main()
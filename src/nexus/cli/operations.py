@@ -1,38 +1,71 @@
 import logging
+import sys
+from pathlib import Path
+from typing import Optional
 
 import click
 
+from nexus.config import STATE_PATH, TEXTFILE_PATH
 from nexus.operations import daily_tasks, monthly_tasks, weekly_tasks
+from nexus.operations.cleanup import (
+    DEFAULT_KEEP_PREVIOUS,
+    DEFAULT_THRESHOLD,
+    run_cleanup,
+)
+from nexus.operations.runner import write_report, write_textfile
+from nexus.operations.usage import scan_service_usage
+from nexus.utils import format_size
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
 
-@click.command()
+@click.group(invoke_without_command=True)
 @click.option("--daily", is_flag=True, help="Run daily maintenance tasks.")
 @click.option("--weekly", is_flag=True, help="Run weekly maintenance tasks.")
 @click.option("--monthly", is_flag=True, help="Run monthly maintenance tasks.")
 @click.option("--all", "run_all", is_flag=True, help="Run all maintenance tasks.")
-def main(daily: bool, weekly: bool, monthly: bool, run_all: bool) -> None:
+@click.option(
+    "--report-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=STATE_PATH / "reports",
+    show_default=True,
+    help="Directory for JSON run reports.",
+)
+@click.option(
+    "--textfile",
+    is_flag=True,
+    help="Also export results for node-exporter's textfile collector.",
+)
+@click.pass_context
+def main(
+    ctx: click.Context,
+    daily: bool,
+    weekly: bool,
+    monthly: bool,
+    run_all: bool,
+    report_dir: Path,
+    textfile: bool,
+) -> None:
     """Execute scheduled maintenance tasks for Nexus infrastructure.
 
     Runs maintenance operations grouped by frequency. Tasks include log rotation,
     Docker image cleanup, backup verification, and system health checks.
 
     Args:
+        ctx: Click context, used to detect subcommands.
         daily: Run daily maintenance tasks (log rotation, temp cleanup).
         weekly: Run weekly maintenance tasks (image pruning, backup checks).
         monthly: Run monthly maintenance tasks (full system audit).
         run_all: Run all maintenance tasks regardless of schedule.
-    """
-    if run_all or daily:
-        daily_tasks()
+        report_dir: Directory to write one JSON report per task group run.
+        textfile: Write Prometheus metrics to TEXTFILE_PATH as well.
 
-    if run_all or weekly:
-        weekly_tasks()
-
-    if run_all or monthly:
-        monthly_tasks()
+    Raises:
+        SystemExit: Exit code 1 if any task failed.
+    """
+    if ctx.invoked_subcommand:
+        return
 
     if not (daily or weekly or monthly or run_all):
         logger.error(
@@ -40,8 +73,128 @@ def main(daily: bool, weekly: bool, monthly: bool, run_all: bool) -> None:
         )
         return
 
+    reports = []
+    if run_all or daily:
+        reports.append(daily_tasks())
+
+    if run_all or weekly:
+        reports.append(weekly_tasks())
+
+    if run_all or monthly:
+        reports.append(monthly_tasks())
+
+    for report in reports:
+        path = write_report(report, report_dir)
+        logger.info(f"Report written to {path}")
+        if textfile:
+            write_textfile(report, TEXTFILE_PATH)
+
+    if not all(report.succeeded for report in reports):
+        logger.error("Some maintenance tasks failed")
+        sys.exit(1)
+
     logger.info("🎉 Operations complete!")
 
 
+def _format_growth(growth: Optional[int]) -> str:
+    if growth is None:
+        return "new"
+    sign = "-" if growth < 0 else "+"
+    return sign + format_size(abs(growth))
+
+
+@main.command()
+@click.argument("services", nargs=-1)
+@click.option(
+    "--cached",
+    is_flag=True,
+    help="Reuse cached listings of unchanged directories. Quicker, but misses "
+    "files that grew in place.",
+)
+def usage(services: tuple[str, ...], cached: bool) -> None:
+    """Show how much disk each service's Config directory uses.
+
+    Prints services ranked by size with growth since the previous scan.
+
+    Args:
+        services: Services to scan. Defaults to all services.
+        cached: Reuse cached listings of directories whose mtime is unchanged.
+    """
+    try:
+        usages = scan_service_usage(list(services) or None, cached=cached)
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(1)
+
+    if not usages:
+        logger.warning("No service data directories found")
+        return
+
+    width = max(len(u.service) for u in usages)
+    print(f"{'SERVICE':<{width}}  {'SIZE':>9}  {'GROWTH':>9}")
+    for u in usages:
+        growth = _format_growth(u.growth)
+        print(f"{u.service:<{width}}  {format_size(u.size):>9}  {growth:>9}")
+
+    print(f"\nTotal: {format_size(sum(u.size for u in usages))}")
+
+
+@main.command()
+@click.option("--dry-run", is_flag=True, help="Show what would be removed.")
+@click.option("--force", is_flag=True, help="Clean up regardless of disk usage.")
+@click.option(
+    "--threshold",
+    type=float,
+    default=DEFAULT_THRESHOLD,
+    show_default=True,
+    help="Only clean up once Docker's disk is this percent full.",
+)
+@click.option(
+    "--keep",
+    type=int,
+    default=DEFAULT_KEEP_PREVIOUS,
+    show_default=True,
+    help="Unused images to keep per deployed service for rollback.",
+)
+def cleanup(dry_run: bool, force: bool, threshold: float, keep: int) -> None:
+    """Remove unused Docker images and anonymous volumes.
+
+    Args:
+        dry_run: List candidates and reclaimable bytes without removing.
+        force: Ignore the disk-pressure threshold.
+        threshold: Disk usage percent that triggers cleanup.
+        keep: Previous images to keep per deployed repository.
+    """
+    result = run_cleanup(
+        threshold=threshold, keep_previous=keep, dry_run=dry_run, force=force
+    )
+    plan = result.plan
+
+    for name in plan.kept:
+        print(f"  keep    {name}")
+    for candidate in plan.candidates:
+        print(
+            f"  remove  {candidate.kind:<6}  {format_size(candidate.size):>9}  "
+            f"{candidate.name}"
+        )
+
+    used = (
+        "not on this host"
+        if plan.usage_percent is None
+        else f"{plan.usage_percent:.0f}% used"
+    )
+    print(
+        f"\n{plan.data_root}: {used}, up to {format_size(plan.reclaimable)} reclaimable"
+    )
+    if result.skipped:
+        logger.info(f"Nothing removed: {result.skipped} (use --force to override)")
+    elif dry_run:
+        logger.info("Dry run, nothing removed")
+    else:
+        logger.info(
+            f"Removed {len(result.removed)} items, freed {format_size(result.freed)}"
+        )
+
+
 if __name__ == "__main__":
     main()
@@ -1,13 +1,19 @@
 import logging
+import subprocess
+import sys
+from datetime import datetime
 from typing import Optional
 
 import click
 
 from nexus.restore.backup import (
+    DEFAULT_RESTORE_PARALLELISM,
     _get_container_names,
+    preview_restore,
     restore_backup,
 )
-from nexus.utils import run_command
+from nexus.restore.progress import ProgressPrinter
+from nexus.utils import format_size, run_command
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
@@ -36,12 +42,36 @@ def _verify_backup() -> bool:
     default="local",
     help="Repository to restore from.",
 )
+@click.option(
+    "--as-of",
+    type=click.DateTime(["%Y-%m-%d", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M:%S"]),
+    help="Resolve 'latest' to the newest snapshot at or before this local time.",
+)
+@click.option(
+    "--preview", is_flag=True, help="Show files and bytes per service, then exit."
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Restore only changed files; stop containers just for the final swap.",
+)
+@click.option(
+    "--parallel",
+    type=click.IntRange(min=1),
+    default=DEFAULT_RESTORE_PARALLELISM,
+    show_default=True,
+    help="Number of services restored at once.",
+)
 @click.option("--dry-run", is_flag=True, help="Preview restore without executing.")
 @click.option("--yes", is_flag=True, help="Skip confirmation prompt.")
 def main(
     service: tuple[str, ...],
     snapshot: str,
     target: str,
+    as_of: Optional[datetime],
+    preview: bool,
+    incremental: bool,
+    parallel: int,
     dry_run: bool,
     yes: bool,
 ) -> None:
@@ -55,10 +85,38 @@ def main(
         service: Services to restore. Repeatable (e.g. --service foo --service bar).
         snapshot: Snapshot ID to restore from. Defaults to "latest".
         target: Repository target ("local" or "r2").
+        as_of: Point in time used to resolve "latest". With --service, the
+            newest snapshot that actually contains those services is used.
+        preview: Print what the restore would write and exit.
+        incremental: Stage only files that differ from the snapshot while
+            containers keep running, then stop them briefly to swap.
+        parallel: Maximum number of services restored at once. Each
+            service restarts as soon as its own data is back.
         dry_run: Preview operations without executing.
         yes: Skip the confirmation prompt.
     """
     services: Optional[list[str]] = list(service) if service else None
+    # Naive times from the command line are in the local timezone
+    as_of = as_of.astimezone() if as_of else None
+
+    if preview:
+        try:
+            snapshot_id, previews = preview_restore(
+                snapshot_id=snapshot, services=services, target=target, as_of=as_of
+            )
+        except subprocess.CalledProcessError:
+            logger.error("Could not list the snapshot, nothing to preview")
+            sys.exit(1)
+        except (RuntimeError, ValueError) as e:
+            logger.error(str(e))
+            sys.exit(1)
+        print(f"\nSnapshot {snapshot_id} (repo: {target})")
+        for item in previews:
+            print(
+                f"  {item.service:<20} {item.files:>8} files  "
+                f"{format_size(item.bytes):>10}"
+            )
+        return
 
     if not dry_run and not yes:
         affected = services or ["all services"]
@@ -72,12 +130,20 @@ def main(
                 print(f"Containers that will stop: {', '.join(containers)}")
         click.confirm("\nProceed with restore?", abort=True)
 
-    restore_backup(
-        snapshot_id=snapshot,
-        services=services,
-        target=target,
-        dry_run=dry_run,
-    )
+    progress = ProgressPrinter()
+    try:
+        restore_backup(
+            snapshot_id=snapshot,
+            services=services,
+            target=target,
+            dry_run=dry_run,
+            as_of=as_of,
+            incremental=incremental,
+            parallelism=parallel,
+            progress=progress,
+        )
+    finally:
+        progress.close()
 
 
 if __name__ == "__main__":
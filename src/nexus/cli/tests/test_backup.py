@@ -1,8 +1,11 @@
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 from click.testing import CliRunner
 
 from nexus.cli.backup import main
+from nexus.config import TEXTFILE_PATH
+from nexus.restore.backup import BackupResult
+from nexus.restore.metrics import RepoStats
 
 
 class TestMain:
@@ -12,7 +15,15 @@ class TestMain:
         result = runner.invoke(main, ["--target", "local"])
 
         assert result.exit_code == 0
-        mock_push.assert_called_once_with(target="local", dry_run=False)
+        mock_push.assert_called_once_with(
+            target="local",
+            dry_run=False,
+            parallelism=2,
+            prune=True,
+            mode="direct",
+            progress=ANY,
+            textfile_dir=None,
+        )
 
     @patch("nexus.cli.backup.push_backup")
     def test_main_push_all(self, mock_push: MagicMock) -> None:
@@ -20,7 +31,15 @@ class TestMain:
         result = runner.invoke(main, [])
 
         assert result.exit_code == 0
-        mock_push.assert_called_once_with(target="all", dry_run=False)
+        mock_push.assert_called_once_with(
+            target="all",
+            dry_run=False,
+            parallelism=2,
+            prune=True,
+            mode="direct",
+            progress=ANY,
+            textfile_dir=None,
+        )
 
     @patch("nexus.cli.backup.push_backup")
     def test_main_push_dry_run(self, mock_push: MagicMock) -> None:
@@ -28,7 +47,15 @@ class TestMain:
         result = runner.invoke(main, ["--dry-run"])
 
         assert result.exit_code == 0
-        mock_push.assert_called_once_with(target="all", dry_run=True)
+        mock_push.assert_called_once_with(
+            target="all",
+            dry_run=True,
+            parallelism=2,
+            prune=True,
+            mode="direct",
+            progress=ANY,
+            textfile_dir=None,
+        )
 
     @patch("nexus.cli.backup.push_backup")
     def test_main_push_r2(self, mock_push: MagicMock) -> None:
@@ -36,7 +63,15 @@ class TestMain:
         result = runner.invoke(main, ["--target", "r2"])
 
         assert result.exit_code == 0
-        mock_push.assert_called_once_with(target="r2", dry_run=False)
+        mock_push.assert_called_once_with(
+            target="r2",
+            dry_run=False,
+            parallelism=2,
+            prune=True,
+            mode="direct",
+            progress=ANY,
+            textfile_dir=None,
+        )
 
     @patch("nexus.cli.backup.push_backup")
     def test_main_push_error(self, mock_push: MagicMock) -> None:
@@ -46,3 +81,76 @@ class TestMain:
         result = runner.invoke(main, [])
 
         assert result.exit_code == 1
+
+    @patch("nexus.cli.backup.push_backup")
+    def test_main_push_parallel_no_prune(self, mock_push: MagicMock) -> None:
+        mock_push.return_value = [
+            BackupResult("daily-local", "local", 12.5, "abc", 3, 7, 2048)
+        ]
+
+        runner = CliRunner()
+        result = runner.invoke(main, ["--parallel", "1", "--no-prune"])
+
+        assert result.exit_code == 0
+        mock_push.assert_called_once_with(
+            target="all",
+            dry_run=False,
+            parallelism=1,
+            prune=False,
+            mode="direct",
+            progress=ANY,
+            textfile_dir=None,
+        )
+        assert "daily-local" in result.output
+        assert "2.0K added" in result.output
+
+    @patch("nexus.cli.backup.push_backup")
+    def test_main_push_copy_mode(self, mock_push: MagicMock) -> None:
+        mock_push.return_value = [
+            BackupResult("daily-r2", "r2", 4.0, "abc123", copied_from="local")
+        ]
+
+        runner = CliRunner()
+        result = runner.invoke(main, ["--mode", "copy"])
+
+        assert result.exit_code == 0
+        assert mock_push.call_args.kwargs["mode"] == "copy"
+        assert "copied abc123 from local" in result.output
+
+    @patch("nexus.cli.backup.push_backup")
+    @patch("nexus.cli.backup.prune_backups")
+    def test_main_prune_only(self, mock_prune: MagicMock, mock_push: MagicMock) -> None:
+        runner = CliRunner()
+        result = runner.invoke(main, ["--prune-only", "--target", "r2"])
+
+        assert result.exit_code == 0
+        mock_prune.assert_called_once_with(target="r2", dry_run=False)
+        mock_push.assert_not_called()
+
+    @patch("nexus.cli.backup.push_backup")
+    def test_main_push_textfile(self, mock_push: MagicMock) -> None:
+        runner = CliRunner()
+        result = runner.invoke(main, ["--textfile"])
+
+        assert result.exit_code == 0
+        assert mock_push.call_args.kwargs["textfile_dir"] == TEXTFILE_PATH
+
+    @patch("nexus.cli.backup.push_backup")
+    @patch("nexus.cli.backup.export_backup_metrics")
+    def test_main_metrics_only(
+        self, mock_export: MagicMock, mock_push: MagicMock
+    ) -> None:
+        mock_export.return_value = [RepoStats("r2", 0.0, snapshots=3, size_bytes=2048)]
+        runner = CliRunner()
+        result = runner.invoke(main, ["--metrics-only", "--target", "r2"])
+
+        assert result.exit_code == 0
+        mock_export.assert_called_once_with(target="r2")
+        mock_push.assert_not_called()
+        assert "3 snapshots" in result.output
+
+    def test_main_prune_flags_conflict(self) -> None:
+        runner = CliRunner()
+        result = runner.invoke(main, ["--prune-only", "--no-prune"])
+
+        assert result.exit_code == 2
@@ -0,0 +1,52 @@
+from unittest.mock import MagicMock, patch
+
+from click.testing import CliRunner
+
+from nexus.cli.backup_verify import main
+from nexus.restore.verify import SampleRestoreResult, SliceResult, VerifyReport
+
+
+class TestMain:
+    @patch("nexus.cli.backup_verify.run_verification")
+    def test_main(self, mock_verify: MagicMock) -> None:
+        mock_verify.return_value = VerifyReport(
+            slices=[
+                SliceResult("local", 5, 28, passed=True),
+                SliceResult("r2", 5, 28, passed=True),
+            ]
+        )
+        runner = CliRunner()
+        result = runner.invoke(main, [])
+
+        assert result.exit_code == 0
+        mock_verify.assert_called_once_with(
+            target="all", slices=28, sample_restore_due=None, service=None
+        )
+        assert "r2     slice 5/28  ok" in result.output
+
+    @patch("nexus.cli.backup_verify.run_verification")
+    def test_main_sample_restore(self, mock_verify: MagicMock) -> None:
+        mock_verify.return_value = VerifyReport(
+            sample_restore=SampleRestoreResult(service="homepage", files=3)
+        )
+        runner = CliRunner()
+        result = runner.invoke(
+            main, ["--target", "local", "--sample-restore", "--service", "homepage"]
+        )
+
+        assert result.exit_code == 0
+        mock_verify.assert_called_once_with(
+            target="local", slices=28, sample_restore_due=True, service="homepage"
+        )
+        assert "sample restore of homepage  ok" in result.output
+
+    @patch("nexus.cli.backup_verify.run_verification")
+    def test_main_failure(self, mock_verify: MagicMock) -> None:
+        mock_verify.return_value = VerifyReport(
+            slices=[SliceResult("local", 5, 28, error="pack 1a2b: hash mismatch")]
+        )
+        runner = CliRunner()
+        result = runner.invoke(main, [])
+
+        assert result.exit_code == 1
+        assert "pack 1a2b: hash mismatch" in result.output
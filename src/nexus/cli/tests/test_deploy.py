@@ -1,9 +1,28 @@
+import json
+from collections.abc import Iterator
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import pytest
 from click.testing import CliRunner
 
 from nexus.cli.deploy import _check_dependencies, _generate_configs, main
+from nexus.graph import ServiceGraph
+from nexus.services import ServiceManifest
+
+
+@pytest.fixture(autouse=True)
+def deploy_state(tmp_path: Path) -> Iterator[Path]:
+    state_path = tmp_path / "deploy-state.json"
+    with (
+        patch("nexus.deploy.planner.DEPLOY_STATE_PATH", state_path),
+        patch("nexus.generate.compose.COMPOSE_PATH", tmp_path / "docker-compose.yml"),
+        patch(
+            "nexus.deploy.reconcile.COMPOSE_SPEC_STATE_PATH",
+            tmp_path / "compose-spec.json",
+        ),
+    ):
+        yield state_path
 
 
 class TestCheckDependencies:
@@ -151,6 +170,42 @@ class TestMain:
 
             assert result.exit_code == 0, result.output
 
+    def test_main_rejects_unknown_preset(self) -> None:
+        with patch("nexus.cli.deploy._check_dependencies") as mock_deps:
+            result = CliRunner().invoke(main, ["--preset", "nope", "-y"])
+
+        assert result.exit_code == 2
+        assert "'nope' is not one of: core, home" in result.output
+        mock_deps.assert_not_called()
+
+    def test_main_rejects_dependency_cycle(
+        self, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        manifests = {
+            name: ServiceManifest(
+                name=name, description="", category="", dependencies=[dep]
+            )
+            for name, dep in (("a", "b"), ("b", "a"))
+        }
+        with (
+            patch("nexus.cli.deploy._check_dependencies", return_value=[]),
+            patch("nexus.cli.deploy.VAULT_PATH") as mock_vault,
+            patch(
+                "nexus.cli.deploy.get_service_graph",
+                return_value=ServiceGraph(manifests),
+            ),
+            patch("nexus.cli.deploy.run_ansible") as mock_ansible,
+            patch.dict("os.environ", {"VIRTUAL_ENV": "/fake/venv"}),
+        ):
+            mock_vault.exists.return_value = True
+            result = CliRunner().invoke(
+                main, ["a", "b", "--domain", "example.com", "-y"]
+            )
+
+        assert result.exit_code == 1
+        assert "Dependency cycle: a -> b -> a" in caplog.text
+        mock_ansible.assert_not_called()
+
     def test_main_default_preset(self) -> None:
         with (
             patch("nexus.cli.deploy._check_dependencies", return_value=[]),
@@ -370,3 +425,94 @@ class TestMain:
             mock_ansible.assert_called_once()
             _args, kwargs = mock_ansible.call_args
             assert kwargs["r2_credentials"] is None
+
+    def test_main_skips_unchanged_stages(self) -> None:
+        with (
+            patch("nexus.cli.deploy._check_dependencies", return_value=[]),
+            patch("nexus.cli.deploy._check_docker_network", return_value=True),
+            patch("nexus.cli.deploy._is_vault_encrypted", return_value=True),
+            patch("nexus.cli.deploy.VAULT_PATH") as mock_vault,
+            patch("nexus.utils.read_vault", return_value={}),
+            patch("nexus.cli.deploy.run_terraform") as mock_tf,
+            patch("nexus.cli.deploy.run_ansible") as mock_ansible,
+            patch("nexus.cli.deploy._generate_configs") as mock_configs,
+            patch("nexus.cli.deploy._is_cloudflared_running", return_value=True),
+            patch.dict("os.environ", {"VIRTUAL_ENV": "/fake/venv"}),
+        ):
+            mock_vault.exists.return_value = True
+            runner = CliRunner()
+            args = ["traefik", "--domain", "example.com", "-y"]
+
+            first = runner.invoke(main, args)
+            second = runner.invoke(main, args)
+            forced = runner.invoke(main, [*args, "--force"])
+
+            assert first.exit_code == second.exit_code == forced.exit_code == 0
+            assert "Changes: None (everything up to date)" in second.output
+            assert mock_tf.call_count == 2
+            assert mock_ansible.call_count == 2
+            assert mock_configs.call_count == 2
+            assert mock_ansible.call_args.kwargs["compose_services"] is None
+
+    def test_main_reports_failed_stage(self, tmp_path: Path) -> None:
+        with (
+            patch("nexus.cli.deploy._check_dependencies", return_value=[]),
+            patch("nexus.cli.deploy._check_docker_network", return_value=True),
+            patch("nexus.cli.deploy._is_vault_encrypted", return_value=True),
+            patch("nexus.cli.deploy.VAULT_PATH") as mock_vault,
+            patch("nexus.cli.deploy.run_terraform", side_effect=ValueError("no token")),
+            patch("nexus.cli.deploy.get_r2_credentials") as mock_r2,
+            patch("nexus.cli.deploy.run_ansible") as mock_ansible,
+            patch("nexus.cli.deploy._generate_configs") as mock_configs,
+            patch("nexus.cli.deploy._is_cloudflared_running", return_value=True),
+            patch.dict("os.environ", {"VIRTUAL_ENV": "/fake/venv"}),
+        ):
+            mock_vault.exists.return_value = True
+            trace = tmp_path / "trace.json"
+
+            runner = CliRunner()
+            result = runner.invoke(
+                main,
+                ["backups", "--domain", "example.com", "-y", "--profile", str(trace)],
+            )
+
+            assert result.exit_code == 1
+            # Compose and configs don't need Terraform; the rest does
+            mock_configs.assert_called_once()
+            mock_r2.assert_not_called()
+            mock_ansible.assert_not_called()
+            assert "Stage timings:" in result.output
+            names = [e["name"] for e in json.loads(trace.read_text())["traceEvents"]]
+            assert sorted(names) == ["compose", "configs", "terraform"]
+
+    def test_main_decrypts_vault_once(self) -> None:
+        with (
+            patch("nexus.cli.deploy._check_dependencies", return_value=[]),
+            patch("nexus.cli.deploy._check_docker_network", return_value=True),
+            patch("nexus.cli.deploy._is_vault_encrypted", return_value=True),
+            patch("nexus.cli.deploy.VAULT_PATH") as mock_vault,
+            patch("nexus.utils.read_vault") as mock_read_vault,
+            patch("nexus.cli.deploy.run_terraform") as mock_tf,
+            patch("nexus.cli.deploy.run_ansible"),
+            patch("nexus.cli.deploy.sync_access_rules"),
+            patch("nexus.cli.deploy.generate_dashboard_config", return_value={}),
+            patch("nexus.cli.deploy._is_cloudflared_running", return_value=True),
+            patch.dict(
+                "os.environ",
+                {"VIRTUAL_ENV": "/fake/venv", "NEXUS_DATA_DIRECTORY": ""},
+            ),
+        ):
+            mock_vault.exists.return_value = True
+            mock_read_vault.return_value = {
+                "nexus_domain": "example.org",
+                "nexus_data_directory": "/nonexistent",
+            }
+
+            runner = CliRunner()
+            result = runner.invoke(main, ["traefik", "--dry-run", "-y"])
+
+            assert result.exit_code == 0, result.output
+            mock_read_vault.assert_called_once()
+            session = mock_tf.call_args.kwargs["session"]
+            assert mock_tf.call_args[0][1] == "example.org"
+            assert session.get("nexus_domain") == "example.org"
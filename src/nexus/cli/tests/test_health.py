@@ -19,10 +19,15 @@ class TestMain:
     ):
         mock_docker.return_value = {"traefik": True, "auth": True}
         mock_disk.return_value = {
-            "total": "100G",
-            "used": "50G",
-            "available": "50G",
-            "usage_percent": "50%",
+            "root": {
+                "path": "/",
+                "total": "100G",
+                "used": "50G",
+                "available": "50G",
+                "usage_percent": "50%",
+                "inode_percent": "10%",
+                "days_to_full": "30",
+            }
         }
         mock_ssl.return_value = {"traefik": True, "grafana": True}
 
@@ -37,6 +42,8 @@ class TestMain:
 
         assert result.exit_code == 0
         assert "Health Check Report" in result.output
+        assert "root (/):" in result.output
+        assert "Full in: ~30 days" in result.output
 
     @patch("nexus.cli.health.check_docker_containers")
     @patch("nexus.cli.health.check_disk_space")
@@ -64,6 +71,10 @@ class TestMain:
         result = runner.invoke(main, ["--domain", "example.com"])
 
         assert result.exit_code == 1
+        # traefik is checked before the services that depend on it
+        report = result.output[result.output.index("Service Health:") :]
+        assert report.index("traefik") < report.index("dashboard")
+        assert "Affects: " in report
 
     @patch("nexus.cli.health.check_docker_containers")
     @patch("nexus.cli.health.check_disk_space")
@@ -0,0 +1,87 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import click
+import pytest
+from click.testing import CliRunner
+
+import nexus
+from nexus.cli.main import COMMANDS, LazyGroup, main
+
+SRC_PATH = Path(nexus.__file__).parent.parent
+ENTRY_POINTS = ["nexus.cli.main"] + [
+    path.split(":")[0] for path, _ in COMMANDS.values()
+]
+
+
+def _loaded_after_import(module: str, candidates: list[str]) -> list[str]:
+    # A fresh interpreter, since this one has already imported everything
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {candidates!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, "PYTHONPATH": str(SRC_PATH)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return [m for m in result.stdout.strip().split(",") if m]
+
+
+class TestLazyGroup:
+    def test_lists_every_command(self) -> None:
+        result = CliRunner().invoke(main, ["--help"])
+
+        assert result.exit_code == 0, result.output
+        for name, (_, short_help) in COMMANDS.items():
+            assert name in result.output
+            assert short_help in result.output
+
+    def test_get_command_imports_the_command(self) -> None:
+        from nexus.cli import backup_list
+
+        command = main.get_command(click.Context(main), "backup-list")
+
+        assert command is backup_list.main
+
+    def test_unknown_command(self) -> None:
+        result = CliRunner().invoke(main, ["frobnicate"])
+
+        assert result.exit_code == 2
+        assert "No such command" in result.output
+
+    def test_runs_subcommand(self) -> None:
+        result = CliRunner().invoke(main, ["deploy", "--help"])
+
+        assert result.exit_code == 0, result.output
+        assert "--preset" in result.output
+
+    def test_rejects_non_command(self) -> None:
+        group = LazyGroup(lazy_commands={"bad": ("nexus.config:ROOT_PATH", "")})
+
+        with pytest.raises(TypeError):
+            group.get_command(click.Context(group), "bad")
+
+    def test_eager_commands_still_work(self) -> None:
+        group = LazyGroup(lazy_commands={})
+        group.add_command(click.Command("hello", help="Say hello."))
+
+        result = CliRunner().invoke(group, ["--help"])
+
+        assert "hello" in result.output
+        assert "Say hello." in result.output
+
+
+class TestStartup:
+    def test_help_imports_no_subcommand(self) -> None:
+        subcommands = ENTRY_POINTS[1:]
+
+        assert _loaded_after_import("nexus.cli.main", subcommands) == []
+
+    @pytest.mark.parametrize("module", ENTRY_POINTS)
+    def test_heavy_modules_load_lazily(self, module: str) -> None:
+        assert _loaded_after_import(module, ["yaml", "aiohttp", "discord"]) == []
@@ -1,8 +1,18 @@
-from unittest.mock import patch
+from collections.abc import Generator
+from unittest.mock import MagicMock, patch
 
+import pytest
 from click.testing import CliRunner
 
 from nexus.cli.operations import main
+from nexus.operations.cleanup import CleanupCandidate, CleanupPlan, CleanupResult
+from nexus.operations.usage import ServiceUsage
+
+
+@pytest.fixture(autouse=True)
+def mock_write_report() -> Generator[MagicMock, None, None]:
+    with patch("nexus.cli.operations.write_report") as mock:
+        yield mock
 
 
 class TestMain:
@@ -47,3 +57,122 @@ class TestMain:
         result = runner.invoke(main, [])
 
         assert result.exit_code == 0
+
+    @patch("nexus.cli.operations.daily_tasks")
+    def test_main_writes_report(self, mock_daily, mock_write_report, tmp_path):
+        runner = CliRunner()
+        result = runner.invoke(main, ["--daily", "--report-dir", str(tmp_path)])
+
+        assert result.exit_code == 0
+        mock_write_report.assert_called_once_with(mock_daily.return_value, tmp_path)
+
+    @patch("nexus.cli.operations.write_textfile")
+    @patch("nexus.cli.operations.daily_tasks")
+    def test_main_textfile(self, mock_daily, mock_write_textfile):
+        runner = CliRunner()
+        result = runner.invoke(main, ["--daily", "--textfile"])
+
+        assert result.exit_code == 0
+        mock_write_textfile.assert_called_once()
+
+    @patch("nexus.cli.operations.write_textfile")
+    @patch("nexus.cli.operations.daily_tasks")
+    def test_main_no_textfile_by_default(self, mock_daily, mock_write_textfile):
+        runner = CliRunner()
+        runner.invoke(main, ["--daily"])
+
+        mock_write_textfile.assert_not_called()
+
+    @patch("nexus.cli.operations.daily_tasks")
+    def test_main_exits_nonzero_on_failure(self, mock_daily):
+        mock_daily.return_value.succeeded = False
+
+        runner = CliRunner()
+        result = runner.invoke(main, ["--daily"])
+
+        assert result.exit_code == 1
+
+    def test_main_no_args_writes_nothing(self, mock_write_report):
+        runner = CliRunner()
+        result = runner.invoke(main, [])
+
+        assert result.exit_code == 0
+        mock_write_report.assert_not_called()
+
+
+class TestUsage:
+    @patch("nexus.cli.operations.scan_service_usage")
+    def test_usage_table(self, mock_scan):
+        mock_scan.return_value = [
+            ServiceUsage("plex", "/data/Config/plex", 2048, 1024),
+            ServiceUsage("sure", "/data/Config/sure", 1024),
+        ]
+
+        runner = CliRunner()
+        result = runner.invoke(main, ["usage"])
+
+        assert result.exit_code == 0
+        mock_scan.assert_called_once_with(None, cached=False)
+        lines = result.output.splitlines()
+        assert lines[1].split() == ["plex", "2.0K", "+1.0K"]
+        assert lines[2].split() == ["sure", "1.0K", "new"]
+        assert "Total: 3.0K" in result.output
+
+    @patch("nexus.cli.operations.scan_service_usage")
+    def test_usage_services_and_cached(self, mock_scan):
+        mock_scan.return_value = []
+
+        runner = CliRunner()
+        result = runner.invoke(main, ["usage", "plex", "--cached"])
+
+        assert result.exit_code == 0
+        mock_scan.assert_called_once_with(["plex"], cached=True)
+
+    @patch(
+        "nexus.cli.operations.scan_service_usage",
+        side_effect=ValueError("not configured"),
+    )
+    def test_usage_not_configured(self, mock_scan):
+        runner = CliRunner()
+        result = runner.invoke(main, ["usage"])
+
+        assert result.exit_code == 1
+
+    @patch("nexus.cli.operations.daily_tasks")
+    def test_usage_skips_maintenance(self, mock_daily):
+        with patch("nexus.cli.operations.scan_service_usage", return_value=[]):
+            runner = CliRunner()
+            runner.invoke(main, ["usage"])
+
+        mock_daily.assert_not_called()
+
+
+class TestCleanup:
+    @patch("nexus.cli.operations.run_cleanup")
+    def test_cleanup_dry_run(self, mock_cleanup):
+        plan = CleanupPlan("/var/lib/docker", 91.0, kept=["app@sha256:1"])
+        plan.candidates = [CleanupCandidate("image", "sha256:2", "app:old", 2048)]
+        mock_cleanup.return_value = CleanupResult(plan, removed=plan.candidates)
+
+        runner = CliRunner()
+        result = runner.invoke(main, ["cleanup", "--dry-run", "--keep", "2"])
+
+        assert result.exit_code == 0
+        mock_cleanup.assert_called_once_with(
+            threshold=80, keep_previous=2, dry_run=True, force=False
+        )
+        assert "keep    app@sha256:1" in result.output
+        assert "app:old" in result.output
+        assert "2.0K reclaimable" in result.output
+
+    @patch("nexus.cli.operations.run_cleanup")
+    def test_cleanup_force(self, mock_cleanup):
+        mock_cleanup.return_value = CleanupResult(CleanupPlan("/", 10.0))
+
+        runner = CliRunner()
+        result = runner.invoke(main, ["cleanup", "--force", "--threshold", "50"])
+
+        assert result.exit_code == 0
+        mock_cleanup.assert_called_once_with(
+            threshold=50, keep_previous=1, dry_run=False, force=True
+        )
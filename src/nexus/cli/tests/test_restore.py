@@ -1,4 +1,6 @@
-from unittest.mock import MagicMock, patch
+import subprocess
+from datetime import datetime
+from unittest.mock import ANY, MagicMock, patch
 
 from click.testing import CliRunner
 
@@ -34,6 +36,10 @@ class TestMain:
             services=None,
             target="local",
             dry_run=False,
+            as_of=None,
+            incremental=False,
+            parallelism=2,
+            progress=ANY,
         )
 
     @patch("nexus.cli.restore.restore_backup")
@@ -49,6 +55,10 @@ class TestMain:
             services=["foundryvtt"],
             target="local",
             dry_run=False,
+            as_of=None,
+            incremental=False,
+            parallelism=2,
+            progress=ANY,
         )
 
     @patch("nexus.cli.restore.restore_backup")
@@ -73,6 +83,10 @@ class TestMain:
             services=["foundryvtt", "plex"],
             target="local",
             dry_run=False,
+            as_of=None,
+            incremental=False,
+            parallelism=2,
+            progress=ANY,
         )
 
     @patch("nexus.cli.restore.restore_backup")
@@ -86,6 +100,10 @@ class TestMain:
             services=None,
             target="local",
             dry_run=True,
+            as_of=None,
+            incremental=False,
+            parallelism=2,
+            progress=ANY,
         )
 
     @patch("nexus.cli.restore.restore_backup")
@@ -101,6 +119,10 @@ class TestMain:
             services=None,
             target="r2",
             dry_run=False,
+            as_of=None,
+            incremental=False,
+            parallelism=2,
+            progress=ANY,
         )
 
     @patch("nexus.cli.restore.restore_backup")
@@ -114,6 +136,10 @@ class TestMain:
             services=None,
             target="local",
             dry_run=False,
+            as_of=None,
+            incremental=False,
+            parallelism=2,
+            progress=ANY,
         )
 
     @patch("nexus.cli.restore._get_container_names")
@@ -150,3 +176,85 @@ class TestMain:
 
         assert result.exit_code != 0
         mock_restore.assert_not_called()
+
+
+class TestPointInTime:
+    @patch("nexus.cli.restore.restore_backup")
+    def test_as_of_is_local_time(self, mock_restore: MagicMock) -> None:
+        runner = CliRunner()
+        result = runner.invoke(main, ["--as-of", "2026-10-01 03:30", "--yes"])
+
+        assert result.exit_code == 0
+        as_of = mock_restore.call_args.kwargs["as_of"]
+        assert as_of == datetime(2026, 10, 1, 3, 30).astimezone()
+        assert as_of.tzinfo is not None
+
+    @patch("nexus.cli.restore.restore_backup")
+    def test_as_of_rejects_bad_format(self, mock_restore: MagicMock) -> None:
+        runner = CliRunner()
+        result = runner.invoke(main, ["--as-of", "yesterday", "--yes"])
+
+        assert result.exit_code == 2
+        mock_restore.assert_not_called()
+
+    @patch("nexus.cli.restore.restore_backup")
+    @patch("nexus.cli.restore.preview_restore")
+    def test_preview(self, mock_preview: MagicMock, mock_restore: MagicMock) -> None:
+        mock_preview.return_value = (
+            "abc123full",
+            [MagicMock(service="foundryvtt", files=2, bytes=2048)],
+        )
+        runner = CliRunner()
+        result = runner.invoke(main, ["--service", "foundryvtt", "--preview"])
+
+        assert result.exit_code == 0
+        assert "abc123full" in result.output
+        assert "foundryvtt" in result.output
+        assert "2.0K" in result.output
+        mock_restore.assert_not_called()
+
+    @patch("nexus.cli.restore.restore_backup")
+    @patch(
+        "nexus.cli.restore.preview_restore",
+        side_effect=subprocess.CalledProcessError(1, "restic"),
+    )
+    def test_preview_restic_failure(
+        self, mock_preview: MagicMock, mock_restore: MagicMock
+    ) -> None:
+        result = CliRunner().invoke(main, ["--preview"])
+
+        assert result.exit_code == 1
+        mock_restore.assert_not_called()
+
+    @patch("nexus.cli.restore.restore_backup")
+    @patch("nexus.cli.restore.preview_restore")
+    def test_preview_errors_exit_cleanly(
+        self, mock_preview: MagicMock, mock_restore: MagicMock
+    ) -> None:
+        for error in (
+            RuntimeError("No snapshot at or before 2020-01-01"),
+            ValueError("Repo 'nope' not found"),
+        ):
+            mock_preview.side_effect = error
+
+            result = CliRunner().invoke(main, ["--preview"])
+
+            assert result.exit_code == 1
+            assert not isinstance(result.exception, (RuntimeError, ValueError))
+        mock_restore.assert_not_called()
+
+    @patch("nexus.cli.restore.restore_backup")
+    def test_incremental(self, mock_restore: MagicMock) -> None:
+        runner = CliRunner()
+        result = runner.invoke(main, ["--incremental", "--yes"])
+
+        assert result.exit_code == 0
+        assert mock_restore.call_args.kwargs["incremental"] is True
+
+    @patch("nexus.cli.restore.restore_backup")
+    def test_parallel(self, mock_restore: MagicMock) -> None:
+        runner = CliRunner()
+        result = runner.invoke(main, ["--parallel", "4", "--yes"])
+
+        assert result.exit_code == 0
+        assert mock_restore.call_args.kwargs["parallelism"] == 4
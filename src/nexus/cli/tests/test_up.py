@@ -0,0 +1,45 @@
+import subprocess
+from pathlib import Path
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from nexus.cli.up import main
+from nexus.deploy.reconcile import Reconciliation
+
+
+class TestUp:
+    def test_passes_services_and_flags(self) -> None:
+        plan = Reconciliation(levels=[["db"], ["api"]])
+        with patch("nexus.cli.up.reconcile", return_value=plan) as mock_reconcile:
+            result = CliRunner().invoke(main, ["api", "db", "--all"])
+
+        assert result.exit_code == 0, result.output
+        mock_reconcile.assert_called_once_with(["api", "db"], force=True, dry_run=False)
+        assert "Started: db, api" in result.output
+
+    def test_defaults_to_every_service(self) -> None:
+        with patch(
+            "nexus.cli.up.reconcile", return_value=Reconciliation()
+        ) as mock_reconcile:
+            result = CliRunner().invoke(main, ["--dry-run"])
+
+        assert result.exit_code == 0, result.output
+        mock_reconcile.assert_called_once_with(None, force=False, dry_run=True)
+
+    def test_missing_compose_file(self, tmp_path: Path) -> None:
+        with patch(
+            "nexus.generate.compose.COMPOSE_PATH", tmp_path / "docker-compose.yml"
+        ):
+            result = CliRunner().invoke(main, [])
+
+        assert result.exit_code == 1
+
+    def test_compose_failure(self) -> None:
+        with patch(
+            "nexus.cli.up.reconcile",
+            side_effect=subprocess.CalledProcessError(1, "docker"),
+        ):
+            result = CliRunner().invoke(main, [])
+
+        assert result.exit_code == 1
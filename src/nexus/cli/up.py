@@ -0,0 +1,56 @@
+import logging
+import subprocess
+import sys
+
+import click
+
+from nexus.deploy.reconcile import reconcile
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+
+@click.command()
+@click.argument("services", nargs=-1)
+@click.option(
+    "--all",
+    "all_services",
+    is_flag=True,
+    help="Recreate every container, changed or not.",
+)
+@click.option("--dry-run", is_flag=True, help="Show what would be started.")
+def main(services: tuple[str, ...], all_services: bool, dry_run: bool) -> None:
+    """Start containers from the generated docker-compose.yml.
+
+    Only containers whose compose definition changed since they were last
+    started, and containers that aren't running, are (re)created. Config
+    generation, Terraform and Ansible are skipped. docker compose gets the
+    same vault-backed variables the playbook passes it, but a vault change
+    alone doesn't recreate anything; use `nexus deploy` for that.
+
+    Args:
+        services: Compose services to consider. Defaults to all of them.
+        all_services: Recreate every considered container.
+        dry_run: Log the docker compose commands without running them.
+
+    Raises:
+        SystemExit: If the compose file is missing, the vault can't be read
+            or docker compose fails.
+    """
+    try:
+        plan = reconcile(list(services) or None, force=all_services, dry_run=dry_run)
+    except FileNotFoundError as e:
+        logger.error(f"{e.filename} not found. Run `nexus deploy` first.")
+        sys.exit(1)
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    except subprocess.CalledProcessError:
+        sys.exit(1)
+
+    if plan.services and not dry_run:
+        print(f"Started: {', '.join(plan.services)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,10 @@ TERRAFORM_PATH = ROOT_PATH / "terraform"
 ANSIBLE_PATH = ROOT_PATH / "ansible"
 VAULT_PATH = ANSIBLE_PATH / "vars" / "vault.yml"
 TAILSCALE_PATH = ROOT_PATH / "tailscale"
+# Local, untracked state persisted between runs (cursors, caches, reports)
+STATE_PATH = ROOT_PATH / ".nexus"
+# Mounted into node-exporter for its textfile collector
+TEXTFILE_PATH = STATE_PATH / "textfile"
 
 
 @cache
@@ -39,45 +43,30 @@ def load_presets() -> dict[str, list[str] | dict[str, Any]]:
     Raises:
         FileNotFoundError: If presets.yml doesn't exist.
     """
-    import yaml
+    from nexus.loader import load_yaml_file
 
-    with open(PRESETS_PATH) as f:
-        return yaml.safe_load(f) or {}
+    return load_yaml_file(PRESETS_PATH) or {}
 
 
 def resolve_preset(name: str) -> list[str]:
     """Resolve a preset name to its list of services, handling extends.
 
-    Supports the 'extends' key for preset inheritance.
+    Supports the 'extends' key for preset inheritance. Expansions are
+    memoized by the shared ServiceGraph.
 
     Args:
         name: The name of the preset to resolve.
 
     Returns:
         A deduplicated list of service names included in the preset.
-    """
-    presets = load_presets()
-    preset = presets.get(name)
-
-    if preset is None:
-        return []
 
-    services: list[str] = []
-
-    # Handle dict format with 'extends' and 'services' keys
-    if isinstance(preset, dict):
-        if "extends" in preset:
-            services.extend(resolve_preset(preset["extends"]))
-        services.extend(preset.get("services", []))
-    # Handle simple list format
-    elif isinstance(preset, list):
-        for item in preset:
-            if item in presets:
-                services.extend(resolve_preset(item))
-            else:
-                services.append(item)
+    Raises:
+        CycleError: If the preset extends itself, directly or not.
+    """
+    # Import here to avoid circular imports
+    from nexus.graph import get_service_graph
 
-    return sorted(list(set(services)))
+    return get_service_graph().expand_preset(name)
 
 
 def get_base_domain() -> Optional[str]:
@@ -88,10 +77,3 @@ def get_base_domain() -> Optional[str]:
         None if not configured.
     """
     return os.environ.get("NEXUS_DOMAIN")
-
-
-# Export for CLI
-try:
-    PRESETS = load_presets()
-except FileNotFoundError:
-    PRESETS = {}
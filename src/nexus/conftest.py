@@ -0,0 +1,19 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+import nexus.loader
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    # Keep parsed-YAML cache entries out of the checkout's .nexus/. One
+    # throwaway cache is shared by the whole session; tests of the cache
+    # itself patch in their own.
+    nexus.loader.YAML_CACHE_PATH = Path(tempfile.mkdtemp(prefix="nexus-yaml-cache-"))
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    if nexus.loader.YAML_CACHE_PATH:
+        shutil.rmtree(nexus.loader.YAML_CACHE_PATH, ignore_errors=True)
@@ -13,6 +13,7 @@ def run_ansible(
     dry_run: bool = False,
     r2_credentials: Optional[R2Credentials] = None,
     backups_r2_credentials: Optional[R2Credentials] = None,
+    compose_services: Optional[list[str]] = None,
 ) -> None:
     """Execute the Ansible playbook to deploy Docker services.
 
@@ -28,6 +29,10 @@ def run_ansible(
             Foundry S3 configuration.
         backups_r2_credentials: Optional R2 credentials for Backups. If provided,
             these are passed as extra-vars for Backrest R2 repository configuration.
+        compose_services: Compose services to recreate. The generated
+            docker-compose.yml still covers every service, but only these
+            containers are pulled and recreated, and the rest of the stack
+            keeps running. Redeploys the whole stack if None.
 
     Raises:
         FileNotFoundError: If the Ansible playbook does not exist.
@@ -65,6 +70,9 @@ def run_ansible(
         )
         extra_vars.append(f"backups_r2_bucket={backups_r2_credentials['bucket']}")
 
+    if compose_services is not None:
+        extra_vars.append(f"compose_services={','.join(compose_services)}")
+
     extra_vars_str = " ".join(extra_vars)
 
     if dry_run:
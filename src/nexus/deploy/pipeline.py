@@ -0,0 +1,237 @@
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One step of the deploy pipeline.
+
+    Attributes:
+        name: Identifier used in logs, the timing summary, and as the key of
+            the stage's output.
+        func: Callable doing the work. It receives the outputs of the stages
+            in needs, keyed by stage name, and its return value is the
+            stage's output. Raising an exception marks the stage as failed.
+        needs: Names of the stages that must succeed before this one starts.
+    """
+
+    name: str
+    func: Callable[[dict[str, Any]], Any]
+    needs: tuple[str, ...] = ()
+
+
+@dataclass
+class StageResult:
+    """Outcome of a single pipeline stage.
+
+    Attributes:
+        name: Name of the stage.
+        status: "ok", "failed", or "skipped" (a stage it needs didn't succeed).
+        started_at: Unix timestamp when the stage started.
+        duration: Wall-clock duration in seconds.
+        thread: Worker the stage ran on, for the trace.
+        error: Error message if the stage failed or was skipped.
+    """
+
+    name: str
+    status: str
+    started_at: float = 0.0
+    duration: float = 0.0
+    thread: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class PipelineReport:
+    """Results of one pipeline run.
+
+    Attributes:
+        started_at: Unix timestamp when the run started.
+        duration: Wall-clock duration of the whole run in seconds.
+        stages: Per-stage results in declaration order.
+        outputs: Each successful stage's output, keyed by stage name.
+    """
+
+    started_at: float
+    duration: float = 0.0
+    stages: list[StageResult] = field(default_factory=list)
+    outputs: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def succeeded(self) -> bool:
+        return all(stage.status == "ok" for stage in self.stages)
+
+
+def _validate(stages: list[Stage]) -> None:
+    names = [stage.name for stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate stage names: {names}")
+
+    declared = set(names)
+    for stage in stages:
+        unknown = set(stage.needs) - declared
+        if unknown:
+            raise ValueError(f"Stage {stage.name} needs unknown stages: {unknown}")
+
+    # Kahn's algorithm: every stage must become ready eventually
+    remaining = {stage.name: set(stage.needs) for stage in stages}
+    while remaining:
+        ready = [name for name, needs in remaining.items() if not needs]
+        if not ready:
+            raise ValueError(f"Stages form a cycle: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for needs in remaining.values():
+            needs.difference_update(ready)
+
+
+def _execute(stage: Stage, inputs: dict[str, Any]) -> tuple[StageResult, Any]:
+    result = StageResult(
+        name=stage.name,
+        status="ok",
+        started_at=time.time(),
+        thread=threading.get_ident(),
+    )
+    start = time.perf_counter()
+    output = None
+    try:
+        output = stage.func(inputs)
+    except Exception as e:
+        logger.error(f"✗ {stage.name} failed: {e}")
+        result.status, result.error = "failed", str(e)
+    result.duration = time.perf_counter() - start
+    return result, output
+
+
+def run_pipeline(
+    stages: list[Stage], max_workers: int = DEFAULT_MAX_WORKERS
+) -> PipelineReport:
+    """Run pipeline stages as a DAG, concurrently where they're independent.
+
+    A stage starts as soon as every stage it needs has succeeded. When a
+    stage fails, the stages that need it (directly or not) are skipped;
+    independent stages still run to completion.
+
+    Args:
+        stages: Stages to run.
+        max_workers: Maximum number of stages running at once.
+
+    Returns:
+        A PipelineReport with one StageResult per stage, in declaration order.
+
+    Raises:
+        ValueError: If stage names repeat, a stage needs an unknown stage,
+            or the stages form a cycle.
+    """
+    _validate(stages)
+    report = PipelineReport(started_at=time.time())
+    start = time.perf_counter()
+
+    pending = list(stages)
+    running: dict[Future[tuple[StageResult, Any]], Stage] = {}
+    results: dict[str, StageResult] = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            for stage in list(pending):
+                blocked = [
+                    n for n in stage.needs if n in results and n not in report.outputs
+                ]
+                if blocked:
+                    pending.remove(stage)
+                    results[stage.name] = StageResult(
+                        name=stage.name,
+                        status="skipped",
+                        error=f"Needs {', '.join(blocked)}, which didn't succeed",
+                    )
+                    continue
+                if all(n in report.outputs for n in stage.needs):
+                    pending.remove(stage)
+                    inputs = {n: report.outputs[n] for n in stage.needs}
+                    running[pool.submit(_execute, stage, inputs)] = stage
+
+            if not running:
+                # Skipping a stage may have made later ones skippable
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                result, output = future.result()
+                results[stage.name] = result
+                if result.status == "ok":
+                    report.outputs[stage.name] = output
+
+    report.stages = [results[stage.name] for stage in stages]
+    report.duration = time.perf_counter() - start
+    return report
+
+
+def format_timings(report: PipelineReport) -> str:
+    """Format a per-stage timing summary.
+
+    Args:
+        report: The pipeline report.
+
+    Returns:
+        One line per stage, then the wall-clock total. The total is less
+        than the sum of the stages when stages overlapped.
+    """
+    width = max((len(stage.name) for stage in report.stages), default=0)
+    lines = []
+    for stage in report.stages:
+        status = "" if stage.status == "ok" else f"  ({stage.status})"
+        lines.append(f"  {stage.name:<{width}}  {stage.duration:6.1f}s{status}")
+    busy = sum(stage.duration for stage in report.stages)
+    lines.append(
+        f"  {'total':<{width}}  {report.duration:6.1f}s  ({busy:.1f}s of work)"
+    )
+    return "\n".join(lines)
+
+
+def write_trace(report: PipelineReport, path: Path) -> Path:
+    """Write the pipeline's stages as a Chrome trace.
+
+    The file uses the Trace Event Format, which chrome://tracing and
+    https://ui.perfetto.dev open directly. Each worker thread is a track.
+
+    Args:
+        report: The pipeline report.
+        path: Where to write the trace. Parent directories are created.
+
+    Returns:
+        The path written.
+    """
+    threads: dict[int, int] = {}
+    events: list[dict[str, Any]] = []
+    for stage in report.stages:
+        if stage.status == "skipped":
+            continue
+        tid = threads.setdefault(stage.thread, len(threads) + 1)
+        events.append(
+            {
+                "name": stage.name,
+                "cat": "deploy",
+                "ph": "X",
+                "ts": round((stage.started_at - report.started_at) * 1e6),
+                "dur": round(stage.duration * 1e6),
+                "pid": 1,
+                "tid": tid,
+                "args": {"status": stage.status, "error": stage.error},
+            }
+        )
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, indent=2)
+    return path
@@ -0,0 +1,319 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from nexus.config import ANSIBLE_PATH, SERVICES_PATH, STATE_PATH, TERRAFORM_PATH
+from nexus.deploy.reconcile import COMPOSE_VAULT_VARS
+from nexus.deploy.terraform import TERRAFORM_VAULT_KEYS, get_subdomains
+from nexus.loader import YAMLError, load_yaml_file
+from nexus.utils import load_state, save_state
+
+# Fingerprints of what each stage last deployed successfully
+DEPLOY_STATE_PATH = STATE_PATH / "deploy-state.json"
+
+# Vault keys and environment overrides every service is rendered with
+_SHARED_VAULT_KEYS = (
+    "nexus_domain",
+    "nexus_data_directory",
+    "nexus_userdata_directory",
+    "tz",
+    "acme_email",
+    # Rendered into the ForwardAuth access rules by the role
+    "tailscale_users",
+)
+_ENV_OVERRIDES = ("NEXUS_DATA_DIRECTORY", "NEXUS_USERDATA_DIRECTORY", "ACME_EMAIL")
+
+# Vault keys the generated dashboard and access rules are rendered with
+_CONFIG_VAULT_KEYS = (
+    "tailscale_users",
+    "grafana_admin_user",
+    "grafana_admin_password",
+    "jellyfin_api_key",
+    "plex_token",
+)
+_GENERATE_PATH = Path(__file__).parent.parent / "generate"
+
+# Documentation doesn't change what is deployed
+_IGNORED_SUFFIXES = (".md",)
+
+_JINJA_VAR = re.compile(r"{{-?\s*([a-z_][a-z0-9_]*)")
+_COMPOSE_VAR = re.compile(r"\$\{([A-Z_][A-Z0-9_]*)")
+
+
+@dataclass
+class DeployPlan:
+    """Which deploy stages are out of date, and what to record once they run.
+
+    Attributes:
+        services: Every service in this deploy.
+        changed: Services whose files or vault values changed since they
+            were last deployed.
+        terraform: Whether Terraform inputs changed.
+        full: Whether the whole stack must be redeployed: on the first
+            deploy, when the service list or the shared Ansible/vault inputs
+            changed, or when forced.
+        configs: Whether the access rules and dashboard configs need
+            regenerating: whenever Ansible runs, or when the generators or
+            the vault values only they read changed.
+        compose_services: Compose services of the changed services, which
+            are the only containers recreated when the deploy isn't full.
+        fingerprints: Fingerprints of the current inputs, recorded by
+            record_deploy() once a stage succeeds.
+    """
+
+    services: list[str]
+    changed: list[str] = field(default_factory=list)
+    terraform: bool = True
+    full: bool = True
+    configs: bool = True
+    compose_services: list[str] = field(default_factory=list)
+    fingerprints: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def ansible(self) -> bool:
+        """Whether Ansible has anything to deploy."""
+        return self.full or bool(self.changed)
+
+
+def _digest(value: Any) -> str:
+    encoded = json.dumps(value, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _hash_tree(root: Path, pattern: str = "**/*") -> str:
+    digest = hashlib.sha256()
+    if not root.is_dir():
+        return digest.hexdigest()
+    for path in sorted(root.glob(pattern)):
+        if not path.is_file() or path.suffix in _IGNORED_SUFFIXES:
+            continue
+        digest.update(str(path.relative_to(root)).encode() + b"\0")
+        digest.update(path.read_bytes() + b"\0")
+    return digest.hexdigest()
+
+
+def _vault_values(vault: dict[str, Any], keys: Iterable[str]) -> str:
+    # Only a digest is stored, never the secrets themselves
+    return _digest({key: vault[key] for key in sorted(keys) if key in vault})
+
+
+def _service_vault_keys(service_dir: Path, vault: dict[str, Any]) -> set[str]:
+    keys = set()
+    for template in service_dir.glob("**/*.j2"):
+        keys.update(_JINJA_VAR.findall(template.read_text()))
+    compose_path = service_dir / "docker-compose.yml"
+    if compose_path.exists():
+        # Compose variables are filled from vault keys by the playbook
+        keys.update(
+            COMPOSE_VAULT_VARS[name][0]
+            for name in _COMPOSE_VAR.findall(compose_path.read_text())
+            if name in COMPOSE_VAULT_VARS
+        )
+    return keys & vault.keys()
+
+
+def service_fingerprint(service: str, vault: dict[str, Any]) -> str:
+    """Fingerprint everything a service's deployment is rendered from.
+
+    Covers every file in the service directory (manifest, compose file,
+    templates, config) and the vault values its templates and compose file
+    reference, so the fingerprint changes whenever its rendered output would.
+
+    Args:
+        service: Service name.
+        vault: Decrypted vault contents.
+
+    Returns:
+        Hex digest of the service's inputs.
+    """
+    service_dir = SERVICES_PATH / service
+    return _digest(
+        {
+            "files": _hash_tree(service_dir),
+            "vault": _vault_values(vault, _service_vault_keys(service_dir, vault)),
+        }
+    )
+
+
+def shared_fingerprint(domain: str, vault: dict[str, Any]) -> str:
+    """Fingerprint the inputs every service is deployed with.
+
+    Args:
+        domain: Base domain of the deploy.
+        vault: Decrypted vault contents.
+
+    Returns:
+        Hex digest of the playbook, roles, shared vault values and overrides.
+    """
+    return _digest(
+        {
+            "ansible": _hash_tree(ANSIBLE_PATH, "*.yml")
+            + _hash_tree(ANSIBLE_PATH / "roles"),
+            "domain": domain,
+            "vault": _vault_values(vault, _SHARED_VAULT_KEYS),
+            "env": {name: os.environ.get(name, "") for name in _ENV_OVERRIDES},
+        }
+    )
+
+
+def configs_fingerprint(domain: str, vault: dict[str, Any]) -> str:
+    """Fingerprint the inputs of the generated dashboard and access rules.
+
+    Args:
+        domain: Base domain of the deploy.
+        vault: Decrypted vault contents.
+
+    Returns:
+        Hex digest of the generators and the vault values only they read.
+    """
+    return _digest(
+        {
+            "generators": _hash_tree(_GENERATE_PATH, "*.py"),
+            "domain": domain,
+            "vault": _vault_values(vault, _CONFIG_VAULT_KEYS),
+        }
+    )
+
+
+def terraform_fingerprint(
+    services: list[str], domain: str, vault: dict[str, Any]
+) -> str:
+    """Fingerprint the inputs of the Terraform stage.
+
+    Args:
+        services: Services being deployed.
+        domain: Base domain of the deploy.
+        vault: Decrypted vault contents.
+
+    Returns:
+        Hex digest of the Terraform config, subdomains and vault values.
+    """
+    return _digest(
+        {
+            "config": _hash_tree(TERRAFORM_PATH, "*.tf"),
+            "domain": domain,
+            "subdomains": get_subdomains(services),
+            "vault": _vault_values(vault, TERRAFORM_VAULT_KEYS),
+        }
+    )
+
+
+def compose_services(services: list[str]) -> list[str]:
+    """Return the compose services that make up the given services.
+
+    Args:
+        services: Service names.
+
+    Returns:
+        Names of the services in their docker-compose.yml files.
+    """
+    names: list[str] = []
+    for service in services:
+        compose_path = SERVICES_PATH / service / "docker-compose.yml"
+        try:
+            compose = load_yaml_file(compose_path) or {}
+        except (FileNotFoundError, YAMLError):
+            continue
+        names.extend(compose.get("services") or {})
+    return names
+
+
+def plan_deploy(
+    services: list[str],
+    domain: str,
+    vault: dict[str, Any],
+    force: bool = False,
+    state_path: Optional[Path] = None,
+) -> DeployPlan:
+    """Work out which deploy stages are out of date.
+
+    Each stage's inputs are fingerprinted and compared with what the last
+    successful deploy recorded. Terraform is skipped unless its config,
+    subdomains or vault values changed; Ansible only recreates the changed
+    services' containers unless the whole stack must be redeployed.
+
+    Args:
+        services: Services being deployed.
+        domain: Base domain of the deploy.
+        vault: Decrypted vault contents. Pass {} if the vault is unreadable.
+        force: Treat every stage and service as changed.
+        state_path: Where deploy fingerprints are kept. Defaults to
+            DEPLOY_STATE_PATH.
+
+    Returns:
+        The deploy plan.
+    """
+    state = load_state(state_path or DEPLOY_STATE_PATH)
+    fingerprints: dict[str, Any] = {
+        "shared": shared_fingerprint(domain, vault),
+        "terraform": terraform_fingerprint(services, domain, vault),
+        "configs": configs_fingerprint(domain, vault),
+        "services": {svc: service_fingerprint(svc, vault) for svc in services},
+    }
+
+    full = (
+        force
+        or state.get("shared") != fingerprints["shared"]
+        or sorted(state.get("deployed", [])) != sorted(services)
+    )
+    deployed = state.get("services", {})
+    changed = [
+        svc
+        for svc in services
+        if full or deployed.get(svc) != fingerprints["services"][svc]
+    ]
+
+    plan = DeployPlan(
+        services=services,
+        changed=changed,
+        terraform=force or state.get("terraform") != fingerprints["terraform"],
+        full=full,
+        configs=full
+        or bool(changed)
+        or state.get("configs") != fingerprints["configs"],
+        compose_services=compose_services(changed),
+        fingerprints=fingerprints,
+    )
+    logging.debug(
+        f"Deploy plan: full={plan.full}, terraform={plan.terraform}, "
+        f"configs={plan.configs}, changed={plan.changed}"
+    )
+    return plan
+
+
+def record_deploy(
+    plan: DeployPlan,
+    terraform: bool = False,
+    services: bool = False,
+    configs: bool = False,
+    state_path: Optional[Path] = None,
+) -> None:
+    """Record the stages of a plan that deployed successfully.
+
+    Args:
+        plan: The plan that was carried out.
+        terraform: Whether the Terraform stage succeeded.
+        services: Whether the Ansible stage succeeded.
+        configs: Whether the configs stage succeeded.
+        state_path: Where deploy fingerprints are kept. Defaults to
+            DEPLOY_STATE_PATH.
+    """
+    path = state_path or DEPLOY_STATE_PATH
+    state = load_state(path)
+    if terraform:
+        state["terraform"] = plan.fingerprints["terraform"]
+    if configs:
+        state["configs"] = plan.fingerprints["configs"]
+    if services:
+        state["shared"] = plan.fingerprints["shared"]
+        state["services"] = plan.fingerprints["services"]
+        state["deployed"] = sorted(plan.services)
+    state["updated_at"] = time.time()
+    save_state(path, state)
@@ -0,0 +1,450 @@
+"""Recreate only the containers whose compose definition changed.
+
+Backs `nexus up`: each service in the generated docker-compose.yml is
+fingerprinted, compared with what its container was last started from, and
+only changed or stopped services are brought up, one dependency level at a
+time.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from nexus.config import STATE_PATH
+from nexus.utils import VaultError, VaultSession, load_state, run_command, save_state
+
+# Per-service fingerprints of the compose spec containers were last started from
+COMPOSE_SPEC_STATE_PATH = STATE_PATH / "compose-spec.json"
+
+COMPOSE_PROJECT = "nexus"
+
+# Compose variable -> (vault key, default), as the playbook passes them to
+# docker compose. The *_DIRECTORY paths derived from other values are added
+# by compose_environment().
+COMPOSE_VAULT_VARS: dict[str, tuple[str, str]] = {
+    "NEXUS_ROOT_DIRECTORY": ("nexus_root_directory", ""),
+    "NEXUS_DATA_DIRECTORY": ("nexus_data_directory", "/Volumes/Data"),
+    "NEXUS_DOMAIN": ("nexus_domain", ""),
+    "TZ": ("tz", "America/Vancouver"),
+    "CLOUDFLARE_DNS_API_TOKEN": ("cloudflare_api_token", ""),
+    "CLOUDFLARE_ZONE_ID": ("cloudflare_zone_id", ""),
+    "ACME_EMAIL": ("acme_email", ""),
+    "FOUNDRY_USERNAME": ("foundry_username", "admin"),
+    "FOUNDRY_PASSWORD": ("foundry_password", ""),
+    "FOUNDRY_ADMIN_KEY": ("foundry_admin_key", ""),
+    "SURE_POSTGRES_USER": ("sure_postgres_user", "sure_user"),
+    "SURE_POSTGRES_PASSWORD": ("sure_postgres_password", ""),
+    "SURE_POSTGRES_DB": ("sure_postgres_db", "sure_production"),
+    "SURE_SECRET_KEY_BASE": ("sure_secret_key_base", ""),
+    "SURE_OPENAI_ACCESS_TOKEN": ("sure_openai_access_token", ""),
+    "SURE_OPENAI_URI_BASE": ("sure_openai_uri_base", ""),
+    "SURE_OPENAI_MODEL": ("sure_openai_model", ""),
+    "SURE_PORT": ("sure_port", "5006"),
+    "GRAFANA_ADMIN_USER": ("grafana_admin_user", "admin"),
+    "GRAFANA_ADMIN_PASSWORD": ("grafana_admin_password", ""),
+    "DISCORD_WEBHOOK_URL": ("discord_webhook_url", ""),
+    "RESTIC_PASSWORD": ("restic_password", ""),
+    "TAILNET_ID": ("tailnet_id", ""),
+    "VAULTWARDEN_ADMIN_TOKEN": ("vaultwarden_admin_token", ""),
+    "VAULTWARDEN_SIGNUPS_ALLOWED": ("vaultwarden_signups_allowed", "false"),
+    "VAULTWARDEN_INVITATIONS_ALLOWED": ("vaultwarden_invitations_allowed", "true"),
+    "PAPERLESS_POSTGRES_USER": ("paperless_postgres_user", "paperless"),
+    "PAPERLESS_POSTGRES_PASSWORD": ("paperless_postgres_password", ""),
+    "PAPERLESS_POSTGRES_DB": ("paperless_postgres_db", "paperless"),
+    "PAPERLESS_SECRET_KEY": ("paperless_secret_key", ""),
+    "PAPERLESS_ADMIN_USER": ("paperless_admin_user", "admin"),
+    "PAPERLESS_ADMIN_PASSWORD": ("paperless_admin_password", ""),
+    "GRIMMORY_MYSQL_USER": ("grimmory_mysql_user", "grimmory"),
+    "GRIMMORY_MYSQL_PASSWORD": ("grimmory_mysql_password", ""),
+    "GRIMMORY_MYSQL_ROOT_PASSWORD": ("grimmory_mysql_root_password", ""),
+    "PUID": ("puid", "1000"),
+    "PGID": ("pgid", "1000"),
+}
+
+# Aspect -> compose service keys it covers. Anything not listed is "other".
+_ASPECTS: dict[str, tuple[str, ...]] = {
+    "image": ("image", "build", "platform"),
+    "environment": ("environment", "env_file"),
+    "labels": ("labels",),
+    "volumes": ("volumes", "tmpfs", "devices"),
+    "resources": (
+        "deploy",
+        "cpus",
+        "cpu_shares",
+        "cpuset",
+        "mem_limit",
+        "mem_reservation",
+        "memswap_limit",
+        "shm_size",
+        "ulimits",
+    ),
+}
+
+
+@dataclass
+class Reconciliation:
+    """What it takes to bring running containers in line with the compose spec.
+
+    Attributes:
+        changed: Compose services whose spec changed since they were last
+            started, mapped to the aspects that changed.
+        stopped: Compose services whose spec is unchanged but that aren't
+            running.
+        removed: Compose services that were started before and are no
+            longer in the spec.
+        pull: Compose services whose image has to be pulled first.
+        levels: Services to start, grouped so each group only depends on
+            the groups before it.
+        fingerprints: Fingerprints of the current spec, recorded once the
+            services are up.
+    """
+
+    changed: dict[str, list[str]] = field(default_factory=dict)
+    stopped: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    pull: list[str] = field(default_factory=list)
+    levels: list[list[str]] = field(default_factory=list)
+    fingerprints: dict[str, dict[str, str]] = field(default_factory=dict)
+
+    @property
+    def services(self) -> list[str]:
+        """Every compose service that will be started, in start order."""
+        return [name for level in self.levels for name in level]
+
+
+def _digest(value: Any) -> str:
+    encoded = json.dumps(value, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def spec_fingerprint(config: dict[str, Any]) -> dict[str, str]:
+    """Fingerprint a compose service definition, one digest per aspect.
+
+    Variables such as ${TZ} are fingerprinted as written, so a vault change
+    alone never makes `nexus up` recreate a container. Run `nexus deploy`
+    for that: its planner fingerprints the vault values behind them.
+
+    Args:
+        config: The service's definition from a compose file.
+
+    Returns:
+        Aspect name -> hex digest, covering every key of the definition.
+    """
+    grouped: dict[str, dict[str, Any]] = {aspect: {} for aspect in _ASPECTS}
+    grouped["other"] = {}
+    aspect_of = {key: aspect for aspect, keys in _ASPECTS.items() for key in keys}
+    for key, value in config.items():
+        grouped[aspect_of.get(key, "other")][key] = value
+    return {aspect: _digest(values) for aspect, values in grouped.items()}
+
+
+def _depends_on(config: dict[str, Any]) -> list[str]:
+    # Either a list of names or a mapping of name -> condition
+    depends_on = config.get("depends_on") or []
+    return list(depends_on)
+
+
+def _resolve(compose_path: Optional[Path]) -> Path:
+    # Looked up on each call so it follows the generator's COMPOSE_PATH
+    from nexus.generate.compose import COMPOSE_PATH
+
+    return compose_path or COMPOSE_PATH
+
+
+def _load_spec(compose_path: Path) -> dict[str, Any]:
+    # Import here so `nexus up --help` doesn't pull in YAML
+    from nexus.loader import load_yaml_file
+
+    return (load_yaml_file(compose_path) or {}).get("services") or {}
+
+
+def _compose(compose_path: Path, *args: str) -> list[str]:
+    return [
+        "docker",
+        "compose",
+        "-p",
+        COMPOSE_PROJECT,
+        "-f",
+        str(compose_path),
+        *args,
+    ]
+
+
+def compose_environment(vault: dict[str, Any], root: Path) -> dict[str, str]:
+    """Build the variables docker compose interpolates into the compose file.
+
+    Mirrors the environment the playbook's compose task passes, so
+    containers started outside Ansible get the same values.
+
+    Args:
+        vault: Decrypted vault contents.
+        root: Directory of the generated compose file. Used when the vault
+            doesn't set nexus_root_directory.
+
+    Returns:
+        Variable name -> value.
+    """
+
+    def value(key: str, default: str) -> str:
+        found = vault.get(key)
+        return default if found is None else str(found)
+
+    env = {
+        name: value(key, default) for name, (key, default) in COMPOSE_VAULT_VARS.items()
+    }
+    env["NEXUS_ROOT_DIRECTORY"] = env["NEXUS_ROOT_DIRECTORY"] or str(root)
+
+    base = env["NEXUS_DATA_DIRECTORY"]
+    userdata = value("nexus_userdata_directory", "")
+    subdirs = {
+        "FOUNDRYVTT_DATA_DIRECTORY": ("foundryvtt", "Config/foundryvtt/data"),
+        "PAPERLESS_DOCUMENTS_DIRECTORY": ("paperless", "Config/paperless/media"),
+        "GRIMMORY_BOOKS_DIRECTORY": ("grimmory", "Config/grimmory/books"),
+        "SURE_DATA_DIRECTORY": ("sure", "Config/sure"),
+    }
+    for name, (in_userdata, in_base) in subdirs.items():
+        env[name] = f"{userdata}/{in_userdata}" if userdata else f"{base}/{in_base}"
+    env["NEXUS_USERDATA_DIRECTORY"] = userdata or f"{base}/Config"
+    return env
+
+
+def _read_compose_environment(
+    session: Optional[VaultSession], compose_path: Path
+) -> dict[str, str]:
+    try:
+        vault = (session or VaultSession()).read()
+    except FileNotFoundError as err:
+        raise ValueError(
+            "vault.yml not found. "
+            "Run: cp ansible/vars/vault.yml.sample ansible/vars/vault.yml"
+        ) from err
+    except (EOFError, VaultError, subprocess.CalledProcessError) as err:
+        raise ValueError(
+            "Failed to decrypt vault.yml. Check your vault password."
+        ) from err
+    env = os.environ.copy()
+    env.update(compose_environment(vault, compose_path.parent))
+    return env
+
+
+def running_services(compose_path: Path) -> set[str]:
+    """Return the compose services that have a running container.
+
+    Args:
+        compose_path: The compose file the project was started from.
+
+    Returns:
+        Compose service names.
+    """
+    result = run_command(
+        _compose(compose_path, "ps", "--services", "--status", "running"),
+        cwd=compose_path.parent,
+        capture=True,
+    )
+    return {line.strip() for line in result.stdout.splitlines() if line.strip()}
+
+
+def plan_reconcile(
+    services: Optional[list[str]] = None,
+    compose_path: Optional[Path] = None,
+    force: bool = False,
+    check_running: bool = True,
+    state_path: Optional[Path] = None,
+) -> Reconciliation:
+    """Work out which containers have to be (re)created.
+
+    Each compose service's definition is fingerprinted and compared with
+    what it was last started from. Only services whose definition changed,
+    and services that aren't running, are started.
+
+    Args:
+        services: Only consider these compose services. Defaults to all.
+        compose_path: The generated compose file. Defaults to COMPOSE_PATH.
+        force: Treat every considered service as changed.
+        check_running: Also start unchanged services that aren't running.
+        state_path: Where spec fingerprints are kept. Defaults to
+            COMPOSE_SPEC_STATE_PATH.
+
+    Returns:
+        The reconciliation plan.
+
+    Raises:
+        ValueError: If services names a service that isn't in the spec.
+        CycleError: If depends_on forms a cycle.
+    """
+    # Import here to avoid circular imports
+    from nexus.graph import ServiceGraph
+
+    compose_path = _resolve(compose_path)
+    spec = _load_spec(compose_path)
+    unknown = sorted(set(services or []) - spec.keys())
+    if unknown:
+        raise ValueError(f"Not in {compose_path.name}: {', '.join(unknown)}")
+    selected = sorted(services) if services else sorted(spec)
+
+    state = load_state(state_path or COMPOSE_SPEC_STATE_PATH)
+    previous: dict[str, dict[str, str]] = state.get("services", {})
+    fingerprints = {name: spec_fingerprint(spec[name] or {}) for name in spec}
+
+    plan = Reconciliation(fingerprints=fingerprints)
+    for name in selected:
+        before = previous.get(name)
+        if force or before is None:
+            plan.changed[name] = sorted(fingerprints[name])
+            continue
+        aspects = [a for a, d in fingerprints[name].items() if before.get(a) != d]
+        if aspects:
+            plan.changed[name] = sorted(aspects)
+    if not services:
+        plan.removed = sorted(previous.keys() - spec.keys())
+
+    if check_running:
+        running = running_services(compose_path)
+        plan.stopped = [
+            name
+            for name in selected
+            if name not in plan.changed and name not in running
+        ]
+
+    plan.pull = sorted(
+        name
+        for name, aspects in plan.changed.items()
+        if "image" in aspects and "build" not in (spec[name] or {})
+    )
+
+    graph = ServiceGraph.from_dependencies(
+        {name: _depends_on(config or {}) for name, config in spec.items()}
+    )
+    to_start = set(plan.changed) | set(plan.stopped)
+    # Ordering the whole spec keeps dependencies that run through
+    # untouched services in order too
+    level_of: dict[str, int] = {}
+    for name in graph.order(spec):
+        if name not in to_start:
+            continue
+        deps = graph.dependencies(name, transitive=True)
+        level_of[name] = max(
+            (level_of[d] + 1 for d in deps if d in level_of), default=0
+        )
+        while len(plan.levels) <= level_of[name]:
+            plan.levels.append([])
+        plan.levels[level_of[name]].append(name)
+    return plan
+
+
+def reconcile(
+    services: Optional[list[str]] = None,
+    compose_path: Optional[Path] = None,
+    force: bool = False,
+    dry_run: bool = False,
+    state_path: Optional[Path] = None,
+    session: Optional[VaultSession] = None,
+) -> Reconciliation:
+    """Recreate only the containers whose compose spec changed.
+
+    New images are pulled in one `docker compose pull`, which fetches them
+    in parallel. Services are then brought up with `--no-deps`, one
+    dependency level at a time, so unchanged dependencies are left running.
+    docker compose gets the vault-backed variables the playbook would pass.
+
+    Args:
+        services: Only consider these compose services. Defaults to all.
+        compose_path: The generated compose file. Defaults to COMPOSE_PATH.
+        force: Recreate every considered service.
+        dry_run: Log the commands without running them.
+        state_path: Where spec fingerprints are kept. Defaults to
+            COMPOSE_SPEC_STATE_PATH.
+        session: Vault session to read from. Decrypts the vault if None.
+
+    Returns:
+        The plan that was carried out.
+
+    Raises:
+        ValueError: If services names a service that isn't in the spec, or
+            the vault can't be read.
+        subprocess.CalledProcessError: If a docker compose command fails.
+    """
+    compose_path = _resolve(compose_path)
+    plan = plan_reconcile(
+        services,
+        compose_path,
+        force=force,
+        check_running=not dry_run,
+        state_path=state_path,
+    )
+    for name, aspects in plan.changed.items():
+        logging.info(f"{name}: {', '.join(aspects)} changed")
+    if plan.stopped:
+        logging.info(f"Not running: {', '.join(plan.stopped)}")
+    if plan.removed:
+        logging.warning(
+            f"No longer in {compose_path.name}, left running: "
+            f"{', '.join(plan.removed)}. Run `docker compose down "
+            "--remove-orphans` to remove them."
+        )
+    if not plan.levels:
+        logging.info("All containers are up to date")
+        return plan
+
+    commands: list[list[str]] = []
+    if plan.pull:
+        commands.append(_compose(compose_path, "pull", *plan.pull))
+    for level in plan.levels:
+        commands.append(_compose(compose_path, "up", "-d", "--no-deps", *level))
+
+    # Only the commands that start containers interpolate secrets, so the
+    # vault isn't decrypted when everything is up to date
+    env = None if dry_run else _read_compose_environment(session, compose_path)
+    for command in commands:
+        if dry_run:
+            logging.info(f"[DRY RUN] Would run: {' '.join(command)}")
+        else:
+            run_command(command, cwd=compose_path.parent, env=env)
+
+    if not dry_run:
+        _record(state_path, plan.fingerprints, plan.services)
+    return plan
+
+
+def _record(
+    state_path: Optional[Path],
+    fingerprints: dict[str, dict[str, str]],
+    services: list[str],
+) -> None:
+    path = state_path or COMPOSE_SPEC_STATE_PATH
+    state = load_state(path)
+    # Forget services that left the spec, they were warned about once
+    recorded = {
+        name: fingerprint
+        for name, fingerprint in state.get("services", {}).items()
+        if name in fingerprints
+    }
+    recorded.update({name: fingerprints[name] for name in services})
+    state["services"] = recorded
+    state["updated_at"] = time.time()
+    save_state(path, state)
+
+
+def record_compose_spec(
+    services: Optional[list[str]] = None,
+    compose_path: Optional[Path] = None,
+    state_path: Optional[Path] = None,
+) -> None:
+    """Record the spec compose services were started from.
+
+    Args:
+        services: Compose services that were started. Defaults to all.
+        compose_path: The compose file they were started from. Defaults to
+            COMPOSE_PATH.
+        state_path: Where spec fingerprints are kept. Defaults to
+            COMPOSE_SPEC_STATE_PATH.
+    """
+    spec = _load_spec(_resolve(compose_path))
+    fingerprints = {name: spec_fingerprint(spec[name] or {}) for name in spec}
+    _record(state_path, fingerprints, list(spec) if services is None else services)
@@ -7,12 +7,57 @@ from typing import Any, Optional
 from nexus.config import TERRAFORM_PATH
 from nexus.services import discover_services
 from nexus.types import R2Credentials
-from nexus.utils import read_vault
+from nexus.utils import VaultError, VaultSession, read_vault
 
+# Vault keys that feed Terraform, as credentials or variables
+TERRAFORM_VAULT_KEYS = (
+    "cloudflare_api_token",
+    "cloudflare_zone_id",
+    "cloudflare_account_id",
+    "tunnel_secret",
+    "tailscale_oauth_client_id",
+    "tailscale_oauth_client_secret",
+    "tailscale_server_ip",
+    "tailnet_id",
+    "tailscale_users",
+)
 
-def _get_terraform_vars_from_vault() -> dict[str, str]:
+
+def get_subdomains(services: list[str]) -> list[str]:
+    """Return the private subdomains Terraform creates DNS records for.
+
+    Public services are routed by their own tunnel rules and are skipped.
+    Services without a manifest get a subdomain named after them.
+
+    Args:
+        services: Service names being deployed.
+
+    Returns:
+        Sorted, de-duplicated list of subdomains.
+    """
+    subdomains = []
+    all_manifests = discover_services()
+
+    for svc in services:
+        if svc in all_manifests:
+            manifest = all_manifests[svc]
+            if manifest.is_public:
+                continue
+            subdomains.extend(manifest.subdomains)
+        else:
+            subdomains.append(svc)
+
+    return sorted(set(subdomains))
+
+
+def _get_terraform_vars_from_vault(
+    session: Optional[VaultSession] = None,
+) -> dict[str, str]:
     """Read Cloudflare credentials from vault.yml and return as TF_VAR dict.
 
+    Args:
+        session: Vault session to read from. Decrypts the vault if None.
+
     Returns:
         Dictionary of TF_VAR_* environment variables to set.
 
@@ -20,13 +65,13 @@ def _get_terraform_vars_from_vault() -> dict[str, str]:
         ValueError: If required vault keys are missing.
     """
     try:
-        vault = read_vault()
+        vault = session.read() if session else read_vault()
     except FileNotFoundError as err:
         raise ValueError(
             "vault.yml not found. "
             "Run: cp ansible/vars/vault.yml.sample ansible/vars/vault.yml"
         ) from err
-    except subprocess.CalledProcessError as err:
+    except (EOFError, VaultError, subprocess.CalledProcessError) as err:
         raise ValueError(
             "Failed to decrypt vault.yml. Check your vault password."
         ) from err
@@ -73,16 +118,19 @@ def run_terraform(
     services: list[str],
     domain: str,
     dry_run: bool = False,
+    session: Optional[VaultSession] = None,
 ) -> None:
     """Execute Terraform to manage Cloudflare Tunnel and DNS for services.
 
     Creates a Cloudflare Tunnel and configures DNS records.
-    Reads Cloudflare credentials from vault.yml (decrypted via ansible-vault).
+    Reads Cloudflare credentials from vault.yml (decrypted with the vault password).
 
     Args:
         services: List of service names (used for DNS subdomain records).
         domain: Base domain for DNS records (e.g., "example.com").
         dry_run: If True, show plan without applying.
+        session: Vault session shared with the rest of the deploy. Decrypts
+            the vault separately if None.
 
     Raises:
         subprocess.CalledProcessError: If terraform init or apply fails.
@@ -94,7 +142,7 @@ def run_terraform(
 
     # Get Cloudflare credentials from vault.yml
     logging.info("Reading Cloudflare credentials from vault.yml...")
-    tf_env_vars = _get_terraform_vars_from_vault()
+    tf_env_vars = _get_terraform_vars_from_vault(session)
 
     # Set environment variables for Terraform
     env = os.environ.copy()
@@ -105,7 +153,7 @@ def run_terraform(
     tailnet_id = ""
     tailscale_users: dict[str, list[str]] = {}
     try:
-        vault = read_vault()
+        vault = session.read() if session else read_vault()
         tailscale_ip = vault.get("tailscale_server_ip", "")
         tailnet_id = vault.get("tailnet_id", "")
         tailscale_users = vault.get("tailscale_users", {})
@@ -113,20 +161,7 @@ def run_terraform(
         logging.debug("Could not read Tailscale configuration from vault")
         pass
 
-    # Build subdomains from service manifests
-    subdomains = []
-    all_manifests = discover_services()
-
-    for svc in services:
-        if svc in all_manifests:
-            manifest = all_manifests[svc]
-            if manifest.is_public:
-                continue
-            subdomains.extend(manifest.subdomains)
-        else:
-            subdomains.append(svc)
-
-    subdomains = sorted(list(set(subdomains)))
+    subdomains = get_subdomains(services)
 
     # tf_vars contains mixed types: str, list[str], and dict[str, list[str]]
     tf_vars: dict[str, Any] = {
@@ -28,6 +28,20 @@ class TestRunAnsible:
         assert args[0] == "ansible-playbook"
         assert "plex,jellyfin" in args[3]
 
+    @patch("nexus.deploy.ansible.run_command")
+    @patch("nexus.deploy.ansible.ANSIBLE_PATH")
+    def test_run_ansible_compose_services(
+        self, mock_path: MagicMock, mock_run_command: MagicMock, tmp_path: Path
+    ) -> None:
+        (tmp_path / "playbook.yml").touch()
+        mock_path.__truediv__.side_effect = lambda arg: tmp_path / arg
+
+        run_ansible(["monitoring", "traefik"], compose_services=["grafana", "loki"])
+
+        extra_vars = mock_run_command.call_args[0][0][3]
+        assert "services=monitoring,traefik" in extra_vars
+        assert "compose_services=grafana,loki" in extra_vars
+
     @patch("nexus.deploy.ansible.ANSIBLE_PATH")
     def test_run_ansible_playbook_not_found(
         self, mock_path: MagicMock, tmp_path: Path
@@ -0,0 +1,130 @@
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from nexus.deploy.pipeline import (
+    PipelineReport,
+    Stage,
+    StageResult,
+    format_timings,
+    run_pipeline,
+    write_trace,
+)
+
+
+def _boom(_: dict[str, Any]) -> None:
+    raise RuntimeError("boom")
+
+
+class TestRunPipeline:
+    def test_outputs_flow_to_dependents(self) -> None:
+        report = run_pipeline(
+            [
+                Stage("sum", lambda inputs: inputs["a"] + inputs["b"], ("a", "b")),
+                Stage("a", lambda _: 1),
+                Stage("b", lambda _: 2),
+            ]
+        )
+
+        assert report.succeeded is True
+        assert report.outputs["sum"] == 3
+        assert [s.name for s in report.stages] == ["sum", "a", "b"]
+
+    def test_independent_stages_run_concurrently(self) -> None:
+        barrier = threading.Barrier(2, timeout=5)
+
+        report = run_pipeline(
+            [
+                Stage("terraform", lambda _: barrier.wait()),
+                Stage("configs", lambda _: barrier.wait()),
+            ]
+        )
+
+        assert report.succeeded is True
+
+    def test_dependent_waits_for_its_needs(self) -> None:
+        order: list[str] = []
+
+        def slow(_: dict[str, Any]) -> None:
+            time.sleep(0.05)
+            order.append("terraform")
+
+        run_pipeline(
+            [
+                Stage(
+                    "cloudflared", lambda _: order.append("cloudflared"), ("terraform",)
+                ),
+                Stage("terraform", slow),
+            ]
+        )
+
+        assert order == ["terraform", "cloudflared"]
+
+    def test_failure_skips_dependents_only(self) -> None:
+        ran: list[str] = []
+
+        report = run_pipeline(
+            [
+                Stage("terraform", _boom),
+                Stage("r2_credentials", lambda _: ran.append("r2"), ("terraform",)),
+                Stage("ansible", lambda _: ran.append("ansible"), ("r2_credentials",)),
+                Stage("configs", lambda _: ran.append("configs")),
+            ]
+        )
+
+        assert ran == ["configs"]
+        assert report.succeeded is False
+        statuses = {s.name: s.status for s in report.stages}
+        assert statuses == {
+            "terraform": "failed",
+            "r2_credentials": "skipped",
+            "ansible": "skipped",
+            "configs": "ok",
+        }
+        assert report.stages[0].error == "boom"
+
+    @pytest.mark.parametrize(
+        "stages",
+        [
+            [Stage("a", lambda _: None, ("missing",))],
+            [Stage("a", lambda _: None), Stage("a", lambda _: None)],
+            [Stage("a", lambda _: None, ("b",)), Stage("b", lambda _: None, ("a",))],
+        ],
+    )
+    def test_invalid_graphs(self, stages: list[Stage]) -> None:
+        with pytest.raises(ValueError):
+            run_pipeline(stages)
+
+
+def _report() -> PipelineReport:
+    return PipelineReport(
+        started_at=100.0,
+        duration=3.0,
+        stages=[
+            StageResult("terraform", "ok", started_at=100.0, duration=2.5, thread=11),
+            StageResult("configs", "ok", started_at=100.1, duration=0.5, thread=22),
+            StageResult("ansible", "skipped", error="Needs terraform"),
+        ],
+    )
+
+
+class TestReporting:
+    def test_format_timings(self) -> None:
+        lines = format_timings(_report()).splitlines()
+
+        assert lines[0] == "  terraform     2.5s"
+        assert lines[2] == "  ansible       0.0s  (skipped)"
+        assert lines[3] == "  total         3.0s  (3.0s of work)"
+
+    def test_write_trace(self, tmp_path: Path) -> None:
+        path = write_trace(_report(), tmp_path / "traces" / "deploy.json")
+
+        events = json.loads(path.read_text())["traceEvents"]
+        assert [(e["name"], e["ts"], e["dur"], e["tid"]) for e in events] == [
+            ("terraform", 0, 2_500_000, 1),
+            ("configs", 100_000, 500_000, 2),
+        ]
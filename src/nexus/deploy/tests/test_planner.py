@@ -0,0 +1,270 @@
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from nexus.deploy.planner import compose_services, plan_deploy, record_deploy
+from nexus.services import discover_services
+
+VAULT = {
+    "nexus_domain": "example.com",
+    "cloudflare_api_token": "token",
+    "grafana_admin_password": "hunter2",
+    "restic_password": "s3cret",
+}
+
+
+def _service(root: Path, name: str, compose: str, **files: str) -> Path:
+    service_dir = root / "services" / name
+    service_dir.mkdir(parents=True)
+    (service_dir / "service.yml").write_text(
+        f"name: {name}\ncategory: Core\nsubdomains: [{name}]\n"
+    )
+    (service_dir / "docker-compose.yml").write_text(compose)
+    for filename, content in files.items():
+        (service_dir / filename.replace("_", ".")).write_text(content)
+    return service_dir
+
+
+@pytest.fixture
+def root(tmp_path: Path) -> Iterator[Path]:
+    _service(
+        tmp_path,
+        "monitoring",
+        "services:\n  grafana:\n    environment:\n"
+        "      - PASSWORD=${GRAFANA_ADMIN_PASSWORD}\n  prometheus: {}\n",
+    )
+    _service(
+        tmp_path,
+        "backups",
+        "services:\n  backrest: {}\n",
+        config_json_j2='{"password": "{{ restic_password }}"}',
+    )
+    (tmp_path / "ansible").mkdir()
+    (tmp_path / "ansible" / "playbook.yml").write_text("- hosts: localhost\n")
+    (tmp_path / "terraform").mkdir()
+    (tmp_path / "terraform" / "main.tf").write_text("# tunnel\n")
+    (tmp_path / "generate").mkdir()
+    (tmp_path / "generate" / "dashboard.py").write_text("# dashboard\n")
+
+    services_path = tmp_path / "services"
+    with (
+        patch("nexus.deploy.planner.SERVICES_PATH", services_path),
+        patch("nexus.deploy.planner.ANSIBLE_PATH", tmp_path / "ansible"),
+        patch("nexus.deploy.planner.TERRAFORM_PATH", tmp_path / "terraform"),
+        patch("nexus.deploy.planner._GENERATE_PATH", tmp_path / "generate"),
+        patch(
+            "nexus.deploy.terraform.discover_services",
+            side_effect=lambda: discover_services(services_path),
+        ),
+    ):
+        yield tmp_path
+
+
+SERVICES = ["backups", "monitoring"]
+
+
+def _deployed(state_path: Path, vault: dict[str, str] = VAULT) -> None:
+    plan = plan_deploy(SERVICES, "example.com", vault, state_path=state_path)
+    record_deploy(
+        plan, terraform=True, services=True, configs=True, state_path=state_path
+    )
+
+
+class TestPlanDeploy:
+    def test_first_deploy_is_full(self, root: Path) -> None:
+        plan = plan_deploy(
+            SERVICES, "example.com", VAULT, state_path=root / "state.json"
+        )
+
+        assert plan.full is True
+        assert plan.terraform is True
+        assert plan.changed == SERVICES
+
+    def test_nothing_changed(self, root: Path) -> None:
+        state_path = root / "state.json"
+        _deployed(state_path)
+
+        plan = plan_deploy(SERVICES, "example.com", VAULT, state_path=state_path)
+
+        assert (plan.full, plan.terraform, plan.changed) == (False, False, [])
+        assert plan.ansible is False
+        assert plan.configs is False
+
+    def test_compose_edit_redeploys_only_that_service(self, root: Path) -> None:
+        state_path = root / "state.json"
+        _deployed(state_path)
+        compose = root / "services" / "monitoring" / "docker-compose.yml"
+        compose.write_text(compose.read_text() + "  loki: {}\n")
+
+        plan = plan_deploy(SERVICES, "example.com", VAULT, state_path=state_path)
+
+        assert plan.full is False
+        assert plan.terraform is False
+        assert plan.changed == ["monitoring"]
+        assert plan.compose_services == ["grafana", "prometheus", "loki"]
+
+    def test_readme_edit_changes_nothing(self, root: Path) -> None:
+        state_path = root / "state.json"
+        _deployed(state_path)
+        (root / "services" / "backups" / "README.md").write_text("# Backups\n")
+
+        plan = plan_deploy(SERVICES, "example.com", VAULT, state_path=state_path)
+
+        assert plan.ansible is False
+
+    def test_referenced_vault_key_dirties_service(self, root: Path) -> None:
+        state_path = root / "state.json"
+        _deployed(state_path)
+
+        plan = plan_deploy(
+            SERVICES,
+            "example.com",
+            {**VAULT, "restic_password": "rotated"},
+            state_path=state_path,
+        )
+
+        assert plan.changed == ["backups"]
+        assert plan.terraform is False
+
+    def test_unreferenced_vault_key_changes_nothing(self, root: Path) -> None:
+        state_path = root / "state.json"
+        _deployed(state_path)
+
+        plan = plan_deploy(
+            SERVICES,
+            "example.com",
+            {**VAULT, "plex_claim": "claim-123"},
+            state_path=state_path,
+        )
+
+        assert plan.ansible is False
+
+    def test_terraform_vault_key_dirties_terraform(self, root: Path) -> None:
+        state_path = root / "state.json"
+        _deployed(state_path)
+
+        plan = plan_deploy(
+            SERVICES,
+            "example.com",
+            {**VAULT, "cloudflare_api_token": "rotated"},
+            state_path=state_path,
+        )
+
+        assert plan.terraform is True
+        assert plan.ansible is False
+
+    def test_renamed_compose_variable_dirties_service(self, root: Path) -> None:
+        # The playbook fills ${CLOUDFLARE_DNS_API_TOKEN} from cloudflare_api_token
+        _service(
+            root,
+            "traefik",
+            "services:\n  traefik:\n    environment:\n"
+            "      - CF_DNS_API_TOKEN=${CLOUDFLARE_DNS_API_TOKEN}\n",
+        )
+        services = [*SERVICES, "traefik"]
+        state_path = root / "state.json"
+        plan = plan_deploy(services, "example.com", VAULT, state_path=state_path)
+        record_deploy(plan, terraform=True, services=True, state_path=state_path)
+
+        plan = plan_deploy(
+            services,
+            "example.com",
+            {**VAULT, "cloudflare_api_token": "rotated"},
+            state_path=state_path,
+        )
+
+        assert plan.changed == ["traefik"]
+        assert plan.terraform is True
+
+    def test_tailscale_users_redeploy_access_rules(self, root: Path) -> None:
+        state_path = root / "state.json"
+        _deployed(state_path)
+
+        plan = plan_deploy(
+            SERVICES,
+            "example.com",
+            {**VAULT, "tailscale_users": {"admins": ["a@example.com"]}},
+            state_path=state_path,
+        )
+
+        assert plan.full is True
+        assert plan.configs is True
+
+    @pytest.mark.parametrize("key", ["jellyfin_api_key", "plex_token"])
+    def test_dashboard_secret_regenerates_configs_only(
+        self, root: Path, key: str
+    ) -> None:
+        state_path = root / "state.json"
+        _deployed(state_path)
+
+        plan = plan_deploy(
+            SERVICES, "example.com", {**VAULT, key: "rotated"}, state_path=state_path
+        )
+
+        assert plan.configs is True
+        assert plan.ansible is False
+
+    def test_generator_change_regenerates_configs(self, root: Path) -> None:
+        state_path = root / "state.json"
+        _deployed(state_path)
+        (root / "generate" / "dashboard.py").write_text("# widgets\n")
+
+        plan = plan_deploy(SERVICES, "example.com", VAULT, state_path=state_path)
+
+        assert plan.configs is True
+        assert plan.ansible is False
+
+    def test_new_service_is_full_deploy(self, root: Path) -> None:
+        state_path = root / "state.json"
+        _deployed(state_path)
+        _service(root, "homepage", "services:\n  homepage: {}\n")
+
+        plan = plan_deploy(
+            [*SERVICES, "homepage"], "example.com", VAULT, state_path=state_path
+        )
+
+        # New subdomain and a new docker-compose.yml for the whole stack
+        assert plan.terraform is True
+        assert plan.full is True
+
+    def test_playbook_change_is_full_deploy(self, root: Path) -> None:
+        state_path = root / "state.json"
+        _deployed(state_path)
+        (root / "ansible" / "playbook.yml").write_text("- hosts: all\n")
+
+        plan = plan_deploy(SERVICES, "example.com", VAULT, state_path=state_path)
+
+        assert plan.full is True
+        assert plan.terraform is False
+
+    def test_force(self, root: Path) -> None:
+        state_path = root / "state.json"
+        _deployed(state_path)
+
+        plan = plan_deploy(
+            SERVICES, "example.com", VAULT, force=True, state_path=state_path
+        )
+
+        assert (plan.full, plan.terraform) == (True, True)
+
+    def test_failed_ansible_is_retried(self, root: Path) -> None:
+        state_path = root / "state.json"
+        plan = plan_deploy(SERVICES, "example.com", VAULT, state_path=state_path)
+        record_deploy(plan, terraform=True, state_path=state_path)
+
+        plan = plan_deploy(SERVICES, "example.com", VAULT, state_path=state_path)
+
+        assert plan.terraform is False
+        assert plan.full is True
+
+    def test_state_holds_no_secrets(self, root: Path) -> None:
+        state_path = root / "state.json"
+        _deployed(state_path)
+
+        assert "s3cret" not in state_path.read_text()
+
+
+def test_compose_services_skips_missing_files(root: Path) -> None:
+    assert compose_services(["backups", "unknown"]) == ["backrest"]
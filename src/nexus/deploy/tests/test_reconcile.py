@@ -0,0 +1,302 @@
+import subprocess
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from nexus.deploy.reconcile import (
+    compose_environment,
+    plan_reconcile,
+    reconcile,
+    record_compose_spec,
+    spec_fingerprint,
+)
+from nexus.utils import VaultError
+
+COMPOSE = """
+services:
+  db:
+    image: postgres:16
+    volumes: [db-data:/var/lib/postgresql/data]
+  api:
+    image: app:1
+    environment: [DB_HOST=db]
+    depends_on: [db]
+  web:
+    image: nginx
+    labels: [traefik.enable=true]
+    depends_on:
+      api:
+        condition: service_healthy
+  cron:
+    image: busybox
+volumes:
+  db-data:
+"""
+
+
+def _commands(mock_run: MagicMock) -> list[list[str]]:
+    return [call.args[0] for call in mock_run.call_args_list]
+
+
+@pytest.fixture
+def compose_path(tmp_path: Path) -> Path:
+    path = tmp_path / "docker-compose.yml"
+    path.write_text(COMPOSE)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def state_path(tmp_path: Path) -> Iterator[Path]:
+    path = tmp_path / "compose-spec.json"
+    with patch("nexus.deploy.reconcile.COMPOSE_SPEC_STATE_PATH", path):
+        yield path
+
+
+@pytest.fixture(autouse=True)
+def mock_session() -> Iterator[MagicMock]:
+    with patch("nexus.deploy.reconcile.VaultSession") as mock:
+        mock.return_value.read.return_value = {
+            "nexus_domain": "example.org",
+            "nexus_data_directory": "/data",
+            "grafana_admin_password": "s3cret",
+            "puid": 501,
+        }
+        yield mock.return_value
+
+
+@pytest.fixture
+def mock_run() -> Iterator[MagicMock]:
+    # Every service is running unless a test says otherwise
+    with patch("nexus.deploy.reconcile.run_command") as mock:
+        mock.return_value = subprocess.CompletedProcess(
+            args=[], returncode=0, stdout="db\napi\nweb\ncron\n"
+        )
+        yield mock
+
+
+class TestSpecFingerprint:
+    def test_groups_keys_by_aspect(self) -> None:
+        before = spec_fingerprint({"image": "a:1", "environment": ["X=1"]})
+        after = spec_fingerprint({"image": "a:2", "environment": ["X=1"]})
+
+        changed = [aspect for aspect in before if before[aspect] != after[aspect]]
+        assert changed == ["image"]
+
+    def test_unlisted_keys_are_other(self) -> None:
+        before = spec_fingerprint({"restart": "always"})
+        after = spec_fingerprint({"restart": "no"})
+
+        assert before["other"] != after["other"]
+        assert before["image"] == after["image"]
+
+
+class TestPlanReconcile:
+    def test_first_run_starts_everything_in_levels(
+        self, compose_path: Path, mock_run: MagicMock
+    ) -> None:
+        plan = plan_reconcile(compose_path=compose_path)
+
+        assert plan.levels == [["cron", "db"], ["api"], ["web"]]
+        assert plan.pull == ["api", "cron", "db", "web"]
+
+    def test_nothing_changed(self, compose_path: Path, mock_run: MagicMock) -> None:
+        record_compose_spec(compose_path=compose_path)
+
+        plan = plan_reconcile(compose_path=compose_path)
+
+        assert plan.changed == {}
+        assert plan.levels == []
+
+    def test_only_changed_service(
+        self, compose_path: Path, mock_run: MagicMock
+    ) -> None:
+        record_compose_spec(compose_path=compose_path)
+        compose_path.write_text(COMPOSE.replace("[DB_HOST=db]", "[DB_HOST=db2]"))
+
+        plan = plan_reconcile(compose_path=compose_path)
+
+        assert plan.changed == {"api": ["environment"]}
+        assert plan.pull == []
+        assert plan.levels == [["api"]]
+
+    def test_levels_follow_dependencies_through_untouched_services(
+        self, compose_path: Path, mock_run: MagicMock
+    ) -> None:
+        record_compose_spec(compose_path=compose_path)
+        compose_path.write_text(
+            COMPOSE.replace("postgres:16", "postgres:17").replace("nginx", "nginx:1.27")
+        )
+
+        plan = plan_reconcile(compose_path=compose_path)
+
+        assert plan.levels == [["db"], ["web"]]
+        assert plan.pull == ["db", "web"]
+
+    def test_starts_stopped_services(
+        self, compose_path: Path, mock_run: MagicMock
+    ) -> None:
+        record_compose_spec(compose_path=compose_path)
+        mock_run.return_value.stdout = "db\napi\n"
+
+        plan = plan_reconcile(compose_path=compose_path)
+
+        assert plan.stopped == ["cron", "web"]
+        assert plan.pull == []
+        assert plan.levels == [["cron", "web"]]
+
+    def test_reports_removed_services(
+        self, compose_path: Path, mock_run: MagicMock
+    ) -> None:
+        compose_path.write_text(
+            COMPOSE.replace("services:\n", "services:\n  old:\n    image: x\n")
+        )
+        record_compose_spec(compose_path=compose_path)
+        compose_path.write_text(COMPOSE)
+
+        plan = plan_reconcile(compose_path=compose_path)
+
+        assert plan.removed == ["old"]
+        assert plan.levels == []
+
+    def test_selected_services(self, compose_path: Path, mock_run: MagicMock) -> None:
+        plan = plan_reconcile(["web", "db"], compose_path=compose_path)
+
+        assert plan.levels == [["db"], ["web"]]
+
+    def test_unknown_service(self, compose_path: Path, mock_run: MagicMock) -> None:
+        with pytest.raises(ValueError, match=r"Not in docker-compose\.yml: nope"):
+            plan_reconcile(["nope"], compose_path=compose_path)
+
+    def test_force(self, compose_path: Path, mock_run: MagicMock) -> None:
+        record_compose_spec(compose_path=compose_path)
+
+        plan = plan_reconcile(["api"], compose_path=compose_path, force=True)
+
+        assert plan.levels == [["api"]]
+
+
+class TestReconcile:
+    def test_pulls_then_starts_each_level(
+        self, compose_path: Path, mock_run: MagicMock
+    ) -> None:
+        reconcile(compose_path=compose_path)
+
+        prefix = ["docker", "compose", "-p", "nexus", "-f", str(compose_path)]
+        assert _commands(mock_run)[1:] == [
+            [*prefix, "pull", "api", "cron", "db", "web"],
+            [*prefix, "up", "-d", "--no-deps", "cron", "db"],
+            [*prefix, "up", "-d", "--no-deps", "api"],
+            [*prefix, "up", "-d", "--no-deps", "web"],
+        ]
+
+    def test_records_state_so_next_run_is_a_no_op(
+        self, compose_path: Path, mock_run: MagicMock
+    ) -> None:
+        reconcile(compose_path=compose_path)
+        mock_run.reset_mock()
+
+        plan = reconcile(compose_path=compose_path)
+
+        assert plan.levels == []
+        assert len(mock_run.call_args_list) == 1  # ps
+
+    def test_failure_records_nothing(
+        self, compose_path: Path, mock_run: MagicMock, state_path: Path
+    ) -> None:
+        ps = mock_run.return_value
+        mock_run.side_effect = [ps, ps, subprocess.CalledProcessError(1, "up")]
+
+        with pytest.raises(subprocess.CalledProcessError):
+            reconcile(compose_path=compose_path)
+        assert not state_path.exists()
+
+    def test_dry_run(
+        self, compose_path: Path, mock_run: MagicMock, state_path: Path
+    ) -> None:
+        plan = reconcile(compose_path=compose_path, dry_run=True)
+
+        assert plan.services == ["cron", "db", "api", "web"]
+        mock_run.assert_not_called()
+        assert not state_path.exists()
+
+    def test_compose_gets_vault_environment(
+        self, compose_path: Path, mock_run: MagicMock
+    ) -> None:
+        reconcile(compose_path=compose_path)
+
+        ps, *compose_calls = mock_run.call_args_list
+        assert ps.kwargs.get("env") is None
+        for call in compose_calls:
+            env = call.kwargs["env"]
+            assert env["NEXUS_DOMAIN"] == "example.org"
+            assert env["GRAFANA_ADMIN_PASSWORD"] == "s3cret"
+            assert env["PUID"] == "501"
+            assert env["NEXUS_ROOT_DIRECTORY"] == str(compose_path.parent)
+            assert env["SURE_DATA_DIRECTORY"] == "/data/Config/sure"
+            assert "PATH" in env
+
+    def test_up_to_date_skips_vault(
+        self, compose_path: Path, mock_run: MagicMock, mock_session: MagicMock
+    ) -> None:
+        record_compose_spec(compose_path=compose_path)
+
+        reconcile(compose_path=compose_path)
+
+        mock_session.read.assert_not_called()
+
+    def test_unreadable_vault_starts_nothing(
+        self, compose_path: Path, mock_run: MagicMock, mock_session: MagicMock
+    ) -> None:
+        mock_session.read.side_effect = VaultError("bad password")
+
+        with pytest.raises(ValueError, match="Failed to decrypt"):
+            reconcile(compose_path=compose_path)
+        assert len(mock_run.call_args_list) == 1  # ps
+
+    def test_missing_compose_file(self, tmp_path: Path) -> None:
+        with pytest.raises(FileNotFoundError):
+            reconcile(compose_path=tmp_path / "missing.yml")
+
+
+class TestComposeEnvironment:
+    def test_defaults_match_playbook(self, tmp_path: Path) -> None:
+        env = compose_environment({"nexus_domain": "example.org"}, tmp_path)
+
+        assert env["NEXUS_DATA_DIRECTORY"] == "/Volumes/Data"
+        assert env["TZ"] == "America/Vancouver"
+        assert env["VAULTWARDEN_SIGNUPS_ALLOWED"] == "false"
+        assert env["NEXUS_USERDATA_DIRECTORY"] == "/Volumes/Data/Config"
+        assert env["GRIMMORY_BOOKS_DIRECTORY"] == "/Volumes/Data/Config/grimmory/books"
+
+    def test_userdata_directory(self, tmp_path: Path) -> None:
+        env = compose_environment(
+            {"nexus_root_directory": "/srv/nexus", "nexus_userdata_directory": "/u"},
+            tmp_path,
+        )
+
+        assert env["NEXUS_ROOT_DIRECTORY"] == "/srv/nexus"
+        assert env["NEXUS_USERDATA_DIRECTORY"] == "/u"
+        assert env["FOUNDRYVTT_DATA_DIRECTORY"] == "/u/foundryvtt"
+        assert env["PAPERLESS_DOCUMENTS_DIRECTORY"] == "/u/paperless"
+
+
+class TestRecordComposeSpec:
+    def test_records_only_given_services(
+        self, compose_path: Path, mock_run: MagicMock
+    ) -> None:
+        record_compose_spec(["db"], compose_path=compose_path)
+
+        plan = plan_reconcile(compose_path=compose_path)
+
+        assert "db" not in plan.changed
+        assert sorted(plan.changed) == ["api", "cron", "web"]
+
+    def test_defaults_to_generated_compose_file(
+        self, compose_path: Path, mock_run: MagicMock
+    ) -> None:
+        with patch("nexus.generate.compose.COMPOSE_PATH", compose_path):
+            record_compose_spec()
+
+            assert plan_reconcile().levels == []
@@ -67,6 +67,21 @@ class TestGetTerraformVarsFromVault:
 
         assert "vault.yml not found" in str(exc_info.value)
 
+    @patch("nexus.deploy.terraform.read_vault")
+    def test_reads_from_session(self, mock_read_vault: MagicMock) -> None:
+        session = MagicMock()
+        session.read.return_value = {
+            "cloudflare_api_token": "token123",
+            "cloudflare_zone_id": "zone123",
+            "cloudflare_account_id": "account123",
+            "tunnel_secret": "secret123",
+        }
+
+        result = _get_terraform_vars_from_vault(session)
+
+        assert result["TF_VAR_tunnel_secret"] == "secret123"
+        mock_read_vault.assert_not_called()
+
 
 class TestRunTerraform:
     @patch("nexus.deploy.terraform._run_terraform_cmd")
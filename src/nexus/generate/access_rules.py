@@ -6,22 +6,23 @@ Auto-generates tailscale/access-rules.yml from service.yml manifests.
 from pathlib import Path
 from typing import Any, Optional
 
-import yaml
-
 from nexus.config import TAILSCALE_PATH
+from nexus.loader import dump_yaml
 from nexus.services import discover_services
-from nexus.utils import read_vault
+from nexus.utils import VaultSession, read_vault
 
 
 def generate_access_rules(
     services: Optional[list[str]] = None,
     output_path: Optional[Path] = None,
+    session: Optional[VaultSession] = None,
 ) -> dict[str, Any]:
     """Generate access rules from service manifests.
 
     Args:
         services: List of service names to include. If None, includes all.
         output_path: Path to write the generated rules. If None, returns dict only.
+        session: Vault session to read groups from. Decrypts the vault if None.
 
     Returns:
         Dictionary representing the access control rules (groups,
@@ -38,7 +39,7 @@ def generate_access_rules(
 
     # Get groups from vault
     try:
-        vault = read_vault()
+        vault = session.read() if session else read_vault()
         groups_config = vault.get("tailscale_users", {})
     except (FileNotFoundError, KeyError):
         groups_config = {}
@@ -89,20 +90,23 @@ def generate_access_rules(
 """
         with open(output_path, "w") as f:
             f.write(header)
-            yaml.dump(rules, f, default_flow_style=False, sort_keys=False)
+            dump_yaml(rules, f)
 
     return rules
 
 
-def sync_access_rules(services: Optional[list[str]] = None) -> Path:
+def sync_access_rules(
+    services: Optional[list[str]] = None, session: Optional[VaultSession] = None
+) -> Path:
     """Sync access rules file with current service manifests.
 
     Args:
         services: List of services to include. If None, uses all.
+        session: Vault session to read groups from. Decrypts the vault if None.
 
     Returns:
         Path to the generated access rules file.
     """
     output_path = TAILSCALE_PATH / "access-rules.yml"
-    generate_access_rules(services=services, output_path=output_path)
+    generate_access_rules(services=services, output_path=output_path, session=session)
     return output_path
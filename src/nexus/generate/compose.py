@@ -0,0 +1,269 @@
+"""Root docker-compose.yml generator.
+
+Merges the services/<name>/docker-compose.yml files of a deploy into the
+single compose file Ansible brings up.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+from nexus.config import ROOT_PATH, SERVICES_PATH
+from nexus.loader import dump_yaml, load_yaml_file
+
+COMPOSE_PATH = ROOT_PATH / "docker-compose.yml"
+
+# Colons outside ${VAR:-default} variables separate parts of a port entry
+_PORT_SEPARATOR = re.compile(r":(?![^{]*\})")
+
+# Created by Traefik's stack and shared by every service
+_SHARED_NETWORKS: dict[str, Any] = {"proxy": {"external": True}}
+
+_HEADER = """\
+# Nexus Homelab - Generated Docker Compose
+# Services: {services}
+#
+# DO NOT EDIT MANUALLY - This file is generated by `nexus deploy`
+# To modify services, edit the individual service files in services/*/docker-compose.yml
+# Then run: invoke deploy --preset home
+
+"""
+
+
+class ComposeConflictError(ValueError):
+    """Raised when service compose files can't be merged without clobbering.
+
+    Attributes:
+        conflicts: One description per collision found.
+    """
+
+    def __init__(self, conflicts: list[str]) -> None:
+        self.conflicts = conflicts
+        super().__init__(
+            "Conflicting compose definitions:\n"
+            + "\n".join(f"  - {c}" for c in conflicts)
+        )
+
+
+def _port_range(value: str) -> list[str]:
+    start, sep, end = value.partition("-")
+    if sep and start.isdigit() and end.isdigit():
+        return [str(p) for p in range(int(start), int(end) + 1)]
+    return [value]
+
+
+def _published_ports(spec: Any) -> list[tuple[str, str, str]]:
+    """Return the (host_ip, port, protocol) a compose port entry binds on the host.
+
+    Ports that aren't published to a fixed host port (e.g. "80") bind
+    nothing that can collide. Ports set through variables are compared as
+    written.
+    """
+    if isinstance(spec, dict):
+        published = str(spec.get("published") or "")
+        host_ip = str(spec.get("host_ip") or "")
+        protocol = str(spec.get("protocol") or "tcp")
+    else:
+        text, _, protocol = str(spec).partition("/")
+        protocol = protocol or "tcp"
+        # [HOST_IP:][HOST_PORT:]CONTAINER_PORT, where HOST_IP may be [v6]
+        parts = _PORT_SEPARATOR.split(text)
+        if len(parts) == 1:
+            return []
+        host_ip = ":".join(parts[:-2])
+        published = parts[-2]
+    if not published:
+        return []
+    return [(host_ip, port, protocol) for port in _port_range(published)]
+
+
+class _Merger:
+    def __init__(self) -> None:
+        self.services: dict[str, Any] = {}
+        self.networks: dict[str, Any] = dict(_SHARED_NETWORKS)
+        self.volumes: dict[str, Any] = {}
+        self.conflicts: list[str] = []
+        # Compose service, container name, or network/volume -> nexus service
+        self._service_owner: dict[str, str] = {}
+        self._containers: dict[str, str] = {}
+        self._ports: dict[tuple[str, str], list[tuple[str, str]]] = {}
+        self._top_level_owner: dict[tuple[str, str], str] = {}
+
+    def add(self, owner: str, compose: dict[str, Any]) -> None:
+        for name, config in (compose.get("services") or {}).items():
+            self._add_service(owner, name, config or {})
+        for name, config in (compose.get("networks") or {}).items():
+            if name not in _SHARED_NETWORKS:
+                self._add_top_level(owner, "network", self.networks, name, config)
+        for name, config in (compose.get("volumes") or {}).items():
+            self._add_top_level(owner, "volume", self.volumes, name, config)
+
+    def _add_service(self, owner: str, name: str, config: dict[str, Any]) -> None:
+        if name in self._service_owner:
+            self.conflicts.append(
+                f"service {name!r} is defined by both "
+                f"{self._service_owner[name]} and {owner}"
+            )
+            return
+        self._service_owner[name] = owner
+        self.services[name] = config
+
+        container = config.get("container_name")
+        if container:
+            if container in self._containers:
+                self.conflicts.append(
+                    f"container_name {container!r} is used by both "
+                    f"{self._containers[container]} and {owner}/{name}"
+                )
+            else:
+                self._containers[container] = f"{owner}/{name}"
+
+        for spec in config.get("ports") or []:
+            for host_ip, port, protocol in _published_ports(spec):
+                bound = self._ports.setdefault((port, protocol), [])
+                for other_ip, other in bound:
+                    # An unspecified host IP binds every interface
+                    if not host_ip or not other_ip or host_ip == other_ip:
+                        self.conflicts.append(
+                            f"host port {port}/{protocol} is published by both "
+                            f"{other} and {owner}/{name}"
+                        )
+                        break
+                bound.append((host_ip, f"{owner}/{name}"))
+
+    def _add_top_level(
+        self,
+        owner: str,
+        kind: str,
+        merged: dict[str, Any],
+        name: str,
+        config: Any,
+    ) -> None:
+        config = config or {}
+        key = (kind, name)
+        if name in merged and merged[name] != config:
+            # The same external network in several files is expected
+            self.conflicts.append(
+                f"{kind} {name!r} is defined differently by "
+                f"{self._top_level_owner[key]} and {owner}"
+            )
+            return
+        merged[name] = config
+        self._top_level_owner.setdefault(key, owner)
+
+
+def merge_compose_files(
+    services: list[str], services_path: Optional[Path] = None
+) -> dict[str, Any]:
+    """Merge the compose files of services into a single compose document.
+
+    Services are merged in name order, so the result doesn't depend on the
+    order they were given in. Services without a docker-compose.yml are
+    skipped.
+
+    Args:
+        services: Service names.
+        services_path: Path to services directory. Defaults to SERVICES_PATH.
+
+    Returns:
+        The merged document, with services, networks and volumes keys.
+
+    Raises:
+        ComposeConflictError: If two files define the same compose service,
+            container_name, host port, or a network or volume differently.
+        YAMLError: If a compose file is not valid YAML.
+    """
+    services_path = services_path or SERVICES_PATH
+    merger = _Merger()
+    for service in sorted(set(services)):
+        try:
+            compose = load_yaml_file(services_path / service / "docker-compose.yml")
+        except FileNotFoundError:
+            logging.debug(f"No docker-compose.yml for {service}, skipping")
+            continue
+        merger.add(service, compose or {})
+
+    if merger.conflicts:
+        raise ComposeConflictError(merger.conflicts)
+
+    merged: dict[str, Any] = {
+        "services": merger.services,
+        "networks": merger.networks,
+    }
+    if merger.volumes:
+        merged["volumes"] = merger.volumes
+    return merged
+
+
+def render_compose(merged: dict[str, Any], services: list[str]) -> str:
+    """Render a merged compose document as the root docker-compose.yml.
+
+    Args:
+        merged: Document from merge_compose_files().
+        services: Services it was merged from, listed in the header.
+
+    Returns:
+        The file's content. Identical inputs always render identically.
+    """
+    stream = io.StringIO()
+    stream.write(_HEADER.format(services=", ".join(sorted(set(services)))))
+    dump_yaml(merged, stream)
+    return stream.getvalue()
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_compose(
+    services: list[str],
+    output_path: Optional[Path] = None,
+    services_path: Optional[Path] = None,
+    dry_run: bool = False,
+) -> bool:
+    """Generate the root docker-compose.yml for a deploy.
+
+    The file is only rewritten when its content changes, so an unchanged
+    deploy leaves its mtime alone and compose sees nothing new.
+
+    Args:
+        services: Services being deployed.
+        output_path: Where to write. Defaults to COMPOSE_PATH.
+        services_path: Path to services directory. Defaults to SERVICES_PATH.
+        dry_run: Merge and validate, but don't write anything.
+
+    Returns:
+        Whether the file changed (or would change, for a dry run).
+
+    Raises:
+        ComposeConflictError: If the services' compose files conflict.
+    """
+    output_path = output_path or COMPOSE_PATH
+    content = render_compose(
+        merge_compose_files(services, services_path), services
+    ).encode()
+
+    try:
+        unchanged = _digest(output_path.read_bytes()) == _digest(content)
+    except FileNotFoundError:
+        unchanged = False
+    if unchanged:
+        logging.debug(f"{output_path} is up to date")
+        return False
+    if dry_run:
+        logging.info(f"[DRY RUN] Would write {output_path}")
+        return True
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=output_path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(content)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, output_path)
+    logging.info(f"Wrote {output_path}")
+    return True
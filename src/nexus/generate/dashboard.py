@@ -2,9 +2,8 @@ import logging
 from functools import cache
 from typing import Any, Optional
 
-import yaml
-
 from nexus.config import SERVICES_PATH
+from nexus.loader import load_yaml_file
 from nexus.services import discover_services
 from nexus.types import ServiceMetadata, TraefikConfig
 
@@ -67,8 +66,7 @@ def get_service_config(service_name: str) -> list[TraefikConfig]:
         logging.warning(f"No docker-compose.yml found for {service_name}")
         return []
 
-    with compose_file.open() as f:
-        compose_data = yaml.safe_load(f)
+    compose_data = load_yaml_file(compose_file)
 
     configs: list[TraefikConfig] = []
     services = compose_data.get("services", {})
@@ -0,0 +1,233 @@
+from pathlib import Path
+
+import pytest
+import yaml
+
+from nexus.config import get_all_services
+from nexus.generate.compose import (
+    ComposeConflictError,
+    _published_ports,
+    merge_compose_files,
+    write_compose,
+)
+
+
+def _service(root: Path, name: str, compose: str) -> None:
+    service_dir = root / name
+    service_dir.mkdir(parents=True)
+    (service_dir / "docker-compose.yml").write_text(compose)
+
+
+@pytest.fixture
+def services_path(tmp_path: Path) -> Path:
+    root = tmp_path / "services"
+    _service(
+        root,
+        "web",
+        """
+services:
+  web:
+    image: nginx
+    container_name: web
+    ports: ["8080:80"]
+    networks: [nexus]
+networks:
+  nexus:
+    external: true
+  proxy:
+    external: true
+""",
+    )
+    _service(
+        root,
+        "db",
+        """
+services:
+  db:
+    image: postgres
+    volumes: [db-data:/var/lib/postgresql/data]
+    networks: [nexus]
+volumes:
+  db-data:
+networks:
+  nexus:
+    external: true
+""",
+    )
+    return root
+
+
+class TestPublishedPorts:
+    @pytest.mark.parametrize(
+        ("spec", "expected"),
+        [
+            ("80", []),
+            (80, []),
+            ("8080:80", [("", "8080", "tcp")]),
+            ("51413:51413/udp", [("", "51413", "udp")]),
+            ("127.0.0.1:9093:9093", [("127.0.0.1", "9093", "tcp")]),
+            ("[::1]:53:53/udp", [("[::1]", "53", "udp")]),
+            ("127.0.0.1::80", []),
+            ("${SURE_PORT:-5006}:3000", [("", "${SURE_PORT:-5006}", "tcp")]),
+            (
+                "9000-9001:9000-9001",
+                [("", "9000", "tcp"), ("", "9001", "tcp")],
+            ),
+            ({"target": 80, "published": 8080}, [("", "8080", "tcp")]),
+            ({"target": 80}, []),
+        ],
+    )
+    def test_parses(self, spec: object, expected: list[tuple[str, str, str]]) -> None:
+        assert _published_ports(spec) == expected
+
+
+class TestMergeComposeFiles:
+    def test_merges(self, services_path: Path) -> None:
+        merged = merge_compose_files(["web", "db"], services_path)
+
+        assert list(merged["services"]) == ["db", "web"]
+        assert merged["networks"] == {
+            "proxy": {"external": True},
+            "nexus": {"external": True},
+        }
+        assert merged["volumes"] == {"db-data": {}}
+
+    def test_skips_services_without_compose_file(self, services_path: Path) -> None:
+        merged = merge_compose_files(["web", "missing"], services_path)
+
+        assert list(merged["services"]) == ["web"]
+        assert "volumes" not in merged
+
+    def test_duplicate_service_name(self, services_path: Path) -> None:
+        _service(services_path, "other", "services:\n  web:\n    image: httpd\n")
+
+        with pytest.raises(ComposeConflictError, match="'web' is defined by both"):
+            merge_compose_files(["web", "other"], services_path)
+
+    def test_duplicate_container_name(self, services_path: Path) -> None:
+        _service(
+            services_path,
+            "other",
+            "services:\n  proxy:\n    image: httpd\n    container_name: web\n",
+        )
+
+        with pytest.raises(ComposeConflictError, match="container_name 'web'"):
+            merge_compose_files(["web", "other"], services_path)
+
+    def test_duplicate_host_port(self, services_path: Path) -> None:
+        _service(
+            services_path,
+            "other",
+            'services:\n  api:\n    image: httpd\n    ports: ["127.0.0.1:8080:80"]\n',
+        )
+
+        with pytest.raises(ComposeConflictError, match="host port 8080/tcp"):
+            merge_compose_files(["web", "other"], services_path)
+
+    def test_same_port_other_protocol_or_ip(self, services_path: Path) -> None:
+        _service(
+            services_path,
+            "a",
+            'services:\n  a:\n    image: x\n    ports: ["127.0.0.1:53:53"]\n',
+        )
+        _service(
+            services_path,
+            "b",
+            'services:\n  b:\n    image: x\n    ports: ["127.0.0.2:53:53"]\n',
+        )
+        _service(
+            services_path,
+            "c",
+            'services:\n  c:\n    image: x\n    ports: ["8080:80/udp"]\n',
+        )
+
+        merged = merge_compose_files(["a", "b", "c", "web"], services_path)
+
+        assert list(merged["services"]) == ["a", "b", "c", "web"]
+
+    def test_conflicting_volume(self, services_path: Path) -> None:
+        _service(
+            services_path,
+            "other",
+            "volumes:\n  db-data:\n    external: true\n",
+        )
+
+        with pytest.raises(ComposeConflictError) as exc_info:
+            merge_compose_files(["db", "other"], services_path)
+
+        assert exc_info.value.conflicts == [
+            "volume 'db-data' is defined differently by db and other"
+        ]
+
+    def test_reports_every_conflict(self, services_path: Path) -> None:
+        _service(
+            services_path,
+            "worker",
+            "services:\n  web:\n    image: x\n  api:\n    image: x\n"
+            '    container_name: web\n    ports: ["8080:80"]\n',
+        )
+
+        with pytest.raises(ComposeConflictError) as exc_info:
+            merge_compose_files(["web", "worker"], services_path)
+
+        assert len(exc_info.value.conflicts) == 3
+
+    def test_real_services_merge(self) -> None:
+        merged = merge_compose_files(get_all_services())
+
+        assert "traefik" in merged["services"]
+
+
+class TestWriteCompose:
+    def test_writes_valid_compose(self, tmp_path: Path, services_path: Path) -> None:
+        output = tmp_path / "docker-compose.yml"
+
+        assert write_compose(["web", "db"], output, services_path) is True
+
+        content = output.read_text()
+        assert content.startswith("# Nexus Homelab")
+        assert "# Services: db, web" in content
+        assert yaml.safe_load(content) == merge_compose_files(
+            ["db", "web"], services_path
+        )
+
+    def test_deterministic(self, tmp_path: Path, services_path: Path) -> None:
+        first, second = tmp_path / "first.yml", tmp_path / "second.yml"
+
+        write_compose(["web", "db"], first, services_path)
+        write_compose(["db", "web", "db"], second, services_path)
+
+        assert first.read_bytes() == second.read_bytes()
+
+    def test_skips_unchanged(self, tmp_path: Path, services_path: Path) -> None:
+        output = tmp_path / "docker-compose.yml"
+        write_compose(["web"], output, services_path)
+        mtime = output.stat().st_mtime_ns
+
+        assert write_compose(["web"], output, services_path) is False
+        assert output.stat().st_mtime_ns == mtime
+
+    def test_rewrites_on_change(self, tmp_path: Path, services_path: Path) -> None:
+        output = tmp_path / "docker-compose.yml"
+        write_compose(["web"], output, services_path)
+
+        assert write_compose(["web", "db"], output, services_path) is True
+        assert "db" in yaml.safe_load(output.read_text())["services"]
+
+    def test_dry_run(self, tmp_path: Path, services_path: Path) -> None:
+        output = tmp_path / "docker-compose.yml"
+
+        assert write_compose(["web"], output, services_path, dry_run=True) is True
+        assert not output.exists()
+
+    def test_conflict_leaves_file_alone(
+        self, tmp_path: Path, services_path: Path
+    ) -> None:
+        output = tmp_path / "docker-compose.yml"
+        write_compose(["web"], output, services_path)
+        before = output.read_bytes()
+        _service(services_path, "other", "services:\n  web:\n    image: x\n")
+
+        with pytest.raises(ComposeConflictError):
+            write_compose(["web", "other"], output, services_path)
+        assert output.read_bytes() == before
@@ -0,0 +1,278 @@
+import threading
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any, Optional
+
+from nexus.services import ServiceManifest, discover_services
+
+
+class CycleError(ValueError):
+    """Raised when service dependencies or preset extends form a cycle.
+
+    Attributes:
+        cycle: Names along the cycle, starting and ending with the same name.
+    """
+
+    def __init__(self, kind: str, cycle: list[str]) -> None:
+        self.cycle = cycle
+        super().__init__(f"{kind} cycle: {' -> '.join(cycle)}")
+
+
+def _find_cycle(edges: Mapping[str, set[str]]) -> list[str]:
+    # Every name left over by Kahn's algorithm is on or behind a cycle, so
+    # following edges from any of them eventually revisits a name
+    path: list[str] = []
+    name = min(edges)
+    while name not in path:
+        path.append(name)
+        name = min(edges[name])
+    return [*path[path.index(name) :], name]
+
+
+class ServiceGraph:
+    """Dependency graph of services, and the presets that group them.
+
+    Built once from the service manifests and presets.yml, then queried for
+    start order, what a service needs and what breaks when it goes down.
+    Dependencies on services without a manifest are kept, so they show up in
+    closures and orderings instead of being silently dropped.
+
+    Args:
+        manifests: Service manifests, keyed by service name.
+        presets: Presets as loaded from presets.yml.
+    """
+
+    def __init__(
+        self,
+        manifests: Mapping[str, ServiceManifest],
+        presets: Optional[Mapping[str, Any]] = None,
+    ) -> None:
+        self._index({name: m.dependencies for name, m in manifests.items()})
+        self._presets = dict(presets or {})
+        self._expanded: dict[str, tuple[str, ...]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dependencies(
+        cls, dependencies: Mapping[str, Iterable[str]]
+    ) -> "ServiceGraph":
+        """Build a graph from plain dependency lists, e.g. compose depends_on.
+
+        Args:
+            dependencies: Names of what each node depends on, keyed by node.
+
+        Returns:
+            A graph with no presets.
+        """
+        graph = cls({})
+        graph._index(dependencies)
+        return graph
+
+    def _index(self, dependencies: Mapping[str, Iterable[str]]) -> None:
+        self._dependencies: dict[str, tuple[str, ...]] = {
+            name: tuple(dict.fromkeys(d for d in deps if d != name))
+            for name, deps in dependencies.items()
+        }
+        dependents: dict[str, set[str]] = {}
+        for name, deps in self._dependencies.items():
+            for dep in deps:
+                dependents.setdefault(dep, set()).add(name)
+        self._dependents = {name: tuple(sorted(d)) for name, d in dependents.items()}
+
+    @property
+    def services(self) -> list[str]:
+        """Names of every service with a manifest, sorted."""
+        return sorted(self._dependencies)
+
+    @property
+    def presets(self) -> list[str]:
+        """Names of every preset, sorted."""
+        return sorted(self._presets)
+
+    def _walk(self, edges: Mapping[str, tuple[str, ...]], start: str) -> list[str]:
+        seen: set[str] = set()
+        stack = list(edges.get(start, ()))
+        while stack:
+            name = stack.pop()
+            if name in seen or name == start:
+                continue
+            seen.add(name)
+            stack.extend(edges.get(name, ()))
+        return sorted(seen)
+
+    def dependencies(self, name: str, transitive: bool = False) -> list[str]:
+        """Return the services a service depends on.
+
+        Args:
+            name: Service name.
+            transitive: Include dependencies of dependencies.
+
+        Returns:
+            Sorted service names.
+        """
+        if transitive:
+            return self._walk(self._dependencies, name)
+        return sorted(self._dependencies.get(name, ()))
+
+    def dependents(self, name: str, transitive: bool = False) -> list[str]:
+        """Return the services that depend on a service.
+
+        Args:
+            name: Service name.
+            transitive: Include services that depend on it indirectly, i.e.
+                everything affected when it is down.
+
+        Returns:
+            Sorted service names.
+        """
+        if transitive:
+            return self._walk(self._dependents, name)
+        return list(self._dependents.get(name, ()))
+
+    def order(self, services: Iterable[str], strict: bool = True) -> list[str]:
+        """Order services so each comes after the services it depends on.
+
+        Only dependencies among the given services are considered. Services
+        that can start at the same point keep alphabetical order.
+
+        Args:
+            services: Services to order.
+            strict: Raise on a dependency cycle. Otherwise the services in
+                and behind the cycle are appended alphabetically.
+
+        Returns:
+            The same service names, in start order.
+
+        Raises:
+            CycleError: If strict and the services' dependencies form a cycle.
+        """
+        names = set(services)
+        remaining = {
+            name: {d for d in self._dependencies.get(name, ()) if d in names}
+            for name in names
+        }
+        ordered: list[str] = []
+
+        while remaining:
+            ready = sorted(name for name, deps in remaining.items() if not deps)
+            if not ready:
+                if strict:
+                    raise CycleError("Dependency", _find_cycle(remaining))
+                ready = sorted(remaining)
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+            ordered.extend(ready)
+
+        return ordered
+
+    def closure(self, services: Iterable[str], strict: bool = True) -> list[str]:
+        """Return services together with everything they depend on.
+
+        Args:
+            services: Services to start from.
+            strict: Raise on a dependency cycle, as for order().
+
+        Returns:
+            The services and their transitive dependencies, in start order.
+
+        Raises:
+            CycleError: If strict and the dependencies form a cycle.
+        """
+        names = set(services)
+        for name in list(names):
+            names.update(self._walk(self._dependencies, name))
+        return self.order(names, strict=strict)
+
+    def _expand(self, name: str, stack: list[str]) -> tuple[str, ...]:
+        if name in self._expanded:
+            return self._expanded[name]
+        if name in stack:
+            raise CycleError("Preset", [*stack[stack.index(name) :], name])
+
+        stack.append(name)
+        preset = self._presets[name]
+        services: list[str] = []
+        if isinstance(preset, dict):
+            parent = preset.get("extends")
+            if parent is not None:
+                if parent not in self._presets:
+                    raise ValueError(f"Preset {name} extends unknown preset {parent}")
+                services.extend(self._expand(parent, stack))
+            services.extend(preset.get("services", []))
+        elif isinstance(preset, list):
+            for item in preset:
+                if item in self._presets:
+                    services.extend(self._expand(item, stack))
+                else:
+                    services.append(item)
+        stack.pop()
+
+        expanded = tuple(sorted(set(services)))
+        self._expanded[name] = expanded
+        return expanded
+
+    def expand_preset(self, name: str) -> list[str]:
+        """Resolve a preset to its services, following extends.
+
+        Each preset is expanded once per graph; later calls are lookups.
+
+        Args:
+            name: Preset name.
+
+        Returns:
+            Sorted, deduplicated service names, or [] for an unknown preset.
+
+        Raises:
+            CycleError: If the preset extends itself, directly or not.
+            ValueError: If the preset extends a preset that doesn't exist.
+        """
+        if name not in self._presets:
+            return []
+        with self._lock:
+            return list(self._expand(name, []))
+
+
+_graph_lock = threading.Lock()
+# Built from (manifests, presets), kept to tell whether it's still current
+_graph: Optional[tuple[list[ServiceManifest], Any, ServiceGraph]] = None
+
+
+def get_service_graph(services_path: Optional[Path] = None) -> ServiceGraph:
+    """Return the service graph for the current manifests and presets.
+
+    The graph is rebuilt only when a manifest was re-parsed or presets were
+    reloaded since the last call, so callers can ask for it freely.
+
+    Args:
+        services_path: Path to services directory. Defaults to SERVICES_PATH.
+
+    Returns:
+        The shared ServiceGraph.
+    """
+    global _graph
+    # Import here to avoid circular imports
+    from nexus.config import load_presets
+
+    manifests = discover_services(services_path)
+    try:
+        presets = load_presets()
+    except FileNotFoundError:
+        presets = {}
+
+    # The manifest registry and load_presets() hand out the same objects
+    # until their files change, so identity says whether the graph is current
+    current = [manifests[name] for name in sorted(manifests)]
+    with _graph_lock:
+        if _graph is not None:
+            built_from, built_presets, graph = _graph
+            if (
+                built_presets is presets
+                and len(built_from) == len(current)
+                and all(a is b for a, b in zip(built_from, current, strict=True))
+            ):
+                return graph
+        graph = ServiceGraph(manifests, presets)
+        _graph = (current, presets, graph)
+        return graph
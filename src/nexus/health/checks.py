@@ -1,11 +1,14 @@
 import asyncio
 import logging
-import shutil
 import subprocess
 import time
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-import aiohttp
+from nexus.operations.disk import collect_disk_usage
+from nexus.utils import format_size
+
+if TYPE_CHECKING:
+    import aiohttp
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +35,7 @@ class ServiceHealth:
 
 
 async def check_service_health(
-    service: ServiceHealth, session: aiohttp.ClientSession
+    service: ServiceHealth, session: "aiohttp.ClientSession"
 ) -> None:
     """Perform an HTTP health check on a single service.
 
@@ -43,6 +46,8 @@ async def check_service_health(
         service: The ServiceHealth object to check and update in place.
         session: The aiohttp ClientSession to use for making requests.
     """
+    import aiohttp
+
     try:
         start_time = time.perf_counter()
         async with session.get(
@@ -71,6 +76,10 @@ async def check_all_services(services: list[ServiceHealth]) -> None:
         services: A list of ServiceHealth objects to check. Each object
             will be mutated to contain the health check results.
     """
+    # Imported here: aiohttp more than doubles the CLI's startup time, and
+    # only the HTTP checks need it
+    import aiohttp
+
     async with aiohttp.ClientSession() as session:
         tasks = [check_service_health(service, session) for service in services]
         await asyncio.gather(*tasks)
@@ -106,38 +115,37 @@ def check_docker_containers() -> dict[str, bool]:
     return container_status
 
 
-def _format_size(size_bytes: int) -> str:
-    size = float(size_bytes)
-    for unit in ["B", "K", "M", "G", "T", "P"]:
-        if size < 1024:
-            return f"{size:.1f}{unit}"
-        size /= 1024
-    return f"{size:.1f}E"
-
-
-def check_disk_space() -> dict[str, str]:
-    """Query the root filesystem for disk space usage.
+def check_disk_space() -> dict[str, dict[str, str]]:
+    """Query every Nexus data filesystem for space and inode usage.
 
-    Uses shutil.disk_usage to get disk usage metrics.
+    Uses the statvfs-based collector from nexus.operations.disk without
+    recording a new growth sample, so health checks don't skew the trend.
 
     Returns:
-        A dictionary with keys 'total', 'used', 'available', and 'usage_percent'.
+        A dictionary mapping path label (e.g., "root", "data", "backups") to
+        a dictionary with keys 'path', 'total', 'used', 'available',
+        'usage_percent', and 'inode_percent', plus 'days_to_full' when a
+        growth trend is known. Empty if nothing could be measured.
     """
     try:
-        total, used, free = shutil.disk_usage("/")
-
-        # Calculate percentage
-        percent = (used / total) * 100 if total > 0 else 0
-
-        return {
-            "total": _format_size(total),
-            "used": _format_size(used),
-            "available": _format_size(free),
-            "usage_percent": f"{percent:.0f}%",
-        }
+        usages = collect_disk_usage(record=False)
     except Exception:
         return {}
 
+    report: dict[str, dict[str, str]] = {}
+    for label, usage in usages.items():
+        report[label] = {
+            "path": usage.path,
+            "total": format_size(usage.total),
+            "used": format_size(usage.used),
+            "available": format_size(usage.available),
+            "usage_percent": f"{usage.usage_percent:.0f}%",
+            "inode_percent": f"{usage.inode_percent:.0f}%",
+        }
+        if usage.days_to_full is not None:
+            report[label]["days_to_full"] = f"{usage.days_to_full:.0f}"
+    return report
+
 
 def check_ssl_certificates(domain: str) -> dict[str, bool]:
     """Verify SSL certificate validity for core services.
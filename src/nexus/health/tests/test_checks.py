@@ -10,6 +10,7 @@ from nexus.health.checks import (
     check_service_health,
     check_ssl_certificates,
 )
+from nexus.operations.disk import DiskUsage
 
 
 class TestServiceHealth:
@@ -144,22 +145,46 @@ class TestCheckDockerContainers:
 
 class TestCheckDiskSpace:
     def test_check_disk_space_success(self):
-        # total, used, free in bytes
-        # 100GB = 100 * 1024 * 1024 * 1024 = 107374182400
-        # 50GB used
-        # 50GB free
-        mock_usage = (107374182400, 53687091200, 53687091200)
+        # 100GB total, 50GB used, 50GB free
+        usage = DiskUsage(
+            label="data",
+            path="/mnt/data",
+            total=107374182400,
+            used=53687091200,
+            available=53687091200,
+            inodes_total=1000,
+            inodes_free=750,
+        )
+
+        with patch(
+            "nexus.health.checks.collect_disk_usage", return_value={"data": usage}
+        ) as mock_collect:
+            result = check_disk_space()
+
+        mock_collect.assert_called_once_with(record=False)
+        assert result["data"]["path"] == "/mnt/data"
+        assert result["data"]["total"] == "100.0G"
+        assert result["data"]["used"] == "50.0G"
+        assert result["data"]["available"] == "50.0G"
+        assert result["data"]["usage_percent"] == "50%"
+        assert result["data"]["inode_percent"] == "25%"
+        assert "days_to_full" not in result["data"]
 
-        with patch("shutil.disk_usage", return_value=mock_usage):
+    def test_check_disk_space_time_to_full(self):
+        usage = DiskUsage("root", "/", 100, 50, 50, 10, 5, 5.0, 10.0)
+
+        with patch(
+            "nexus.health.checks.collect_disk_usage", return_value={"root": usage}
+        ):
             result = check_disk_space()
 
-        assert result["total"] == "100.0G"
-        assert result["used"] == "50.0G"
-        assert result["available"] == "50.0G"
-        assert result["usage_percent"] == "50%"
+        assert result["root"]["days_to_full"] == "10"
 
     def test_check_disk_space_error(self):
-        with patch("shutil.disk_usage", side_effect=OSError("Disk error")):
+        with patch(
+            "nexus.health.checks.collect_disk_usage",
+            side_effect=OSError("Disk error"),
+        ):
             result = check_disk_space()
 
         assert result == {}
@@ -0,0 +1,162 @@
+import hashlib
+import logging
+import marshal
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Optional, TextIO
+
+# Parsed YAML, keyed by content hash so an edited file never hits a stale
+# entry. Defaults to .nexus/cache/yaml.
+YAML_CACHE_PATH: Optional[Path] = None
+
+# Entries not read for this long are removed when a new entry is written,
+# so content from edited or deleted files doesn't pile up
+YAML_CACHE_MAX_AGE = 30 * 24 * 60 * 60
+
+
+class YAMLError(ValueError):
+    """Raised when a document is not valid YAML.
+
+    Lets callers handle parse errors without importing PyYAML themselves.
+    """
+
+
+def _loader() -> Any:
+    # Imported on a cache miss only, so fully cached runs never load PyYAML
+    import yaml
+
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def load_yaml(text: str) -> Any:
+    """Parse YAML with the same rules as yaml.safe_load, using libyaml if present.
+
+    Nothing is cached, so this is the one to use for secrets.
+
+    Args:
+        text: YAML document.
+
+    Returns:
+        The parsed document.
+
+    Raises:
+        YAMLError: If the document is not valid YAML.
+    """
+    import yaml
+
+    try:
+        return yaml.load(text, Loader=_loader())
+    except yaml.YAMLError as e:
+        raise YAMLError(str(e)) from e
+
+
+def dump_yaml(data: Any, stream: TextIO) -> None:
+    """Write data as block-style YAML, keeping the order of mapping keys.
+
+    Args:
+        data: Document to write.
+        stream: Open text file to write to.
+    """
+    import yaml
+
+    yaml.dump(data, stream, default_flow_style=False, sort_keys=False)
+
+
+def _cache_dir() -> Path:
+    if YAML_CACHE_PATH is not None:
+        return YAML_CACHE_PATH
+    # Import here to avoid circular imports
+    from nexus.config import STATE_PATH
+
+    return STATE_PATH / "cache" / "yaml"
+
+
+def _cache_file(data: bytes) -> Path:
+    digest = hashlib.sha256(data).hexdigest()
+    # marshal's format can change between Python versions
+    return _cache_dir() / f"{digest}-{marshal.version}.marshal"
+
+
+def _read_cache(path: Path) -> tuple[bool, Any]:
+    try:
+        parsed = marshal.loads(path.read_bytes())
+    except FileNotFoundError:
+        return False, None
+    except (EOFError, ValueError, TypeError, OSError) as e:
+        logging.debug(f"Ignoring unreadable YAML cache entry {path}: {e}")
+        return False, None
+    try:
+        # Marks the entry as in use so pruning keeps it
+        os.utime(path)
+    except OSError:
+        pass
+    return True, parsed
+
+
+def _prune_cache(directory: Path) -> None:
+    cutoff = time.time() - YAML_CACHE_MAX_AGE
+    try:
+        entries = list(directory.iterdir())
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.stat().st_mtime < cutoff:
+                entry.unlink()
+        except OSError as e:
+            logging.debug(f"Could not prune YAML cache entry {entry}: {e}")
+
+
+def _write_cache(path: Path, parsed: Any) -> None:
+    try:
+        data = marshal.dumps(parsed)
+    except ValueError:
+        # Types marshal can't store (e.g. YAML timestamps); parse each time
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError as e:
+        logging.debug(f"Could not write YAML cache entry {path}: {e}")
+        return
+    _prune_cache(path.parent)
+
+
+def load_yaml_file(path: Path, cache: bool = True) -> Any:
+    """Load a YAML file, reusing the parsed result when its content is unchanged.
+
+    Parsed documents are marshalled to the cache dir under the SHA-256 of
+    the file's content, so a cold process only reads and hashes the file.
+    Documents marshal can't store are parsed every time. Entries that
+    haven't been read for YAML_CACHE_MAX_AGE are pruned whenever a new one
+    is written. Never use the cache for secrets: entries are stored
+    unencrypted.
+
+    Args:
+        path: YAML file to load.
+        cache: Whether to use the on-disk cache.
+
+    Returns:
+        The parsed document (None for an empty file).
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        YAMLError: If the file is not valid YAML.
+    """
+    data = path.read_bytes()
+    if not cache:
+        return load_yaml(data.decode())
+
+    cache_file = _cache_file(data)
+    hit, parsed = _read_cache(cache_file)
+    if hit:
+        return parsed
+
+    parsed = load_yaml(data.decode())
+    _write_cache(cache_file, parsed)
+    return parsed
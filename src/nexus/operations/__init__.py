@@ -1,7 +1,7 @@
+from nexus.operations.logs import check_service_logs
 from nexus.operations.maintenance import (
     check_container_status,
     check_disk_space,
-    check_service_logs,
     cleanup_old_images,
     cleanup_old_volumes,
     daily_tasks,
@@ -0,0 +1,314 @@
+import json
+import logging
+import re
+import shutil
+import subprocess
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from nexus.utils import run_command
+
+logger = logging.getLogger(__name__)
+
+# Only clean up once the filesystem holding Docker's data is this full
+DEFAULT_THRESHOLD = 80
+# Unused images kept per deployed repository for fast rollback
+DEFAULT_KEEP_PREVIOUS = 1
+
+DEFAULT_DATA_ROOT = "/var/lib/docker"
+
+# Anonymous volumes are named with a random 64-character hex ID. Named
+# volumes hold service data and are never removed automatically.
+_ANONYMOUS_VOLUME = re.compile(r"^[0-9a-f]{64}$")
+
+# docker system df reports decimal units (kB, MB, GB)
+_SIZE_UNITS = {"B": 1, "kB": 10**3, "MB": 10**6, "GB": 10**9, "TB": 10**12}
+
+
+@dataclass
+class CleanupCandidate:
+    """An unused Docker image or volume that can be removed.
+
+    Attributes:
+        kind: "image" or "volume".
+        id: Image ID or volume name.
+        name: Human-readable name (first tag or digest for images).
+        size: Size in bytes. For images this includes layers shared with
+            other images, so it is an upper bound on what removal frees.
+        tags: The image's repo:tag references. Docker refuses to remove an
+            image by ID while it is tagged in several repositories, so a
+            tagged image is removed by untagging each of these instead.
+    """
+
+    kind: str
+    id: str
+    name: str
+    size: int
+    tags: list[str] = field(default_factory=list)
+
+    @property
+    def rm_args(self) -> list[str]:
+        """What to pass to `docker <kind> rm` to remove the candidate."""
+        return list(self.tags) or [self.id]
+
+
+@dataclass
+class CleanupPlan:
+    """What a cleanup would remove and keep.
+
+    Attributes:
+        data_root: Docker's data root, where usage is measured.
+        usage_percent: Current usage of the filesystem holding data_root,
+            or None if data_root isn't on this host (e.g. Docker Desktop,
+            which keeps it inside a VM).
+        candidates: Images and volumes that would be removed.
+        kept: Names of unused images kept for rollback.
+    """
+
+    data_root: str
+    usage_percent: Optional[float]
+    candidates: list[CleanupCandidate] = field(default_factory=list)
+    kept: list[str] = field(default_factory=list)
+
+    @property
+    def reclaimable(self) -> int:
+        return sum(c.size for c in self.candidates)
+
+
+@dataclass
+class CleanupResult:
+    """Outcome of a cleanup run.
+
+    Attributes:
+        plan: The plan the run was based on.
+        removed: Candidates that were removed (or would be, on a dry run).
+        freed: Bytes freed on the Docker data root, measured before and
+            after removal. Zero on dry runs, skipped runs, and when the
+            data root isn't on this host.
+        skipped: Reason nothing was removed, if applicable.
+    """
+
+    plan: CleanupPlan
+    removed: list[CleanupCandidate] = field(default_factory=list)
+    freed: int = 0
+    skipped: Optional[str] = None
+
+
+def _docker_json(cmd: list[str]) -> Any:
+    result = run_command(cmd, capture=True)
+    return json.loads(result.stdout) if result.stdout.strip() else []
+
+
+def _lines(cmd: list[str]) -> list[str]:
+    result = run_command(cmd, capture=True)
+    return [line for line in result.stdout.splitlines() if line]
+
+
+def _repository(reference: str) -> str:
+    """Strip the tag or digest from an image reference."""
+    name = reference.split("@", 1)[0]
+    # A colon after the last slash is a tag, not a registry port
+    head, _, tail = name.rpartition("/")
+    if ":" in tail:
+        tail = tail.split(":", 1)[0]
+    return f"{head}/{tail}" if head else tail
+
+
+def _parse_size(size: str) -> int:
+    match = re.match(r"^([\d.]+)\s*([kMGT]?B)$", size.strip())
+    if not match:
+        return 0
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def get_data_root() -> str:
+    """Return Docker's data root directory, as reported by the daemon."""
+    try:
+        result = run_command(
+            ["docker", "info", "--format", "{{.DockerRootDir}}"], capture=True
+        )
+        return result.stdout.strip() or DEFAULT_DATA_ROOT
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return DEFAULT_DATA_ROOT
+
+
+def _usage_percent(path: str) -> Optional[float]:
+    # Measuring some other filesystem instead would make the threshold and
+    # freed bytes meaningless, so report that the data root isn't here
+    try:
+        usage = shutil.disk_usage(path)
+    except OSError:
+        return None
+    return usage.used / usage.total * 100 if usage.total else 0.0
+
+
+def _free_bytes(path: str) -> Optional[int]:
+    try:
+        return shutil.disk_usage(path).free
+    except OSError:
+        return None
+
+
+def _plan_images(plan: CleanupPlan, keep_previous: int) -> None:
+    image_ids = list(
+        dict.fromkeys(_lines(["docker", "image", "ls", "-q", "--no-trunc"]))
+    )
+    if not image_ids:
+        return
+    images = _docker_json(["docker", "image", "inspect", *image_ids])
+
+    container_ids = _lines(["docker", "ps", "-aq", "--no-trunc"])
+    containers = (
+        _docker_json(["docker", "container", "inspect", *container_ids])
+        if container_ids
+        else []
+    )
+    in_use = {c["Image"] for c in containers}
+    deployed = {_repository(c["Config"]["Image"]) for c in containers}
+
+    # Newest first, so the first unused images of each repo are kept
+    images.sort(key=lambda i: i.get("Created", ""), reverse=True)
+    kept_per_repo: dict[str, int] = {}
+
+    for image in images:
+        if image["Id"] in in_use:
+            continue
+
+        references = (image.get("RepoTags") or []) + (image.get("RepoDigests") or [])
+        name = references[0] if references else image["Id"][7:19]
+        repos = {_repository(ref) for ref in references} & deployed
+
+        repo = min(repos) if repos else None
+        if repo and kept_per_repo.get(repo, 0) < keep_previous:
+            kept_per_repo[repo] = kept_per_repo.get(repo, 0) + 1
+            plan.kept.append(name)
+            continue
+
+        plan.candidates.append(
+            CleanupCandidate(
+                "image",
+                image["Id"],
+                name,
+                int(image.get("Size", 0)),
+                tags=list(image.get("RepoTags") or []),
+            )
+        )
+
+
+def _plan_volumes(plan: CleanupPlan) -> None:
+    dangling = {
+        name
+        for name in _lines(
+            ["docker", "volume", "ls", "-q", "--filter", "dangling=true"]
+        )
+        if _ANONYMOUS_VOLUME.match(name)
+    }
+    if not dangling:
+        return
+
+    result = run_command(
+        ["docker", "system", "df", "-v", "--format", "{{json .}}"], capture=True
+    )
+    sizes = {
+        v["Name"]: _parse_size(v.get("Size", ""))
+        for v in json.loads(result.stdout).get("Volumes") or []
+    }
+    for name in sorted(dangling):
+        plan.candidates.append(
+            CleanupCandidate("volume", name, name[:12], sizes.get(name, 0))
+        )
+
+
+def plan_cleanup(
+    kinds: frozenset[str] = frozenset({"image", "volume"}),
+    keep_previous: int = DEFAULT_KEEP_PREVIOUS,
+) -> CleanupPlan:
+    """Work out which unused images and volumes can be removed.
+
+    Images used by any container (running or stopped) are always kept. For
+    each repository a container was created from, the newest keep_previous
+    unused images are kept too, so a bad upgrade can be rolled back without
+    re-pulling. Only anonymous dangling volumes are candidates.
+
+    Args:
+        kinds: Which resources to consider: "image", "volume", or both.
+        keep_previous: Unused images to keep per deployed repository.
+
+    Returns:
+        The cleanup plan.
+
+    Raises:
+        subprocess.CalledProcessError: If a Docker command fails.
+    """
+    data_root = get_data_root()
+    plan = CleanupPlan(data_root=data_root, usage_percent=_usage_percent(data_root))
+
+    if "image" in kinds:
+        _plan_images(plan, keep_previous)
+    if "volume" in kinds:
+        _plan_volumes(plan)
+
+    return plan
+
+
+def run_cleanup(
+    kinds: frozenset[str] = frozenset({"image", "volume"}),
+    threshold: float = DEFAULT_THRESHOLD,
+    keep_previous: int = DEFAULT_KEEP_PREVIOUS,
+    dry_run: bool = False,
+    force: bool = False,
+) -> CleanupResult:
+    """Remove unused Docker images and volumes when disk is under pressure.
+
+    Args:
+        kinds: Which resources to clean up: "image", "volume", or both.
+        threshold: Only remove anything once the Docker data root's
+            filesystem is at least this percent full. If the data root isn't
+            on this host, nothing is removed unless forced.
+        keep_previous: Unused images to keep per deployed repository.
+        dry_run: Report what would be removed without removing it.
+        force: Clean up regardless of threshold.
+
+    Returns:
+        The cleanup result, including bytes actually freed.
+
+    Raises:
+        subprocess.CalledProcessError: If listing Docker resources fails.
+    """
+    plan = plan_cleanup(kinds, keep_previous)
+    result = CleanupResult(plan=plan)
+
+    if not force:
+        if plan.usage_percent is None:
+            result.skipped = (
+                f"{plan.data_root} is not on this host (e.g. Docker Desktop "
+                "keeps it in a VM), so disk pressure can't be measured"
+            )
+            return result
+        if plan.usage_percent < threshold:
+            result.skipped = (
+                f"{plan.data_root} is {plan.usage_percent:.0f}% full "
+                f"(threshold {threshold:.0f}%)"
+            )
+            return result
+
+    if dry_run:
+        result.removed = list(plan.candidates)
+        return result
+
+    free_before = _free_bytes(plan.data_root)
+    for candidate in plan.candidates:
+        try:
+            run_command(
+                ["docker", candidate.kind, "rm", *candidate.rm_args], capture=True
+            )
+        except subprocess.CalledProcessError:
+            # Typically an image another image builds on; retry next time
+            logger.warning(f"Could not remove {candidate.kind} {candidate.name}")
+            continue
+        result.removed.append(candidate)
+
+    free_after = _free_bytes(plan.data_root)
+    if free_before is not None and free_after is not None:
+        result.freed = max(0, free_after - free_before)
+    return result
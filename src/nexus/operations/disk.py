@@ -0,0 +1,180 @@
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from nexus.config import STATE_PATH
+from nexus.utils import load_state, read_vault, save_state
+
+logger = logging.getLogger(__name__)
+
+DISK_SAMPLES_PATH = STATE_PATH / "disk-samples.json"
+
+# Samples older than this are ignored for growth estimates and dropped
+GROWTH_WINDOW_SECONDS = 14 * 24 * 3600
+# A growth estimate needs samples spanning at least this long
+MIN_GROWTH_SPAN_SECONDS = 3600
+
+
+@dataclass
+class DiskUsage:
+    """Filesystem usage for one configured data path.
+
+    Byte counts follow df semantics: `available` is what unprivileged
+    processes can still write, so used + available may be less than total.
+
+    Attributes:
+        label: Short name for the path (e.g., "data", "backups").
+        path: The path that was measured.
+        total: Filesystem size in bytes.
+        used: Bytes in use.
+        available: Bytes available to unprivileged users.
+        inodes_total: Total inodes on the filesystem.
+        inodes_free: Inodes available to unprivileged users.
+        growth_per_day: Bytes per day the used space is growing by, or None
+            if there aren't enough samples yet.
+        days_to_full: Projected days until available space runs out, or None
+            if usage isn't growing or can't be estimated.
+    """
+
+    label: str
+    path: str
+    total: int
+    used: int
+    available: int
+    inodes_total: int
+    inodes_free: int
+    growth_per_day: Optional[float] = None
+    days_to_full: Optional[float] = None
+
+    @property
+    def usage_percent(self) -> float:
+        capacity = self.used + self.available
+        return self.used / capacity * 100 if capacity else 0.0
+
+    @property
+    def inode_percent(self) -> float:
+        if not self.inodes_total:
+            return 0.0
+        return (self.inodes_total - self.inodes_free) / self.inodes_total * 100
+
+
+def get_data_paths() -> dict[str, Path]:
+    """Resolve every filesystem path Nexus stores data on.
+
+    Reads NEXUS_DATA_DIRECTORY and NEXUS_USERDATA_DIRECTORY from the
+    environment, falling back to the vault when unset.
+
+    Returns:
+        Dictionary mapping labels to paths: always "root", plus "data",
+        "backups", "config", and "userdata" when configured.
+    """
+    data_dir = os.environ.get("NEXUS_DATA_DIRECTORY", "")
+    userdata_dir = os.environ.get("NEXUS_USERDATA_DIRECTORY", "")
+
+    if not data_dir or not userdata_dir:
+        try:
+            vault = read_vault()
+            data_dir = data_dir or vault.get("nexus_data_directory", "")
+            userdata_dir = userdata_dir or vault.get("nexus_userdata_directory", "")
+        except Exception as e:
+            logger.debug(f"Could not read data paths from vault: {e}")
+
+    paths = {"root": Path("/")}
+    if data_dir:
+        base = Path(data_dir).expanduser()
+        paths["data"] = base
+        paths["backups"] = base / "Backups"
+        paths["config"] = base / "Config"
+    if userdata_dir:
+        paths["userdata"] = Path(userdata_dir).expanduser()
+    return paths
+
+
+def statvfs_usage(label: str, path: Path) -> DiskUsage:
+    """Measure a filesystem with os.statvfs.
+
+    Args:
+        label: Short name for the path.
+        path: Any path on the filesystem to measure.
+
+    Returns:
+        DiskUsage without growth estimates.
+
+    Raises:
+        OSError: If the path cannot be measured.
+    """
+    st = os.statvfs(path)
+    return DiskUsage(
+        label=label,
+        path=str(path),
+        total=st.f_blocks * st.f_frsize,
+        used=(st.f_blocks - st.f_bfree) * st.f_frsize,
+        available=st.f_bavail * st.f_frsize,
+        inodes_total=st.f_files,
+        inodes_free=st.f_favail,
+    )
+
+
+def _growth_per_day(samples: list[list[float]]) -> Optional[float]:
+    """Least-squares slope of used bytes over time, in bytes per day."""
+    if len(samples) < 2 or samples[-1][0] - samples[0][0] < MIN_GROWTH_SPAN_SECONDS:
+        return None
+
+    mean_t = sum(t for t, _ in samples) / len(samples)
+    mean_u = sum(u for _, u in samples) / len(samples)
+    numerator = sum((t - mean_t) * (u - mean_u) for t, u in samples)
+    denominator = sum((t - mean_t) ** 2 for t, _ in samples)
+    return numerator / denominator * 86400
+
+
+def collect_disk_usage(
+    paths: Optional[dict[str, Path]] = None,
+    record: bool = True,
+) -> dict[str, DiskUsage]:
+    """Measure every data path and estimate how fast each is filling up.
+
+    Growth is the least-squares trend of samples from previous runs within
+    GROWTH_WINDOW_SECONDS, stored in DISK_SAMPLES_PATH.
+
+    Args:
+        paths: Labels mapped to paths to measure. Defaults to
+            get_data_paths().
+        record: If True, store this run's measurements as new samples.
+
+    Returns:
+        Dictionary mapping label to DiskUsage. Paths that don't exist or
+        can't be measured are omitted.
+    """
+    if paths is None:
+        paths = get_data_paths()
+
+    now = time.time()
+    history = load_state(DISK_SAMPLES_PATH)
+    usages: dict[str, DiskUsage] = {}
+
+    for label, path in paths.items():
+        try:
+            usage = statvfs_usage(label, path)
+        except OSError as e:
+            logger.debug(f"Skipping {label} ({path}): {e}")
+            continue
+
+        samples = [
+            s for s in history.get(label, []) if now - s[0] <= GROWTH_WINDOW_SECONDS
+        ]
+        samples.append([now, usage.used])
+
+        usage.growth_per_day = _growth_per_day(samples)
+        if usage.growth_per_day and usage.growth_per_day > 0:
+            usage.days_to_full = usage.available / usage.growth_per_day
+
+        history[label] = samples
+        usages[label] = usage
+
+    if record:
+        save_state(DISK_SAMPLES_PATH, history)
+
+    return usages
@@ -0,0 +1,169 @@
+import logging
+import re
+import subprocess
+from dataclasses import dataclass
+from typing import Optional
+
+from nexus.config import STATE_PATH
+from nexus.utils import load_state, run_command, save_state, stream_command_output
+
+logger = logging.getLogger(__name__)
+
+LOG_CURSORS_PATH = STATE_PATH / "log-cursors.json"
+
+# How far back to read for a container that has never been scanned
+DEFAULT_LOOKBACK = "1h"
+
+SEVERITIES = ("critical", "error", "warning")
+
+# What `docker logs --timestamps` prefixes each line with (RFC3339, UTC)
+_TIMESTAMP = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?Z")
+
+
+@dataclass(frozen=True)
+class LogRule:
+    """A compiled log pattern and the severity a match is reported as.
+
+    Attributes:
+        pattern: Compiled regular expression searched for in each log line.
+        severity: One of "critical", "error", or "warning".
+    """
+
+    pattern: re.Pattern[str]
+    severity: str
+
+
+def _rule(pattern: str, severity: str) -> LogRule:
+    return LogRule(re.compile(pattern, re.IGNORECASE), severity)
+
+
+# Rules are evaluated in order and the first match wins, so the most severe
+# patterns come first.
+DEFAULT_RULES = [
+    _rule(r"\b(panic|fatal|out of memory|oomkilled)\b", "critical"),
+    _rule(r"\b(error|exception|traceback)\b", "error"),
+    _rule(r"\bwarn(ing)?\b", "warning"),
+]
+
+# Containers with structured log levels replace DEFAULT_RULES entirely, so
+# e.g. an info line that mentions "error" in a message isn't counted.
+SERVICE_RULES: dict[str, list[LogRule]] = {
+    "traefik": [
+        _rule(r"\blevel=(fatal|panic)\b", "critical"),
+        _rule(r"\blevel=error\b", "error"),
+        _rule(r"\blevel=warn(ing)?\b", "warning"),
+    ],
+    "jellyfin": [
+        _rule(r"\[FTL\]", "critical"),
+        _rule(r"\[ERR\]", "error"),
+        _rule(r"\[WRN\]", "warning"),
+    ],
+}
+
+
+def _list_running_containers() -> list[str]:
+    try:
+        result = run_command(["docker", "ps", "--format", "{{.Names}}"], capture=True)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        logger.error("Failed to list running containers")
+        return []
+    return [name for name in result.stdout.splitlines() if name]
+
+
+def scan_container_logs(
+    container: str,
+    rules: list[LogRule],
+    cursor: Optional[str] = None,
+) -> tuple[dict[str, int], Optional[str]]:
+    """Stream a container's logs and count lines matching each severity.
+
+    Runs `docker logs --timestamps` and reads its stdout and stderr line by
+    line, so memory use is independent of log volume. Only timestamped lines
+    newer than the cursor are considered; anything else docker writes to
+    stderr is logged as an error and never becomes the cursor.
+
+    Args:
+        container: Name of the container to scan.
+        rules: Ordered rules to apply; the first matching rule wins.
+        cursor: Docker timestamp of the last line seen on a previous run.
+            If None, scans the last DEFAULT_LOOKBACK of logs.
+
+    Returns:
+        Tuple of (counts keyed by severity, timestamp of the newest line
+        read). The timestamp is the given cursor if no new lines were read.
+    """
+    counts = dict.fromkeys(SEVERITIES, 0)
+    newest = cursor
+
+    since = cursor or DEFAULT_LOOKBACK
+    cmd = ["docker", "logs", "--timestamps", "--since", since, container]
+
+    # Containers log to both streams, while docker's own errors (e.g. "Error:
+    # No such container") come on stderr without a timestamp
+    for stream, line in stream_command_output(cmd, check=False):
+        timestamp, _, message = line.partition(" ")
+        if not _TIMESTAMP.fullmatch(timestamp):
+            if stream == "stderr" and line:
+                logger.error(f"{container}: {line}")
+            continue
+        # --since is inclusive, and docker's fixed-width RFC3339 timestamps
+        # compare correctly as strings
+        if cursor and timestamp <= cursor:
+            continue
+        # The two streams arrive interleaved, so keep the latest of either
+        if newest is None or timestamp > newest:
+            newest = timestamp
+
+        for rule in rules:
+            if rule.pattern.search(message):
+                counts[rule.severity] += 1
+                break
+
+    return counts, newest
+
+
+def check_service_logs(
+    containers: Optional[list[str]] = None,
+) -> dict[str, dict[str, int]]:
+    """Scan container logs for problems since the previous scan.
+
+    Streams logs for every running container (or the given ones), applying
+    per-service rule sets from SERVICE_RULES or DEFAULT_RULES. A timestamp
+    cursor per container is persisted in LOG_CURSORS_PATH, so each run only
+    reads lines written since the last one.
+
+    Args:
+        containers: Container names to scan. Defaults to all running
+            containers.
+
+    Returns:
+        Dictionary mapping container name to counts keyed by severity.
+        Containers whose logs could not be read are omitted.
+    """
+    if containers is None:
+        containers = _list_running_containers()
+
+    cursors = load_state(LOG_CURSORS_PATH)
+    findings: dict[str, dict[str, int]] = {}
+
+    for container in containers:
+        rules = SERVICE_RULES.get(container, DEFAULT_RULES)
+        try:
+            counts, newest = scan_container_logs(
+                container, rules, cursors.get(container)
+            )
+        except OSError as e:
+            logger.error(f"{container}: Failed to read logs: {e}")
+            continue
+
+        if newest:
+            cursors[container] = newest
+        findings[container] = counts
+
+        if counts["critical"]:
+            logger.error(f"{container}: Found {counts['critical']} critical log lines")
+        if counts["error"]:
+            logger.warning(f"{container}: Found {counts['error']} errors")
+
+    save_state(LOG_CURSORS_PATH, cursors)
+    return findings
@@ -1,8 +1,20 @@
 import logging
 import subprocess
 
+from nexus.operations.cleanup import CleanupResult, run_cleanup
+from nexus.operations.disk import DiskUsage, collect_disk_usage
+from nexus.operations.logs import check_service_logs
+from nexus.operations.runner import MaintenanceTask, RunReport, run_tasks
+from nexus.restore.verify import VERIFY_STATE_PATH, cycle_coverage, run_verification
+from nexus.utils import format_size, load_state
+
 logger = logging.getLogger(__name__)
 
+WARNING_THRESHOLD = 80
+CRITICAL_THRESHOLD = 90
+# Warn when the growth trend predicts a path filling up sooner than this
+FULL_WARNING_DAYS = 14
+
 
 def _run_command(cmd: list[str], description: str) -> subprocess.CompletedProcess[str]:
     logger.info(f"Running: {description}")
@@ -36,151 +48,210 @@ def check_container_status() -> bool:
     return True
 
 
-def check_disk_space() -> dict[str, str | int]:
-    """Check root filesystem disk usage and warn if thresholds exceeded.
+def check_disk_space() -> dict[str, DiskUsage]:
+    """Check usage of every data filesystem and warn if thresholds exceeded.
 
-    Runs `df -h /` and logs warnings at 80% usage and errors at 90%.
+    Measures the root filesystem and each configured data path with
+    os.statvfs. Logs warnings at 80% space or inode usage and errors at 90%,
+    and warns when the growth trend predicts a path filling up within
+    FULL_WARNING_DAYS.
 
     Returns:
-        Dictionary with 'total', 'used', 'available' (strings) and
-        'usage_percent' (int). Empty dict if parsing fails.
+        Dictionary mapping path label to its DiskUsage. Empty if no path
+        could be measured.
     """
-    result = _run_command(["df", "-h", "/"], "Check disk space")
-
-    lines = result.stdout.split("\n")
-    if len(lines) > 1:
-        parts = lines[1].split()
-        usage_percent = int(parts[4].rstrip("%"))
+    logger.info("Running: Check disk space")
+    usages = collect_disk_usage()
 
-        warning_threshold = 80
-        critical_threshold = 90
+    for label, usage in usages.items():
+        for kind, percent in (
+            ("disk", usage.usage_percent),
+            ("inode", usage.inode_percent),
+        ):
+            if percent >= CRITICAL_THRESHOLD:
+                logger.error(f"🚨 Critical {kind} usage on {label}: {percent:.0f}%")
+            elif percent >= WARNING_THRESHOLD:
+                logger.warning(f"⚠️  High {kind} usage on {label}: {percent:.0f}%")
 
-        if usage_percent >= critical_threshold:
-            logger.error(f"🚨 Critical disk usage: {usage_percent}%")
-        elif usage_percent >= warning_threshold:
-            logger.warning(f"⚠️  High disk usage: {usage_percent}%")
+        if usage.days_to_full is not None and usage.days_to_full < FULL_WARNING_DAYS:
+            logger.warning(
+                f"⚠️  {label} is growing {format_size(usage.growth_per_day or 0)}/day"
+                f" and will be full in {usage.days_to_full:.1f} days"
+            )
 
-        return {
-            "total": parts[1],
-            "used": parts[2],
-            "available": parts[3],
-            "usage_percent": usage_percent,
-        }
-
-    return {}
+    logger.info(f"✓ Check disk space completed ({len(usages)} paths)")
+    return usages
 
 
 def verify_backups() -> bool:
-    """Check if backup snapshots exist in restic repositories.
+    """Verify the next data slice of each backup repository.
 
-    Uses `docker exec backrest restic snapshots` to verify backup snapshots exist.
+    Each night reads a different `--read-data-subset` slice, so every pack
+    in the local and R2 repositories is read back once per cycle. A sample
+    restore of one service is added when due. See nexus.restore.verify.
 
     Returns:
-        True if at least one backup snapshot is found, False otherwise.
+        True if every slice checked, and the sample restore if any, passed.
     """
     try:
-        result = _run_command(
-            ["docker", "exec", "backrest", "restic", "-r", "/repos", "snapshots"],
-            "Check backup snapshots",
-        )
-        if result.stdout.strip():
-            logger.info("✓ Backup snapshots found")
-            return True
-        logger.warning("No backup snapshots found")
+        report = run_verification()
+    except Exception as e:
+        logger.error(f"Failed to verify backups: {e}")
         return False
-    except subprocess.CalledProcessError:
-        logger.error("Failed to check backup snapshots")
-        return False
-
-
-def check_service_logs() -> None:
-    """Scan service logs from the last hour for error messages.
-
-    Checks traefik, tailscale-access, and jellyfin container logs
-    and logs a warning if errors are found.
-    """
-    services = ["traefik", "tailscale-access", "jellyfin"]
 
-    for service in services:
-        result = subprocess.run(
-            ["docker", "logs", "--since", "1h", service],
-            capture_output=True,
-            text=True,
+    state = load_state(VERIFY_STATE_PATH).get("repos", {})
+    for result in report.slices:
+        passed, slices = cycle_coverage(state.get(result.repo_id, {}))
+        if result.passed:
+            logger.info(
+                f"✓ Repo '{result.repo_id}' slice {result.slice}/{result.slices} "
+                f"verified ({passed}/{slices} slices passed this cycle)"
+            )
+        else:
+            logger.error(
+                f"Repo '{result.repo_id}' slice {result.slice}/{result.slices} "
+                f"failed: {result.error}"
+            )
+
+    sample = report.sample_restore
+    if sample and sample.passed:
+        logger.info(
+            f"✓ Sample restore of {sample.service} matched "
+            f"({sample.files} files, {sample.compared} compared with live data)"
         )
-
-        errors = [line for line in result.stdout.split("\n") if "error" in line.lower()]
-        if errors:
-            logger.warning(f"{service}: Found {len(errors)} errors in last hour")
+    elif sample:
+        problem = sample.error or f"mismatched: {', '.join(sample.mismatched[:10])}"
+        logger.error(f"Sample restore of {sample.service} failed: {problem}")
+
+    return report.passed
+
+
+def _log_cleanup(result: CleanupResult) -> None:
+    if result.skipped:
+        logger.info(f"Skipping cleanup: {result.skipped}")
+        return
+    plan = result.plan
+    if plan.kept:
+        logger.info(f"Keeping for rollback: {', '.join(plan.kept)}")
+    logger.info(
+        f"✓ Removed {len(result.removed)}/{len(plan.candidates)} items, "
+        f"freed {format_size(result.freed)} "
+        f"(estimated up to {format_size(plan.reclaimable)})"
+    )
 
 
 def cleanup_old_images() -> None:
-    """Remove all unused Docker images to reclaim disk space.
+    """Remove unused Docker images under disk pressure.
 
-    Runs `docker image prune -a -f` to remove images not associated
-    with any container.
+    Keeps images used by any container plus the previous image of each
+    deployed service for rollback. See nexus.operations.cleanup.
     """
     logger.info("Cleaning up unused Docker images...")
-
-    result = _run_command(
-        ["docker", "image", "prune", "-a", "-f"], "Clean up Docker images"
-    )
-
-    freed_space = result.stdout.strip()
-    logger.info(f"✓ Freed space: {freed_space}")
+    _log_cleanup(run_cleanup(kinds=frozenset({"image"})))
 
 
 def cleanup_old_volumes() -> None:
-    """Remove all unused Docker volumes to reclaim disk space.
+    """Remove dangling anonymous Docker volumes under disk pressure.
 
-    Runs `docker volume prune -f` to remove volumes not used by
-    any container.
+    Named volumes are never removed. See nexus.operations.cleanup.
     """
     logger.info("Cleaning up unused Docker volumes...")
-
-    result = _run_command(
-        ["docker", "volume", "prune", "-f"], "Clean up Docker volumes"
-    )
-
-    freed_space = result.stdout.strip()
-    logger.info(f"✓ Cleaned volumes: {freed_space}")
+    _log_cleanup(run_cleanup(kinds=frozenset({"volume"})))
 
 
-def daily_tasks() -> None:
+def daily_tasks() -> RunReport:
     """Execute daily maintenance checks.
 
-    Runs container status check, disk space check, and log scanning.
+    Runs container status check, disk space check, log scanning, and the
+    nightly backup verification slice concurrently.
+
+    Returns:
+        Report with the duration and outcome of each check.
     """
     logger.info("📅 Running daily tasks...")
 
-    check_container_status()
-    check_disk_space()
-    check_service_logs()
+    report = run_tasks(
+        "daily",
+        [
+            MaintenanceTask("check_container_status", check_container_status),
+            MaintenanceTask("check_disk_space", check_disk_space),
+            MaintenanceTask(
+                "check_service_logs",
+                check_service_logs,
+                resources=frozenset({"log-cursors"}),
+            ),
+            MaintenanceTask(
+                "verify_backups", verify_backups, resources=frozenset({"backrest"})
+            ),
+        ],
+    )
 
-    logger.info("✓ Daily tasks complete")
+    _log_report(report)
+    return report
 
 
-def weekly_tasks() -> None:
+def weekly_tasks() -> RunReport:
     """Execute weekly maintenance operations.
 
-    Verifies backups exist and cleans up unused Docker resources.
+    Cleans up unused Docker resources. Cleanups share the "docker-prune"
+    resource because the daemon rejects concurrent prune operations.
+
+    Returns:
+        Report with the duration and outcome of each operation.
     """
     logger.info("📅 Running weekly tasks...")
 
-    verify_backups()
-    cleanup_old_images()
-    cleanup_old_volumes()
+    report = run_tasks(
+        "weekly",
+        [
+            MaintenanceTask(
+                "cleanup_old_images",
+                cleanup_old_images,
+                resources=frozenset({"docker-prune"}),
+            ),
+            MaintenanceTask(
+                "cleanup_old_volumes",
+                cleanup_old_volumes,
+                resources=frozenset({"docker-prune"}),
+            ),
+        ],
+    )
+
+    _log_report(report)
+    return report
 
-    logger.info("✓ Weekly tasks complete")
+
+def _remind_secret_rotation() -> None:
+    logger.info("⚠️  Monthly reminder: Consider rotating secrets")
+    logger.info("   Run: ansible-vault rekey ansible/vars/vault.yml")
 
 
-def monthly_tasks() -> None:
+def monthly_tasks() -> RunReport:
     """Execute monthly maintenance reminders.
 
     Logs a reminder to consider rotating secrets.
+
+    Returns:
+        Report with the outcome of each reminder.
     """
     logger.info("📅 Running monthly tasks...")
 
-    logger.info("⚠️  Monthly reminder: Consider rotating secrets")
-    logger.info("   Run: ansible-vault rekey ansible/vars/vault.yml")
+    report = run_tasks(
+        "monthly",
+        [MaintenanceTask("remind_secret_rotation", _remind_secret_rotation)],
+    )
+
+    _log_report(report)
+    return report
 
-    logger.info("✓ Monthly tasks complete")
+
+def _log_report(report: RunReport) -> None:
+    failed = [task.name for task in report.tasks if task.status != "ok"]
+    group = report.group.capitalize()
+    if failed:
+        logger.warning(
+            f"⚠️  {group} tasks finished in {report.duration:.1f}s "
+            f"with failures: {', '.join(failed)}"
+        )
+    else:
+        logger.info(f"✓ {group} tasks complete in {report.duration:.1f}s")
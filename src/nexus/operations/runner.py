@@ -0,0 +1,220 @@
+import json
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from nexus.utils import write_prometheus_textfile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+
+
+@dataclass(frozen=True)
+class MaintenanceTask:
+    """A unit of maintenance work scheduled by run_tasks.
+
+    Attributes:
+        name: Identifier used in logs, reports, and metric labels.
+        func: Zero-argument callable doing the work. Raising an exception or
+            returning False marks the task as failed.
+        resources: Names of shared resources the task needs exclusively.
+            Tasks that share a resource never run concurrently and keep
+            their declaration order.
+    """
+
+    name: str
+    func: Callable[[], Any]
+    resources: frozenset[str] = frozenset()
+
+
+@dataclass
+class TaskResult:
+    """Outcome of a single maintenance task.
+
+    Attributes:
+        name: Name of the task.
+        status: "ok" or "failed".
+        started_at: Unix timestamp when the task started.
+        duration: Wall-clock duration in seconds.
+        error: Error message if the task failed.
+    """
+
+    name: str
+    status: str
+    started_at: float
+    duration: float
+    error: Optional[str] = None
+
+
+@dataclass
+class RunReport:
+    """Structured report for one run of a maintenance task group.
+
+    Attributes:
+        group: Task group name (e.g., "daily").
+        started_at: Unix timestamp when the run started.
+        duration: Wall-clock duration of the whole run in seconds.
+        tasks: Per-task results in declaration order.
+    """
+
+    group: str
+    started_at: float
+    duration: float = 0.0
+    tasks: list[TaskResult] = field(default_factory=list)
+
+    @property
+    def succeeded(self) -> bool:
+        return all(task.status == "ok" for task in self.tasks)
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["succeeded"] = self.succeeded
+        return data
+
+
+def _execute(task: MaintenanceTask) -> TaskResult:
+    started_at = time.time()
+    start = time.perf_counter()
+    try:
+        outcome = task.func()
+        status = "failed" if outcome is False else "ok"
+        error = "Check reported a problem" if outcome is False else None
+    except Exception as e:
+        logger.error(f"✗ {task.name} failed: {e}")
+        status, error = "failed", str(e)
+
+    return TaskResult(
+        name=task.name,
+        status=status,
+        started_at=started_at,
+        duration=time.perf_counter() - start,
+        error=error,
+    )
+
+
+def run_tasks(
+    group: str,
+    tasks: list[MaintenanceTask],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> RunReport:
+    """Run a group of maintenance tasks concurrently where it is safe to.
+
+    Tasks are started in declaration order on a thread pool, except that a
+    task waits while any running or earlier pending task holds one of its
+    resources. A failing task is recorded and never stops the rest of the
+    group.
+
+    Args:
+        group: Name of the task group, used in the report.
+        tasks: Tasks to run.
+        max_workers: Maximum number of tasks running at once.
+
+    Returns:
+        A RunReport with one TaskResult per task, in declaration order.
+
+    Raises:
+        ValueError: If two tasks have the same name, since results, reports
+            and metric labels are keyed by it.
+    """
+    names = [task.name for task in tasks]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate task names: {', '.join(duplicates)}")
+
+    report = RunReport(group=group, started_at=time.time())
+    start = time.perf_counter()
+
+    pending = list(tasks)
+    running: dict[Future[TaskResult], MaintenanceTask] = {}
+    results: dict[str, TaskResult] = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            blocked: set[str] = set()
+            for task in running.values():
+                blocked |= task.resources
+
+            for task in list(pending):
+                if task.resources & blocked:
+                    blocked |= task.resources
+                    continue
+                pending.remove(task)
+                blocked |= task.resources
+                running[pool.submit(_execute, task)] = task
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                results[task.name] = future.result()
+
+    report.tasks = [results[task.name] for task in tasks]
+    report.duration = time.perf_counter() - start
+    return report
+
+
+def write_report(report: RunReport, report_dir: Path) -> Path:
+    """Write a run report as JSON.
+
+    Args:
+        report: The report to write.
+        report_dir: Directory for reports. Created if missing.
+
+    Returns:
+        Path to the written report, named after the group and start time.
+    """
+    stamp = datetime.fromtimestamp(report.started_at).strftime("%Y%m%dT%H%M%S")
+    path = report_dir / f"{report.group}-{stamp}.json"
+    report_dir.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report.to_dict(), f, indent=2)
+    return path
+
+
+def write_textfile(report: RunReport, textfile_dir: Path) -> Path:
+    """Export a run report for node-exporter's textfile collector.
+
+    Args:
+        report: The report to export.
+        textfile_dir: The collector directory. Created if missing.
+
+    Returns:
+        Path to the written .prom file. Each group gets its own file so
+        runs of different groups don't overwrite each other.
+    """
+    group = {"group": report.group}
+    path = textfile_dir / f"nexus_maintenance_{report.group}.prom"
+    write_prometheus_textfile(
+        path,
+        [
+            (
+                "nexus_maintenance_last_run_timestamp_seconds",
+                "Unix time the maintenance group last ran.",
+                [(group, report.started_at)],
+            ),
+            (
+                "nexus_maintenance_run_duration_seconds",
+                "Wall-clock duration of the last maintenance group run.",
+                [(group, report.duration)],
+            ),
+            (
+                "nexus_maintenance_task_success",
+                "Whether the task succeeded on the last run (1) or failed (0).",
+                [
+                    ({**group, "task": t.name}, 1 if t.status == "ok" else 0)
+                    for t in report.tasks
+                ],
+            ),
+            (
+                "nexus_maintenance_task_duration_seconds",
+                "Duration of the task on the last run.",
+                [({**group, "task": t.name}, t.duration) for t in report.tasks],
+            ),
+        ],
+    )
+    return path
@@ -0,0 +1,204 @@
+import json
+import subprocess
+from collections.abc import Generator
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from nexus.operations.cleanup import (
+    _parse_size,
+    _repository,
+    plan_cleanup,
+    run_cleanup,
+)
+
+ANON = "a" * 64
+
+IMAGES = [
+    {
+        "Id": "sha256:plex-current",
+        "RepoTags": ["plexinc/pms-docker:latest"],
+        "Created": "2026-10-10T00:00:00Z",
+        "Size": 300,
+    },
+    {
+        "Id": "sha256:plex-previous",
+        "RepoTags": [],
+        "RepoDigests": ["plexinc/pms-docker@sha256:111"],
+        "Created": "2026-09-10T00:00:00Z",
+        "Size": 290,
+    },
+    {
+        "Id": "sha256:plex-older",
+        "RepoTags": [],
+        "RepoDigests": ["plexinc/pms-docker@sha256:000"],
+        "Created": "2026-08-10T00:00:00Z",
+        "Size": 280,
+    },
+    {
+        "Id": "sha256:unrelated",
+        "RepoTags": ["busybox:latest", "mirror.local/busybox:latest"],
+        "Created": "2026-01-01T00:00:00Z",
+        "Size": 5,
+    },
+]
+
+CONTAINERS = [
+    {"Image": "sha256:plex-current", "Config": {"Image": "plexinc/pms-docker:latest"}}
+]
+
+
+def _fake_docker(removals: list[list[str]]) -> Any:
+    def fake(cmd: list[str], capture: bool = False) -> MagicMock:
+        joined = " ".join(cmd)
+        if joined.startswith("docker info"):
+            stdout = "/var/lib/docker\n"
+        elif joined.startswith("docker image ls"):
+            stdout = "\n".join(i["Id"] for i in IMAGES)
+        elif joined.startswith("docker image inspect"):
+            stdout = json.dumps(IMAGES)
+        elif joined.startswith("docker ps"):
+            stdout = "container1\n"
+        elif joined.startswith("docker container inspect"):
+            stdout = json.dumps(CONTAINERS)
+        elif joined.startswith("docker volume ls"):
+            stdout = f"{ANON}\nvaultwarden_data\n"
+        elif joined.startswith("docker system df"):
+            stdout = json.dumps(
+                {
+                    "Volumes": [
+                        {"Name": ANON, "Size": "1.5MB"},
+                        {"Name": "vaultwarden_data", "Size": "2GB"},
+                    ]
+                }
+            )
+        elif cmd[2] == "rm":
+            removals.append(cmd)
+            stdout = ""
+        else:
+            raise AssertionError(f"unexpected command: {joined}")
+        return MagicMock(stdout=stdout)
+
+    return fake
+
+
+@pytest.fixture
+def removals() -> Generator[list[list[str]], None, None]:
+    removed: list[list[str]] = []
+    with patch(
+        "nexus.operations.cleanup.run_command", side_effect=_fake_docker(removed)
+    ):
+        yield removed
+
+
+def _disk(used: int, total: int = 100) -> MagicMock:
+    return MagicMock(total=total, used=used, free=total - used)
+
+
+class TestHelpers:
+    @pytest.mark.parametrize(
+        "reference,expected",
+        [
+            ("busybox:latest", "busybox"),
+            ("plexinc/pms-docker@sha256:abc", "plexinc/pms-docker"),
+            ("localhost:5000/app:1.0", "localhost:5000/app"),
+            ("ghcr.io/org/app", "ghcr.io/org/app"),
+        ],
+    )
+    def test_repository(self, reference: str, expected: str) -> None:
+        assert _repository(reference) == expected
+
+    def test_parse_size(self) -> None:
+        assert _parse_size("1.5MB") == 1_500_000
+        assert _parse_size("0B") == 0
+        assert _parse_size("N/A") == 0
+
+
+class TestPlanCleanup:
+    def test_keeps_in_use_and_previous_image(self, removals: list[list[str]]) -> None:
+        with patch("shutil.disk_usage", return_value=_disk(50)):
+            plan = plan_cleanup()
+
+        assert plan.data_root == "/var/lib/docker"
+        assert plan.usage_percent == 50
+        assert plan.kept == ["plexinc/pms-docker@sha256:111"]
+        assert [(c.kind, c.id) for c in plan.candidates] == [
+            ("image", "sha256:plex-older"),
+            ("image", "sha256:unrelated"),
+            ("volume", ANON),
+        ]
+        assert plan.reclaimable == 280 + 5 + 1_500_000
+
+    def test_keep_previous_zero(self, removals: list[list[str]]) -> None:
+        with patch("shutil.disk_usage", return_value=_disk(50)):
+            plan = plan_cleanup(frozenset({"image"}), keep_previous=0)
+
+        assert plan.kept == []
+        assert len(plan.candidates) == 3
+
+
+class TestRunCleanup:
+    def test_below_threshold_skips(self, removals: list[list[str]]) -> None:
+        with patch("shutil.disk_usage", return_value=_disk(50)):
+            result = run_cleanup(threshold=80)
+
+        assert result.skipped is not None
+        assert result.removed == []
+        assert removals == []
+
+    def test_dry_run(self, removals: list[list[str]]) -> None:
+        with patch("shutil.disk_usage", return_value=_disk(90)):
+            result = run_cleanup(dry_run=True)
+
+        assert len(result.removed) == 3
+        assert result.freed == 0
+        assert removals == []
+
+    def test_removes_and_measures_freed(self, removals: list[list[str]]) -> None:
+        with patch("shutil.disk_usage", side_effect=[_disk(90), _disk(90), _disk(80)]):
+            result = run_cleanup()
+
+        assert removals == [
+            ["docker", "image", "rm", "sha256:plex-older"],
+            ["docker", "image", "rm", "busybox:latest", "mirror.local/busybox:latest"],
+            ["docker", "volume", "rm", ANON],
+        ]
+        assert result.freed == 10
+
+    def test_data_root_not_on_host(self, removals: list[list[str]]) -> None:
+        with patch("shutil.disk_usage", side_effect=FileNotFoundError()):
+            result = run_cleanup()
+
+        assert result.plan.usage_percent is None
+        assert result.skipped is not None
+        assert "not on this host" in result.skipped
+        assert removals == []
+
+    def test_force_without_data_root(self, removals: list[list[str]]) -> None:
+        with patch("shutil.disk_usage", side_effect=FileNotFoundError()):
+            result = run_cleanup(frozenset({"volume"}), force=True)
+
+        assert removals == [["docker", "volume", "rm", ANON]]
+        assert result.freed == 0
+
+    def test_force_ignores_threshold(self, removals: list[list[str]]) -> None:
+        with patch("shutil.disk_usage", return_value=_disk(10)):
+            result = run_cleanup(frozenset({"volume"}), force=True)
+
+        assert result.skipped is None
+        assert removals == [["docker", "volume", "rm", ANON]]
+
+    def test_failed_removal_is_skipped(self) -> None:
+        def fake(cmd: list[str], capture: bool = False) -> MagicMock:
+            if cmd[2] == "rm":
+                raise subprocess.CalledProcessError(1, cmd)
+            return _fake_docker([])(cmd, capture)
+
+        with (
+            patch("nexus.operations.cleanup.run_command", side_effect=fake),
+            patch("shutil.disk_usage", return_value=_disk(90)),
+        ):
+            result = run_cleanup(frozenset({"volume"}))
+
+        assert result.removed == []
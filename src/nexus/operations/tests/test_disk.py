@@ -0,0 +1,164 @@
+import json
+import os
+from collections.abc import Generator
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from nexus.operations.disk import (
+    DiskUsage,
+    collect_disk_usage,
+    get_data_paths,
+    statvfs_usage,
+)
+
+
+@pytest.fixture
+def samples_path(tmp_path: Path) -> Generator[Path, None, None]:
+    path = tmp_path / "disk-samples.json"
+    with patch("nexus.operations.disk.DISK_SAMPLES_PATH", path):
+        yield path
+
+
+def _statvfs(used_blocks: int, free_blocks: int) -> os.statvfs_result:
+    # (bsize, frsize, blocks, bfree, bavail, files, ffree, favail, flag, namemax)
+    blocks = used_blocks + free_blocks
+    return os.statvfs_result(
+        (4096, 4096, blocks, free_blocks, free_blocks, 1000, 400, 400, 0, 255)
+    )
+
+
+class TestDiskUsage:
+    def test_percentages(self) -> None:
+        usage = DiskUsage("data", "/data", 100, 60, 20, 1000, 250)
+
+        # Reserved blocks don't count towards capacity, matching df
+        assert usage.usage_percent == 75
+        assert usage.inode_percent == 75
+
+    def test_empty_filesystem(self) -> None:
+        usage = DiskUsage("data", "/data", 0, 0, 0, 0, 0)
+
+        assert usage.usage_percent == 0
+        assert usage.inode_percent == 0
+
+
+class TestGetDataPaths:
+    def test_from_environment(self) -> None:
+        env = {
+            "NEXUS_DATA_DIRECTORY": "/mnt/data",
+            "NEXUS_USERDATA_DIRECTORY": "/mnt/userdata",
+        }
+        with (
+            patch.dict(os.environ, env),
+            patch("nexus.operations.disk.read_vault") as mock_vault,
+        ):
+            paths = get_data_paths()
+
+        mock_vault.assert_not_called()
+        assert paths == {
+            "root": Path("/"),
+            "data": Path("/mnt/data"),
+            "backups": Path("/mnt/data/Backups"),
+            "config": Path("/mnt/data/Config"),
+            "userdata": Path("/mnt/userdata"),
+        }
+
+    def test_falls_back_to_vault(self) -> None:
+        with (
+            patch.dict(os.environ, {}, clear=True),
+            patch(
+                "nexus.operations.disk.read_vault",
+                return_value={"nexus_data_directory": "/srv/nexus"},
+            ),
+        ):
+            paths = get_data_paths()
+
+        assert paths["data"] == Path("/srv/nexus")
+        assert "userdata" not in paths
+
+    def test_vault_unavailable(self) -> None:
+        with (
+            patch.dict(os.environ, {}, clear=True),
+            patch("nexus.operations.disk.read_vault", side_effect=FileNotFoundError()),
+        ):
+            assert get_data_paths() == {"root": Path("/")}
+
+
+class TestStatvfsUsage:
+    def test_statvfs_usage(self) -> None:
+        with patch("os.statvfs", return_value=_statvfs(10, 30)):
+            usage = statvfs_usage("data", Path("/data"))
+
+        assert usage.total == 40 * 4096
+        assert usage.used == 10 * 4096
+        assert usage.available == 30 * 4096
+        assert usage.inodes_total == 1000
+        assert usage.inodes_free == 400
+
+
+class TestCollectDiskUsage:
+    def test_first_run_has_no_growth(self, samples_path: Path) -> None:
+        with patch("os.statvfs", return_value=_statvfs(10, 30)):
+            usages = collect_disk_usage({"data": Path("/data")})
+
+        assert usages["data"].growth_per_day is None
+        assert usages["data"].days_to_full is None
+        assert len(json.loads(samples_path.read_text())["data"]) == 1
+
+    def test_predicts_time_to_full(self, samples_path: Path) -> None:
+        now = 1_000_000_000.0
+        day = 86400
+        # Growing by 10 blocks a day, with 30 blocks left
+        samples_path.write_text(
+            json.dumps({"data": [[now - 2 * day, 0], [now - day, 10 * 4096]]})
+        )
+
+        with (
+            patch("os.statvfs", return_value=_statvfs(20, 30)),
+            patch("nexus.operations.disk.time.time", return_value=now),
+        ):
+            usages = collect_disk_usage({"data": Path("/data")})
+
+        assert usages["data"].growth_per_day == pytest.approx(10 * 4096)
+        assert usages["data"].days_to_full == pytest.approx(3)
+
+    def test_shrinking_usage_never_fills(self, samples_path: Path) -> None:
+        now = 1_000_000_000.0
+        samples_path.write_text(json.dumps({"data": [[now - 86400, 50 * 4096]]}))
+
+        with (
+            patch("os.statvfs", return_value=_statvfs(20, 30)),
+            patch("nexus.operations.disk.time.time", return_value=now),
+        ):
+            usages = collect_disk_usage({"data": Path("/data")})
+
+        assert usages["data"].growth_per_day is not None
+        assert usages["data"].growth_per_day < 0
+        assert usages["data"].days_to_full is None
+
+    def test_drops_old_samples(self, samples_path: Path) -> None:
+        now = 1_000_000_000.0
+        samples_path.write_text(json.dumps({"data": [[now - 30 * 86400, 0]]}))
+
+        with (
+            patch("os.statvfs", return_value=_statvfs(20, 30)),
+            patch("nexus.operations.disk.time.time", return_value=now),
+        ):
+            usages = collect_disk_usage({"data": Path("/data")})
+
+        assert usages["data"].growth_per_day is None
+        assert json.loads(samples_path.read_text())["data"] == [[now, 20 * 4096]]
+
+    def test_skips_missing_paths(self, samples_path: Path) -> None:
+        with patch("os.statvfs", side_effect=FileNotFoundError()):
+            usages = collect_disk_usage({"data": Path("/missing")})
+
+        assert usages == {}
+
+    def test_record_false_keeps_samples(self, samples_path: Path) -> None:
+        with patch("os.statvfs", return_value=_statvfs(10, 30)):
+            collect_disk_usage({"data": Path("/data")}, record=False)
+
+        assert not samples_path.exists()
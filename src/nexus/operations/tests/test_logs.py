@@ -0,0 +1,159 @@
+import json
+from collections.abc import Generator, Iterator
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from nexus.operations.logs import (
+    DEFAULT_RULES,
+    SERVICE_RULES,
+    check_service_logs,
+    scan_container_logs,
+)
+
+
+def _stdout(lines: list[str]) -> Iterator[tuple[str, str]]:
+    return iter([("stdout", line) for line in lines])
+
+
+@pytest.fixture
+def cursors_path(tmp_path: Path) -> Generator[Path, None, None]:
+    path = tmp_path / "log-cursors.json"
+    with patch("nexus.operations.logs.LOG_CURSORS_PATH", path):
+        yield path
+
+
+@pytest.fixture
+def mock_stream() -> Generator[MagicMock, None, None]:
+    with patch("nexus.operations.logs.stream_command_output") as mock:
+        yield mock
+
+
+class TestScanContainerLogs:
+    def test_counts_by_severity(self, mock_stream: MagicMock) -> None:
+        mock_stream.return_value = _stdout(
+            [
+                "2026-10-19T10:00:00.000000001Z starting up",
+                "2026-10-19T10:00:01.000000000Z ERROR could not connect",
+                "2026-10-19T10:00:02.000000000Z Warning: slow query",
+                "2026-10-19T10:00:03.000000000Z fatal: out of disk",
+            ]
+        )
+
+        counts, newest = scan_container_logs("myapp", DEFAULT_RULES)
+
+        assert counts == {"critical": 1, "error": 1, "warning": 1}
+        assert newest == "2026-10-19T10:00:03.000000000Z"
+        cmd = mock_stream.call_args[0][0]
+        assert cmd == ["docker", "logs", "--timestamps", "--since", "1h", "myapp"]
+
+    def test_skips_lines_at_or_before_cursor(self, mock_stream: MagicMock) -> None:
+        cursor = "2026-10-19T10:00:01.000000000Z"
+        mock_stream.return_value = _stdout(
+            [
+                f"{cursor} error already counted",
+                "2026-10-19T10:00:02.000000000Z error new",
+            ]
+        )
+
+        counts, newest = scan_container_logs("myapp", DEFAULT_RULES, cursor)
+
+        assert counts["error"] == 1
+        assert newest == "2026-10-19T10:00:02.000000000Z"
+        cmd = mock_stream.call_args[0][0]
+        assert cmd[cmd.index("--since") + 1] == cursor
+
+    def test_no_new_lines_keeps_cursor(self, mock_stream: MagicMock) -> None:
+        mock_stream.return_value = _stdout([])
+
+        _, newest = scan_container_logs("myapp", DEFAULT_RULES, "2026-10-19T10Z")
+
+        assert newest == "2026-10-19T10Z"
+
+    def test_scans_stderr_and_ignores_docker_errors(
+        self, mock_stream: MagicMock
+    ) -> None:
+        cursor = "2026-10-19T10:00:00.000000000Z"
+        mock_stream.return_value = iter(
+            [
+                ("stderr", "2026-10-19T10:00:02.000000000Z ERROR on stderr"),
+                ("stdout", "2026-10-19T10:00:01.000000000Z ok"),
+                ("stderr", "Error: No such container: myapp"),
+            ]
+        )
+
+        counts, newest = scan_container_logs("myapp", DEFAULT_RULES, cursor)
+
+        assert counts["error"] == 1
+        assert newest == "2026-10-19T10:00:02.000000000Z"
+
+    def test_docker_error_never_becomes_cursor(self, mock_stream: MagicMock) -> None:
+        mock_stream.return_value = iter(
+            [("stderr", "Error response from daemon: No such container: myapp")]
+        )
+
+        counts, newest = scan_container_logs("myapp", DEFAULT_RULES)
+
+        assert newest is None
+        assert counts == {"critical": 0, "error": 0, "warning": 0}
+
+    def test_service_rules_replace_defaults(self, mock_stream: MagicMock) -> None:
+        mock_stream.return_value = _stdout(
+            [
+                '2026-10-19T10:00:00.000000000Z level=info msg="retrying error"',
+                '2026-10-19T10:00:01.000000000Z level=error msg="bad gateway"',
+            ]
+        )
+
+        counts, _ = scan_container_logs("traefik", SERVICE_RULES["traefik"])
+
+        assert counts == {"critical": 0, "error": 1, "warning": 0}
+
+
+class TestCheckServiceLogs:
+    def test_scans_running_containers(
+        self, cursors_path: Path, mock_stream: MagicMock
+    ) -> None:
+        mock_stream.side_effect = lambda *a, **kw: _stdout(
+            ["2026-10-19T10:00:00.000000000Z ERROR boom"]
+        )
+
+        with patch("nexus.operations.logs.run_command") as mock_run:
+            mock_run.return_value = MagicMock(stdout="traefik\njellyfin\nplex\n")
+            findings = check_service_logs()
+
+        assert set(findings) == {"traefik", "jellyfin", "plex"}
+        assert findings["plex"]["error"] == 1
+        # traefik only counts level=error, not the word itself
+        assert findings["traefik"]["error"] == 0
+        assert mock_stream.call_count == 3
+
+    def test_persists_and_reuses_cursors(
+        self, cursors_path: Path, mock_stream: MagicMock
+    ) -> None:
+        cursors_path.write_text(json.dumps({"plex": "2026-10-19T09Z"}))
+        mock_stream.return_value = _stdout(["2026-10-19T10:00:00.000000000Z hello"])
+
+        check_service_logs(["plex"])
+
+        cmd = mock_stream.call_args[0][0]
+        assert "2026-10-19T09Z" in cmd
+        saved = json.loads(cursors_path.read_text())
+        assert saved["plex"] == "2026-10-19T10:00:00.000000000Z"
+
+    def test_skips_unreadable_container(
+        self, cursors_path: Path, mock_stream: MagicMock
+    ) -> None:
+        mock_stream.side_effect = FileNotFoundError("docker")
+
+        findings = check_service_logs(["plex"])
+
+        assert findings == {}
+        assert json.loads(cursors_path.read_text()) == {}
+
+    def test_docker_unavailable(self, cursors_path: Path) -> None:
+        with patch(
+            "nexus.operations.logs.run_command", side_effect=FileNotFoundError()
+        ):
+            assert check_service_logs() == {}
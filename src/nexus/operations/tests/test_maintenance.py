@@ -4,11 +4,12 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from nexus.operations.cleanup import CleanupPlan, CleanupResult
+from nexus.operations.disk import DiskUsage
 from nexus.operations.maintenance import (
     _run_command,
     check_container_status,
     check_disk_space,
-    check_service_logs,
     cleanup_old_images,
     cleanup_old_volumes,
     daily_tasks,
@@ -16,6 +17,7 @@ from nexus.operations.maintenance import (
     verify_backups,
     weekly_tasks,
 )
+from nexus.restore.verify import SampleRestoreResult, SliceResult, VerifyReport
 
 
 @pytest.fixture
@@ -49,63 +51,114 @@ class TestCheckContainerStatus:
         assert result is False
 
 
+def _usage(label: str, used: int, available: int, **kwargs: float) -> DiskUsage:
+    return DiskUsage(
+        label=label,
+        path="/",
+        total=used + available,
+        used=used,
+        available=available,
+        inodes_total=1000,
+        inodes_free=kwargs.pop("inodes_free", 900),
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def mock_collect() -> Generator[MagicMock, None, None]:
+    with patch("nexus.operations.maintenance.collect_disk_usage") as mock:
+        yield mock
+
+
 class TestCheckDiskSpace:
-    def test_check_disk_space(self, mock_run_command: MagicMock) -> None:
-        mock_run_command.return_value = MagicMock(
-            stdout="Filesystem      Size  Used Avail Use% Mounted on\n"
-            "/dev/sda1       100G   50G   50G  50% /",
-            returncode=0,
-        )
+    def test_check_disk_space(self, mock_collect: MagicMock) -> None:
+        usage = _usage("data", 50, 50)
+        mock_collect.return_value = {"data": usage}
 
         result = check_disk_space()
 
-        assert result["total"] == "100G"
-        assert result["used"] == "50G"
-        assert result["available"] == "50G"
-        assert result["usage_percent"] == 50
+        assert result == {"data": usage}
+        assert result["data"].usage_percent == 50
 
-    def test_check_disk_space_high_usage(self, mock_run_command: MagicMock) -> None:
-        mock_run_command.return_value = MagicMock(
-            stdout="Filesystem      Size  Used Avail Use% Mounted on\n"
-            "/dev/sda1       100G   85G   15G  85% /",
-            returncode=0,
-        )
+    def test_check_disk_space_high_usage(
+        self, mock_collect: MagicMock, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        mock_collect.return_value = {"backups": _usage("backups", 85, 15)}
 
-        result = check_disk_space()
+        check_disk_space()
 
-        assert result["usage_percent"] == 85
+        assert "High disk usage on backups: 85%" in caplog.text
 
+    def test_check_disk_space_inodes(
+        self, mock_collect: MagicMock, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        mock_collect.return_value = {"config": _usage("config", 10, 90, inodes_free=50)}
 
-class TestVerifyBackups:
-    def test_verify_backups(self, mock_run_command: MagicMock) -> None:
-        mock_run_command.return_value = MagicMock(
-            stdout="snapshot abc123\nsnapshot def456\nsnapshot ghi789",
-            returncode=0,
+        check_disk_space()
+
+        assert "Critical inode usage on config: 95%" in caplog.text
+
+    def test_check_disk_space_time_to_full(
+        self, mock_collect: MagicMock, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        mock_collect.return_value = {
+            "data": _usage("data", 10, 90, growth_per_day=10.0, days_to_full=9.0)
+        }
+
+        check_disk_space()
+
+        assert "data is growing" in caplog.text
+        assert "full in 9.0 days" in caplog.text
+
+
+@pytest.fixture
+def mock_verification() -> Generator[MagicMock, None, None]:
+    with patch("nexus.operations.maintenance.run_verification") as mock:
+        mock.return_value = VerifyReport(
+            slices=[SliceResult("local", 3, 28, passed=True)]
         )
+        yield mock
+
+
+class TestVerifyBackups:
+    def test_verify_backups(
+        self, mock_verification: MagicMock, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        caplog.set_level("INFO")
 
         result = verify_backups()
 
         assert result is True
-        mock_run_command.assert_called_once()
+        mock_verification.assert_called_once_with()
+        assert "slice 3/28 verified" in caplog.text
 
-    def test_verify_backups_no_snapshots(self, mock_run_command: MagicMock) -> None:
-        mock_run_command.return_value = MagicMock(
-            stdout="",
-            returncode=0,
+    def test_verify_backups_failed_slice(self, mock_verification: MagicMock) -> None:
+        mock_verification.return_value = VerifyReport(
+            slices=[SliceResult("r2", 3, 28, error="hash mismatch")]
         )
 
         result = verify_backups()
 
         assert result is False
 
-    def test_verify_backups_command_failure(self, mock_run_command: MagicMock) -> None:
-        mock_run_command.side_effect = subprocess.CalledProcessError(
-            1, "cmd", stderr="error"
+    def test_verify_backups_failed_sample_restore(
+        self, mock_verification: MagicMock, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        mock_verification.return_value.sample_restore = SampleRestoreResult(
+            service="homepage", mismatched=["a.txt"]
         )
 
         result = verify_backups()
 
         assert result is False
+        assert "Sample restore of homepage failed" in caplog.text
+
+    def test_verify_backups_error(self, mock_verification: MagicMock) -> None:
+        mock_verification.side_effect = RuntimeError("Backrest not running")
+
+        result = verify_backups()
+
+        assert result is False
 
 
 class TestRunCommand:
@@ -125,91 +178,106 @@ class TestRunCommand:
                 _run_command(["false"], "Failing command")
 
 
-class TestCheckServiceLogs:
-    def test_check_service_logs(self) -> None:
-        with patch("subprocess.run") as mock_run:
-            mock_run.return_value = MagicMock(
-                stdout="info message\nERROR something", returncode=0
-            )
-            check_service_logs()
-            assert mock_run.call_count == 3
-
-    def test_check_service_logs_no_errors(self) -> None:
-        with patch("subprocess.run") as mock_run:
-            mock_run.return_value = MagicMock(
-                stdout="all good\nno issues", returncode=0
-            )
-            check_service_logs()
+@pytest.fixture
+def mock_cleanup() -> Generator[MagicMock, None, None]:
+    with patch("nexus.operations.maintenance.run_cleanup") as mock:
+        mock.return_value = CleanupResult(plan=CleanupPlan("/var/lib/docker", 85.0))
+        yield mock
 
 
 class TestCleanupOldImages:
-    def test_cleanup_old_images(self, mock_run_command: MagicMock) -> None:
-        mock_run_command.return_value = MagicMock(stdout="Total reclaimed space: 1GB")
+    def test_cleanup_old_images(self, mock_cleanup: MagicMock) -> None:
         cleanup_old_images()
-        mock_run_command.assert_called_once()
-        args = mock_run_command.call_args[0][0]
-        assert "docker" in args
-        assert "image" in args
-        assert "prune" in args
+        mock_cleanup.assert_called_once_with(kinds=frozenset({"image"}))
+
+    def test_cleanup_skipped_below_threshold(
+        self, mock_cleanup: MagicMock, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        caplog.set_level("INFO")
+        mock_cleanup.return_value.skipped = "/var/lib/docker is 40% full"
+        cleanup_old_images()
+        assert "Skipping cleanup" in caplog.text
 
 
 class TestCleanupOldVolumes:
-    def test_cleanup_old_volumes(self, mock_run_command: MagicMock) -> None:
-        mock_run_command.return_value = MagicMock(stdout="Total reclaimed space: 500MB")
+    def test_cleanup_old_volumes(self, mock_cleanup: MagicMock) -> None:
         cleanup_old_volumes()
-        mock_run_command.assert_called_once()
-        args = mock_run_command.call_args[0][0]
-        assert "docker" in args
-        assert "volume" in args
-        assert "prune" in args
+        mock_cleanup.assert_called_once_with(kinds=frozenset({"volume"}))
 
 
 class TestDailyTasks:
-    def test_daily_tasks(self, mock_run_command: MagicMock) -> None:
-        mock_run_command.return_value = MagicMock(
-            stdout="Filesystem      Size  Used Avail Use% Mounted on\n"
-            "/dev/sda1       100G   50G   50G  50% /",
-            returncode=0,
-        )
+    def test_daily_tasks(
+        self,
+        mock_run_command: MagicMock,
+        mock_collect: MagicMock,
+        mock_verification: MagicMock,
+    ) -> None:
+        mock_run_command.return_value = MagicMock(stdout="", returncode=0)
+        mock_collect.return_value = {}
 
-        with patch("subprocess.run") as mock_subprocess:
-            mock_subprocess.return_value = MagicMock(stdout="no errors")
-            daily_tasks()
+        with patch("nexus.operations.maintenance.check_service_logs") as mock_logs:
+            report = daily_tasks()
 
-        assert mock_run_command.call_count >= 2
+        mock_run_command.assert_called_once()
+        mock_collect.assert_called_once()
+        mock_logs.assert_called_once()
+        mock_verification.assert_called_once()
+        assert "verify_backups" in [t.name for t in report.tasks]
 
 
 class TestWeeklyTasks:
-    def test_weekly_tasks(self, mock_run_command: MagicMock) -> None:
-        mock_run_command.return_value = MagicMock(
-            stdout="snapshot abc123\nreclaimed space"
-        )
+    def test_weekly_tasks(
+        self, mock_run_command: MagicMock, mock_cleanup: MagicMock
+    ) -> None:
+        report = weekly_tasks()
+
+        mock_run_command.assert_not_called()
+        assert mock_cleanup.call_count == 2
+        assert [t.name for t in report.tasks] == [
+            "cleanup_old_images",
+            "cleanup_old_volumes",
+        ]
+
+    def test_weekly_tasks_continue_after_failure(
+        self, mock_run_command: MagicMock, mock_cleanup: MagicMock
+    ) -> None:
+        result = mock_cleanup.return_value
+
+        def fake_cleanup(kinds: frozenset[str]) -> CleanupResult:
+            if "image" in kinds:
+                raise subprocess.CalledProcessError(1, "docker", stderr="failed")
+            return result
+
+        mock_cleanup.side_effect = fake_cleanup
 
-        weekly_tasks()
+        report = weekly_tasks()
 
-        assert mock_run_command.call_count == 3
+        assert mock_cleanup.call_count == 2
+        assert report.succeeded is False
+        statuses = {t.name: t.status for t in report.tasks}
+        assert statuses["cleanup_old_images"] == "failed"
+        assert statuses["cleanup_old_volumes"] == "ok"
 
 
 class TestMonthlyTasks:
     def test_monthly_tasks(self) -> None:
-        monthly_tasks()
+        report = monthly_tasks()
 
+        assert report.group == "monthly"
+        assert report.succeeded is True
 
-class TestCheckDiskSpaceCritical:
-    def test_check_disk_space_critical(self, mock_run_command: MagicMock) -> None:
-        mock_run_command.return_value = MagicMock(
-            stdout="Filesystem      Size  Used Avail Use% Mounted on\n"
-            "/dev/sda1       100G   95G   5G  95% /",
-            returncode=0,
-        )
 
-        result = check_disk_space()
+class TestCheckDiskSpaceCritical:
+    def test_check_disk_space_critical(
+        self, mock_collect: MagicMock, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        mock_collect.return_value = {"root": _usage("root", 95, 5)}
 
-        assert result["usage_percent"] == 95
+        check_disk_space()
 
-    def test_check_disk_space_empty_output(self, mock_run_command: MagicMock) -> None:
-        mock_run_command.return_value = MagicMock(stdout="", returncode=0)
+        assert "Critical disk usage on root: 95%" in caplog.text
 
-        result = check_disk_space()
+    def test_check_disk_space_nothing_measured(self, mock_collect: MagicMock) -> None:
+        mock_collect.return_value = {}
 
-        assert result == {}
+        assert check_disk_space() == {}
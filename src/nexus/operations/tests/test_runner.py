@@ -0,0 +1,151 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from nexus.operations.runner import (
+    MaintenanceTask,
+    RunReport,
+    TaskResult,
+    run_tasks,
+    write_report,
+    write_textfile,
+)
+
+
+class TestRunTasks:
+    def test_records_results_in_declaration_order(self) -> None:
+        report = run_tasks(
+            "daily",
+            [
+                MaintenanceTask("slow", lambda: time.sleep(0.05)),
+                MaintenanceTask("fast", lambda: None),
+            ],
+        )
+
+        assert [t.name for t in report.tasks] == ["slow", "fast"]
+        assert all(t.status == "ok" for t in report.tasks)
+        assert report.succeeded is True
+        assert report.tasks[0].duration >= 0.05
+
+    def test_failure_does_not_abort_group(self) -> None:
+        ran = []
+
+        def boom() -> None:
+            raise RuntimeError("boom")
+
+        report = run_tasks(
+            "weekly",
+            [
+                MaintenanceTask("boom", boom),
+                MaintenanceTask("after", lambda: ran.append("after")),
+            ],
+        )
+
+        assert ran == ["after"]
+        assert report.tasks[0].status == "failed"
+        assert report.tasks[0].error == "boom"
+        assert report.succeeded is False
+
+    def test_false_return_marks_failed(self) -> None:
+        report = run_tasks("daily", [MaintenanceTask("check", lambda: False)])
+
+        assert report.tasks[0].status == "failed"
+
+    def test_rejects_duplicate_names(self) -> None:
+        ran = []
+
+        with pytest.raises(ValueError, match="Duplicate task names: prune"):
+            run_tasks(
+                "daily",
+                [
+                    MaintenanceTask("prune", lambda: ran.append(1)),
+                    MaintenanceTask("prune", lambda: ran.append(2)),
+                ],
+            )
+        assert ran == []
+
+    def test_independent_tasks_run_concurrently(self) -> None:
+        barrier = threading.Barrier(2, timeout=5)
+
+        report = run_tasks(
+            "daily",
+            [
+                MaintenanceTask("a", barrier.wait),
+                MaintenanceTask("b", barrier.wait),
+            ],
+        )
+
+        assert report.succeeded is True
+
+    def test_shared_resource_serializes_in_order(self) -> None:
+        active = []
+        order = []
+        lock = threading.Lock()
+
+        def make(name: str):
+            def task() -> None:
+                with lock:
+                    active.append(name)
+                    assert len(active) == 1
+                order.append(name)
+                time.sleep(0.01)
+                with lock:
+                    active.remove(name)
+
+            return task
+
+        prune = frozenset({"docker-prune"})
+        report = run_tasks(
+            "weekly",
+            [
+                MaintenanceTask("images", make("images"), prune),
+                MaintenanceTask("volumes", make("volumes"), prune),
+            ],
+        )
+
+        assert report.succeeded is True
+        assert order == ["images", "volumes"]
+
+
+def _sample_report() -> RunReport:
+    return RunReport(
+        group="daily",
+        started_at=1_700_000_000.0,
+        duration=1.5,
+        tasks=[
+            TaskResult("check_disk_space", "ok", 1_700_000_000.0, 0.5),
+            TaskResult("check_logs", "failed", 1_700_000_000.0, 1.0, "boom"),
+        ],
+    )
+
+
+class TestWriteReport:
+    def test_write_report(self, tmp_path: Path) -> None:
+        path = write_report(_sample_report(), tmp_path / "reports")
+
+        data = json.loads(path.read_text())
+        assert path.name.startswith("daily-")
+        assert data["group"] == "daily"
+        assert data["succeeded"] is False
+        assert data["tasks"][1]["error"] == "boom"
+
+
+class TestWriteTextfile:
+    def test_write_textfile(self, tmp_path: Path) -> None:
+        path = write_textfile(_sample_report(), tmp_path)
+
+        content = path.read_text()
+        assert path.name == "nexus_maintenance_daily.prom"
+        assert "# TYPE nexus_maintenance_task_success gauge" in content
+        assert (
+            'nexus_maintenance_task_success{group="daily",task="check_logs"} 0'
+            in content
+        )
+        assert (
+            'nexus_maintenance_task_success{group="daily",task="check_disk_space"} 1'
+            in content
+        )
+        assert 'nexus_maintenance_run_duration_seconds{group="daily"} 1.5' in content
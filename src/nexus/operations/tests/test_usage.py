@@ -0,0 +1,102 @@
+import json
+import os
+from collections.abc import Generator
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from nexus.operations.usage import scan_service_usage
+
+
+@pytest.fixture
+def cache_path(tmp_path: Path) -> Generator[Path, None, None]:
+    path = tmp_path / "usage-cache.json"
+    with patch("nexus.operations.usage.USAGE_CACHE_PATH", path):
+        yield path
+
+
+@pytest.fixture
+def config_dir(tmp_path: Path) -> Generator[Path, None, None]:
+    config = tmp_path / "data" / "Config"
+    (config / "plex" / "Library").mkdir(parents=True)
+    (config / "plex" / "Library" / "db").write_bytes(b"x" * 8192)
+    (config / "backrest").mkdir()
+    (config / "backrest" / "config.json").write_bytes(b"{}")
+
+    with patch(
+        "nexus.operations.usage.get_data_paths", return_value={"config": config}
+    ):
+        yield config
+
+
+class TestScanServiceUsage:
+    def test_ranks_by_size(self, cache_path: Path, config_dir: Path) -> None:
+        usages = scan_service_usage(["backups", "plex", "jellyfin"])
+
+        # jellyfin has no directory; backups maps to backrest
+        assert [u.service for u in usages] == ["plex", "backups"]
+        assert usages[0].size >= 8192
+        assert usages[1].path == str(config_dir / "backrest")
+        assert all(u.growth is None for u in usages)
+
+    def test_reports_growth(self, cache_path: Path, config_dir: Path) -> None:
+        first = scan_service_usage(["plex"])[0]
+        (config_dir / "plex" / "Library" / "new").write_bytes(b"x" * 8192)
+
+        second = scan_service_usage(["plex"])[0]
+
+        assert second.previous_size == first.size
+        assert second.growth is not None
+        assert second.growth >= 8192
+
+    def test_reports_files_growing_in_place(
+        self, cache_path: Path, config_dir: Path
+    ) -> None:
+        db = config_dir / "plex" / "Library" / "db"
+        first = scan_service_usage(["plex"])[0]
+        mtime_ns = db.parent.stat().st_mtime_ns
+        with open(db, "ab") as f:
+            f.write(b"x" * 65536)
+        os.utime(db.parent, ns=(mtime_ns, mtime_ns))
+
+        second = scan_service_usage(["plex"])[0]
+
+        assert second.size > first.size
+
+    def test_cached_reuses_unchanged_directories(
+        self, cache_path: Path, config_dir: Path
+    ) -> None:
+        scan_service_usage(["plex"])
+
+        with patch("nexus.operations.usage.os.scandir") as mock_scandir:
+            scan_service_usage(["plex"], cached=True)
+
+        mock_scandir.assert_not_called()
+
+    def test_rescans_by_default(self, cache_path: Path, config_dir: Path) -> None:
+        scan_service_usage(["plex"])
+
+        with patch(
+            "nexus.operations.usage.os.scandir", wraps=os.scandir
+        ) as mock_scandir:
+            scan_service_usage(["plex"])
+
+        assert mock_scandir.call_count == 2
+
+    def test_keeps_cache_for_other_services(
+        self, cache_path: Path, config_dir: Path
+    ) -> None:
+        scan_service_usage(["plex", "backups"])
+        scan_service_usage(["plex"])
+
+        state = json.loads(cache_path.read_text())
+        assert str(config_dir / "backrest") in state["dirs"]
+        assert set(state["totals"]) == {"plex", "backups"}
+
+    def test_missing_data_directory(self, cache_path: Path) -> None:
+        with patch(
+            "nexus.operations.usage.get_data_paths", return_value={"root": Path("/")}
+        ):
+            with pytest.raises(ValueError, match="nexus_data_directory"):
+                scan_service_usage()
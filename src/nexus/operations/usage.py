@@ -0,0 +1,170 @@
+import logging
+import os
+import stat
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from nexus.config import STATE_PATH
+from nexus.operations.disk import get_data_paths
+from nexus.restore.backup import get_all_backup_services, get_config_dir_name
+from nexus.utils import load_state, save_state
+
+logger = logging.getLogger(__name__)
+
+USAGE_CACHE_PATH = STATE_PATH / "usage-cache.json"
+
+DEFAULT_MAX_WORKERS = 8
+
+
+@dataclass
+class ServiceUsage:
+    """Disk footprint of one service's Config directory.
+
+    Attributes:
+        service: Name of the service.
+        path: The directory that was scanned.
+        size: Bytes allocated on disk by everything under the directory.
+        previous_size: Size recorded by the previous scan, or None if the
+            service has not been scanned before.
+    """
+
+    service: str
+    path: str
+    size: int
+    previous_size: Optional[int] = None
+
+    @property
+    def growth(self) -> Optional[int]:
+        if self.previous_size is None:
+            return None
+        return self.size - self.previous_size
+
+
+def _scan_dir(
+    path: str,
+    cache: dict[str, Any],
+    new_cache: dict[str, Any],
+    cached: bool,
+) -> int:
+    """Return the allocated size of a directory tree.
+
+    Every directory is listed and every file stat'ed, and the listing is
+    recorded in new_cache. With cached, a directory whose mtime is unchanged
+    reuses its recorded listing instead. That skips the per-file stats but
+    misses files that grew in place, since writing to a file doesn't touch
+    its directory's mtime. Subdirectories are visited either way.
+    """
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError as e:
+        logger.debug(f"Skipping {path}: {e}")
+        return 0
+
+    entry = cache.get(path)
+    if not cached or not entry or entry["mtime_ns"] != mtime_ns:
+        files, subdirs = 0, []
+        try:
+            with os.scandir(path) as it:
+                for item in it:
+                    try:
+                        st = item.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if stat.S_ISDIR(st.st_mode):
+                        subdirs.append(item.name)
+                    else:
+                        files += st.st_blocks * 512
+        except OSError as e:
+            logger.debug(f"Cannot list {path}: {e}")
+        entry = {"mtime_ns": mtime_ns, "files": files, "subdirs": subdirs}
+
+    new_cache[path] = entry
+    files_size: int = entry["files"]
+    return files_size + sum(
+        _scan_dir(os.path.join(path, name), cache, new_cache, cached)
+        for name in entry["subdirs"]
+    )
+
+
+def _scan_service(
+    service: str, root: Path, cache: dict[str, Any], cached: bool
+) -> tuple[int, dict[str, Any]]:
+    new_cache: dict[str, Any] = {}
+    size = _scan_dir(str(root / get_config_dir_name(service)), cache, new_cache, cached)
+    return size, new_cache
+
+
+def scan_service_usage(
+    services: Optional[list[str]] = None,
+    cached: bool = False,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> list[ServiceUsage]:
+    """Measure how much disk each service's Config directory uses.
+
+    Services are scanned concurrently, and every file is stat'ed so files
+    that grow in place (e.g., a database) are counted. Directory listings
+    are recorded in USAGE_CACHE_PATH keyed by path and mtime; pass
+    cached=True to reuse them for a quicker, possibly stale, scan.
+
+    Args:
+        services: Services to scan. Defaults to every service with a
+            docker-compose.yml.
+        cached: Reuse the recorded listing of directories whose mtime is
+            unchanged. Misses files that grew in place.
+        max_workers: Maximum number of services scanned at once.
+
+    Returns:
+        Usage per service whose directory exists, largest first.
+
+    Raises:
+        ValueError: If the data directory is not configured.
+    """
+    paths = get_data_paths()
+    if "config" not in paths:
+        raise ValueError(
+            "nexus_data_directory is not configured (set NEXUS_DATA_DIRECTORY)"
+        )
+    root = paths["config"]
+
+    if services is None:
+        services = get_all_backup_services()
+    services = [s for s in services if (root / get_config_dir_name(s)).is_dir()]
+
+    state = load_state(USAGE_CACHE_PATH)
+    cache = state.get("dirs", {})
+    previous = state.get("totals", {})
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(
+            pool.map(lambda s: _scan_service(s, root, cache, cached), services)
+        )
+
+    # Keep entries for services that weren't part of this scan
+    scanned_roots = tuple(str(root / get_config_dir_name(s)) for s in services)
+    dirs = {
+        path: entry
+        for path, entry in cache.items()
+        if not any(path == r or path.startswith(r + os.sep) for r in scanned_roots)
+    }
+    totals = dict(previous)
+    usages = []
+    for service, (size, new_cache) in zip(services, results, strict=True):
+        dirs.update(new_cache)
+        totals[service] = size
+        usages.append(
+            ServiceUsage(
+                service=service,
+                path=str(root / get_config_dir_name(service)),
+                size=size,
+                previous_size=previous.get(service),
+            )
+        )
+
+    save_state(
+        USAGE_CACHE_PATH, {"scanned_at": time.time(), "dirs": dirs, "totals": totals}
+    )
+
+    return sorted(usages, key=lambda u: u.size, reverse=True)
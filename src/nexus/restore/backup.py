@@ -1,21 +1,76 @@
 import json
 import logging
 import os
+import subprocess
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
 from typing import Any, Optional
 
-import yaml
-
-from nexus.config import SERVICES_PATH
-from nexus.utils import read_vault, run_command
+from nexus.config import SERVICES_PATH, TEXTFILE_PATH
+from nexus.graph import get_service_graph
+from nexus.loader import load_yaml_file
+from nexus.restore.catalog import (
+    Snapshot,
+    catalog_path,
+    find_snapshot,
+    get_snapshots,
+    iter_snapshot_nodes,
+    snapshot_contains,
+)
+from nexus.restore.incremental import (
+    STAGING_MOUNT,
+    SwapError,
+    catch_up,
+    diff_service,
+    discard,
+    stage,
+    staging_root,
+    swap,
+    swapped_out,
+)
+from nexus.restore.metrics import (
+    BACKUP_METRICS_STATE_PATH,
+    PlanRun,
+    RepoStats,
+    known_repo_stats,
+    record_backup_metrics,
+)
+from nexus.restore.progress import ResticProgress, run_restic_json
+from nexus.restore.runner import ResticRunner
+from nexus.services import discover_services
+from nexus.utils import format_size, read_vault, run_command
 
 logger = logging.getLogger(__name__)
 
 CONFIG_DIR_OVERRIDES = {"backups": "backrest"}
 
-BACKREST_IMAGE = "ghcr.io/garethgeorge/backrest:latest"
+# Local and R2 plans are independent, so by default both run at once
+DEFAULT_BACKUP_PARALLELISM = 2
+
+BACKUP_MODES = ("direct", "copy")
+# In copy mode, this repo is backed up and every other repo is copied from it
+COPY_SOURCE_REPO = "local"
+
+ProgressCallback = Callable[[ResticProgress], None]
+
+# Services restored at once; each restic restore is multi-threaded already
+DEFAULT_RESTORE_PARALLELISM = 2
+
 
+def get_config_dir_name(service_name: str) -> str:
+    """Return the name of a service's directory under Config and the backups.
 
-def _get_config_dir_name(service_name: str) -> str:
+    Args:
+        service_name: Name of the service directory under services/.
+
+    Returns:
+        The directory name, which differs from the service name for a few
+        services (see CONFIG_DIR_OVERRIDES).
+    """
     return CONFIG_DIR_OVERRIDES.get(service_name, service_name)
 
 
@@ -32,8 +87,7 @@ def _get_container_names(service_name: str) -> list[str]:
     compose_path = SERVICES_PATH / service_name / "docker-compose.yml"
     if not compose_path.exists():
         return []
-    with open(compose_path) as f:
-        compose = yaml.safe_load(f)
+    compose = load_yaml_file(compose_path)
     services = compose.get("services", {})
     return [
         svc_config.get("container_name", name) for name, svc_config in services.items()
@@ -65,7 +119,7 @@ def _get_restore_config() -> tuple[str, str]:
     return (data_dir, password)
 
 
-def _get_all_backup_services() -> list[str]:
+def get_all_backup_services() -> list[str]:
     """Discover all services that have a docker-compose.yml.
 
     Returns:
@@ -78,39 +132,6 @@ def _get_all_backup_services() -> list[str]:
     )
 
 
-def _build_ephemeral_cmd(
-    data_dir: str,
-    password: str,
-    uri: str,
-    target: str,
-    extra_mounts: Optional[list[str]] = None,
-) -> list[str]:
-    cmd = [
-        "docker",
-        "run",
-        "--rm",
-        "--entrypoint",
-        "restic",
-        "-v",
-        f"{data_dir}/Backups:/repos:ro",
-        "-e",
-        f"RESTIC_PASSWORD={password}",
-    ]
-    if target == "r2":
-        cmd.extend(
-            [
-                "-v",
-                f"{data_dir}/Config/backrest/rclone:/root/.config/rclone:ro",
-            ]
-        )
-    if extra_mounts:
-        for mount in extra_mounts:
-            cmd.extend(["-v", mount])
-    # --no-lock: repos mount is :ro so restic cannot write a lock file
-    cmd.extend([BACKREST_IMAGE, "--no-lock", "-r", uri])
-    return cmd
-
-
 def get_backrest_config() -> dict[str, Any]:
     """Retrieve and parse the Backrest configuration from the running container.
 
@@ -138,31 +159,51 @@ def get_backrest_config() -> dict[str, Any]:
         raise RuntimeError(f"Failed to read Backrest config: {e}") from e
 
 
-def push_backup(target: str = "all", dry_run: bool = False) -> None:
-    """Trigger a restic backup and prune for the specified target repositories.
+@dataclass
+class BackupResult:
+    """Outcome of backing up one Backrest plan.
+
+    Attributes:
+        plan_id: ID of the Backrest plan.
+        repo_id: ID of the repo the plan backs up to.
+        duration: Wall-clock duration of `restic backup` in seconds.
+        snapshot_id: ID of the snapshot created, if the backup succeeded.
+        files_new: Files added since the parent snapshot.
+        files_changed: Files modified since the parent snapshot.
+        data_added: Bytes added to the repository after deduplication.
+        error: Error message if the backup failed.
+        copied_from: Repo ID the snapshot was replicated from with
+            `restic copy`, or None if it was backed up directly.
+    """
 
-    Reads repo URIs and retention policies from the Backrest config, then runs
-    `restic backup /userdata` followed by `restic forget --keep-last N --prune`
-    for each targeted plan. Keeps manual and scheduled backups consistent.
+    plan_id: str
+    repo_id: str
+    duration: float = 0.0
+    snapshot_id: Optional[str] = None
+    files_new: int = 0
+    files_changed: int = 0
+    data_added: int = 0
+    error: Optional[str] = None
+    copied_from: Optional[str] = None
 
-    Args:
-        target: Which repositories to back up. One of "local", "r2", or "all".
-            Defaults to "all".
-        dry_run: If True, log the commands without executing them.
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
 
-    Raises:
-        ValueError: If target is not one of "local", "r2", or "all".
-        RuntimeError: If the Backrest config cannot be read.
-    """
-    if target not in ("local", "r2", "all"):
-        raise ValueError(f"Invalid target '{target}'. Must be 'local', 'r2', or 'all'.")
 
-    config = get_backrest_config()
+@dataclass
+class _PlanTarget:
+    plan_id: str
+    repo_id: str
+    uri: str
+    keep_last: int
 
+
+def _resolve_plans(config: dict[str, Any], target: str) -> list[_PlanTarget]:
     repos_by_id = {repo["id"]: repo for repo in config.get("repos", [])}
-    plans = config.get("plans", [])
+    targets = []
 
-    for plan in plans:
+    for plan in config.get("plans", []):
         repo_id = plan.get("repo", "")
 
         if target != "all" and repo_id != target:
@@ -176,60 +217,352 @@ def push_backup(target: str = "all", dry_run: bool = False) -> None:
             )
             continue
 
-        uri = repo["uri"]
-        keep_last = plan.get("retention", {}).get("policyKeepLastN", 1)
-        plan_id = plan.get("id", repo_id)
-
-        backup_cmd = [
-            "docker",
-            "exec",
-            "backrest",
-            "restic",
-            "-r",
-            uri,
-            "backup",
-            "/userdata",
-        ]
-        forget_cmd = [
-            "docker",
-            "exec",
-            "backrest",
-            "restic",
-            "-r",
-            uri,
-            "forget",
-            "--keep-last",
-            str(keep_last),
-            "--prune",
-        ]
+        targets.append(
+            _PlanTarget(
+                plan_id=plan.get("id", repo_id),
+                repo_id=repo_id,
+                uri=repo["uri"],
+                keep_last=plan.get("retention", {}).get("policyKeepLastN", 1),
+            )
+        )
+
+    return targets
+
+
+def _backup_cmd(plan: _PlanTarget) -> list[str]:
+    return [
+        "docker",
+        "exec",
+        "backrest",
+        "restic",
+        "-r",
+        plan.uri,
+        "backup",
+        "/userdata",
+        "--json",
+    ]
+
+
+def _forget_cmd(plan: _PlanTarget) -> list[str]:
+    return [
+        "docker",
+        "exec",
+        "backrest",
+        "restic",
+        "-r",
+        plan.uri,
+        "forget",
+        "--keep-last",
+        str(plan.keep_last),
+        "--prune",
+    ]
+
+
+def _copy_cmd(source: _PlanTarget, dest: _PlanTarget, snapshot_id: str) -> list[str]:
+    # Both repos share the container's RESTIC_PASSWORD; restic reads the
+    # source repo's password from RESTIC_FROM_PASSWORD.
+    script = (
+        'RESTIC_FROM_PASSWORD="$RESTIC_PASSWORD" '
+        'exec restic -r "$1" copy --from-repo "$2" "$3"'
+    )
+    return [
+        "docker",
+        "exec",
+        "backrest",
+        "sh",
+        "-c",
+        script,
+        "sh",
+        dest.uri,
+        source.uri,
+        snapshot_id,
+    ]
+
+
+def _unlock_cmd(plan: _PlanTarget) -> list[str]:
+    # Only removes stale locks left by interrupted runs, never live ones
+    return ["docker", "exec", "backrest", "restic", "-r", plan.uri, "unlock"]
+
+
+def _backup_plan(
+    plan: _PlanTarget, progress: Optional[ProgressCallback]
+) -> BackupResult:
+    result = BackupResult(plan_id=plan.plan_id, repo_id=plan.repo_id)
+
+    logger.info(f"Backing up plan '{plan.plan_id}' to repo '{plan.repo_id}'")
+    start = time.perf_counter()
+    try:
+        summary = run_restic_json(_backup_cmd(plan), progress, label=plan.plan_id)
+    except subprocess.CalledProcessError as e:
+        result.error = (e.stderr or str(e)).strip()
+        logger.error(f"Plan '{plan.plan_id}' backup failed: {result.error}")
+        return result
+    finally:
+        result.duration = time.perf_counter() - start
+
+    result.snapshot_id = summary.get("snapshot_id")
+    result.files_new = summary.get("files_new", 0)
+    result.files_changed = summary.get("files_changed", 0)
+    result.data_added = summary.get("data_added", 0)
+
+    logger.info(
+        f"Plan '{plan.plan_id}' backed up in {result.duration:.1f}s: "
+        f"{result.files_new} new, {result.files_changed} changed, "
+        f"{format_size(result.data_added)} added"
+    )
+    return result
+
+
+def _copy_plan(
+    source: _PlanTarget, dest: _PlanTarget, snapshot_id: str
+) -> BackupResult:
+    result = BackupResult(
+        plan_id=dest.plan_id,
+        repo_id=dest.repo_id,
+        snapshot_id=snapshot_id,
+        copied_from=source.repo_id,
+    )
+
+    logger.info(
+        f"Copying snapshot {snapshot_id} from '{source.repo_id}' to '{dest.repo_id}'"
+    )
+    start = time.perf_counter()
+    try:
+        run_command(_unlock_cmd(dest), capture=True)
+        run_command(_copy_cmd(source, dest, snapshot_id), capture=True)
+    except subprocess.CalledProcessError as e:
+        result.error = (e.stderr or str(e)).strip()
+        logger.error(f"Plan '{dest.plan_id}' copy failed: {result.error}")
+        return result
+    finally:
+        result.duration = time.perf_counter() - start
+
+    logger.info(f"Plan '{dest.plan_id}' copied in {result.duration:.1f}s")
+    return result
+
+
+def _backup_then_copy(
+    plans: list[_PlanTarget],
+    target: str,
+    parallelism: int,
+    progress: Optional[ProgressCallback],
+) -> tuple[list[_PlanTarget], list[BackupResult]]:
+    """Back up the local plans once, then replicate to the other repos.
+
+    Returns the plans that ran and their results, in config order.
+    """
+    sources = [p for p in plans if p.repo_id == COPY_SOURCE_REPO]
+    if not sources:
+        raise ValueError(
+            f"Copy mode needs a plan for the '{COPY_SOURCE_REPO}' repo to copy from"
+        )
+    source = sources[0]
+    replicas = [
+        p
+        for p in plans
+        if p.repo_id != COPY_SOURCE_REPO and target in ("all", p.repo_id)
+    ]
+
+    # target="r2" replicates the newest local snapshot without a new backup
+    source_result: Optional[BackupResult] = None
+    if target != "r2":
+        source_result = _backup_plan(source, progress)
+
+    snapshot_id = source_result.snapshot_id if source_result else "latest"
+
+    def replicate(dest: _PlanTarget) -> BackupResult:
+        if source_result and not source_result.succeeded:
+            return BackupResult(
+                plan_id=dest.plan_id,
+                repo_id=dest.repo_id,
+                error=f"source plan '{source.plan_id}' failed",
+                copied_from=source.repo_id,
+            )
+        return _copy_plan(source, dest, snapshot_id or "latest")
+
+    with ThreadPoolExecutor(max_workers=max(1, parallelism)) as pool:
+        replica_results = list(pool.map(replicate, replicas))
+
+    ran = ([source] if source_result else []) + replicas
+    results = ([source_result] if source_result else []) + replica_results
+    return ran, results
+
+
+def _validate_target(target: str) -> None:
+    if target not in ("local", "r2", "all"):
+        raise ValueError(f"Invalid target '{target}'. Must be 'local', 'r2', or 'all'.")
+
+
+def push_backup(
+    target: str = "all",
+    dry_run: bool = False,
+    parallelism: int = DEFAULT_BACKUP_PARALLELISM,
+    prune: bool = True,
+    mode: str = "direct",
+    progress: Optional[ProgressCallback] = None,
+    textfile_dir: Optional[Path] = None,
+) -> list[BackupResult]:
+    """Trigger restic backups, then optionally prune, for the target repositories.
+
+    Reads repo URIs and retention policies from the Backrest config. In
+    "direct" mode, runs `restic backup /userdata` for each targeted plan,
+    several plans at once, so the R2 upload doesn't wait for the local
+    backup. In "copy" mode, backs up to the local repo once and replicates
+    the new snapshot to the other repos with `restic copy`, so the source
+    data is read and hashed only once and only blobs the remote lacks are
+    uploaded. A stale lock from an interrupted copy is cleared first, and
+    since copy skips snapshots and blobs already present, rerunning picks
+    up where the last run stopped.
+
+    Pruning is I/O-heavy and runs only after every backup finished, for the
+    plans that succeeded, with each repo's own retention; pass prune=False
+    to leave it to a later prune_backups() call.
+
+    Args:
+        target: Which repositories to back up. One of "local", "r2", or "all".
+            Defaults to "all". In copy mode, "r2" replicates the newest
+            local snapshot without taking a new backup.
+        dry_run: If True, log the commands without executing them.
+        parallelism: Maximum number of plans backed up at once.
+        prune: If True, run `restic forget --prune` after backing up.
+        mode: "direct" to back up each repo from source, or "copy" to back
+            up locally and replicate.
+        progress: Called with restic's progress while backing up, from the
+            thread running each plan.
+        textfile_dir: If given, export each plan's outcome, duration and
+            added bytes there for node-exporter, failures included.
+
+    Returns:
+        One BackupResult per plan, in config order, with timing and restic's
+        summary statistics. Empty on dry runs.
+
+    Raises:
+        ValueError: If target or mode is invalid, or copy mode has no local
+            plan to copy from.
+        RuntimeError: If the Backrest config cannot be read or any plan's
+            backup fails.
+    """
+    _validate_target(target)
+    if mode not in BACKUP_MODES:
+        raise ValueError(f"Invalid mode '{mode}'. Must be one of {BACKUP_MODES}.")
+
+    config = get_backrest_config()
+
+    if dry_run:
+        _log_dry_run(config, target, prune, mode)
+        return []
 
-        if dry_run:
+    if mode == "copy":
+        plans, results = _backup_then_copy(
+            _resolve_plans(config, "all"), target, parallelism, progress
+        )
+    else:
+        plans = _resolve_plans(config, target)
+        with ThreadPoolExecutor(max_workers=max(1, parallelism)) as pool:
+            results = list(pool.map(lambda p: _backup_plan(p, progress), plans))
+
+    if textfile_dir:
+        _export_results(results, textfile_dir)
+
+    if prune:
+        succeeded = {r.plan_id for r in results if r.succeeded}
+        _prune_plans([p for p in plans if p.plan_id in succeeded])
+
+    failed = [r.plan_id for r in results if not r.succeeded]
+    if failed:
+        raise RuntimeError(f"Backup failed for plans: {', '.join(failed)}")
+
+    return results
+
+
+def _export_results(results: list[BackupResult], textfile_dir: Path) -> None:
+    finished_at = time.time()
+    runs = [
+        PlanRun(
+            plan_id=r.plan_id,
+            repo_id=r.repo_id,
+            finished_at=finished_at,
+            duration=r.duration,
+            succeeded=r.succeeded,
+            data_added=r.data_added,
+        )
+        for r in results
+    ]
+    try:
+        record_backup_metrics(textfile_dir, runs=runs)
+    except OSError as e:
+        logger.warning(f"Could not export backup metrics: {e}")
+
+
+def _log_dry_run(config: dict[str, Any], target: str, prune: bool, mode: str) -> None:
+    plans = _resolve_plans(config, target)
+    for plan in plans:
+        if mode == "copy" and plan.repo_id != COPY_SOURCE_REPO:
+            source = _resolve_plans(config, COPY_SOURCE_REPO)
+            cmd = _copy_cmd(source[0], plan, "<new snapshot>") if source else []
+        else:
+            cmd = _backup_cmd(plan)
+        logger.info(f"[DRY RUN] Plan '{plan.plan_id}': would run: {' '.join(cmd)}")
+        if prune:
             logger.info(
-                f"[DRY RUN] Plan '{plan_id}': would run: {' '.join(backup_cmd)}"
+                f"[DRY RUN] Plan '{plan.plan_id}': would run: "
+                f"{' '.join(_forget_cmd(plan))}"
             )
+
+
+def _prune_plans(plans: list[_PlanTarget]) -> None:
+    # Sequential: prune is I/O-bound on the same disks, and running two at
+    # once only makes both slower.
+    for plan in plans:
+        logger.info(f"Pruning plan '{plan.plan_id}' (keep-last={plan.keep_last})")
+        run_command(_forget_cmd(plan))
+        logger.info(f"Plan '{plan.plan_id}' prune complete")
+
+
+def prune_backups(target: str = "all", dry_run: bool = False) -> None:
+    """Apply retention policies to the target repositories.
+
+    Runs `restic forget --keep-last N --prune` for each targeted plan, one
+    plan at a time. Meant for a separate, off-peak run after
+    push_backup(prune=False).
+
+    Args:
+        target: Which repositories to prune. One of "local", "r2", or "all".
+        dry_run: If True, log the commands without executing them.
+
+    Raises:
+        ValueError: If target is not one of "local", "r2", or "all".
+        RuntimeError: If the Backrest config cannot be read.
+    """
+    _validate_target(target)
+
+    plans = _resolve_plans(get_backrest_config(), target)
+
+    if dry_run:
+        for plan in plans:
             logger.info(
-                f"[DRY RUN] Plan '{plan_id}': would run: {' '.join(forget_cmd)}"
+                f"[DRY RUN] Plan '{plan.plan_id}': would run: "
+                f"{' '.join(_forget_cmd(plan))}"
             )
-            continue
+        return
 
-        logger.info(f"Backing up plan '{plan_id}' to repo '{repo_id}' ({uri})")
-        run_command(backup_cmd)
-        logger.info(f"Pruning plan '{plan_id}' (keep-last={keep_last})")
-        run_command(forget_cmd)
-        logger.info(f"Plan '{plan_id}' backup complete")
+    _prune_plans(plans)
 
 
-def list_backups(target: str = "local") -> list[dict[str, str]]:
+def list_backups(target: str = "local", refresh: bool = False) -> list[dict[str, str]]:
     """List snapshots from a restic repository.
 
-    Uses an ephemeral docker container instead of docker exec into the running
-    backrest container, so vault secrets are used directly.
+    Served from the local snapshot catalog, which is refreshed incrementally
+    when older than CATALOG_MAX_AGE. Refreshing uses an ephemeral docker
+    container instead of docker exec into the running backrest container,
+    so vault secrets are used directly.
 
     Args:
         target: Which repository to list snapshots from. One of "local" or "r2".
+        refresh: Refresh the catalog from the repository regardless of age.
 
     Returns:
-        List of dicts with 'id', 'short_id', 'time' keys.
+        List of dicts with 'id', 'short_id', 'time' keys, oldest first.
         Returns empty list on error.
     """
     try:
@@ -242,119 +575,543 @@ def list_backups(target: str = "local") -> list[dict[str, str]]:
             return []
 
         uri = repo["uri"]
-        cmd = _build_ephemeral_cmd(data_dir, password, uri, target)
-        cmd.extend(["snapshots", "--json"])
-
-        result = run_command(cmd, capture=True)
-        snapshots_data = json.loads(result.stdout)
-        return [
-            {"id": s["id"], "short_id": s["short_id"], "time": s["time"]}
-            for s in snapshots_data
-        ]
+        snapshots = get_snapshots(
+            catalog_path(data_dir, target),
+            ResticRunner(data_dir, password, uri, target).command(),
+            refresh=refresh,
+        )
+        return [{"id": s.id, "short_id": s.short_id, "time": s.time} for s in snapshots]
     except Exception as e:
         logger.error(f"Failed to list backups: {e}")
         return []
 
 
+def _repo_stats(
+    runner: ResticRunner, state_path: Path = BACKUP_METRICS_STATE_PATH
+) -> RepoStats:
+    snapshots = get_snapshots(
+        catalog_path(runner.data_dir, runner.target), runner.command()
+    )
+    latest = snapshots[-1] if snapshots else None
+    stats = RepoStats(
+        repo_id=runner.target,
+        refreshed_at=time.time(),
+        snapshots=len(snapshots),
+        latest_snapshot_id=latest.id if latest else None,
+        latest_snapshot_at=latest.timestamp.timestamp() if latest else None,
+    )
+
+    # Size only changes with the snapshot set, and reading it walks the index
+    known = known_repo_stats(runner.target, state_path)
+    if (
+        known
+        and known.size_bytes is not None
+        and (known.snapshots, known.latest_snapshot_id)
+        == (stats.snapshots, stats.latest_snapshot_id)
+    ):
+        stats.size_bytes = known.size_bytes
+    else:
+        result = run_command(
+            [*runner.command(), "stats", "--mode", "raw-data", "--json"],
+            capture=True,
+        )
+        stats.size_bytes = json.loads(result.stdout).get("total_size")
+    return stats
+
+
+def export_backup_metrics(
+    target: str = "all",
+    textfile_dir: Path = TEXTFILE_PATH,
+    state_path: Path = BACKUP_METRICS_STATE_PATH,
+) -> list[RepoStats]:
+    """Refresh the snapshot catalogs and export repository freshness and size.
+
+    Meant to run every hour or so. Catalog refreshes are incremental, and a
+    repository's size is only read again when its snapshots changed, so a
+    refresh with nothing new costs one `restic list snapshots` per repo.
+    Snapshots taken by Backrest's own schedule are covered as well as those
+    taken by push_backup().
+
+    Args:
+        target: Which repositories to refresh: "local", "r2", or "all".
+        textfile_dir: node-exporter's textfile collector directory.
+        state_path: Where backup metrics are kept between runs.
+
+    Returns:
+        Stats of each repository that could be read. Repositories that fail
+        keep their last exported values, which then age into alerts.
+
+    Raises:
+        ValueError: If target is invalid.
+        RuntimeError: If the Backrest config cannot be read.
+    """
+    _validate_target(target)
+    data_dir, password = _get_restore_config()
+    config = get_backrest_config()
+
+    stats = []
+    for repo in config.get("repos", []):
+        if target not in ("all", repo["id"]):
+            continue
+        runner = ResticRunner(data_dir, password, str(repo["uri"]), repo["id"])
+        try:
+            stats.append(_repo_stats(runner, state_path))
+        except (subprocess.CalledProcessError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not read stats of repo '{repo['id']}': {e}")
+
+    record_backup_metrics(textfile_dir, repos=stats, state_path=state_path)
+    return stats
+
+
+@dataclass
+class RestorePreview:
+    """What restoring one service from a snapshot would write.
+
+    Attributes:
+        service: Name of the service.
+        files: Number of regular files.
+        bytes: Total size of those files.
+    """
+
+    service: str
+    files: int = 0
+    bytes: int = 0
+
+
+def get_snapshot_dir(service: str) -> str:
+    """Return where a service's data lives inside a backup snapshot.
+
+    Args:
+        service: Service name.
+
+    Returns:
+        Absolute path inside the snapshot (e.g., "/userdata/plex").
+    """
+    return f"/userdata/{get_config_dir_name(service)}"
+
+
+def get_runner(target: str) -> ResticRunner:
+    """Return a runner for restic commands against a Backrest repository.
+
+    Args:
+        target: Repository ID in the Backrest config ("local" or "r2").
+
+    Returns:
+        The runner.
+
+    Raises:
+        ValueError: If the repository isn't in the Backrest config.
+    """
+    data_dir, password = _get_restore_config()
+    config = get_backrest_config()
+    repos_by_id = {repo["id"]: repo for repo in config.get("repos", [])}
+    repo = repos_by_id.get(target)
+    if not repo:
+        raise ValueError(f"Repo '{target}' not found in Backrest config")
+    return ResticRunner(data_dir, password, str(repo["uri"]), target)
+
+
 def restore_backup(
     snapshot_id: str = "latest",
     services: Optional[list[str]] = None,
     target: str = "local",
     dry_run: bool = False,
+    as_of: Optional[datetime] = None,
+    incremental: bool = False,
+    parallelism: int = DEFAULT_RESTORE_PARALLELISM,
+    progress: Optional[ProgressCallback] = None,
 ) -> None:
     """Restore services from a restic backup snapshot.
 
-    Stops affected containers, restores files via an ephemeral restic container,
-    then restarts containers. The start step runs in a finally block to ensure
-    containers are always brought back up.
+    Each service is restored by its own ephemeral restic container, several
+    at once. A service's containers are stopped just before its restore and
+    started again as soon as it finishes, after any dependencies restored
+    alongside it, so small services aren't kept down by large ones.
+    Containers are started again even if their restore fails.
+
+    With incremental=True, only files that differ from the snapshot are
+    restored, into a staging copy built while containers keep running.
+    Containers are stopped only to swap the staged directories into place.
 
     Args:
         snapshot_id: ID of the backup snapshot to restore from. Use "latest"
-            to automatically resolve the most recent snapshot.
+            to resolve the most recent snapshot (at or before as_of, and
+            containing every requested service) from the snapshot catalog.
         services: Optional list of specific service names to restore.
             If None, restores all discovered services.
         target: Which repository to restore from. One of "local" or "r2".
         dry_run: If True, log the restoration steps without executing.
+        as_of: Restore the state as of this time. Only used when snapshot_id
+            is "latest".
+        incremental: Restore only changed files and keep downtime to the
+            final swap.
+        parallelism: Maximum number of services restored at once.
+        progress: Called with restic's progress while restoring, from the
+            thread restoring each service.
 
     Raises:
         ValueError: If the target repo is not found in Backrest config.
-        RuntimeError: If snapshot resolution or restore fails.
+        RuntimeError: If snapshot resolution or any service's restore fails.
     """
-    data_dir, password = _get_restore_config()
-
-    config = get_backrest_config()
-    repos_by_id = {repo["id"]: repo for repo in config.get("repos", [])}
-    repo = repos_by_id.get(target)
-    if not repo:
-        raise ValueError(f"Repo '{target}' not found in Backrest config")
-    uri = repo["uri"]
+    runner = get_runner(target)
 
     if snapshot_id == "latest":
-        snapshot_id = _resolve_latest_snapshot(data_dir, password, uri, target)
-        logger.info(f"Resolved latest snapshot: {snapshot_id}")
+        snapshot_id = resolve_snapshot(runner, as_of=as_of, services=services)
+        logger.info(f"Resolved snapshot: {snapshot_id}")
 
-    affected_services = services or _get_all_backup_services()
+    affected_services = services or get_all_backup_services()
 
-    containers: list[str] = []
-    for svc in affected_services:
-        containers.extend(_get_container_names(svc))
-
-    restore_cmd = _build_ephemeral_cmd(
-        data_dir,
-        password,
-        uri,
-        target,
-        extra_mounts=[f"{data_dir}/Config:/userdata:rw"],
+    if incremental:
+        _restore_incremental(runner, snapshot_id, affected_services, dry_run)
+        return
+
+    restore_cmd = runner.command(
+        extra_mounts=[f"{runner.data_dir}/Config:/userdata:rw"]
     )
-    restore_cmd.extend(["restore", snapshot_id, "--target", "/"])
-    if services:
-        for svc in services:
-            restore_cmd.extend(["--include", f"/userdata/{_get_config_dir_name(svc)}"])
+    restore_cmd.extend(["restore", snapshot_id, "--target", "/", "--json"])
+
+    jobs = _restore_jobs(affected_services, restore_cmd, whole_snapshot=not services)
 
     if dry_run:
         logger.info(f"[DRY RUN] Snapshot: {snapshot_id}")
-        if containers:
-            logger.info(f"[DRY RUN] Would stop containers: {' '.join(containers)}")
-        logger.info(f"[DRY RUN] Would run: {' '.join(restore_cmd)}")
-        if containers:
-            logger.info(f"[DRY RUN] Would start containers: {' '.join(containers)}")
+        for job in jobs:
+            if job.containers:
+                logger.info(f"[DRY RUN] Would stop: {' '.join(job.containers)}")
+            logger.info(f"[DRY RUN] Would run: {' '.join(job.cmd)}")
+            if job.containers:
+                logger.info(f"[DRY RUN] Would start: {' '.join(job.containers)}")
+        return
+
+    logger.info(f"Restoring snapshot {snapshot_id} from '{target}' repo")
+    failed = _run_restore_jobs(jobs, parallelism, progress)
+    if failed:
+        raise RuntimeError(f"Restore failed for: {', '.join(failed)}")
+    logger.info("Restore complete!")
+
+
+@dataclass
+class _RestoreJob:
+    name: str
+    cmd: list[str]
+    containers: list[str]
+    # Jobs whose containers must be started before this job's
+    after: list[str]
+
+
+def _restore_jobs(
+    services: list[str], restore_cmd: list[str], whole_snapshot: bool
+) -> list[_RestoreJob]:
+    """Split a restore into one job per service, in dependency order.
+
+    Critical services, and the services they depend on, come first, so with
+    a bounded worker pool they are restored and restarted ahead of the rest.
+
+    Args:
+        services: Services to restore.
+        restore_cmd: restic restore command without include/exclude filters.
+        whole_snapshot: Also restore everything outside the services'
+            directories, as a final job with no containers.
+
+    Returns:
+        Jobs ordered so that a service's dependencies come before it.
+    """
+    graph = get_service_graph()
+    manifests = discover_services()
+    first: set[str] = set()
+    for svc in services:
+        if svc in manifests and manifests[svc].critical:
+            first.add(svc)
+            first.update(graph.dependencies(svc, transitive=True))
+    ordered = graph.order(services, strict=False)
+    # A stable partition keeps each group in dependency order, and nothing
+    # in the first group depends on the second
+    ordered = [s for s in ordered if s in first] + [
+        s for s in ordered if s not in first
+    ]
+
+    jobs = []
+    for svc in ordered:
+        deps = graph.dependencies(svc)
+        jobs.append(
+            _RestoreJob(
+                name=svc,
+                cmd=[*restore_cmd, "--include", get_snapshot_dir(svc)],
+                containers=_get_container_names(svc),
+                after=[d for d in deps if d in services],
+            )
+        )
+
+    if whole_snapshot:
+        excludes = [
+            arg for svc in services for arg in ("--exclude", get_snapshot_dir(svc))
+        ]
+        jobs.append(
+            _RestoreJob(
+                name="other data",
+                cmd=[*restore_cmd, *excludes],
+                containers=[],
+                after=[],
+            )
+        )
+    return jobs
+
+
+def _restore_job(job: _RestoreJob, progress: Optional[ProgressCallback]) -> None:
+    if job.containers:
+        logger.info(f"Stopping containers: {' '.join(job.containers)}")
+        run_command(["docker", "stop", *job.containers])
+    started = time.monotonic()
+    run_restic_json(job.cmd, progress, label=job.name)
+    logger.info(f"{job.name}: restored in {time.monotonic() - started:.1f}s")
+
+
+def _run_restore_jobs(
+    jobs: list[_RestoreJob],
+    parallelism: int,
+    progress: Optional[ProgressCallback] = None,
+) -> list[str]:
+    """Run restore jobs concurrently, restarting each service when it can.
+
+    A service's containers are stopped just before its own restore, and
+    started as soon as that restore has finished (or failed) and every
+    dependency being restored alongside it has been started. Containers are
+    always started again, as with a single restore.
+
+    Args:
+        jobs: Jobs in dependency order, as from _restore_jobs().
+        parallelism: Maximum number of restores run at once.
+        progress: Called with each restore's progress.
+
+    Returns:
+        Names of the jobs whose restore or restart failed.
+    """
+    failed: list[str] = []
+    done: set[str] = set()
+    started: set[str] = set()
+
+    def start_ready() -> None:
+        # Jobs are in dependency order, so one pass starts every ready job
+        for job in jobs:
+            if job.name in started or job.name not in done:
+                continue
+            if not all(dep in started for dep in job.after):
+                continue
+            started.add(job.name)
+            if not job.containers:
+                continue
+            logger.info(f"Starting containers: {' '.join(job.containers)}")
+            try:
+                run_command(["docker", "start", *job.containers])
+            except Exception as e:
+                logger.error(f"{job.name}: failed to start containers: {e}")
+                failed.append(job.name)
+
+    with ThreadPoolExecutor(max_workers=max(1, parallelism)) as pool:
+        futures = {pool.submit(_restore_job, job, progress): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"{job.name}: restore failed: {e}")
+                failed.append(job.name)
+            done.add(job.name)
+            start_ready()
+
+    return failed
+
+
+def _restore_incremental(
+    runner: ResticRunner,
+    snapshot_id: str,
+    services: list[str],
+    dry_run: bool,
+) -> None:
+    """Restore changed files into staging, then swap them in with a short stop.
+
+    Args:
+        runner: Runs restic against the repository to restore from.
+        snapshot_id: Resolved snapshot ID.
+        services: Services to restore.
+        dry_run: Only report what differs from the snapshot.
+
+    Raises:
+        subprocess.CalledProcessError: If a restic or Docker command fails.
+        OSError: If staging or swapping a directory fails.
+    """
+    config_dir = f"{runner.data_dir}/Config"
+    list_cmd = runner.command()
+
+    diffs = []
+    for svc in services:
+        live_dir = Path(config_dir) / get_config_dir_name(svc)
+        diff = diff_service(list_cmd, snapshot_id, svc, get_snapshot_dir(svc), live_dir)
+        logger.info(
+            f"{svc}: {len(diff.changed)} of {len(diff.expected)} files differ "
+            f"({format_size(diff.changed_bytes)})"
+        )
+        if diff.changed:
+            diffs.append(diff)
+
+    containers: list[str] = []
+    for diff in diffs:
+        containers.extend(_get_container_names(diff.service))
+
+    if dry_run:
+        logger.info(f"[DRY RUN] Snapshot: {snapshot_id}")
+        if diffs:
+            logger.info(
+                f"[DRY RUN] Would stage {sum(len(d.changed) for d in diffs)} files, "
+                f"then stop only for the swap: {' '.join(containers) or 'none'}"
+            )
         return
 
-    if containers:
-        logger.info(f"Stopping containers: {' '.join(containers)}")
-        run_command(["docker", "stop", *containers])
+    if not diffs:
+        logger.info("Live data already matches the snapshot, nothing to restore")
+        return
+
+    root = staging_root(config_dir, snapshot_id)
+    # Left behind by an interrupted restore of the same snapshot, which may
+    # have been stopped between swapping out live data and deleting it
+    leftover = swapped_out(root)
+    if leftover:
+        raise RuntimeError(
+            f"{', '.join(str(p) for p in leftover)} may hold live data from an "
+            "interrupted restore. Move it back into place or delete it, then retry"
+        )
+    discard(root)
+    root.mkdir(parents=True)
+    restore_cmd = runner.command(extra_mounts=[f"{root}:{STAGING_MOUNT}:rw"])
 
+    stranded = False
     try:
-        logger.info(f"Restoring snapshot {snapshot_id} from '{target}' repo")
-        run_command(restore_cmd)
-        logger.info("Restore complete!")
-    finally:
+        logger.info(f"Staging snapshot {snapshot_id} from '{runner.target}' repo")
+        for diff in diffs:
+            stage(restore_cmd, root, snapshot_id, diff)
+
         if containers:
-            logger.info(f"Starting containers: {' '.join(containers)}")
-            run_command(["docker", "start", *containers])
+            logger.info(f"Stopping containers: {' '.join(containers)}")
+            run_command(["docker", "stop", *containers])
+        stopped_at = time.monotonic()
+
+        try:
+            for diff in diffs:
+                caught_up = catch_up(restore_cmd, root, snapshot_id, diff)
+                if caught_up:
+                    logger.info(f"{diff.service}: restored {caught_up} files again")
+            for diff in diffs:
+                swap(root, diff)
+            logger.info("Restore complete!")
+        finally:
+            if containers:
+                logger.info(f"Starting containers: {' '.join(containers)}")
+                run_command(["docker", "start", *containers])
+            downtime = time.monotonic() - stopped_at
+            logger.info(f"Services were stopped for {downtime:.1f}s")
+    except SwapError as e:
+        # The staging root now holds the only copy of the live data
+        stranded = True
+        logger.error(f"{e}. Move it back to {e.live_dir} by hand")
+        raise
+    finally:
+        if not stranded:
+            discard(root)
 
 
-def _resolve_latest_snapshot(
-    data_dir: str, password: str, uri: str, target: str
+def resolve_snapshot(
+    runner: ResticRunner,
+    as_of: Optional[datetime] = None,
+    services: Optional[list[str]] = None,
 ) -> str:
-    """Resolve 'latest' to an actual snapshot ID.
+    """Resolve 'latest' to an actual snapshot ID using the snapshot catalog.
 
     Args:
-        data_dir: Path to the nexus data directory.
-        password: Restic repository password.
-        uri: Repository URI.
-        target: Repository target ("local" or "r2").
+        runner: Runs restic against the repository.
+        as_of: Only consider snapshots taken at or before this time.
+        services: Only consider snapshots that contain data for every one of
+            these services.
 
     Returns:
         The full snapshot ID string.
 
     Raises:
-        RuntimeError: If no snapshots are found in the repository.
+        RuntimeError: If no snapshot matches.
+        subprocess.CalledProcessError: If restic fails to list a snapshot
+            while checking it for services.
     """
-    cmd = _build_ephemeral_cmd(data_dir, password, uri, target)
-    cmd.extend(["snapshots", "--json", "--latest", "1"])
-    result = run_command(cmd, capture=True)
-    snapshots = json.loads(result.stdout)
-    if not snapshots:
-        raise RuntimeError("No snapshots found in repository")
-    return str(snapshots[0]["id"])
+    path = catalog_path(runner.data_dir, runner.target)
+    restic_cmd = runner.command()
+    snapshots = get_snapshots(path, restic_cmd)
+
+    def has_services(snapshot: Snapshot) -> bool:
+        return all(
+            snapshot_contains(
+                path, restic_cmd, snapshots, snapshot, get_snapshot_dir(svc)
+            )
+            for svc in services or []
+        )
+
+    snapshot = find_snapshot(snapshots, as_of, has_services)
+    if snapshot:
+        logger.info(f"Using snapshot {snapshot.short_id} taken at {snapshot.time}")
+        return snapshot.id
+
+    criteria = []
+    if as_of:
+        criteria.append(f"at or before {as_of.isoformat()}")
+    if services:
+        criteria.append(f"containing {', '.join(services)}")
+    suffix = f" {' and '.join(criteria)}" if criteria else ""
+    raise RuntimeError(f"No snapshots found in repository{suffix}")
+
+
+def preview_restore(
+    snapshot_id: str = "latest",
+    services: Optional[list[str]] = None,
+    target: str = "local",
+    as_of: Optional[datetime] = None,
+) -> tuple[str, list[RestorePreview]]:
+    """Count the files and bytes a restore would write, per service.
+
+    Streams `restic ls --json` for the services' directories, so the
+    listing is never held in memory as a whole.
+
+    Args:
+        snapshot_id: Snapshot ID, or "latest" to resolve as restore_backup
+            would.
+        services: Services to preview. Defaults to all discovered services.
+        target: Which repository to read from. One of "local" or "r2".
+        as_of: Point in time used to resolve "latest".
+
+    Returns:
+        Tuple of (resolved snapshot ID, one RestorePreview per service in
+        the order given).
+
+    Raises:
+        ValueError: If the target repo is not found in Backrest config.
+        RuntimeError: If snapshot resolution fails.
+        subprocess.CalledProcessError: If restic fails to list the snapshot,
+            rather than reporting a partial count.
+    """
+    runner = get_runner(target)
+
+    if snapshot_id == "latest":
+        snapshot_id = resolve_snapshot(runner, as_of=as_of, services=services)
+
+    affected = services or get_all_backup_services()
+    previews = {svc: RestorePreview(service=svc) for svc in affected}
+    prefixes = [(get_snapshot_dir(svc) + "/", previews[svc]) for svc in affected]
+
+    restic_cmd = runner.command()
+    dirs = [get_snapshot_dir(svc) for svc in affected]
+    for node in iter_snapshot_nodes(restic_cmd, snapshot_id, dirs, check=True):
+        if node.get("type") != "file":
+            continue
+        node_path = node.get("path", "")
+        for prefix, preview in prefixes:
+            if node_path.startswith(prefix):
+                preview.files += 1
+                preview.bytes += node.get("size", 0)
+                break
+
+    return snapshot_id, list(previews.values())
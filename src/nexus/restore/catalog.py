@@ -0,0 +1,291 @@
+import json
+import logging
+import time
+from collections.abc import Callable, Generator
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from nexus.utils import load_state, run_command, save_state, stream_command
+
+logger = logging.getLogger(__name__)
+
+# A catalog younger than this is used without contacting the repository
+CATALOG_MAX_AGE = 15 * 60
+
+# Fields copied from restic's per-snapshot summary (restic >= 0.17)
+_SUMMARY_FIELDS = (
+    "files_new",
+    "files_changed",
+    "data_added",
+    "total_files_processed",
+    "total_bytes_processed",
+)
+
+
+@dataclass
+class Snapshot:
+    """A restic snapshot as recorded in the local catalog.
+
+    Attributes:
+        id: Full snapshot ID.
+        short_id: Abbreviated snapshot ID.
+        time: Snapshot time as reported by restic (RFC 3339).
+        paths: Paths included in the snapshot.
+        tags: Tags attached to the snapshot.
+        hostname: Host that created the snapshot.
+        summary: Size statistics (e.g., total_bytes_processed, data_added)
+            when the snapshot was created by restic 0.17 or later.
+        contains: Memoized results of snapshot_contains(), keyed by path.
+            Snapshots are immutable, so each path is checked at most once.
+    """
+
+    id: str
+    short_id: str
+    time: str
+    paths: list[str] = field(default_factory=list)
+    tags: list[str] = field(default_factory=list)
+    hostname: str = ""
+    summary: dict[str, int] = field(default_factory=dict)
+    contains: dict[str, bool] = field(default_factory=dict)
+
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromisoformat(self.time.replace("Z", "+00:00"))
+
+    def covers(self, path: str) -> bool:
+        """Return whether path falls under one of the snapshot's backup paths."""
+        if not self.paths:
+            return True
+        return any(
+            path == p or path.startswith(p.rstrip("/") + "/") for p in self.paths
+        )
+
+    @classmethod
+    def from_restic(cls, data: dict[str, Any]) -> "Snapshot":
+        summary = data.get("summary") or {}
+        return cls(
+            id=data["id"],
+            short_id=data.get("short_id", data["id"][:8]),
+            time=data["time"],
+            paths=data.get("paths") or [],
+            tags=data.get("tags") or [],
+            hostname=data.get("hostname", ""),
+            summary={k: summary[k] for k in _SUMMARY_FIELDS if k in summary},
+        )
+
+
+def catalog_path(data_dir: str, target: str) -> Path:
+    """Return where the snapshot catalog for a repository is stored.
+
+    Args:
+        data_dir: Path to the nexus data directory.
+        target: Repository ID (e.g., "local" or "r2").
+
+    Returns:
+        Path of the catalog file under the data directory.
+    """
+    return Path(data_dir) / "Config" / "nexus" / f"snapshots-{target}.json"
+
+
+def _load(path: Path) -> tuple[float, list[Snapshot]]:
+    state = load_state(path)
+    try:
+        snapshots = [Snapshot(**s) for s in state.get("snapshots", [])]
+    except TypeError as e:
+        logger.warning(f"Ignoring malformed snapshot catalog {path}: {e}")
+        return 0.0, []
+    return float(state.get("refreshed_at", 0.0)), snapshots
+
+
+def _save(path: Path, snapshots: list[Snapshot], refreshed_at: float) -> None:
+    try:
+        save_state(
+            path,
+            {
+                "refreshed_at": refreshed_at,
+                "snapshots": [asdict(s) for s in snapshots],
+            },
+        )
+    except OSError as e:
+        logger.warning(f"Could not save snapshot catalog {path}: {e}")
+
+
+def refresh_catalog(
+    path: Path, restic_cmd: list[str], known: list[Snapshot]
+) -> list[Snapshot]:
+    """Bring a catalog up to date with the repository.
+
+    `restic list snapshots` only lists the repository's snapshot IDs, one
+    cheap round-trip even for a remote repository. Full metadata is then
+    fetched for new IDs only, and snapshots that were forgotten are dropped.
+
+    Args:
+        path: Catalog file to update.
+        restic_cmd: Command prefix that runs restic against the repository
+            (everything up to the restic subcommand).
+        known: Snapshots currently in the catalog.
+
+    Returns:
+        All snapshots in the repository, oldest first.
+
+    Raises:
+        subprocess.CalledProcessError: If restic fails.
+    """
+    result = run_command([*restic_cmd, "list", "snapshots"], capture=True)
+    ids = [line.strip() for line in result.stdout.splitlines() if line.strip()]
+
+    by_id = {s.id: s for s in known if s.id in ids}
+    new_ids = [i for i in ids if i not in by_id]
+    if new_ids:
+        result = run_command(
+            [*restic_cmd, "snapshots", "--json", *new_ids], capture=True
+        )
+        for data in json.loads(result.stdout or "[]"):
+            snapshot = Snapshot.from_restic(data)
+            by_id[snapshot.id] = snapshot
+
+    snapshots = sorted(by_id.values(), key=lambda s: s.timestamp)
+    logger.debug(f"Catalog refreshed: {len(new_ids)} new, {len(snapshots)} total")
+
+    _save(path, snapshots, time.time())
+    return snapshots
+
+
+def get_snapshots(
+    path: Path,
+    restic_cmd: list[str],
+    max_age: float = CATALOG_MAX_AGE,
+    refresh: bool = False,
+) -> list[Snapshot]:
+    """Return a repository's snapshots, from the catalog when it is fresh.
+
+    Args:
+        path: Catalog file for the repository.
+        restic_cmd: Command prefix that runs restic against the repository.
+        max_age: Seconds a catalog stays fresh. Older catalogs are refreshed
+            incrementally before use.
+        refresh: Refresh regardless of age.
+
+    Returns:
+        All snapshots in the repository, oldest first.
+
+    Raises:
+        subprocess.CalledProcessError: If a refresh is needed and restic fails.
+    """
+    refreshed_at, snapshots = _load(path)
+    if refresh or time.time() - refreshed_at > max_age:
+        return refresh_catalog(path, restic_cmd, snapshots)
+    return snapshots
+
+
+def find_snapshot(
+    snapshots: list[Snapshot],
+    as_of: Optional[datetime] = None,
+    predicate: Optional[Callable[[Snapshot], bool]] = None,
+) -> Optional[Snapshot]:
+    """Find the newest snapshot taken at or before a point in time.
+
+    Args:
+        snapshots: Snapshots to search.
+        as_of: Timezone-aware cutoff. Defaults to no cutoff.
+        predicate: Extra condition a snapshot must meet. Evaluated newest
+            first and only until a snapshot matches, so it may be costly.
+
+    Returns:
+        The matching snapshot, or None if there is none.
+    """
+    candidates = [s for s in snapshots if as_of is None or s.timestamp <= as_of]
+    for snapshot in sorted(candidates, key=lambda s: s.timestamp, reverse=True):
+        if predicate is None or predicate(snapshot):
+            return snapshot
+    return None
+
+
+def iter_snapshot_nodes(
+    restic_cmd: list[str],
+    snapshot_id: str,
+    paths: list[str],
+    recursive: bool = True,
+    check: bool = False,
+) -> Generator[dict[str, Any], None, None]:
+    """Stream the file tree of a snapshot from `restic ls --json`.
+
+    Nodes are yielded as restic prints them, so memory use doesn't depend on
+    how many files the snapshot holds, and closing the iterator early stops
+    restic.
+
+    Args:
+        restic_cmd: Command prefix that runs restic against the repository.
+        snapshot_id: Snapshot to list.
+        paths: Only list these directories.
+        recursive: Include everything below paths, not just their entries.
+        check: Raise if restic fails, rather than ending the listing early.
+
+    Yields:
+        Node dicts with at least 'path', 'type', 'mtime', and for files
+        'size'.
+
+    Raises:
+        subprocess.CalledProcessError: If check is True and restic fails.
+    """
+    flags = ["--json", "--recursive"] if recursive else ["--json"]
+    cmd = [*restic_cmd, "ls", *flags, snapshot_id, *paths]
+
+    for line in stream_command(cmd, check=check):
+        try:
+            message = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(message, dict) and message.get("struct_type") == "node":
+            yield message
+
+
+def snapshot_contains(
+    path: Path,
+    restic_cmd: list[str],
+    snapshots: list[Snapshot],
+    snapshot: Snapshot,
+    directory: str,
+) -> bool:
+    """Check whether a snapshot has any entries under a directory.
+
+    The answer is memoized in the catalog at path, so later calls for the
+    same snapshot and directory don't touch the repository. Snapshots never
+    change, so only an answer from a listing restic completed is memoized.
+
+    Args:
+        path: Catalog file the snapshot belongs to.
+        restic_cmd: Command prefix that runs restic against the repository.
+        snapshots: Every snapshot in the catalog, saved back with the result.
+        snapshot: The snapshot to check.
+        directory: Absolute path inside the snapshot (e.g., "/userdata/plex").
+
+    Returns:
+        True if the directory exists in the snapshot and is not empty.
+
+    Raises:
+        subprocess.CalledProcessError: If restic fails to list the snapshot.
+    """
+    if directory in snapshot.contains:
+        return snapshot.contains[directory]
+    if not snapshot.covers(directory):
+        return False
+
+    nodes = iter_snapshot_nodes(
+        restic_cmd, snapshot.id, [directory], recursive=False, check=True
+    )
+    prefix = directory.rstrip("/") + "/"
+    found = False
+    for node in nodes:
+        if node.get("path", "").startswith(prefix):
+            found = True
+            break
+    # Stops restic if it is still listing
+    nodes.close()
+
+    snapshot.contains[directory] = found
+    refreshed_at, _ = _load(path)
+    _save(path, snapshots, refreshed_at)
+    return found
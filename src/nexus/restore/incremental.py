@@ -0,0 +1,406 @@
+import logging
+import os
+import re
+import shutil
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from nexus.restore.catalog import iter_snapshot_nodes
+from nexus.utils import run_command
+
+logger = logging.getLogger(__name__)
+
+# Where the staging root is mounted in the ephemeral restic container
+STAGING_MOUNT = "/staging"
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+# restic include patterns are globs; file names are matched literally
+_GLOB_CHARS = re.compile(r"([*?\[\\])")
+
+
+class SwapError(OSError):
+    """Raised when a swap failed and the live directory couldn't be put back.
+
+    Attributes:
+        live_dir: Where the service's data belongs.
+        previous: Where the service's data is now. Deleting the staging
+            root would delete it.
+    """
+
+    def __init__(self, live_dir: Path, previous: Path) -> None:
+        self.live_dir = live_dir
+        self.previous = previous
+        super().__init__(
+            f"Could not swap {live_dir} or put it back; its data is in {previous}"
+        )
+
+
+@dataclass
+class ServiceDiff:
+    """How a service's live directory differs from a snapshot.
+
+    Attributes:
+        service: Service name.
+        snapshot_dir: Directory inside the snapshot (e.g., "/userdata/plex").
+        live_dir: The service's directory on the host.
+        expected: Size and mtime (in microseconds) of every regular file in
+            the snapshot, keyed by path relative to snapshot_dir.
+        changed: Relative paths of files that are missing or differ live.
+        changed_bytes: Total snapshot size of the changed files.
+        dirs: Relative paths of directories in the snapshot.
+    """
+
+    service: str
+    snapshot_dir: str
+    live_dir: Path
+    expected: dict[str, tuple[int, int]] = field(default_factory=dict)
+    changed: list[str] = field(default_factory=list)
+    changed_bytes: int = 0
+    dirs: list[str] = field(default_factory=list)
+
+
+def staging_root(config_dir: str, snapshot_id: str) -> Path:
+    """Return the staging root for a restore.
+
+    It lives inside the config directory so staged files can be hard linked
+    and renamed into place without crossing filesystems.
+    """
+    return Path(config_dir) / f".nexus-restore-{snapshot_id[:12]}"
+
+
+def _staged_dir(root: Path, diff: ServiceDiff) -> Path:
+    # restic restore --target /staging recreates the snapshot's absolute paths
+    return root / diff.snapshot_dir.lstrip("/")
+
+
+def _mtime_us(value: str) -> int:
+    when = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return (when - _EPOCH) // timedelta(microseconds=1)
+
+
+def _stat_key(st: os.stat_result) -> tuple[int, int]:
+    return st.st_size, st.st_mtime_ns // 1000
+
+
+def live_key(path: Path) -> Optional[tuple[int, int]]:
+    """Return the size and mtime a live file is compared with snapshots by.
+
+    Args:
+        path: Path to the live file.
+
+    Returns:
+        (size, mtime in microseconds), or None if path is missing or not a
+        regular file.
+    """
+    try:
+        st = path.lstat()
+    except (FileNotFoundError, NotADirectoryError):
+        # NotADirectoryError: a parent is a file live
+        return None
+    if not path.is_file() or path.is_symlink():
+        return None
+    return _stat_key(st)
+
+
+def diff_service(
+    restic_cmd: list[str],
+    snapshot_id: str,
+    service: str,
+    snapshot_dir: str,
+    live_dir: Path,
+) -> ServiceDiff:
+    """Compare a service's live directory with its copy in a snapshot.
+
+    The snapshot listing is streamed, and each file is compared as it
+    arrives. Only regular files are compared; symlinks and special files
+    are left as they are.
+
+    Args:
+        restic_cmd: Command prefix that runs restic against the repository.
+        snapshot_id: Snapshot to compare against.
+        service: Service name.
+        snapshot_dir: The service's directory inside the snapshot.
+        live_dir: The service's directory on the host.
+
+    Returns:
+        The differences found.
+
+    Raises:
+        subprocess.CalledProcessError: If restic fails to list the snapshot.
+    """
+    diff = ServiceDiff(service=service, snapshot_dir=snapshot_dir, live_dir=live_dir)
+    prefix = snapshot_dir.rstrip("/") + "/"
+
+    for node in iter_snapshot_nodes(
+        restic_cmd, snapshot_id, [snapshot_dir], check=True
+    ):
+        node_path = node.get("path", "")
+        if not node_path.startswith(prefix):
+            continue
+        rel = node_path[len(prefix) :]
+
+        if node.get("type") == "dir":
+            diff.dirs.append(rel)
+            continue
+        if node.get("type") != "file":
+            continue
+
+        key = (node.get("size", 0), _mtime_us(node["mtime"]))
+        diff.expected[rel] = key
+        if live_key(live_dir / rel) != key:
+            diff.changed.append(rel)
+            diff.changed_bytes += key[0]
+
+    return diff
+
+
+def _same_entry(a: Path, b: Path) -> bool:
+    try:
+        sa, sb = a.lstat(), b.lstat()
+    except FileNotFoundError:
+        return False
+    if a.is_symlink() or b.is_symlink():
+        return a.is_symlink() and b.is_symlink() and a.readlink() == b.readlink()
+    return (sa.st_dev, sa.st_ino) == (sb.st_dev, sb.st_ino)
+
+
+def _link(src: Path, dst: Path) -> None:
+    """Mirror src at dst: a hard link, a new symlink, or a copy as a fallback."""
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if dst.is_symlink() or dst.exists():
+        dst.unlink()
+    if src.is_symlink():
+        dst.symlink_to(src.readlink())
+        return
+    try:
+        os.link(src, dst)
+    except OSError:
+        # e.g. fs.protected_hardlinks for files owned by another user
+        shutil.copy2(src, dst)
+
+
+def _mirror_dir(src: Path, dst: Path) -> None:
+    dst.mkdir(parents=True, exist_ok=True)
+    shutil.copystat(src, dst)
+    st = src.stat()
+    try:
+        os.chown(dst, st.st_uid, st.st_gid)
+    except PermissionError:
+        pass
+
+
+def _stage_tree(live_dir: Path, staged_dir: Path) -> None:
+    staged_dir.mkdir(parents=True, exist_ok=True)
+    if not live_dir.is_dir():
+        return
+    _mirror_dir(live_dir, staged_dir)
+
+    for dirpath, dirnames, filenames in os.walk(live_dir):
+        rel = Path(dirpath).relative_to(live_dir)
+        for name in dirnames:
+            if (Path(dirpath) / name).is_symlink():
+                _link(Path(dirpath) / name, staged_dir / rel / name)
+            else:
+                _mirror_dir(Path(dirpath) / name, staged_dir / rel / name)
+        for name in filenames:
+            _link(Path(dirpath) / name, staged_dir / rel / name)
+
+
+def _remove_staged(path: Path) -> None:
+    # Staged entries are hard links and mirrored directories, so removing
+    # them never touches live data. rmtree doesn't follow symlinks
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
+    elif path.is_symlink() or path.exists():
+        path.unlink()
+
+
+def _restore_into_staging(
+    restic_cmd: list[str],
+    root: Path,
+    snapshot_id: str,
+    diff: ServiceDiff,
+    paths: list[str],
+) -> None:
+    """Restore specific files of a service from a snapshot into staging.
+
+    Staged entries at those paths are removed first, so restic writes new
+    files instead of modifying the live ones through the shared inode. This
+    includes directories that are files in the snapshot.
+    """
+    staged = _staged_dir(root, diff)
+    for rel in paths:
+        _remove_staged(staged / rel)
+
+    include_file = root / f"include-{diff.service}.txt"
+    include_file.write_text(
+        "".join(
+            _GLOB_CHARS.sub(r"\\\1", f"{diff.snapshot_dir}/{rel}") + "\n"
+            for rel in paths
+        )
+    )
+    run_command(
+        [
+            *restic_cmd,
+            "restore",
+            snapshot_id,
+            "--target",
+            STAGING_MOUNT,
+            "--include-file",
+            f"{STAGING_MOUNT}/{include_file.name}",
+        ]
+    )
+
+
+def stage(
+    restic_cmd: list[str], root: Path, snapshot_id: str, diff: ServiceDiff
+) -> None:
+    """Build the staged copy of a service's directory while it keeps running.
+
+    Args:
+        restic_cmd: Command prefix that runs restic with root mounted at
+            STAGING_MOUNT.
+        root: Staging root for this restore.
+        snapshot_id: Snapshot being restored.
+        diff: The service's differences from diff_service().
+
+    Raises:
+        subprocess.CalledProcessError: If restic fails.
+    """
+    staged = _staged_dir(root, diff)
+    _stage_tree(diff.live_dir, staged)
+    # Parents sort before their children
+    for rel in sorted(diff.dirs):
+        target = staged / rel
+        if target.is_symlink() or (target.exists() and not target.is_dir()):
+            # A file live that is a directory in the snapshot
+            _remove_staged(target)
+        target.mkdir(parents=True, exist_ok=True)
+    if diff.changed:
+        _restore_into_staging(restic_cmd, root, snapshot_id, diff, diff.changed)
+
+
+def catch_up(
+    restic_cmd: list[str], root: Path, snapshot_id: str, diff: ServiceDiff
+) -> int:
+    """Bring a staged directory up to date after the service has stopped.
+
+    While staging, the service kept writing. Staged hard links already see
+    in-place writes, but files it created, replaced or deleted, and snapshot
+    files it modified, have to be reconciled. Files restored from the
+    snapshot always win.
+
+    Args:
+        restic_cmd: Command prefix that runs restic with root mounted at
+            STAGING_MOUNT.
+        root: Staging root for this restore.
+        snapshot_id: Snapshot being restored.
+        diff: The service's differences, as staged.
+
+    Returns:
+        Number of files restored again from the snapshot.
+
+    Raises:
+        subprocess.CalledProcessError: If restic fails.
+    """
+    live, staged = diff.live_dir, _staged_dir(root, diff)
+    restored = set(diff.changed)
+    stale: list[str] = []
+
+    snapshot_dirs = set(diff.dirs)
+    if live.is_dir():
+        for dirpath, dirnames, filenames in os.walk(live):
+            base = Path(dirpath).relative_to(live)
+            # Symlinks, and directories that are files in the snapshot, are
+            # compared as entries rather than walked into
+            entries = [
+                d
+                for d in dirnames
+                if (Path(dirpath) / d).is_symlink()
+                or (base / d).as_posix() in diff.expected
+            ]
+            dirnames[:] = [d for d in dirnames if d not in entries]
+            for name in filenames + entries:
+                path = Path(dirpath) / name
+                rel = path.relative_to(live).as_posix()
+                if rel in restored or rel in snapshot_dirs:
+                    continue
+                if rel in diff.expected and live_key(path) != diff.expected[rel]:
+                    stale.append(rel)
+                elif not _same_entry(path, staged / rel):
+                    _link(path, staged / rel)
+
+    for dirpath, _, filenames in os.walk(staged):
+        for name in filenames:
+            path = Path(dirpath) / name
+            rel = path.relative_to(staged).as_posix()
+            if rel in restored or (live / rel).is_symlink() or (live / rel).exists():
+                continue
+            if rel in diff.expected:
+                stale.append(rel)
+            else:
+                path.unlink()
+
+    if stale:
+        _restore_into_staging(restic_cmd, root, snapshot_id, diff, stale)
+        diff.changed.extend(stale)
+    return len(stale)
+
+
+def swap(root: Path, diff: ServiceDiff) -> None:
+    """Rename the staged directory into place of the live one.
+
+    The live directory is moved under root, to be deleted with it. If the
+    staged directory can't be moved into place, the live one is put back.
+
+    Raises:
+        SwapError: If the live directory couldn't be put back either. It is
+            left under root, which must then be kept.
+        OSError: If a rename fails.
+    """
+    staged = _staged_dir(root, diff)
+    previous = _previous_dir(root, diff.service)
+    previous.parent.mkdir(parents=True, exist_ok=True)
+
+    had_live = diff.live_dir.exists()
+    if had_live:
+        os.replace(diff.live_dir, previous)
+    try:
+        os.replace(staged, diff.live_dir)
+    except OSError:
+        if had_live:
+            try:
+                os.replace(previous, diff.live_dir)
+            except OSError as e:
+                raise SwapError(diff.live_dir, previous) from e
+        raise
+
+
+def _previous_dir(root: Path, service: str) -> Path:
+    return root / "previous" / service
+
+
+def swapped_out(root: Path) -> list[Path]:
+    """Return the live directories a staging root holds.
+
+    A staging root left behind by an interrupted restore may still hold
+    live data that was swapped out and never put back, so it must not be
+    discarded blindly.
+
+    Args:
+        root: Staging root.
+
+    Returns:
+        Directories under root that were live before a swap.
+    """
+    previous = root / "previous"
+    if not previous.is_dir():
+        return []
+    return sorted(previous.iterdir())
+
+
+def discard(root: Path) -> None:
+    """Delete a staging root, including live directories swapped out."""
+    shutil.rmtree(root, ignore_errors=True)
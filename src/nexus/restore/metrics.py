@@ -0,0 +1,200 @@
+import logging
+import time
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from nexus.config import STATE_PATH
+from nexus.utils import load_state, save_state, write_prometheus_textfile
+
+logger = logging.getLogger(__name__)
+
+# Last known values, so a run that covers one plan or repo keeps the others
+BACKUP_METRICS_STATE_PATH = STATE_PATH / "backup-metrics.json"
+TEXTFILE_NAME = "nexus_backup.prom"
+
+
+@dataclass
+class PlanRun:
+    """One backup of a plan, as exported to Prometheus.
+
+    Attributes:
+        plan_id: ID of the Backrest plan.
+        repo_id: ID of the repo the plan backs up to.
+        finished_at: Unix time the backup finished.
+        duration: Wall-clock duration in seconds.
+        succeeded: Whether the backup succeeded.
+        data_added: Bytes added to the repository after deduplication.
+    """
+
+    plan_id: str
+    repo_id: str
+    finished_at: float
+    duration: float
+    succeeded: bool
+    data_added: int = 0
+
+
+@dataclass
+class RepoStats:
+    """Freshness and size of a repository, as exported to Prometheus.
+
+    Attributes:
+        repo_id: Repository ID.
+        refreshed_at: Unix time the stats were read.
+        snapshots: Number of snapshots in the repository.
+        latest_snapshot_id: ID of the newest snapshot, if any.
+        latest_snapshot_at: Unix time of the newest snapshot, if any.
+        size_bytes: Stored size of the repository, if known.
+    """
+
+    repo_id: str
+    refreshed_at: float
+    snapshots: int = 0
+    latest_snapshot_id: Optional[str] = None
+    latest_snapshot_at: Optional[float] = None
+    size_bytes: Optional[int] = None
+
+
+def known_repo_stats(
+    repo_id: str, state_path: Path = BACKUP_METRICS_STATE_PATH
+) -> Optional[RepoStats]:
+    """Return the stats last recorded for a repository.
+
+    Args:
+        repo_id: Repository ID.
+        state_path: Where backup metrics are kept.
+
+    Returns:
+        The recorded stats, or None if none were recorded yet.
+    """
+    data = load_state(state_path).get("repos", {}).get(repo_id)
+    if not data:
+        return None
+    try:
+        return RepoStats(**data)
+    except TypeError:
+        return None
+
+
+def _plan_samples(
+    plans: dict[str, dict[str, Any]],
+) -> list[tuple[str, str, list[tuple[dict[str, str], float]]]]:
+    def samples(key: str) -> list[tuple[dict[str, str], float]]:
+        return [
+            ({"plan": plan_id, "repo": p["repo_id"]}, p[key])
+            for plan_id, p in sorted(plans.items())
+            if p.get(key) is not None
+        ]
+
+    return [
+        (
+            "nexus_backup_last_success_timestamp_seconds",
+            "Unix time the plan's last successful backup finished.",
+            samples("last_success_at"),
+        ),
+        (
+            "nexus_backup_last_run_timestamp_seconds",
+            "Unix time the plan's last backup finished.",
+            samples("last_run_at"),
+        ),
+        (
+            "nexus_backup_last_run_success",
+            "Whether the plan's last backup succeeded (1) or failed (0).",
+            samples("last_run_success"),
+        ),
+        (
+            "nexus_backup_duration_seconds",
+            "Duration of the plan's last successful backup.",
+            samples("duration"),
+        ),
+        (
+            "nexus_backup_data_added_bytes",
+            "Bytes the plan's last successful backup added to its repository.",
+            samples("data_added"),
+        ),
+    ]
+
+
+def _repo_samples(
+    repos: dict[str, dict[str, Any]],
+) -> list[tuple[str, str, list[tuple[dict[str, str], float]]]]:
+    def samples(key: str) -> list[tuple[dict[str, str], float]]:
+        return [
+            ({"repo": repo_id}, r[key])
+            for repo_id, r in sorted(repos.items())
+            if r.get(key) is not None
+        ]
+
+    return [
+        (
+            "nexus_backup_repo_latest_snapshot_timestamp_seconds",
+            "Unix time of the newest snapshot in the repository.",
+            samples("latest_snapshot_at"),
+        ),
+        (
+            "nexus_backup_repo_snapshots",
+            "Number of snapshots in the repository.",
+            samples("snapshots"),
+        ),
+        (
+            "nexus_backup_repo_size_bytes",
+            "Stored size of the repository.",
+            samples("size_bytes"),
+        ),
+        (
+            "nexus_backup_repo_refresh_timestamp_seconds",
+            "Unix time the repository's stats were last read.",
+            samples("refreshed_at"),
+        ),
+    ]
+
+
+def record_backup_metrics(
+    textfile_dir: Path,
+    runs: Iterable[PlanRun] = (),
+    repos: Iterable[RepoStats] = (),
+    state_path: Path = BACKUP_METRICS_STATE_PATH,
+) -> Path:
+    """Record backup runs and repository stats and export them all.
+
+    Values are merged into state_path first, so the textfile always carries
+    every plan and repo last seen, not just those in this call.
+
+    Args:
+        textfile_dir: node-exporter's textfile collector directory.
+        runs: Backups that just finished.
+        repos: Repository stats that were just read.
+        state_path: Where backup metrics are kept between runs.
+
+    Returns:
+        Path to the written .prom file.
+    """
+    state = load_state(state_path)
+    plans = state.setdefault("plans", {})
+    for run in runs:
+        plan = plans.setdefault(run.plan_id, {})
+        plan.update(
+            repo_id=run.repo_id,
+            last_run_at=run.finished_at,
+            last_run_success=1 if run.succeeded else 0,
+        )
+        if run.succeeded:
+            plan.update(
+                last_success_at=run.finished_at,
+                duration=run.duration,
+                data_added=run.data_added,
+            )
+
+    repo_state = state.setdefault("repos", {})
+    for stats in repos:
+        repo_state[stats.repo_id] = asdict(stats)
+
+    state["updated_at"] = time.time()
+    save_state(state_path, state)
+
+    path = textfile_dir / TEXTFILE_NAME
+    write_prometheus_textfile(path, _plan_samples(plans) + _repo_samples(repo_state))
+    logger.debug(f"Backup metrics written to {path}")
+    return path
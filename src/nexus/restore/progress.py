@@ -0,0 +1,200 @@
+import json
+import logging
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Optional, TextIO
+
+from nexus.utils import format_size, stream_command
+
+logger = logging.getLogger(__name__)
+
+# Non-JSON output lines (e.g. restic errors on stderr) kept for error messages
+_ERROR_TAIL = 20
+
+
+@dataclass
+class ResticProgress:
+    """A progress update from `restic backup --json` or `restic restore --json`.
+
+    Attributes:
+        label: What is running (e.g., a plan or service name).
+        percent_done: Fraction done, from 0.0 to 1.0.
+        files_done: Files processed so far.
+        total_files: Files to process, once restic has counted them.
+        bytes_done: Bytes processed so far.
+        total_bytes: Bytes to process, once restic has counted them.
+        seconds_elapsed: Time since restic started.
+        seconds_remaining: restic's estimate of the time left, if given.
+    """
+
+    label: str
+    percent_done: float = 0.0
+    files_done: int = 0
+    total_files: int = 0
+    bytes_done: int = 0
+    total_bytes: int = 0
+    seconds_elapsed: float = 0.0
+    seconds_remaining: Optional[float] = None
+
+    @property
+    def rate(self) -> float:
+        """Bytes processed per second so far."""
+        if self.seconds_elapsed <= 0:
+            return 0.0
+        return self.bytes_done / self.seconds_elapsed
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Seconds left, from restic's estimate or the average rate."""
+        if self.seconds_remaining is not None:
+            return self.seconds_remaining
+        if self.rate <= 0 or not self.total_bytes:
+            return None
+        return max(0.0, (self.total_bytes - self.bytes_done) / self.rate)
+
+    @classmethod
+    def from_status(cls, label: str, message: dict[str, Any]) -> "ResticProgress":
+        # backup reports files_done/bytes_done, restore files_/bytes_restored
+        return cls(
+            label=label,
+            percent_done=float(message.get("percent_done", 0.0)),
+            files_done=message.get("files_done", message.get("files_restored", 0)),
+            total_files=message.get("total_files", 0),
+            bytes_done=message.get("bytes_done", message.get("bytes_restored", 0)),
+            total_bytes=message.get("total_bytes", 0),
+            seconds_elapsed=float(message.get("seconds_elapsed", 0.0)),
+            seconds_remaining=message.get("seconds_remaining"),
+        )
+
+
+def run_restic_json(
+    cmd: list[str],
+    on_progress: Optional[Callable[[ResticProgress], None]] = None,
+    label: str = "",
+) -> dict[str, Any]:
+    """Run a restic command with --json and follow its output as it streams.
+
+    Status lines are parsed one at a time and handed to on_progress, so
+    memory use doesn't grow with the length of the run.
+
+    Args:
+        cmd: Full restic command, including --json.
+        on_progress: Called with each status update.
+        label: Label for the progress updates.
+
+    Returns:
+        restic's summary message, or an empty dict if it printed none.
+
+    Raises:
+        subprocess.CalledProcessError: If restic fails. stderr holds the
+            last error lines restic printed.
+    """
+    summary: dict[str, Any] = {}
+    errors: deque[str] = deque(maxlen=_ERROR_TAIL)
+
+    try:
+        for line in stream_command(cmd, merge_stderr=True):
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                if line.strip():
+                    errors.append(line.strip())
+                continue
+            if not isinstance(message, dict):
+                continue
+
+            message_type = message.get("message_type")
+            if message_type == "status" and on_progress:
+                on_progress(ResticProgress.from_status(label, message))
+            elif message_type == "summary":
+                summary = message
+            elif message_type in ("error", "exit_error"):
+                error = message.get("error", {})
+                text = error.get("message") if isinstance(error, dict) else None
+                errors.append(text or message.get("message") or str(message))
+    except subprocess.CalledProcessError as e:
+        raise subprocess.CalledProcessError(
+            e.returncode, e.cmd, stderr="\n".join(errors)
+        ) from None
+
+    return summary
+
+
+def _format_eta(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "--:--"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+class ProgressPrinter:
+    """Renders progress of one or more concurrent restic runs on one line.
+
+    On a terminal the line is redrawn in place a few times a second;
+    otherwise (e.g. under cron) a plain line is written now and then, so
+    logs show the run is alive without filling up.
+
+    Args:
+        stream: Where to write. Defaults to stderr.
+        interval: Minimum seconds between updates. Defaults to 0.5 on a
+            terminal and 60 otherwise.
+    """
+
+    def __init__(
+        self, stream: Optional[TextIO] = None, interval: Optional[float] = None
+    ) -> None:
+        self._stream = stream or sys.stderr
+        self._tty = self._stream.isatty()
+        self._interval = (
+            interval if interval is not None else (0.5 if self._tty else 60.0)
+        )
+        self._latest: dict[str, ResticProgress] = {}
+        self._lock = threading.Lock()
+        self._last_render = float("-inf")
+        self._drawn = False
+
+    def __call__(self, progress: ResticProgress) -> None:
+        with self._lock:
+            self._latest[progress.label] = progress
+            now = time.monotonic()
+            if now - self._last_render < self._interval:
+                return
+            self._last_render = now
+            self._render()
+
+    def line(self) -> str:
+        """Return the current progress of every run as one line."""
+        parts = []
+        for progress in self._latest.values():
+            prefix = f"{progress.label}: " if progress.label else ""
+            total = format_size(progress.total_bytes) if progress.total_bytes else "?"
+            parts.append(
+                f"{prefix}{progress.percent_done:4.0%} "
+                f"{format_size(progress.bytes_done)}/{total} "
+                f"{progress.files_done} files "
+                f"{format_size(progress.rate)}/s "
+                f"ETA {_format_eta(progress.eta)}"
+            )
+        return " | ".join(parts)
+
+    def _render(self) -> None:
+        if self._tty:
+            self._stream.write(f"\r{self.line()}\x1b[K")
+            self._drawn = True
+        else:
+            self._stream.write(self.line() + "\n")
+        self._stream.flush()
+
+    def close(self) -> None:
+        """End the progress line so later output starts on a new one."""
+        with self._lock:
+            if self._drawn:
+                self._stream.write("\n")
+                self._stream.flush()
+                self._drawn = False
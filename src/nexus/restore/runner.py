@@ -0,0 +1,66 @@
+from dataclasses import dataclass
+from typing import Optional
+
+BACKREST_IMAGE = "ghcr.io/garethgeorge/backrest:latest"
+
+# Where the backrest container keeps restic's cache (XDG_CACHE_HOME=/cache)
+RESTIC_CACHE_DIR = "Config/backrest/cache"
+
+
+@dataclass(frozen=True)
+class ResticRunner:
+    """Runs restic against one repository in short-lived backrest containers.
+
+    Every container mounts the backrest service's cache directory as
+    restic's cache. Index and snapshot metadata that restic already fetched,
+    whether for a scheduled backup or an earlier command, are reused
+    instead of downloaded again, which matters most for the R2 repository.
+
+    Attributes:
+        data_dir: Path to the nexus data directory.
+        password: Restic repository password.
+        uri: Repository URI.
+        target: Repository ID ("local" or "r2").
+    """
+
+    data_dir: str
+    password: str
+    uri: str
+    target: str
+
+    def command(self, extra_mounts: Optional[list[str]] = None) -> list[str]:
+        """Return the command prefix that runs restic against the repository.
+
+        Args:
+            extra_mounts: Additional `docker run -v` mount specs.
+
+        Returns:
+            Everything up to the restic subcommand.
+        """
+        cmd = [
+            "docker",
+            "run",
+            "--rm",
+            "--entrypoint",
+            "restic",
+            "-v",
+            f"{self.data_dir}/Backups:/repos:ro",
+            "-v",
+            f"{self.data_dir}/{RESTIC_CACHE_DIR}:/cache",
+            "-e",
+            "XDG_CACHE_HOME=/cache",
+            "-e",
+            f"RESTIC_PASSWORD={self.password}",
+        ]
+        if self.target == "r2":
+            cmd.extend(
+                [
+                    "-v",
+                    f"{self.data_dir}/Config/backrest/rclone:/root/.config/rclone:ro",
+                ]
+            )
+        for mount in extra_mounts or []:
+            cmd.extend(["-v", mount])
+        # --no-lock: repos mount is :ro so restic cannot write a lock file
+        cmd.extend([BACKREST_IMAGE, "--no-lock", "-r", self.uri])
+        return cmd
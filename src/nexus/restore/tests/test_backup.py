@@ -1,17 +1,31 @@
 import json
+import subprocess
+import threading
+from collections.abc import Generator, Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+import nexus.restore.backup as backup_module
 from nexus.restore.backup import (
-    _get_config_dir_name,
     _get_container_names,
     _get_restore_config,
+    _restore_jobs,
+    _RestoreJob,
+    _run_restore_jobs,
+    export_backup_metrics,
     get_backrest_config,
+    get_config_dir_name,
     list_backups,
+    preview_restore,
+    prune_backups,
     push_backup,
     restore_backup,
 )
+from nexus.restore.incremental import SwapError
 
 SAMPLE_CONFIG = {
     "repos": [
@@ -40,13 +54,13 @@ SAMPLE_SNAPSHOTS = [
 
 class TestGetConfigDirName:
     def test_get_config_dir_name(self) -> None:
-        assert _get_config_dir_name("foundryvtt") == "foundryvtt"
+        assert get_config_dir_name("foundryvtt") == "foundryvtt"
 
     def test_get_config_dir_name_override(self) -> None:
-        assert _get_config_dir_name("backups") == "backrest"
+        assert get_config_dir_name("backups") == "backrest"
 
     def test_get_config_dir_name_unknown(self) -> None:
-        assert _get_config_dir_name("myservice") == "myservice"
+        assert get_config_dir_name("myservice") == "myservice"
 
 
 class TestGetContainerNames:
@@ -119,6 +133,35 @@ class TestGetBackrestConfig:
             get_backrest_config()
 
 
+@pytest.fixture(autouse=True)
+def restic_json_via_run_command() -> Generator[None, None, None]:
+    """Route streamed `restic --json` runs through the patched run_command.
+
+    run_restic_json itself is tested in test_progress.py. Here, its commands
+    are recorded in order with every other command, and the summary is
+    taken from the mocked stdout.
+    """
+
+    def fake(cmd: list[str], on_progress: Any = None, label: str = "") -> Any:
+        stdout = backup_module.run_command(cmd).stdout
+        if not isinstance(stdout, str):
+            return {}
+        for line in reversed(stdout.splitlines()):
+            message = json.loads(line)
+            if isinstance(message, dict) and message.get("message_type") == "summary":
+                return message
+        return {}
+
+    with patch("nexus.restore.backup.run_restic_json", side_effect=fake):
+        yield
+
+
+def _summary(**fields: object) -> str:
+    status = json.dumps({"message_type": "status", "percent_done": 0.5})
+    summary = json.dumps({"message_type": "summary", **fields})
+    return f"{status}\n{summary}\n"
+
+
 class TestPushBackup:
     @patch("nexus.restore.backup.run_command")
     @patch("nexus.restore.backup.get_backrest_config")
@@ -126,8 +169,13 @@ class TestPushBackup:
         self, mock_config: MagicMock, mock_run_command: MagicMock
     ) -> None:
         mock_config.return_value = SAMPLE_CONFIG
+        mock_run_command.return_value = MagicMock(
+            stdout=_summary(
+                snapshot_id="snap1", files_new=3, files_changed=2, data_added=4096
+            )
+        )
 
-        push_backup(target="local")
+        results = push_backup(target="local")
 
         calls = mock_run_command.call_args_list
         assert len(calls) == 2
@@ -142,6 +190,7 @@ class TestPushBackup:
             "/repos",
             "backup",
             "/userdata",
+            "--json",
         ]
         assert forget_cmd == [
             "docker",
@@ -155,6 +204,12 @@ class TestPushBackup:
             "3",
             "--prune",
         ]
+        assert len(results) == 1
+        assert results[0].plan_id == "daily-local"
+        assert results[0].snapshot_id == "snap1"
+        assert results[0].files_new == 3
+        assert results[0].files_changed == 2
+        assert results[0].data_added == 4096
 
     @patch("nexus.restore.backup.run_command")
     @patch("nexus.restore.backup.get_backrest_config")
@@ -162,29 +217,14 @@ class TestPushBackup:
         self, mock_config: MagicMock, mock_run_command: MagicMock
     ) -> None:
         mock_config.return_value = SAMPLE_CONFIG
+        mock_run_command.return_value = MagicMock(stdout=_summary())
 
         push_backup(target="r2")
 
         calls = mock_run_command.call_args_list
         assert len(calls) == 2
-        backup_cmd = calls[0][0][0]
-        forget_cmd = calls[1][0][0]
-        assert backup_cmd == [
-            "docker",
-            "exec",
-            "backrest",
-            "restic",
-            "-r",
-            "rclone:r2:my-bucket",
-            "backup",
-            "/userdata",
-        ]
-        assert forget_cmd == [
-            "docker",
-            "exec",
-            "backrest",
-            "restic",
-            "-r",
+        assert calls[0][0][0][5:7] == ["rclone:r2:my-bucket", "backup"]
+        assert calls[1][0][0][5:] == [
             "rclone:r2:my-bucket",
             "forget",
             "--keep-last",
@@ -198,13 +238,60 @@ class TestPushBackup:
         self, mock_config: MagicMock, mock_run_command: MagicMock
     ) -> None:
         mock_config.return_value = SAMPLE_CONFIG
+        mock_run_command.return_value = MagicMock(stdout=_summary())
 
-        push_backup(target="all")
+        results = push_backup(target="all")
 
         assert mock_run_command.call_count == 4
-        uris = [c[0][0][5] for c in mock_run_command.call_args_list]
-        assert "/repos" in uris
-        assert "rclone:r2:my-bucket" in uris
+        commands = [c[0][0] for c in mock_run_command.call_args_list]
+        # Both backups finish before any prune starts
+        assert [cmd[6] for cmd in commands] == ["backup", "backup", "forget", "forget"]
+        assert {cmd[5] for cmd in commands} == {"/repos", "rclone:r2:my-bucket"}
+        assert [r.plan_id for r in results] == ["daily-local", "daily-r2"]
+
+    @patch("nexus.restore.backup.run_command")
+    @patch("nexus.restore.backup.get_backrest_config")
+    def test_push_backup_runs_plans_concurrently(
+        self, mock_config: MagicMock, mock_run_command: MagicMock
+    ) -> None:
+        mock_config.return_value = SAMPLE_CONFIG
+        both_started = threading.Barrier(2, timeout=5)
+
+        def fake_run(cmd: list[str], capture: bool = False) -> MagicMock:
+            if "backup" in cmd:
+                # Deadlocks (and times out) unless both backups run at once
+                both_started.wait()
+            return MagicMock(stdout=_summary())
+
+        mock_run_command.side_effect = fake_run
+
+        results = push_backup(target="all", prune=False)
+
+        assert all(r.succeeded for r in results)
+        assert mock_run_command.call_count == 2
+
+    @patch("nexus.restore.backup.run_command")
+    @patch("nexus.restore.backup.get_backrest_config")
+    def test_push_backup_failure_skips_prune_for_plan(
+        self, mock_config: MagicMock, mock_run_command: MagicMock
+    ) -> None:
+        mock_config.return_value = SAMPLE_CONFIG
+
+        def fake_run(cmd: list[str], capture: bool = False) -> MagicMock:
+            if "backup" in cmd and "/repos" in cmd:
+                raise subprocess.CalledProcessError(1, cmd, stderr="repo locked")
+            return MagicMock(stdout=_summary())
+
+        mock_run_command.side_effect = fake_run
+
+        with pytest.raises(RuntimeError, match="daily-local"):
+            push_backup(target="all")
+
+        forgets = [
+            c[0][0] for c in mock_run_command.call_args_list if "forget" in c[0][0]
+        ]
+        assert len(forgets) == 1
+        assert "rclone:r2:my-bucket" in forgets[0]
 
     @patch("nexus.restore.backup.run_command")
     @patch("nexus.restore.backup.get_backrest_config")
@@ -221,6 +308,174 @@ class TestPushBackup:
         with pytest.raises(ValueError, match="Invalid target"):
             push_backup(target="invalid")
 
+    @patch("nexus.restore.backup.run_command")
+    @patch("nexus.restore.backup.get_backrest_config")
+    def test_push_backup_exports_failures_to_textfile(
+        self, mock_config: MagicMock, mock_run_command: MagicMock, tmp_path: Path
+    ) -> None:
+        mock_config.return_value = SAMPLE_CONFIG
+
+        def fake_run(cmd: list[str]) -> MagicMock:
+            if "rclone:r2:my-bucket" in cmd:
+                raise subprocess.CalledProcessError(1, cmd, stderr="R2 unreachable")
+            return MagicMock(stdout=_summary(snapshot_id="snap1", data_added=4096))
+
+        mock_run_command.side_effect = fake_run
+
+        with (
+            patch("nexus.restore.backup.record_backup_metrics") as mock_record,
+            pytest.raises(RuntimeError, match="daily-r2"),
+        ):
+            push_backup(target="all", prune=False, textfile_dir=tmp_path)
+
+        assert mock_record.call_args[0][0] == tmp_path
+        runs = {r.plan_id: r for r in mock_record.call_args.kwargs["runs"]}
+        assert runs["daily-local"].succeeded is True
+        assert runs["daily-local"].data_added == 4096
+        assert runs["daily-r2"].succeeded is False
+
+
+class TestPushBackupCopyMode:
+    @patch("nexus.restore.backup.run_command")
+    @patch("nexus.restore.backup.get_backrest_config")
+    def test_backs_up_once_then_copies(
+        self, mock_config: MagicMock, mock_run_command: MagicMock
+    ) -> None:
+        mock_config.return_value = SAMPLE_CONFIG
+        mock_run_command.return_value = MagicMock(
+            stdout=_summary(snapshot_id="newsnap")
+        )
+
+        results = push_backup(target="all", mode="copy")
+
+        commands = [c[0][0] for c in mock_run_command.call_args_list]
+        backups = [cmd for cmd in commands if "backup" in cmd]
+        assert len(backups) == 1
+        assert backups[0][5] == "/repos"
+        assert commands[1] == [
+            "docker",
+            "exec",
+            "backrest",
+            "restic",
+            "-r",
+            "rclone:r2:my-bucket",
+            "unlock",
+        ]
+        copy_cmd = commands[2]
+        assert copy_cmd[3:5] == ["sh", "-c"]
+        assert "copy --from-repo" in copy_cmd[5]
+        assert copy_cmd[7:] == ["rclone:r2:my-bucket", "/repos", "newsnap"]
+        # Each repo keeps its own retention
+        forgets = [cmd for cmd in commands if "forget" in cmd]
+        assert [(cmd[5], cmd[8]) for cmd in forgets] == [
+            ("/repos", "3"),
+            ("rclone:r2:my-bucket", "1"),
+        ]
+        assert [r.plan_id for r in results] == ["daily-local", "daily-r2"]
+        assert results[1].copied_from == "local"
+        assert results[1].snapshot_id == "newsnap"
+
+    @patch("nexus.restore.backup.run_command")
+    @patch("nexus.restore.backup.get_backrest_config")
+    def test_r2_target_copies_latest(
+        self, mock_config: MagicMock, mock_run_command: MagicMock
+    ) -> None:
+        mock_config.return_value = SAMPLE_CONFIG
+        mock_run_command.return_value = MagicMock(stdout="")
+
+        results = push_backup(target="r2", mode="copy", prune=False)
+
+        commands = [c[0][0] for c in mock_run_command.call_args_list]
+        assert not any("backup" in cmd for cmd in commands)
+        assert commands[-1][-1] == "latest"
+        assert [r.plan_id for r in results] == ["daily-r2"]
+
+    @patch("nexus.restore.backup.run_command")
+    @patch("nexus.restore.backup.get_backrest_config")
+    def test_source_failure_skips_copy(
+        self, mock_config: MagicMock, mock_run_command: MagicMock
+    ) -> None:
+        mock_config.return_value = SAMPLE_CONFIG
+        mock_run_command.side_effect = subprocess.CalledProcessError(
+            1, "restic", stderr="disk full"
+        )
+
+        with pytest.raises(RuntimeError, match="daily-local, daily-r2"):
+            push_backup(target="all", mode="copy")
+
+        assert mock_run_command.call_count == 1
+
+    @patch("nexus.restore.backup.get_backrest_config")
+    def test_requires_local_plan(self, mock_config: MagicMock) -> None:
+        mock_config.return_value = {
+            "repos": SAMPLE_CONFIG["repos"],
+            "plans": [SAMPLE_CONFIG["plans"][1]],
+        }
+
+        with pytest.raises(ValueError, match="local"):
+            push_backup(target="all", mode="copy")
+
+    def test_invalid_mode(self) -> None:
+        with pytest.raises(ValueError, match="Invalid mode"):
+            push_backup(mode="mirror")
+
+
+class TestPruneBackups:
+    @patch("nexus.restore.backup.run_command")
+    @patch("nexus.restore.backup.get_backrest_config")
+    def test_prune_backups(
+        self, mock_config: MagicMock, mock_run_command: MagicMock
+    ) -> None:
+        mock_config.return_value = SAMPLE_CONFIG
+
+        prune_backups(target="all")
+
+        commands = [c[0][0] for c in mock_run_command.call_args_list]
+        assert [cmd[6] for cmd in commands] == ["forget", "forget"]
+        assert "backup" not in {cmd[6] for cmd in commands}
+
+    @patch("nexus.restore.backup.run_command")
+    @patch("nexus.restore.backup.get_backrest_config")
+    def test_prune_backups_dry_run(
+        self, mock_config: MagicMock, mock_run_command: MagicMock
+    ) -> None:
+        mock_config.return_value = SAMPLE_CONFIG
+
+        prune_backups(target="local", dry_run=True)
+
+        mock_run_command.assert_not_called()
+
+
+def _fake_restic(snapshots: list[dict[str, str]]) -> Any:
+    """Answer `restic list snapshots` and `restic snapshots --json <ids>`."""
+
+    def fake(cmd: list[str], capture: bool = False) -> MagicMock:
+        if "list" in cmd:
+            return MagicMock(stdout="\n".join(s["id"] for s in snapshots))
+        if "snapshots" in cmd:
+            wanted = cmd[cmd.index("--json") + 1 :]
+            return MagicMock(
+                stdout=json.dumps([s for s in snapshots if s["id"] in wanted])
+            )
+        return MagicMock(stdout="")
+
+    return fake
+
+
+def _fake_ls(files: dict[str, list[tuple[str, int]]]) -> Any:
+    """Answer `restic ls --json <snapshot> <dirs>` with (path, size) files."""
+
+    def fake(cmd: list[str], check: bool = True) -> Iterator[str]:
+        snapshot_id = next(arg for arg in cmd if arg in files)
+        dirs = cmd[cmd.index(snapshot_id) + 1 :]
+        yield json.dumps({"struct_type": "snapshot", "id": snapshot_id})
+        for path, size in files[snapshot_id]:
+            if any(path.startswith(d + "/") for d in dirs):
+                node = {"struct_type": "node", "path": path, "type": "file"}
+                yield json.dumps({**node, "size": size})
+
+    return fake
+
 
 class TestListBackups:
     @patch("nexus.restore.backup.run_command")
@@ -231,12 +486,16 @@ class TestListBackups:
         mock_config_fn: MagicMock,
         mock_backrest_config: MagicMock,
         mock_run_command: MagicMock,
+        tmp_path: Path,
     ) -> None:
-        mock_config_fn.return_value = ("/data", "secret")
+        mock_config_fn.return_value = (str(tmp_path), "secret")
         mock_backrest_config.return_value = SAMPLE_CONFIG
-        mock_run_command.return_value = MagicMock(stdout=json.dumps(SAMPLE_SNAPSHOTS))
 
-        result = list_backups(target="local")
+        with patch(
+            "nexus.restore.catalog.run_command",
+            side_effect=_fake_restic(SAMPLE_SNAPSHOTS),
+        ) as mock_restic:
+            result = list_backups(target="local")
 
         assert len(result) == 2
         assert result[0] == {
@@ -245,47 +504,73 @@ class TestListBackups:
             "time": "2024-01-01T00:00:00Z",
         }
         assert result[1]["short_id"] == "def456"
-        cmd = mock_run_command.call_args[0][0]
+        cmd = mock_restic.call_args_list[0][0][0]
         assert "docker" in cmd
         assert "run" in cmd
         assert "--rm" in cmd
         assert "/repos" in cmd
-        assert "snapshots" in cmd
-        assert "--json" in cmd
+        assert cmd[-2:] == ["list", "snapshots"]
+        assert (tmp_path / "Config" / "nexus" / "snapshots-local.json").exists()
+
+    @patch("nexus.restore.backup.get_backrest_config")
+    @patch("nexus.restore.backup._get_restore_config")
+    def test_list_backups_uses_fresh_catalog(
+        self,
+        mock_config_fn: MagicMock,
+        mock_backrest_config: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        mock_config_fn.return_value = (str(tmp_path), "secret")
+        mock_backrest_config.return_value = SAMPLE_CONFIG
+
+        with patch(
+            "nexus.restore.catalog.run_command",
+            side_effect=_fake_restic(SAMPLE_SNAPSHOTS),
+        ) as mock_restic:
+            list_backups(target="local")
+            result = list_backups(target="local")
+            assert mock_restic.call_count == 2
+
+            list_backups(target="local", refresh=True)
+            # Refresh only lists IDs; nothing new to fetch
+            assert mock_restic.call_count == 3
+
+        assert len(result) == 2
 
-    @patch("nexus.restore.backup.run_command")
     @patch("nexus.restore.backup.get_backrest_config")
     @patch("nexus.restore.backup._get_restore_config")
     def test_list_backups_empty(
         self,
         mock_config_fn: MagicMock,
         mock_backrest_config: MagicMock,
-        mock_run_command: MagicMock,
+        tmp_path: Path,
     ) -> None:
-        mock_config_fn.return_value = ("/data", "secret")
+        mock_config_fn.return_value = (str(tmp_path), "secret")
         mock_backrest_config.return_value = SAMPLE_CONFIG
-        mock_run_command.return_value = MagicMock(stdout="[]")
 
-        result = list_backups()
+        with patch("nexus.restore.catalog.run_command", side_effect=_fake_restic([])):
+            result = list_backups()
 
         assert result == []
 
-    @patch("nexus.restore.backup.run_command")
     @patch("nexus.restore.backup.get_backrest_config")
     @patch("nexus.restore.backup._get_restore_config")
     def test_list_backups_r2_mounts_rclone(
         self,
         mock_config_fn: MagicMock,
         mock_backrest_config: MagicMock,
-        mock_run_command: MagicMock,
+        tmp_path: Path,
     ) -> None:
-        mock_config_fn.return_value = ("/data", "secret")
+        mock_config_fn.return_value = (str(tmp_path), "secret")
         mock_backrest_config.return_value = SAMPLE_CONFIG
-        mock_run_command.return_value = MagicMock(stdout=json.dumps(SAMPLE_SNAPSHOTS))
 
-        list_backups(target="r2")
+        with patch(
+            "nexus.restore.catalog.run_command",
+            side_effect=_fake_restic(SAMPLE_SNAPSHOTS),
+        ) as mock_restic:
+            list_backups(target="r2")
 
-        cmd = mock_run_command.call_args[0][0]
+        cmd = mock_restic.call_args[0][0]
         assert any("rclone" in arg for arg in cmd)
 
     @patch("nexus.restore.backup.run_command")
@@ -305,6 +590,78 @@ class TestListBackups:
         assert result == []
 
 
+class TestExportBackupMetrics:
+    @pytest.fixture
+    def restic(self, tmp_path: Path) -> Iterator[MagicMock]:
+        stats = json.dumps({"total_size": 123456, "snapshots_count": 2})
+        with (
+            patch(
+                "nexus.restore.backup._get_restore_config",
+                return_value=(str(tmp_path), "secret"),
+            ),
+            patch(
+                "nexus.restore.backup.get_backrest_config",
+                return_value=SAMPLE_CONFIG,
+            ),
+            patch(
+                "nexus.restore.catalog.run_command",
+                side_effect=_fake_restic(SAMPLE_SNAPSHOTS),
+            ),
+            patch(
+                "nexus.restore.backup.run_command",
+                return_value=MagicMock(stdout=stats),
+            ) as mock_run_command,
+        ):
+            yield mock_run_command
+
+    def test_exports_freshness_and_size(
+        self, restic: MagicMock, tmp_path: Path
+    ) -> None:
+        stats = export_backup_metrics(
+            target="local",
+            textfile_dir=tmp_path / "textfile",
+            state_path=tmp_path / "state.json",
+        )
+
+        assert len(stats) == 1
+        assert stats[0].snapshots == 2
+        assert stats[0].latest_snapshot_id == "def456full"
+        assert (
+            stats[0].latest_snapshot_at == datetime(2024, 1, 2, tzinfo=UTC).timestamp()
+        )
+        assert stats[0].size_bytes == 123456
+        assert restic.call_args[0][0][-4:] == ["stats", "--mode", "raw-data", "--json"]
+        prom = (tmp_path / "textfile" / "nexus_backup.prom").read_text()
+        assert 'nexus_backup_repo_size_bytes{repo="local"} 123456' in prom
+
+    def test_size_is_reused_while_snapshots_are_unchanged(
+        self, restic: MagicMock, tmp_path: Path
+    ) -> None:
+        kwargs = {
+            "textfile_dir": tmp_path / "textfile",
+            "state_path": tmp_path / "state.json",
+        }
+        export_backup_metrics(target="all", **kwargs)
+        export_backup_metrics(target="all", **kwargs)
+
+        # One `restic stats` per repo, on the first run only
+        assert restic.call_count == 2
+
+    def test_unreadable_repo_is_skipped(
+        self, restic: MagicMock, tmp_path: Path
+    ) -> None:
+        restic.side_effect = [
+            subprocess.CalledProcessError(1, "restic"),
+            MagicMock(stdout=json.dumps({"total_size": 1})),
+        ]
+
+        stats = export_backup_metrics(
+            textfile_dir=tmp_path / "textfile", state_path=tmp_path / "state.json"
+        )
+
+        assert [s.repo_id for s in stats] == ["r2"]
+
+
 class TestRestoreBackup:
     @patch("nexus.restore.backup.run_command")
     @patch("nexus.restore.backup.get_backrest_config")
@@ -348,20 +705,112 @@ class TestRestoreBackup:
         mock_config_fn: MagicMock,
         mock_backrest_config: MagicMock,
         mock_run_command: MagicMock,
+        tmp_path: Path,
     ) -> None:
-        mock_config_fn.return_value = ("/data", "secret")
+        mock_config_fn.return_value = (str(tmp_path), "secret")
         mock_backrest_config.return_value = SAMPLE_CONFIG
-        mock_run_command.return_value = MagicMock(
-            stdout=json.dumps([SAMPLE_SNAPSHOTS[0]])
-        )
 
-        restore_backup(snapshot_id="latest", services=["foundryvtt"], target="local")
+        files = {
+            "abc123full": [("/userdata/foundryvtt/world.db", 10)],
+            "def456full": [("/userdata/foundryvtt/world.db", 12)],
+        }
+        with (
+            patch(
+                "nexus.restore.catalog.run_command",
+                side_effect=_fake_restic(SAMPLE_SNAPSHOTS),
+            ),
+            patch("nexus.restore.catalog.stream_command", side_effect=_fake_ls(files)),
+        ):
+            restore_backup(
+                snapshot_id="latest", services=["foundryvtt"], target="local"
+            )
 
-        # First run_command call is the snapshots --latest 1 call
-        calls = mock_run_command.call_args_list
-        latest_cmd = calls[0][0][0]
-        assert "--latest" in latest_cmd
-        assert "1" in latest_cmd
+        restore_call = mock_run_command.call_args_list[1][0][0]
+        assert "def456full" in restore_call
+
+    @patch("nexus.restore.backup.run_command")
+    @patch("nexus.restore.backup.get_backrest_config")
+    @patch("nexus.restore.backup._get_restore_config")
+    def test_restore_backup_latest_skips_snapshot_without_service(
+        self,
+        mock_config_fn: MagicMock,
+        mock_backrest_config: MagicMock,
+        mock_run_command: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        mock_config_fn.return_value = (str(tmp_path), "secret")
+        mock_backrest_config.return_value = SAMPLE_CONFIG
+
+        files = {
+            "abc123full": [("/userdata/foundryvtt/world.db", 10)],
+            "def456full": [("/userdata/plex/library.db", 12)],
+        }
+        with (
+            patch(
+                "nexus.restore.catalog.run_command",
+                side_effect=_fake_restic(SAMPLE_SNAPSHOTS),
+            ),
+            patch("nexus.restore.catalog.stream_command", side_effect=_fake_ls(files)),
+        ):
+            restore_backup(
+                snapshot_id="latest", services=["foundryvtt"], target="local"
+            )
+
+        restore_call = mock_run_command.call_args_list[1][0][0]
+        assert "abc123full" in restore_call
+
+    @patch("nexus.restore.backup.run_command")
+    @patch("nexus.restore.backup.get_backrest_config")
+    @patch("nexus.restore.backup._get_restore_config")
+    def test_restore_backup_as_of(
+        self,
+        mock_config_fn: MagicMock,
+        mock_backrest_config: MagicMock,
+        mock_run_command: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        mock_config_fn.return_value = (str(tmp_path), "secret")
+        mock_backrest_config.return_value = SAMPLE_CONFIG
+
+        with patch(
+            "nexus.restore.catalog.run_command",
+            side_effect=_fake_restic(SAMPLE_SNAPSHOTS),
+        ):
+            restore_backup(
+                snapshot_id="latest",
+                target="local",
+                as_of=datetime(2024, 1, 1, 12, 0, tzinfo=UTC),
+            )
+
+        restore_calls = [
+            c[0][0] for c in mock_run_command.call_args_list if "restore" in c[0][0]
+        ]
+        assert restore_calls
+        assert all("abc123full" in cmd for cmd in restore_calls)
+
+    @patch("nexus.restore.backup.get_backrest_config")
+    @patch("nexus.restore.backup._get_restore_config")
+    def test_restore_backup_as_of_before_first_snapshot(
+        self,
+        mock_config_fn: MagicMock,
+        mock_backrest_config: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        mock_config_fn.return_value = (str(tmp_path), "secret")
+        mock_backrest_config.return_value = SAMPLE_CONFIG
+
+        with (
+            patch(
+                "nexus.restore.catalog.run_command",
+                side_effect=_fake_restic(SAMPLE_SNAPSHOTS),
+            ),
+            pytest.raises(RuntimeError, match="at or before"),
+        ):
+            restore_backup(
+                snapshot_id="latest",
+                target="local",
+                as_of=datetime(2023, 1, 1, tzinfo=UTC),
+            )
 
     @patch("nexus.restore.backup.run_command")
     @patch("nexus.restore.backup.get_backrest_config")
@@ -439,3 +888,289 @@ class TestRestoreBackup:
         ):
             with pytest.raises(ValueError, match="Repo 'unknown' not found"):
                 restore_backup(snapshot_id="abc123", target="unknown")
+
+
+class TestParallelRestore:
+    def test_jobs_in_dependency_order(self) -> None:
+        jobs = _restore_jobs(
+            ["dashboard", "traefik"], ["restic", "restore", "snap"], False
+        )
+
+        assert [j.name for j in jobs] == ["traefik", "dashboard"]
+        assert jobs[1].after == ["traefik"]
+        assert jobs[1].cmd[-2:] == ["--include", "/userdata/dashboard"]
+
+    def test_critical_services_come_first(self) -> None:
+        jobs = _restore_jobs(
+            ["jellyfin", "plex", "traefik", "vaultwarden"],
+            ["restic", "restore", "snap"],
+            False,
+        )
+        names = [j.name for j in jobs]
+
+        assert names.index("vaultwarden") < names.index("jellyfin")
+        assert names.index("traefik") < names.index("vaultwarden")
+
+    def test_critical_service_is_submitted_first(self) -> None:
+        jobs = _restore_jobs(
+            ["jellyfin", "vaultwarden"], ["restic", "restore", "snap"], False
+        )
+        submitted: list[str] = []
+        lock = threading.Lock()
+
+        def fake_restore(job: _RestoreJob, progress: object) -> None:
+            with lock:
+                submitted.append(job.name)
+
+        with (
+            patch("nexus.restore.backup._restore_job", side_effect=fake_restore),
+            patch("nexus.restore.backup.run_command"),
+        ):
+            _run_restore_jobs(jobs, parallelism=1)
+
+        assert submitted == ["vaultwarden", "jellyfin"]
+
+    def test_whole_snapshot_restores_other_data(self) -> None:
+        jobs = _restore_jobs(["traefik"], ["restic", "restore", "snap"], True)
+
+        assert jobs[-1].containers == []
+        assert jobs[-1].cmd[-2:] == ["--exclude", "/userdata/traefik"]
+
+    def test_service_restarts_without_waiting_for_others(self) -> None:
+        jobs = [
+            _RestoreJob("traefik", ["restore-traefik"], ["traefik"], []),
+            _RestoreJob("dashboard", ["restore-dashboard"], ["dashboard"], ["traefik"]),
+            _RestoreJob("vaultwarden", ["restore-vaultwarden"], ["vaultwarden"], []),
+        ]
+        vaultwarden_up = threading.Event()
+        events: list[str] = []
+        lock = threading.Lock()
+
+        def fake_run(cmd: list[str]) -> MagicMock:
+            if cmd == ["restore-traefik"]:
+                # The slow restore finishes only once vaultwarden is back up
+                assert vaultwarden_up.wait(timeout=5)
+            with lock:
+                events.append(" ".join(cmd))
+            if cmd == ["docker", "start", "vaultwarden"]:
+                vaultwarden_up.set()
+            return MagicMock()
+
+        with patch("nexus.restore.backup.run_command", side_effect=fake_run):
+            failed = _run_restore_jobs(jobs, parallelism=3)
+
+        assert failed == []
+        assert events.index("docker start vaultwarden") < events.index(
+            "restore-traefik"
+        )
+        assert events.index("docker start traefik") < events.index(
+            "docker start dashboard"
+        )
+
+    def test_failed_restore_still_starts_containers(self) -> None:
+        jobs = [_RestoreJob("plex", ["restore-plex"], ["plex"], [])]
+
+        def fake_run(cmd: list[str]) -> MagicMock:
+            if cmd == ["restore-plex"]:
+                raise subprocess.CalledProcessError(1, cmd)
+            return MagicMock()
+
+        with patch(
+            "nexus.restore.backup.run_command", side_effect=fake_run
+        ) as mock_run:
+            failed = _run_restore_jobs(jobs, parallelism=1)
+
+        assert failed == ["plex"]
+        assert mock_run.call_args_list[-1][0][0] == ["docker", "start", "plex"]
+
+
+class TestRestoreIncremental:
+    @patch("nexus.restore.backup.run_command")
+    @patch("nexus.restore.backup.get_backrest_config")
+    @patch("nexus.restore.backup._get_restore_config")
+    def test_nothing_changed_keeps_containers_running(
+        self,
+        mock_config_fn: MagicMock,
+        mock_backrest_config: MagicMock,
+        mock_run_command: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        mock_config_fn.return_value = (str(tmp_path), "secret")
+        mock_backrest_config.return_value = SAMPLE_CONFIG
+
+        with (
+            patch("nexus.restore.backup.diff_service") as mock_diff,
+            patch("nexus.restore.backup.stage") as mock_stage,
+        ):
+            mock_diff.return_value = MagicMock(changed=[], expected={"a": (1, 1)})
+            restore_backup(
+                snapshot_id="abc123full", services=["foundryvtt"], incremental=True
+            )
+
+        mock_stage.assert_not_called()
+        mock_run_command.assert_not_called()
+
+    @patch("nexus.restore.backup.run_command")
+    @patch("nexus.restore.backup.get_backrest_config")
+    @patch("nexus.restore.backup._get_restore_config")
+    def test_stops_containers_only_for_swap(
+        self,
+        mock_config_fn: MagicMock,
+        mock_backrest_config: MagicMock,
+        mock_run_command: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        mock_config_fn.return_value = (str(tmp_path), "secret")
+        mock_backrest_config.return_value = SAMPLE_CONFIG
+        events: list[str] = []
+        mock_run_command.side_effect = lambda cmd: events.append(cmd[1])
+
+        with (
+            patch("nexus.restore.backup.diff_service") as mock_diff,
+            patch(
+                "nexus.restore.backup.stage",
+                side_effect=lambda *a: events.append("stage"),
+            ),
+            patch(
+                "nexus.restore.backup.catch_up",
+                side_effect=lambda *a: events.append("catch_up") or 0,
+            ),
+            patch(
+                "nexus.restore.backup.swap",
+                side_effect=lambda *a: events.append("swap"),
+            ),
+        ):
+            mock_diff.return_value = MagicMock(
+                service="foundryvtt", changed=["world.db"], changed_bytes=10
+            )
+            restore_backup(
+                snapshot_id="abc123full", services=["foundryvtt"], incremental=True
+            )
+
+        assert events == ["stage", "stop", "catch_up", "swap", "start"]
+        assert not list((tmp_path / "Config").glob(".nexus-restore-*"))
+
+    @patch("nexus.restore.backup.run_command")
+    @patch("nexus.restore.backup.get_backrest_config")
+    @patch("nexus.restore.backup._get_restore_config")
+    def test_keeps_staging_root_holding_live_data(
+        self,
+        mock_config_fn: MagicMock,
+        mock_backrest_config: MagicMock,
+        mock_run_command: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        mock_config_fn.return_value = (str(tmp_path), "secret")
+        mock_backrest_config.return_value = SAMPLE_CONFIG
+        live = tmp_path / "Config" / "foundryvtt"
+
+        def fail_swap(root: Path, diff: object) -> None:
+            previous = root / "previous" / "foundryvtt"
+            previous.mkdir(parents=True)
+            (previous / "world.db").write_text("live")
+            raise SwapError(live, previous)
+
+        with (
+            patch("nexus.restore.backup.diff_service") as mock_diff,
+            patch("nexus.restore.backup.stage"),
+            patch("nexus.restore.backup.catch_up", return_value=0),
+            patch("nexus.restore.backup.swap", side_effect=fail_swap),
+            pytest.raises(SwapError),
+        ):
+            mock_diff.return_value = MagicMock(
+                service="foundryvtt", changed=["world.db"], changed_bytes=10
+            )
+            restore_backup(
+                snapshot_id="abc123full", services=["foundryvtt"], incremental=True
+            )
+
+        (kept,) = (tmp_path / "Config").glob(".nexus-restore-*")
+        assert (kept / "previous" / "foundryvtt" / "world.db").read_text() == "live"
+
+        # A retry refuses to discard it
+        with (
+            patch("nexus.restore.backup.diff_service") as mock_diff,
+            pytest.raises(RuntimeError, match="interrupted restore"),
+        ):
+            mock_diff.return_value = MagicMock(
+                service="foundryvtt", changed=["world.db"], changed_bytes=10
+            )
+            restore_backup(
+                snapshot_id="abc123full", services=["foundryvtt"], incremental=True
+            )
+        assert (kept / "previous" / "foundryvtt" / "world.db").exists()
+
+    @patch("nexus.restore.backup.run_command")
+    @patch("nexus.restore.backup.get_backrest_config")
+    @patch("nexus.restore.backup._get_restore_config")
+    def test_starts_containers_when_swap_fails(
+        self,
+        mock_config_fn: MagicMock,
+        mock_backrest_config: MagicMock,
+        mock_run_command: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        mock_config_fn.return_value = (str(tmp_path), "secret")
+        mock_backrest_config.return_value = SAMPLE_CONFIG
+
+        with (
+            patch("nexus.restore.backup.diff_service") as mock_diff,
+            patch("nexus.restore.backup.stage"),
+            patch("nexus.restore.backup.catch_up", return_value=0),
+            patch("nexus.restore.backup.swap", side_effect=OSError("busy")),
+            pytest.raises(OSError, match="busy"),
+        ):
+            mock_diff.return_value = MagicMock(
+                service="foundryvtt", changed=["world.db"], changed_bytes=10
+            )
+            restore_backup(
+                snapshot_id="abc123full", services=["foundryvtt"], incremental=True
+            )
+
+        assert mock_run_command.call_args_list[-1][0][0][:2] == ["docker", "start"]
+
+
+class TestPreviewRestore:
+    @patch("nexus.restore.backup.get_backrest_config")
+    @patch("nexus.restore.backup._get_restore_config")
+    def test_preview_counts_files_per_service(
+        self, mock_config_fn: MagicMock, mock_backrest_config: MagicMock
+    ) -> None:
+        mock_config_fn.return_value = ("/data", "secret")
+        mock_backrest_config.return_value = SAMPLE_CONFIG
+
+        files = {
+            "abc123full": [
+                ("/userdata/foundryvtt/world.db", 10),
+                ("/userdata/foundryvtt/assets/map.png", 30),
+                ("/userdata/backrest/config.json", 5),
+                ("/userdata/plex/library.db", 99),
+            ]
+        }
+        with patch("nexus.restore.catalog.stream_command", side_effect=_fake_ls(files)):
+            snapshot_id, previews = preview_restore(
+                snapshot_id="abc123full", services=["foundryvtt", "backups"]
+            )
+
+        assert snapshot_id == "abc123full"
+        assert [(p.service, p.files, p.bytes) for p in previews] == [
+            ("foundryvtt", 2, 40),
+            ("backups", 1, 5),
+        ]
+
+    @patch("nexus.restore.backup.get_backrest_config")
+    @patch("nexus.restore.backup._get_restore_config")
+    def test_preview_raises_when_restic_fails(
+        self, mock_config_fn: MagicMock, mock_backrest_config: MagicMock
+    ) -> None:
+        mock_config_fn.return_value = ("/data", "secret")
+        mock_backrest_config.return_value = SAMPLE_CONFIG
+
+        def failing(cmd: list[str], check: bool = False) -> Iterator[str]:
+            yield json.dumps({"struct_type": "snapshot", "id": "abc123full"})
+            if check:
+                raise subprocess.CalledProcessError(1, cmd)
+
+        with patch("nexus.restore.catalog.stream_command", side_effect=failing):
+            with pytest.raises(subprocess.CalledProcessError):
+                preview_restore(snapshot_id="abc123full", services=["foundryvtt"])
@@ -0,0 +1,214 @@
+import json
+import subprocess
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from nexus.restore.catalog import (
+    Snapshot,
+    catalog_path,
+    find_snapshot,
+    get_snapshots,
+    iter_snapshot_nodes,
+    refresh_catalog,
+    snapshot_contains,
+)
+
+RESTIC = ["restic", "-r", "/repos"]
+
+SNAPSHOT_DATA = [
+    {
+        "id": "aaa111full",
+        "short_id": "aaa111",
+        "time": "2026-10-01T03:00:00.123456789+00:00",
+        "paths": ["/userdata"],
+        "hostname": "nexus",
+        "summary": {"data_added": 100, "total_bytes_processed": 5000},
+    },
+    {
+        "id": "bbb222full",
+        "short_id": "bbb222",
+        "time": "2026-10-02T03:00:00Z",
+        "paths": ["/userdata"],
+        "tags": ["manual"],
+    },
+]
+
+
+def _snapshot(data: dict) -> Snapshot:
+    return Snapshot.from_restic(data)
+
+
+class TestSnapshot:
+    def test_from_restic(self) -> None:
+        snapshot = _snapshot(SNAPSHOT_DATA[0])
+
+        assert snapshot.paths == ["/userdata"]
+        assert snapshot.summary == {"data_added": 100, "total_bytes_processed": 5000}
+        assert snapshot.timestamp == datetime(2026, 10, 1, 3, 0, 0, 123456, UTC)
+
+    def test_catalog_path(self) -> None:
+        assert catalog_path("/data", "r2") == Path(
+            "/data/Config/nexus/snapshots-r2.json"
+        )
+
+
+class TestRefreshCatalog:
+    def test_fetches_only_new_snapshots(self, tmp_path: Path) -> None:
+        path = tmp_path / "catalog.json"
+        known = [_snapshot(SNAPSHOT_DATA[0])]
+
+        with patch("nexus.restore.catalog.run_command") as mock_run:
+            mock_run.side_effect = [
+                MagicMock(stdout="aaa111full\nbbb222full\n"),
+                MagicMock(stdout=json.dumps([SNAPSHOT_DATA[1]])),
+            ]
+            snapshots = refresh_catalog(path, RESTIC, known)
+
+        assert [s.id for s in snapshots] == ["aaa111full", "bbb222full"]
+        fetch_cmd = mock_run.call_args_list[1][0][0]
+        assert fetch_cmd == [*RESTIC, "snapshots", "--json", "bbb222full"]
+        saved = json.loads(path.read_text())
+        assert [s["id"] for s in saved["snapshots"]] == ["aaa111full", "bbb222full"]
+
+    def test_drops_forgotten_snapshots(self, tmp_path: Path) -> None:
+        known = [_snapshot(d) for d in SNAPSHOT_DATA]
+
+        with patch("nexus.restore.catalog.run_command") as mock_run:
+            mock_run.return_value = MagicMock(stdout="bbb222full\n")
+            snapshots = refresh_catalog(tmp_path / "catalog.json", RESTIC, known)
+
+        assert [s.id for s in snapshots] == ["bbb222full"]
+        mock_run.assert_called_once()
+
+
+class TestGetSnapshots:
+    def test_fresh_catalog_skips_repository(self, tmp_path: Path) -> None:
+        path = tmp_path / "catalog.json"
+        with patch("nexus.restore.catalog.run_command") as mock_run:
+            mock_run.side_effect = [
+                MagicMock(stdout="aaa111full\n"),
+                MagicMock(stdout=json.dumps([SNAPSHOT_DATA[0]])),
+            ]
+            get_snapshots(path, RESTIC)
+            snapshots = get_snapshots(path, RESTIC)
+
+        assert mock_run.call_count == 2
+        assert [s.id for s in snapshots] == ["aaa111full"]
+
+    def test_stale_catalog_refreshes(self, tmp_path: Path) -> None:
+        path = tmp_path / "catalog.json"
+        path.write_text(json.dumps({"refreshed_at": 0, "snapshots": []}))
+
+        with patch("nexus.restore.catalog.run_command") as mock_run:
+            mock_run.return_value = MagicMock(stdout="")
+            get_snapshots(path, RESTIC)
+
+        mock_run.assert_called_once()
+
+    def test_malformed_catalog_is_rebuilt(self, tmp_path: Path) -> None:
+        path = tmp_path / "catalog.json"
+        path.write_text(json.dumps({"refreshed_at": 9e12, "snapshots": [{"x": 1}]}))
+
+        with patch("nexus.restore.catalog.run_command") as mock_run:
+            mock_run.return_value = MagicMock(stdout="")
+            assert get_snapshots(path, RESTIC) == []
+
+        mock_run.assert_called_once()
+
+
+class TestFindSnapshot:
+    def test_latest(self) -> None:
+        snapshots = [_snapshot(d) for d in SNAPSHOT_DATA]
+
+        assert find_snapshot(snapshots).id == "bbb222full"
+
+    def test_as_of(self) -> None:
+        snapshots = [_snapshot(d) for d in SNAPSHOT_DATA]
+        as_of = datetime(2026, 10, 1, 12, 0, tzinfo=UTC)
+
+        assert find_snapshot(snapshots, as_of).id == "aaa111full"
+
+    def test_none_before_cutoff(self) -> None:
+        snapshots = [_snapshot(d) for d in SNAPSHOT_DATA]
+        as_of = datetime(2026, 9, 1, tzinfo=UTC)
+
+        assert find_snapshot(snapshots, as_of) is None
+
+    def test_predicate_checked_newest_first(self) -> None:
+        snapshots = [_snapshot(d) for d in SNAPSHOT_DATA]
+        checked: list[str] = []
+
+        def predicate(snapshot: Snapshot) -> bool:
+            checked.append(snapshot.id)
+            return snapshot.id == "aaa111full"
+
+        assert find_snapshot(snapshots, predicate=predicate).id == "aaa111full"
+        assert checked == ["bbb222full", "aaa111full"]
+
+
+class TestIterSnapshotNodes:
+    def test_yields_only_nodes(self) -> None:
+        lines = [
+            json.dumps({"struct_type": "snapshot", "id": "aaa111full"}),
+            "not json",
+            json.dumps({"struct_type": "node", "path": "/userdata/plex/a"}),
+        ]
+        with patch("nexus.restore.catalog.stream_command", return_value=iter(lines)):
+            nodes = list(iter_snapshot_nodes(RESTIC, "aaa111full", ["/userdata/plex"]))
+
+        assert nodes == [{"struct_type": "node", "path": "/userdata/plex/a"}]
+
+
+class TestSnapshotContains:
+    def test_result_is_memoized_in_catalog(self, tmp_path: Path) -> None:
+        path = tmp_path / "catalog.json"
+        snapshots = [_snapshot(d) for d in SNAPSHOT_DATA]
+        node = json.dumps({"struct_type": "node", "path": "/userdata/plex/a"})
+
+        with patch(
+            "nexus.restore.catalog.stream_command", return_value=iter([node])
+        ) as mock_stream:
+            found = snapshot_contains(
+                path, RESTIC, snapshots, snapshots[0], "/userdata/plex"
+            )
+            again = snapshot_contains(
+                path, RESTIC, snapshots, snapshots[0], "/userdata/plex"
+            )
+
+        assert found and again
+        mock_stream.assert_called_once()
+        saved = json.loads(path.read_text())
+        assert saved["snapshots"][0]["contains"] == {"/userdata/plex": True}
+
+    def test_failed_listing_is_not_memoized(self, tmp_path: Path) -> None:
+        path = tmp_path / "catalog.json"
+        snapshots = [_snapshot(d) for d in SNAPSHOT_DATA]
+
+        def failing(cmd: list[str], check: bool = False) -> Iterator[str]:
+            assert check is True
+            raise subprocess.CalledProcessError(1, cmd)
+            yield ""
+
+        with patch("nexus.restore.catalog.stream_command", side_effect=failing):
+            with pytest.raises(subprocess.CalledProcessError):
+                snapshot_contains(
+                    path, RESTIC, snapshots, snapshots[0], "/userdata/plex"
+                )
+
+        assert snapshots[0].contains == {}
+        assert not path.exists()
+
+    def test_path_outside_snapshot_skips_repository(self, tmp_path: Path) -> None:
+        snapshot = _snapshot(SNAPSHOT_DATA[0])
+
+        with patch("nexus.restore.catalog.stream_command") as mock_stream:
+            found = snapshot_contains(
+                tmp_path / "catalog.json", RESTIC, [snapshot], snapshot, "/etc/plex"
+            )
+
+        assert not found
+        mock_stream.assert_not_called()
@@ -0,0 +1,223 @@
+import json
+import os
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from nexus.restore.incremental import (
+    STAGING_MOUNT,
+    ServiceDiff,
+    SwapError,
+    catch_up,
+    diff_service,
+    stage,
+    staging_root,
+    swap,
+    swapped_out,
+)
+
+RESTIC = ["restic", "-r", "/repos"]
+MTIME = "2026-10-01T03:00:00.123456+00:00"
+MTIME_S = datetime.fromisoformat(MTIME).timestamp()
+
+# Snapshot contents of /userdata/plex
+SNAPSHOT = {
+    "a.txt": "same",
+    "b.txt": "from snapshot",
+    "c/d.txt": "missing live",
+}
+
+
+def _ls(snapshot: dict[str, str]) -> Any:
+    def fake(cmd: list[str], check: bool = True) -> Iterator[str]:
+        yield json.dumps({"struct_type": "snapshot", "id": "abc123full"})
+        yield json.dumps(
+            {"struct_type": "node", "path": "/userdata/plex/c", "type": "dir"}
+        )
+        for rel, content in snapshot.items():
+            yield json.dumps(
+                {
+                    "struct_type": "node",
+                    "path": f"/userdata/plex/{rel}",
+                    "type": "file",
+                    "size": len(content),
+                    "mtime": MTIME,
+                }
+            )
+
+    return fake
+
+
+def _restic_restore(root: Path, restored: list[list[str]]) -> Any:
+    """Write the snapshot version of every included file into staging."""
+
+    def fake(cmd: list[str]) -> MagicMock:
+        include = cmd[cmd.index("--include-file") + 1]
+        include_file = root / include.removeprefix(STAGING_MOUNT + "/")
+        paths = include_file.read_text().splitlines()
+        restored.append(paths)
+        for path in paths:
+            rel = path.removeprefix("/userdata/plex/")
+            target = root / path.lstrip("/")
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(SNAPSHOT[rel])
+            os.utime(target, (MTIME_S, MTIME_S))
+        return MagicMock()
+
+    return fake
+
+
+def _write(path: Path, content: str, snapshot_mtime: bool = False) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    if snapshot_mtime:
+        os.utime(path, (MTIME_S, MTIME_S))
+
+
+@pytest.fixture
+def live(tmp_path: Path) -> Path:
+    live_dir = tmp_path / "Config" / "plex"
+    _write(live_dir / "a.txt", "same", snapshot_mtime=True)
+    _write(live_dir / "b.txt", "edited since", snapshot_mtime=False)
+    _write(live_dir / "extra.txt", "not in snapshot")
+    return live_dir
+
+
+def _diff(live_dir: Path) -> ServiceDiff:
+    with patch("nexus.restore.catalog.stream_command", side_effect=_ls(SNAPSHOT)):
+        return diff_service(RESTIC, "abc123full", "plex", "/userdata/plex", live_dir)
+
+
+class TestDiffService:
+    def test_finds_changed_and_missing_files(self, live: Path) -> None:
+        diff = _diff(live)
+
+        assert diff.changed == ["b.txt", "c/d.txt"]
+        assert diff.changed_bytes == len("from snapshot") + len("missing live")
+        assert set(diff.expected) == set(SNAPSHOT)
+        assert diff.dirs == ["c"]
+
+    def test_missing_live_dir_changes_everything(self, tmp_path: Path) -> None:
+        diff = _diff(tmp_path / "nope")
+
+        assert diff.changed == list(SNAPSHOT)
+
+
+class TestStageAndSwap:
+    def test_full_cycle(self, live: Path) -> None:
+        root = staging_root(str(live.parent), "abc123full")
+        root.mkdir()
+        diff = _diff(live)
+        restored: list[list[str]] = []
+
+        with patch(
+            "nexus.restore.incremental.run_command",
+            side_effect=_restic_restore(root, restored),
+        ):
+            stage(RESTIC, root, "abc123full", diff)
+
+            staged = root / "userdata" / "plex"
+            assert (staged / "a.txt").samefile(live / "a.txt")
+            assert (staged / "b.txt").read_text() == "from snapshot"
+            assert (live / "b.txt").read_text() == "edited since"
+
+            # The service keeps running while staging
+            _write(live / "new.txt", "written during staging")
+            with (live / "a.txt").open("a") as f:
+                f.write(" but edited")
+            (live / "extra.txt").unlink()
+
+            assert catch_up(RESTIC, root, "abc123full", diff) == 1
+
+        swap(root, diff)
+
+        assert restored == [
+            ["/userdata/plex/b.txt", "/userdata/plex/c/d.txt"],
+            ["/userdata/plex/a.txt"],
+        ]
+        assert (live / "a.txt").read_text() == "same"
+        assert (live / "b.txt").read_text() == "from snapshot"
+        assert (live / "c" / "d.txt").read_text() == "missing live"
+        assert (live / "new.txt").read_text() == "written during staging"
+        assert not (live / "extra.txt").exists()
+        assert (root / "previous" / "plex" / "b.txt").read_text() == "edited since"
+
+    def test_entries_that_changed_type(self, tmp_path: Path) -> None:
+        live_dir = tmp_path / "Config" / "plex"
+        _write(live_dir / "a.txt", "same", snapshot_mtime=True)
+        # A directory live but a file in the snapshot, and the reverse
+        _write(live_dir / "b.txt" / "inner.txt", "live")
+        _write(live_dir / "c", "live file")
+        root = staging_root(str(live_dir.parent), "abc123full")
+        root.mkdir()
+        diff = _diff(live_dir)
+        restored: list[list[str]] = []
+
+        with patch(
+            "nexus.restore.incremental.run_command",
+            side_effect=_restic_restore(root, restored),
+        ):
+            stage(RESTIC, root, "abc123full", diff)
+
+            staged = root / "userdata" / "plex"
+            assert (staged / "b.txt").read_text() == "from snapshot"
+            assert (staged / "c" / "d.txt").read_text() == "missing live"
+            assert (live_dir / "b.txt" / "inner.txt").read_text() == "live"
+            assert (live_dir / "c").read_text() == "live file"
+
+            assert catch_up(RESTIC, root, "abc123full", diff) == 0
+
+        swap(root, diff)
+
+        assert (live_dir / "b.txt").read_text() == "from snapshot"
+        assert (live_dir / "c" / "d.txt").read_text() == "missing live"
+
+    def test_include_patterns_are_escaped(self, tmp_path: Path) -> None:
+        root = tmp_path / "staging"
+        root.mkdir()
+        diff = ServiceDiff(
+            service="plex",
+            snapshot_dir="/userdata/plex",
+            live_dir=tmp_path / "plex",
+            changed=["[draft]*.txt"],
+        )
+
+        with patch("nexus.restore.incremental.run_command"):
+            stage(RESTIC, root, "abc123full", diff)
+
+        include = (root / "include-plex.txt").read_text()
+        assert include == "/userdata/plex/\\[draft]\\*.txt\n"
+
+    def test_swap_restores_live_dir_on_failure(self, live: Path) -> None:
+        root = staging_root(str(live.parent), "abc123full")
+        diff = ServiceDiff(service="plex", snapshot_dir="/userdata/plex", live_dir=live)
+
+        # Nothing was staged, so moving the staged directory fails
+        with pytest.raises(OSError):
+            swap(root, diff)
+
+        assert (live / "extra.txt").exists()
+
+    def test_swap_keeps_live_data_when_rollback_fails(self, live: Path) -> None:
+        root = staging_root(str(live.parent), "abc123full")
+        diff = ServiceDiff(service="plex", snapshot_dir="/userdata/plex", live_dir=live)
+        real_replace = os.replace
+        calls: list[int] = []
+
+        def replace(src: Path, dst: Path) -> None:
+            calls.append(1)
+            if len(calls) > 1:
+                raise OSError("busy")
+            real_replace(src, dst)
+
+        with patch("nexus.restore.incremental.os.replace", side_effect=replace):
+            with pytest.raises(SwapError) as exc_info:
+                swap(root, diff)
+
+        assert exc_info.value.live_dir == live
+        assert (exc_info.value.previous / "extra.txt").exists()
+        assert swapped_out(root) == [exc_info.value.previous]
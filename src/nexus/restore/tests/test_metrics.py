@@ -0,0 +1,97 @@
+from pathlib import Path
+
+from nexus.restore.metrics import (
+    PlanRun,
+    RepoStats,
+    known_repo_stats,
+    record_backup_metrics,
+)
+
+
+def _series(prom: Path) -> dict[str, str]:
+    lines = prom.read_text().splitlines()
+    return dict(line.rsplit(" ", 1) for line in lines if not line.startswith("#"))
+
+
+class TestRecordBackupMetrics:
+    def test_exports_runs_and_repo_stats(self, tmp_path: Path) -> None:
+        state_path = tmp_path / "state.json"
+
+        prom = record_backup_metrics(
+            tmp_path / "textfile",
+            runs=[PlanRun("daily-r2", "r2", 1700000000.0, 42.5, True, 2048)],
+            repos=[
+                RepoStats(
+                    "r2",
+                    1700000100.0,
+                    snapshots=3,
+                    latest_snapshot_id="abc",
+                    latest_snapshot_at=1699999000.0,
+                    size_bytes=10_000,
+                )
+            ],
+            state_path=state_path,
+        )
+
+        series = _series(prom)
+        labels = '{plan="daily-r2",repo="r2"}'
+        assert series[f"nexus_backup_last_success_timestamp_seconds{labels}"] == (
+            "1700000000.0"
+        )
+        assert series[f"nexus_backup_last_run_success{labels}"] == "1"
+        assert series[f"nexus_backup_duration_seconds{labels}"] == "42.5"
+        assert series[f"nexus_backup_data_added_bytes{labels}"] == "2048"
+        assert series['nexus_backup_repo_size_bytes{repo="r2"}'] == "10000"
+        assert (
+            series['nexus_backup_repo_latest_snapshot_timestamp_seconds{repo="r2"}']
+            == "1699999000.0"
+        )
+        assert known_repo_stats("r2", state_path) == RepoStats(
+            "r2",
+            1700000100.0,
+            snapshots=3,
+            latest_snapshot_id="abc",
+            latest_snapshot_at=1699999000.0,
+            size_bytes=10_000,
+        )
+
+    def test_failure_keeps_last_success(self, tmp_path: Path) -> None:
+        state_path = tmp_path / "state.json"
+        textfile = tmp_path / "textfile"
+        record_backup_metrics(
+            textfile,
+            runs=[PlanRun("daily-r2", "r2", 100.0, 5.0, True, 10)],
+            state_path=state_path,
+        )
+
+        prom = record_backup_metrics(
+            textfile,
+            runs=[PlanRun("daily-r2", "r2", 200.0, 1.0, False)],
+            state_path=state_path,
+        )
+
+        series = _series(prom)
+        labels = '{plan="daily-r2",repo="r2"}'
+        assert series[f"nexus_backup_last_success_timestamp_seconds{labels}"] == "100.0"
+        assert series[f"nexus_backup_last_run_timestamp_seconds{labels}"] == "200.0"
+        assert series[f"nexus_backup_last_run_success{labels}"] == "0"
+        assert series[f"nexus_backup_duration_seconds{labels}"] == "5.0"
+
+    def test_plans_not_in_this_run_are_kept(self, tmp_path: Path) -> None:
+        state_path = tmp_path / "state.json"
+        textfile = tmp_path / "textfile"
+        record_backup_metrics(
+            textfile,
+            runs=[PlanRun("daily-local", "local", 100.0, 5.0, True)],
+            state_path=state_path,
+        )
+
+        prom = record_backup_metrics(
+            textfile,
+            runs=[PlanRun("daily-r2", "r2", 200.0, 9.0, True)],
+            state_path=state_path,
+        )
+
+        text = prom.read_text()
+        assert 'plan="daily-local"' in text
+        assert 'plan="daily-r2"' in text
@@ -0,0 +1,108 @@
+import io
+import json
+import subprocess
+from collections.abc import Iterator
+from unittest.mock import patch
+
+import pytest
+
+from nexus.restore.progress import ProgressPrinter, ResticProgress, run_restic_json
+
+BACKUP_STATUS = {
+    "message_type": "status",
+    "percent_done": 0.25,
+    "total_files": 40,
+    "files_done": 10,
+    "total_bytes": 4096,
+    "bytes_done": 1024,
+    "seconds_elapsed": 2,
+    "seconds_remaining": 6,
+}
+RESTORE_STATUS = {
+    "message_type": "status",
+    "percent_done": 0.5,
+    "total_files": 4,
+    "files_restored": 2,
+    "total_bytes": 2048,
+    "bytes_restored": 1024,
+    "seconds_elapsed": 4,
+}
+
+
+def _stream(lines: list[str], returncode: int = 0) -> Iterator[str]:
+    yield from lines
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, ["restic"])
+
+
+class TestResticProgress:
+    def test_backup_status(self) -> None:
+        progress = ResticProgress.from_status("local", BACKUP_STATUS)
+
+        assert progress.files_done == 10
+        assert progress.rate == 512
+        assert progress.eta == 6
+
+    def test_restore_status(self) -> None:
+        progress = ResticProgress.from_status("plex", RESTORE_STATUS)
+
+        assert progress.files_done == 2
+        assert progress.bytes_done == 1024
+        # No estimate from restic, so it's derived from the average rate
+        assert progress.eta == 4
+
+
+class TestRunResticJson:
+    def test_reports_progress_and_returns_summary(self) -> None:
+        lines = [
+            json.dumps(BACKUP_STATUS),
+            json.dumps({"message_type": "summary", "snapshot_id": "snap1"}),
+        ]
+        updates: list[ResticProgress] = []
+
+        with patch(
+            "nexus.restore.progress.stream_command", return_value=_stream(lines)
+        ) as mock_stream:
+            summary = run_restic_json(["restic", "--json"], updates.append, "local")
+
+        assert summary["snapshot_id"] == "snap1"
+        assert [u.label for u in updates] == ["local"]
+        assert mock_stream.call_args.kwargs["merge_stderr"] is True
+
+    def test_failure_keeps_error_lines(self) -> None:
+        lines = [
+            "Fatal: unable to open repository",
+            json.dumps({"message_type": "exit_error", "message": "repo locked"}),
+        ]
+
+        with (
+            patch(
+                "nexus.restore.progress.stream_command",
+                return_value=_stream(lines, returncode=1),
+            ),
+            pytest.raises(subprocess.CalledProcessError) as exc_info,
+        ):
+            run_restic_json(["restic", "--json"])
+
+        assert exc_info.value.stderr == "Fatal: unable to open repository\nrepo locked"
+
+
+class TestProgressPrinter:
+    def test_line_combines_runs(self) -> None:
+        printer = ProgressPrinter(stream=io.StringIO())
+        printer(ResticProgress.from_status("local", BACKUP_STATUS))
+        printer(ResticProgress.from_status("r2", RESTORE_STATUS))
+
+        line = printer.line()
+        assert line.startswith("local:  25% 1.0K/4.0K 10 files 512.0B/s ETA 0:06")
+        assert " | r2:  50%" in line
+
+    def test_throttles_plain_output(self) -> None:
+        stream = io.StringIO()
+        printer = ProgressPrinter(stream=stream, interval=3600)
+
+        for _ in range(3):
+            printer(ResticProgress.from_status("local", BACKUP_STATUS))
+        printer.close()
+
+        assert len(stream.getvalue().splitlines()) == 1
@@ -0,0 +1,27 @@
+from nexus.restore.runner import BACKREST_IMAGE, ResticRunner
+
+
+class TestResticRunner:
+    def test_command_shares_backrest_cache(self) -> None:
+        cmd = ResticRunner("/data", "secret", "/repos", "local").command()
+
+        assert cmd[:3] == ["docker", "run", "--rm"]
+        assert "/data/Config/backrest/cache:/cache" in cmd
+        assert "XDG_CACHE_HOME=/cache" in cmd
+        assert "RESTIC_PASSWORD=secret" in cmd
+        assert cmd[-4:] == [BACKREST_IMAGE, "--no-lock", "-r", "/repos"]
+        assert not any("rclone" in arg for arg in cmd)
+
+    def test_command_r2_mounts_rclone_config(self) -> None:
+        cmd = ResticRunner("/data", "secret", "rclone:r2:bucket", "r2").command()
+
+        assert "/data/Config/backrest/rclone:/root/.config/rclone:ro" in cmd
+
+    def test_command_extra_mounts(self) -> None:
+        cmd = ResticRunner("/data", "secret", "/repos", "local").command(
+            extra_mounts=["/data/Config:/userdata:rw"]
+        )
+
+        mount = cmd.index("/data/Config:/userdata:rw")
+        assert cmd[mount - 1] == "-v"
+        assert mount < cmd.index(BACKREST_IMAGE)
@@ -0,0 +1,309 @@
+import json
+import os
+import subprocess
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from nexus.restore.backup import RestorePreview
+from nexus.restore.runner import ResticRunner
+from nexus.restore.verify import (
+    SAMPLE_RESTORE_INTERVAL,
+    SampleRestoreResult,
+    check_slice,
+    cycle_coverage,
+    run_verification,
+    sample_restore,
+)
+from nexus.utils import load_state
+
+CONFIG = {
+    "repos": [
+        {"id": "local", "uri": "/repos"},
+        {"id": "r2", "uri": "rclone:r2:bucket"},
+    ]
+}
+MTIME = "2026-10-01T03:00:00+00:00"
+MTIME_S = datetime.fromisoformat(MTIME).timestamp()
+SNAPSHOT = {"a.txt": "alpha", "sub/b.txt": "bravo"}
+
+
+@pytest.fixture
+def mock_config() -> Iterator[MagicMock]:
+    with patch("nexus.restore.verify.get_backrest_config", return_value=CONFIG) as m:
+        yield m
+
+
+@pytest.fixture
+def mock_run_command() -> Iterator[MagicMock]:
+    with patch("nexus.restore.verify.run_command") as m:
+        yield m
+
+
+def _slices_checked(mock_run_command: MagicMock) -> list[tuple[str, str]]:
+    return [(c[0][0][5], c[0][0][-1]) for c in mock_run_command.call_args_list]
+
+
+class TestCheckSlice:
+    def test_passes(self, mock_run_command: MagicMock) -> None:
+        result = check_slice("local", "/repos", 3, 28)
+
+        assert result.passed is True
+        mock_run_command.assert_called_once_with(
+            [
+                "docker",
+                "exec",
+                "backrest",
+                "restic",
+                "-r",
+                "/repos",
+                "check",
+                "--read-data-subset=3/28",
+            ],
+            capture=True,
+        )
+
+    def test_failure_keeps_error(self, mock_run_command: MagicMock) -> None:
+        mock_run_command.side_effect = subprocess.CalledProcessError(
+            1, "restic", stderr="pack 1a2b: hash mismatch\n"
+        )
+
+        result = check_slice("local", "/repos", 3, 28)
+
+        assert result.passed is False
+        assert result.error == "pack 1a2b: hash mismatch"
+
+
+class TestRunVerification:
+    def test_rotates_slices_across_runs(
+        self, mock_config: MagicMock, mock_run_command: MagicMock, tmp_path: Path
+    ) -> None:
+        state_path = tmp_path / "verify.json"
+
+        for _ in range(4):
+            run_verification(slices=3, sample_restore_due=False, state_path=state_path)
+
+        assert _slices_checked(mock_run_command) == [
+            ("/repos", "--read-data-subset=1/3"),
+            ("rclone:r2:bucket", "--read-data-subset=1/3"),
+            ("/repos", "--read-data-subset=2/3"),
+            ("rclone:r2:bucket", "--read-data-subset=2/3"),
+            ("/repos", "--read-data-subset=3/3"),
+            ("rclone:r2:bucket", "--read-data-subset=3/3"),
+            ("/repos", "--read-data-subset=1/3"),
+            ("rclone:r2:bucket", "--read-data-subset=1/3"),
+        ]
+        state = load_state(state_path)
+        assert cycle_coverage(state["repos"]["local"]) == (3, 3)
+
+    def test_failed_slice_is_recorded_and_rotation_continues(
+        self, mock_config: MagicMock, mock_run_command: MagicMock, tmp_path: Path
+    ) -> None:
+        state_path = tmp_path / "verify.json"
+        mock_run_command.side_effect = subprocess.CalledProcessError(
+            1, "restic", stderr="hash mismatch"
+        )
+
+        report = run_verification(
+            target="local", slices=3, sample_restore_due=False, state_path=state_path
+        )
+
+        assert report.passed is False
+        repo_state = load_state(state_path)["repos"]["local"]
+        assert repo_state["next"] == 2
+        assert repo_state["results"]["1"]["error"] == "hash mismatch"
+        assert cycle_coverage(repo_state) == (0, 3)
+        assert "r2" not in load_state(state_path)["repos"]
+
+    def test_changing_slice_count_restarts_cycle(
+        self, mock_config: MagicMock, mock_run_command: MagicMock, tmp_path: Path
+    ) -> None:
+        state_path = tmp_path / "verify.json"
+        run_verification(
+            target="local", slices=3, sample_restore_due=False, state_path=state_path
+        )
+
+        run_verification(
+            target="local", slices=7, sample_restore_due=False, state_path=state_path
+        )
+
+        assert _slices_checked(mock_run_command)[-1][1] == "--read-data-subset=1/7"
+        assert list(load_state(state_path)["repos"]["local"]["results"]) == ["1"]
+
+    @patch("nexus.restore.verify.sample_restore")
+    def test_sample_restore_runs_when_due(
+        self,
+        mock_sample: MagicMock,
+        mock_config: MagicMock,
+        mock_run_command: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        state_path = tmp_path / "verify.json"
+        mock_sample.return_value = SampleRestoreResult(
+            service="homepage", snapshot_id="abc123"
+        )
+
+        first = run_verification(target="local", state_path=state_path)
+        second = run_verification(target="local", state_path=state_path)
+
+        assert first.sample_restore is mock_sample.return_value
+        assert second.sample_restore is None
+        mock_sample.assert_called_once_with(None)
+        state = load_state(state_path)
+        assert state["sample_restore"]["service"] == "homepage"
+
+        state["sample_restore"]["checked_at"] -= SAMPLE_RESTORE_INTERVAL
+        state_path.write_text(json.dumps(state))
+        run_verification(target="local", state_path=state_path)
+        assert mock_sample.call_count == 2
+
+
+def _ls(cmd: list[str], check: bool = True) -> Iterator[str]:
+    yield json.dumps({"struct_type": "snapshot", "id": "abc123full"})
+    yield json.dumps(
+        {"struct_type": "node", "path": "/userdata/homepage/sub", "type": "dir"}
+    )
+    for rel, content in SNAPSHOT.items():
+        yield json.dumps(
+            {
+                "struct_type": "node",
+                "path": f"/userdata/homepage/{rel}",
+                "type": "file",
+                "size": len(content),
+                "mtime": MTIME,
+            }
+        )
+
+
+def _write(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    os.utime(path, (MTIME_S, MTIME_S))
+
+
+def _restic_restore(restored: dict[str, str]) -> Any:
+    """Write the given files where restic would restore them."""
+
+    def fake(cmd: list[str]) -> MagicMock:
+        mount = next(m for m in cmd if m.endswith(":/verify:rw"))
+        scratch = Path(mount.split(":")[0])
+        for rel, content in restored.items():
+            _write(scratch / "userdata" / "homepage" / rel, content)
+        return MagicMock()
+
+    return fake
+
+
+class TestSampleRestore:
+    @pytest.fixture
+    def runner(self, tmp_path: Path) -> Iterator[ResticRunner]:
+        (tmp_path / "Config").mkdir()
+        runner = ResticRunner(str(tmp_path), "secret", "/repos", "local")
+        with (
+            patch("nexus.restore.verify.get_runner", return_value=runner),
+            patch("nexus.restore.verify.resolve_snapshot", return_value="abc123full"),
+            patch("nexus.restore.catalog.stream_command", side_effect=_ls),
+        ):
+            yield runner
+
+    def _live(self, runner: ResticRunner, files: dict[str, str]) -> Path:
+        live_dir = Path(runner.data_dir) / "Config" / "homepage"
+        for rel, content in files.items():
+            _write(live_dir / rel, content)
+        return live_dir
+
+    def test_matching_restore_passes(
+        self, runner: ResticRunner, mock_run_command: MagicMock
+    ) -> None:
+        self._live(runner, SNAPSHOT)
+        mock_run_command.side_effect = _restic_restore(SNAPSHOT)
+
+        result = sample_restore("homepage")
+
+        assert result.passed is True
+        assert (result.files, result.compared) == (2, 2)
+        cmd = mock_run_command.call_args[0][0]
+        assert cmd[-6:] == [
+            "abc123full",
+            "--target",
+            "/verify",
+            "--include",
+            "/userdata/homepage",
+            "--verify",
+        ]
+        # The scratch directory is removed afterwards
+        assert [p.name for p in (Path(runner.data_dir) / "Config").iterdir()] == [
+            "homepage"
+        ]
+
+    def test_checksum_mismatch_fails(
+        self, runner: ResticRunner, mock_run_command: MagicMock
+    ) -> None:
+        self._live(runner, SNAPSHOT)
+        mock_run_command.side_effect = _restic_restore(
+            {"a.txt": "ALPHA", "sub/b.txt": "bravo"}
+        )
+
+        result = sample_restore("homepage")
+
+        assert result.passed is False
+        assert result.mismatched == ["a.txt"]
+
+    def test_changed_live_files_are_not_compared(
+        self, runner: ResticRunner, mock_run_command: MagicMock
+    ) -> None:
+        live_dir = self._live(runner, SNAPSHOT)
+        (live_dir / "a.txt").write_text("edited since")
+        mock_run_command.side_effect = _restic_restore(SNAPSHOT)
+
+        result = sample_restore("homepage")
+
+        assert result.passed is True
+        assert (result.files, result.compared) == (2, 1)
+
+    def test_missing_restored_file_fails(
+        self, runner: ResticRunner, mock_run_command: MagicMock
+    ) -> None:
+        self._live(runner, SNAPSHOT)
+        mock_run_command.side_effect = _restic_restore({"a.txt": "alpha"})
+
+        result = sample_restore("homepage")
+
+        assert result.mismatched == ["sub/b.txt"]
+
+    @patch("nexus.restore.verify.preview_restore")
+    def test_defaults_to_smallest_service(
+        self,
+        mock_preview: MagicMock,
+        runner: ResticRunner,
+        mock_run_command: MagicMock,
+    ) -> None:
+        mock_preview.return_value = (
+            "abc123full",
+            [
+                RestorePreview("plex", files=900, bytes=10_000_000),
+                RestorePreview("empty"),
+                RestorePreview("homepage", files=2, bytes=10),
+            ],
+        )
+        self._live(runner, SNAPSHOT)
+        mock_run_command.side_effect = _restic_restore(SNAPSHOT)
+
+        result = sample_restore()
+
+        assert result.service == "homepage"
+        assert result.passed is True
+
+    def test_restic_failure_is_reported(
+        self, runner: ResticRunner, mock_run_command: MagicMock
+    ) -> None:
+        mock_run_command.side_effect = subprocess.CalledProcessError(1, "restic")
+
+        result = sample_restore("homepage")
+
+        assert result.passed is False
+        assert result.error
@@ -0,0 +1,333 @@
+import hashlib
+import logging
+import shutil
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from nexus.config import STATE_PATH
+from nexus.restore.backup import (
+    get_backrest_config,
+    get_config_dir_name,
+    get_runner,
+    get_snapshot_dir,
+    preview_restore,
+    resolve_snapshot,
+)
+from nexus.restore.incremental import ServiceDiff, diff_service, live_key
+from nexus.utils import load_state, run_command, save_state
+
+logger = logging.getLogger(__name__)
+
+VERIFY_STATE_PATH = STATE_PATH / "backup-verify.json"
+
+# One slice a night reads all pack data of a repo every four weeks
+DEFAULT_SLICES = 28
+# How often a verification run also restores a sample service
+SAMPLE_RESTORE_INTERVAL = 7 * 24 * 3600
+
+# Where the scratch directory is mounted in the restic container
+_SCRATCH_MOUNT = "/verify"
+
+
+@dataclass
+class SliceResult:
+    """Outcome of checking one slice of a repository's data.
+
+    Attributes:
+        repo_id: Repository ID (e.g., "local" or "r2").
+        slice: 1-based slice number checked.
+        slices: Number of slices the repository's data is split into.
+        passed: Whether `restic check` succeeded.
+        duration: Wall-clock duration in seconds.
+        error: restic's error output if the check failed.
+    """
+
+    repo_id: str
+    slice: int
+    slices: int
+    passed: bool = False
+    duration: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class SampleRestoreResult:
+    """Outcome of restoring one service into a scratch directory.
+
+    Attributes:
+        service: Service that was restored.
+        snapshot_id: Snapshot it was restored from.
+        files: Files restored with the size recorded in the snapshot.
+        compared: Files whose checksum was compared with the live copy.
+            Only files unchanged since the snapshot (same size and mtime)
+            are compared.
+        mismatched: Relative paths of files missing, of the wrong size, or
+            whose checksum differs from the live copy.
+        duration: Wall-clock duration in seconds.
+        error: Why the sample restore could not run, if it couldn't.
+    """
+
+    service: str
+    snapshot_id: str = ""
+    files: int = 0
+    compared: int = 0
+    mismatched: list[str] = field(default_factory=list)
+    duration: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def passed(self) -> bool:
+        return self.error is None and not self.mismatched
+
+
+@dataclass
+class VerifyReport:
+    """Results of one verification run.
+
+    Attributes:
+        slices: One result per repository checked.
+        sample_restore: The sample restore, if one was due or requested.
+    """
+
+    slices: list[SliceResult] = field(default_factory=list)
+    sample_restore: Optional[SampleRestoreResult] = None
+
+    @property
+    def passed(self) -> bool:
+        restored = self.sample_restore is None or self.sample_restore.passed
+        return restored and all(s.passed for s in self.slices)
+
+
+def _check_cmd(uri: str, slice_number: int, slices: int) -> list[str]:
+    return [
+        "docker",
+        "exec",
+        "backrest",
+        "restic",
+        "-r",
+        uri,
+        "check",
+        f"--read-data-subset={slice_number}/{slices}",
+    ]
+
+
+def check_slice(repo_id: str, uri: str, slice_number: int, slices: int) -> SliceResult:
+    """Check repository structure and read back one slice of its pack data.
+
+    Args:
+        repo_id: Repository ID.
+        uri: Repository URI.
+        slice_number: 1-based slice to read.
+        slices: Number of slices the pack data is split into.
+
+    Returns:
+        The check result.
+    """
+    result = SliceResult(repo_id=repo_id, slice=slice_number, slices=slices)
+    logger.info(f"Checking repo '{repo_id}' data slice {slice_number}/{slices}")
+    start = time.perf_counter()
+    try:
+        run_command(_check_cmd(uri, slice_number, slices), capture=True)
+        result.passed = True
+    except subprocess.CalledProcessError as e:
+        result.error = (e.stderr or str(e)).strip()
+    finally:
+        result.duration = time.perf_counter() - start
+    return result
+
+
+def _sha256(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _smallest_service(snapshot_id: str, target: str) -> str:
+    _, previews = preview_restore(snapshot_id=snapshot_id, target=target)
+    candidates = [p for p in previews if p.files]
+    if not candidates:
+        raise RuntimeError(f"Snapshot {snapshot_id} has no service data")
+    return min(candidates, key=lambda p: p.bytes).service
+
+
+def sample_restore(
+    service: Optional[str] = None, target: str = "local"
+) -> SampleRestoreResult:
+    """Restore a service from the latest snapshot and compare it with live data.
+
+    The service is restored into a scratch directory with `restic restore
+    --verify`, which rereads every restored file and checks it against the
+    snapshot. Each file must then exist with the size the snapshot records,
+    and files that haven't changed since the snapshot must match the live
+    copy byte for byte (SHA-256).
+
+    Args:
+        service: Service to restore. Defaults to the service with the least
+            data in the snapshot.
+        target: Repository to restore from ("local" or "r2").
+
+    Returns:
+        The sample restore result. Failures are reported in the result rather
+        than raised.
+    """
+    result = SampleRestoreResult(service=service or "")
+    start = time.perf_counter()
+    scratch: Optional[Path] = None
+    try:
+        runner = get_runner(target)
+        result.snapshot_id = resolve_snapshot(
+            runner, services=[service] if service else None
+        )
+        if not service:
+            service = result.service = _smallest_service(result.snapshot_id, target)
+        logger.info(f"Sample-restoring {service} from snapshot {result.snapshot_id}")
+
+        snapshot_dir = get_snapshot_dir(service)
+        live_dir = Path(runner.data_dir) / "Config" / get_config_dir_name(service)
+        diff = diff_service(
+            runner.command(), result.snapshot_id, service, snapshot_dir, live_dir
+        )
+
+        # Inside the config dir, which the Docker daemon can always mount
+        scratch = Path(
+            tempfile.mkdtemp(prefix=".nexus-verify-", dir=f"{runner.data_dir}/Config")
+        )
+        run_command(
+            [
+                *runner.command(extra_mounts=[f"{scratch}:{_SCRATCH_MOUNT}:rw"]),
+                "restore",
+                result.snapshot_id,
+                "--target",
+                _SCRATCH_MOUNT,
+                "--include",
+                snapshot_dir,
+                "--verify",
+            ]
+        )
+        _compare_restored(result, scratch / snapshot_dir.lstrip("/"), live_dir, diff)
+    except (subprocess.CalledProcessError, RuntimeError, ValueError, OSError) as e:
+        result.error = str(e)
+    finally:
+        if scratch:
+            shutil.rmtree(scratch, ignore_errors=True)
+        result.duration = time.perf_counter() - start
+    return result
+
+
+def _compare_restored(
+    result: SampleRestoreResult, restored_dir: Path, live_dir: Path, diff: ServiceDiff
+) -> None:
+    changed = set(diff.changed)
+    for rel, (size, _) in diff.expected.items():
+        restored = restored_dir / rel
+        if not restored.is_file() or restored.stat().st_size != size:
+            result.mismatched.append(rel)
+            continue
+        result.files += 1
+        if rel in changed:
+            continue
+
+        live = live_dir / rel
+        try:
+            matches = _sha256(restored) == _sha256(live)
+        except FileNotFoundError:
+            continue
+        # A service may have written the file since it was diffed
+        if live_key(live) != diff.expected[rel]:
+            continue
+        result.compared += 1
+        if not matches:
+            result.mismatched.append(rel)
+
+
+def _next_slice(repo_state: dict[str, Any], slices: int) -> int:
+    if repo_state.get("slices") != slices:
+        # Slicing changed, so earlier results cover different data
+        repo_state.clear()
+        repo_state["slices"] = slices
+    return int(repo_state.get("next", 1))
+
+
+def cycle_coverage(repo_state: dict[str, Any]) -> tuple[int, int]:
+    """Return how many slices of a repository passed, out of how many.
+
+    Args:
+        repo_state: The repository's entry in the verification state.
+
+    Returns:
+        Tuple of (slices whose latest check passed, total slices).
+    """
+    slices = int(repo_state.get("slices", 0))
+    results = repo_state.get("results", {})
+    passed = sum(1 for r in results.values() if r.get("passed"))
+    return passed, slices
+
+
+def run_verification(
+    target: str = "all",
+    slices: int = DEFAULT_SLICES,
+    sample_restore_due: Optional[bool] = None,
+    service: Optional[str] = None,
+    state_path: Path = VERIFY_STATE_PATH,
+) -> VerifyReport:
+    """Verify the next data slice of each repository, rotating across runs.
+
+    Each run checks repository structure and reads one `--read-data-subset`
+    slice of pack data, then moves on to the next slice for the following
+    run, so nightly I/O stays bounded while every pack is read once per
+    cycle of `slices` runs. The next slice and each slice's latest result
+    are kept in state_path. A sample restore of one service from the local
+    repo is added every SAMPLE_RESTORE_INTERVAL.
+
+    Args:
+        target: Repository to verify: "local", "r2", or "all".
+        slices: Number of slices each repository's data is split into.
+        sample_restore_due: Force (True) or skip (False) the sample restore.
+            Defaults to running it when SAMPLE_RESTORE_INTERVAL has passed.
+        service: Service for the sample restore. Defaults to the smallest one.
+        state_path: Where verification state is kept.
+
+    Returns:
+        The verification report.
+
+    Raises:
+        RuntimeError: If the Backrest config cannot be read.
+    """
+    config = get_backrest_config()
+    state = load_state(state_path)
+    repos_state = state.setdefault("repos", {})
+    report = VerifyReport()
+
+    for repo in config.get("repos", []):
+        if target not in ("all", repo["id"]):
+            continue
+        repo_state = repos_state.setdefault(repo["id"], {})
+        slice_number = _next_slice(repo_state, slices)
+
+        result = check_slice(repo["id"], repo["uri"], slice_number, slices)
+        report.slices.append(result)
+
+        repo_state.setdefault("results", {})[str(slice_number)] = {
+            "passed": result.passed,
+            "checked_at": time.time(),
+            "error": result.error,
+        }
+        repo_state["next"] = slice_number % slices + 1
+
+    last_restore = state.get("sample_restore", {}).get("checked_at", 0)
+    if sample_restore_due is None:
+        sample_restore_due = time.time() - last_restore >= SAMPLE_RESTORE_INTERVAL
+    if sample_restore_due:
+        report.sample_restore = sample_restore(service)
+        state["sample_restore"] = {
+            "checked_at": time.time(),
+            "service": report.sample_restore.service,
+            "snapshot_id": report.sample_restore.snapshot_id,
+            "passed": report.sample_restore.passed,
+        }
+
+    save_state(state_path, state)
+    return report
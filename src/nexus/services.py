@@ -1,10 +1,10 @@
+import threading
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Optional
 
-import yaml
-
 from nexus.config import SERVICES_PATH
+from nexus.loader import load_yaml_file
 
 
 @dataclass
@@ -19,6 +19,8 @@ class ServiceManifest:
         access_groups: List of groups allowed access.
         is_public: Whether service is publicly accessible.
         dependencies: List of service names this service depends on.
+        critical: Whether a restore brings this service back before the
+            others.
         path: Path to the service directory.
         icon: Dashboard icon identifier (e.g., 'si-plex').
         display_name: Optional human-readable display name.
@@ -37,6 +39,7 @@ class ServiceManifest:
     access_groups: list[str] = field(default_factory=list)
     is_public: bool = False
     dependencies: list[str] = field(default_factory=list)
+    critical: bool = False
     path: Path = field(default_factory=Path)
     # Dashboard configuration
     icon: str = "mdi-application"
@@ -59,8 +62,7 @@ class ServiceManifest:
             FileNotFoundError: If the manifest doesn't exist.
             ValueError: If required fields are missing.
         """
-        with open(path) as f:
-            data = yaml.safe_load(f)
+        data = load_yaml_file(path)
 
         # Handle subdomain/subdomains flexibility
         subdomains = []
@@ -87,6 +89,7 @@ class ServiceManifest:
             access_groups=access_groups,
             is_public=is_public,
             dependencies=data.get("dependencies", []),
+            critical=data.get("critical", False),
             path=path.parent,
             icon=data.get("icon", "mdi-application"),
             display_name=data.get("display_name", ""),
@@ -104,35 +107,133 @@ class ServiceManifest:
         return bool(self.subdomains) or self.is_public
 
 
+# Identifies a file's contents without reading it: (mtime_ns, size, inode)
+_StatKey = tuple[int, int, int]
+
+
+def _stat_key(path: Path) -> _StatKey:
+    st = path.stat()
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class ManifestRegistry:
+    """Process-wide cache of parsed service manifests.
+
+    Each service.yml is parsed once and reused for as long as its mtime,
+    size and inode are unchanged. The services directory listing is reused
+    while the directory's own mtime is unchanged, so repeated discovery
+    costs one stat per manifest. Invalid manifests are remembered too, so
+    they aren't re-parsed on every call.
+
+    Manifests returned are shared between callers and must not be modified.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._listings: dict[Path, tuple[int, list[Path]]] = {}
+        self._manifests: dict[Path, tuple[_StatKey, Optional[ServiceManifest]]] = {}
+
+    def _service_dirs(self, services_path: Path) -> list[Path]:
+        mtime = services_path.stat().st_mtime_ns
+        cached = self._listings.get(services_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        dirs = [d for d in services_path.iterdir() if d.is_dir()]
+        self._listings[services_path] = (mtime, dirs)
+        return dirs
+
+    def _manifest(self, manifest_path: Path) -> Optional[ServiceManifest]:
+        try:
+            key = _stat_key(manifest_path)
+        except FileNotFoundError:
+            self._manifests.pop(manifest_path, None)
+            return None
+
+        cached = self._manifests.get(manifest_path)
+        if cached and cached[0] == key:
+            return cached[1]
+
+        manifest: Optional[ServiceManifest]
+        try:
+            manifest = ServiceManifest.from_yaml(manifest_path)
+        except (KeyError, ValueError):
+            # Skip invalid manifests
+            manifest = None
+        self._manifests[manifest_path] = (key, manifest)
+        return manifest
+
+    def discover(self, services_path: Path) -> dict[str, ServiceManifest]:
+        """Return the manifests under a services directory.
+
+        Args:
+            services_path: Path to the services directory.
+
+        Returns:
+            Dictionary mapping service name to its manifest. The dictionary is
+            new on every call; the manifests in it are shared.
+        """
+        services = {}
+        with self._lock:
+            for service_dir in self._service_dirs(services_path):
+                manifest = self._manifest(service_dir / "service.yml")
+                if manifest:
+                    services[manifest.name] = manifest
+        return services
+
+    def invalidate(self, path: Optional[Path] = None) -> None:
+        """Forget cached manifests so they are re-read on next discovery.
+
+        Args:
+            path: A manifest, service directory or services directory to
+                forget. Forgets everything if None.
+        """
+        with self._lock:
+            if path is None:
+                self._listings.clear()
+                self._manifests.clear()
+                return
+            self._listings.pop(path, None)
+            self._listings.pop(path.parent, None)
+            for cached in list(self._manifests):
+                if path in (cached, cached.parent, cached.parent.parent):
+                    del self._manifests[cached]
+
+
+_registry = ManifestRegistry()
+
+
 def discover_services(
     services_path: Optional[Path] = None,
 ) -> dict[str, ServiceManifest]:
     """Discover all services with manifest files.
 
+    Manifests come from a process-wide ManifestRegistry, so only those
+    changed on disk since the last call are parsed again.
+
     Args:
         services_path: Path to services directory. Defaults to SERVICES_PATH.
 
     Returns:
-        Dictionary mapping service name to its manifest.
+        Dictionary mapping service name to its manifest. Manifests are shared
+        between callers and must not be modified.
     """
     if services_path is None:
         services_path = SERVICES_PATH
 
-    services = {}
-    for service_dir in services_path.iterdir():
-        if not service_dir.is_dir():
-            continue
+    return _registry.discover(services_path)
 
-        manifest_path = service_dir / "service.yml"
-        if manifest_path.exists():
-            try:
-                manifest = ServiceManifest.from_yaml(manifest_path)
-                services[manifest.name] = manifest
-            except (yaml.YAMLError, KeyError, ValueError):
-                # Skip invalid manifests
-                continue
 
-    return services
+def invalidate_manifests(path: Optional[Path] = None) -> None:
+    """Drop cached manifests, e.g. after editing a service.yml in-process.
+
+    Edits are picked up automatically when the file's mtime or size changes;
+    this is for writes that might not change either.
+
+    Args:
+        path: A manifest, service directory or services directory to forget.
+            Forgets everything if None.
+    """
+    _registry.invalidate(path)
 
 
 def get_all_service_names(services_path: Optional[Path] = None) -> list[str]:
@@ -197,21 +298,10 @@ def resolve_dependencies(
         all_services: Dictionary of all available services.
 
     Returns:
-        List of service names including all dependencies.
+        List of service names including all dependencies, in start order.
+        Services in a dependency cycle come last, alphabetically.
     """
-    resolved = set()
-    to_process = list(service_names)
-
-    while to_process:
-        name = to_process.pop(0)
-        if name in resolved:
-            continue
-
-        resolved.add(name)
-
-        if name in all_services:
-            for dep in all_services[name].dependencies:
-                if dep not in resolved:
-                    to_process.append(dep)
+    # Import here to avoid circular imports
+    from nexus.graph import ServiceGraph
 
-    return sorted(resolved)
+    return ServiceGraph(all_services).closure(service_names, strict=False)
@@ -0,0 +1,159 @@
+from pathlib import Path
+
+import pytest
+
+from nexus.graph import CycleError, ServiceGraph, get_service_graph
+from nexus.services import ServiceManifest, invalidate_manifests
+
+
+def _manifests(**dependencies: list[str]) -> dict[str, ServiceManifest]:
+    return {
+        name: ServiceManifest(name=name, description="", category="", dependencies=deps)
+        for name, deps in dependencies.items()
+    }
+
+
+@pytest.fixture
+def graph() -> ServiceGraph:
+    # traefik <- auth <- dashboard, traefik <- plex
+    return ServiceGraph(
+        _manifests(
+            traefik=[],
+            auth=["traefik"],
+            dashboard=["auth", "traefik"],
+            plex=["traefik"],
+        ),
+        {
+            "core": ["traefik", "auth"],
+            "home": {"extends": "core", "services": ["dashboard", "plex"]},
+            "everything": ["home", "extra"],
+        },
+    )
+
+
+class TestOrder:
+    def test_dependencies_first(self, graph: ServiceGraph) -> None:
+        assert graph.order(["plex", "dashboard", "auth", "traefik"]) == [
+            "traefik",
+            "auth",
+            "plex",
+            "dashboard",
+        ]
+
+    def test_only_given_services(self, graph: ServiceGraph) -> None:
+        assert graph.order(["plex", "dashboard"]) == ["dashboard", "plex"]
+
+    def test_cycle(self) -> None:
+        graph = ServiceGraph(_manifests(a=["b"], b=["c"], c=["a"], d=["a"]))
+
+        with pytest.raises(CycleError) as exc_info:
+            graph.order(["a", "b", "c", "d"])
+
+        assert exc_info.value.cycle == ["a", "b", "c", "a"]
+        assert str(exc_info.value) == "Dependency cycle: a -> b -> c -> a"
+
+    def test_cycle_not_strict(self) -> None:
+        graph = ServiceGraph(_manifests(a=["b"], b=["a"], c=[]))
+
+        assert graph.order(["b", "a", "c"], strict=False) == ["c", "a", "b"]
+
+
+class TestQueries:
+    def test_closure_in_start_order(self, graph: ServiceGraph) -> None:
+        assert graph.closure(["dashboard"]) == ["traefik", "auth", "dashboard"]
+
+    def test_closure_keeps_unknown_dependencies(self) -> None:
+        graph = ServiceGraph(_manifests(app=["database"]))
+
+        assert graph.closure(["app"]) == ["database", "app"]
+
+    def test_dependencies(self, graph: ServiceGraph) -> None:
+        assert graph.dependencies("auth") == ["traefik"]
+        assert graph.dependencies("dashboard", transitive=True) == [
+            "auth",
+            "traefik",
+        ]
+
+    def test_dependents(self, graph: ServiceGraph) -> None:
+        assert graph.dependents("auth") == ["dashboard"]
+        assert graph.dependents("traefik") == ["auth", "dashboard", "plex"]
+        assert graph.dependents("dashboard", transitive=True) == []
+
+    def test_from_dependencies(self) -> None:
+        graph = ServiceGraph.from_dependencies({"web": ["api"], "api": ["db"]})
+
+        assert graph.closure(["web"]) == ["db", "api", "web"]
+        assert graph.dependents("db", transitive=True) == ["api", "web"]
+        assert graph.presets == []
+
+    def test_self_dependency_ignored(self) -> None:
+        graph = ServiceGraph(_manifests(a=["a"]))
+
+        assert graph.order(["a"]) == ["a"]
+        assert graph.dependents("a") == []
+
+
+class TestExpandPreset:
+    def test_extends(self, graph: ServiceGraph) -> None:
+        assert graph.expand_preset("home") == ["auth", "dashboard", "plex", "traefik"]
+
+    def test_nested_presets_in_list(self, graph: ServiceGraph) -> None:
+        assert "extra" in graph.expand_preset("everything")
+        assert "plex" in graph.expand_preset("everything")
+
+    def test_unknown_preset(self, graph: ServiceGraph) -> None:
+        assert graph.expand_preset("nope") == []
+
+    def test_memoized(self, graph: ServiceGraph) -> None:
+        graph.expand_preset("everything")
+        graph._presets["core"] = ["changed"]
+
+        # core was expanded as part of everything and isn't read again
+        assert graph.expand_preset("core") == ["auth", "traefik"]
+
+    def test_cycle(self) -> None:
+        graph = ServiceGraph(
+            {},
+            {
+                "a": {"extends": "b", "services": []},
+                "b": ["c"],
+                "c": {"extends": "a"},
+            },
+        )
+
+        with pytest.raises(CycleError, match="Preset cycle: a -> b -> c -> a"):
+            graph.expand_preset("a")
+
+    def test_unknown_extends(self) -> None:
+        graph = ServiceGraph({}, {"a": {"extends": "missing"}})
+
+        with pytest.raises(ValueError, match="unknown preset missing"):
+            graph.expand_preset("a")
+
+
+class TestGetServiceGraph:
+    def test_reused_while_unchanged(self) -> None:
+        assert get_service_graph() is get_service_graph()
+
+    def test_rebuilt_when_a_manifest_changes(self, tmp_path: Path) -> None:
+        service_dir = tmp_path / "app"
+        service_dir.mkdir()
+        manifest = service_dir / "service.yml"
+        manifest.write_text("name: app\ndescription: App\ncategory: Apps\n")
+        first = get_service_graph(tmp_path)
+
+        manifest.write_text(
+            "name: app\ndescription: App\ncategory: Apps\ndependencies: [db]\n"
+        )
+        invalidate_manifests(manifest)
+        second = get_service_graph(tmp_path)
+
+        assert second is not first
+        assert second.dependencies("app") == ["db"]
+
+    def test_real_presets_resolve(self) -> None:
+        graph = get_service_graph()
+
+        for preset in graph.presets:
+            graph.expand_preset(preset)
+        graph.order(graph.services)
@@ -0,0 +1,124 @@
+import os
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+import yaml
+
+from nexus.loader import YAMLError, load_yaml, load_yaml_file
+
+
+@pytest.fixture
+def cache_path(tmp_path: Path) -> Iterator[Path]:
+    cache_path = tmp_path / "cache"
+    with patch("nexus.loader.YAML_CACHE_PATH", cache_path):
+        yield cache_path
+
+
+@pytest.fixture
+def mock_parse() -> Iterator[MagicMock]:
+    with patch("nexus.loader.load_yaml", wraps=load_yaml) as m:
+        yield m
+
+
+class TestLoadYaml:
+    def test_matches_safe_load(self) -> None:
+        text = "name: plex\nports: [32400]\naccess: {public: false}\n"
+
+        assert load_yaml(text) == yaml.safe_load(text)
+
+    def test_rejects_unsafe_tags(self) -> None:
+        with pytest.raises(YAMLError) as exc_info:
+            load_yaml("!!python/object/apply:os.system ['true']")
+
+        assert isinstance(exc_info.value.__cause__, yaml.YAMLError)
+
+
+class TestLoadYamlFile:
+    def test_second_load_skips_parsing(
+        self, tmp_path: Path, cache_path: Path, mock_parse: MagicMock
+    ) -> None:
+        path = tmp_path / "service.yml"
+        path.write_text("name: plex\nsubdomains: [plex]\n")
+
+        first = load_yaml_file(path)
+        second = load_yaml_file(path)
+
+        assert first == second == {"name": "plex", "subdomains": ["plex"]}
+        assert mock_parse.call_count == 1
+        assert len(list(cache_path.iterdir())) == 1
+
+    def test_edited_file_is_reparsed(
+        self, tmp_path: Path, cache_path: Path, mock_parse: MagicMock
+    ) -> None:
+        path = tmp_path / "service.yml"
+        path.write_text("name: plex\n")
+        load_yaml_file(path)
+
+        path.write_text("name: jellyfin\n")
+
+        assert load_yaml_file(path) == {"name": "jellyfin"}
+        assert mock_parse.call_count == 2
+
+    def test_identical_content_shares_an_entry(
+        self, tmp_path: Path, cache_path: Path, mock_parse: MagicMock
+    ) -> None:
+        (tmp_path / "a.yml").write_text("services: {}\n")
+        (tmp_path / "b.yml").write_text("services: {}\n")
+
+        load_yaml_file(tmp_path / "a.yml")
+        load_yaml_file(tmp_path / "b.yml")
+
+        assert mock_parse.call_count == 1
+
+    def test_unmarshallable_document_is_not_cached(
+        self, tmp_path: Path, cache_path: Path
+    ) -> None:
+        path = tmp_path / "dated.yml"
+        path.write_text("released: 2024-01-01\n")
+
+        assert str(load_yaml_file(path)["released"]) == "2024-01-01"
+        assert not cache_path.exists() or not list(cache_path.iterdir())
+
+    def test_corrupt_entry_is_ignored(
+        self, tmp_path: Path, cache_path: Path, mock_parse: MagicMock
+    ) -> None:
+        path = tmp_path / "service.yml"
+        path.write_text("name: plex\n")
+        load_yaml_file(path)
+        for entry in cache_path.iterdir():
+            entry.write_bytes(b"\x00garbage")
+
+        assert load_yaml_file(path) == {"name": "plex"}
+        assert mock_parse.call_count == 2
+
+    def test_stale_entries_are_pruned(self, tmp_path: Path, cache_path: Path) -> None:
+        kept = tmp_path / "kept.yml"
+        kept.write_text("name: plex\n")
+        load_yaml_file(kept)
+        (tmp_path / "old.yml").write_text("name: jellyfin\n")
+        load_yaml_file(tmp_path / "old.yml")
+        month_ago = time.time() - 31 * 24 * 60 * 60
+        for entry in cache_path.iterdir():
+            os.utime(entry, (month_ago, month_ago))
+        # Reading an entry keeps it
+        load_yaml_file(kept)
+
+        (tmp_path / "new.yml").write_text("name: emby\n")
+        load_yaml_file(tmp_path / "new.yml")
+
+        assert len(list(cache_path.iterdir())) == 2
+        assert load_yaml_file(kept) == {"name": "plex"}
+
+    def test_cache_disabled(self, tmp_path: Path, cache_path: Path) -> None:
+        path = tmp_path / "vault.yml"
+        path.write_text("secret: value\n")
+
+        assert load_yaml_file(path, cache=False) == {"secret": "value"}
+        assert not cache_path.exists()
+
+    def test_missing_file(self, tmp_path: Path, cache_path: Path) -> None:
+        with pytest.raises(FileNotFoundError):
+            load_yaml_file(tmp_path / "missing.yml")
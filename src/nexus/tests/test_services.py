@@ -1,11 +1,15 @@
+import os
 from pathlib import Path
+from unittest.mock import patch
 
 from nexus.services import (
+    ManifestRegistry,
     ServiceManifest,
     discover_services,
     get_all_service_names,
     get_public_services,
     get_services_by_category,
+    invalidate_manifests,
     resolve_dependencies,
 )
 
@@ -136,6 +140,78 @@ class TestDiscoverServices:
         assert "traefik" in names
 
 
+def _manifest(services_path: Path, name: str, description: str = "") -> Path:
+    service_dir = services_path / name
+    service_dir.mkdir(parents=True, exist_ok=True)
+    path = service_dir / "service.yml"
+    path.write_text(f"name: {name}\ndescription: '{description}'\n")
+    return path
+
+
+class TestManifestRegistry:
+    def test_parses_each_manifest_once(self, tmp_path: Path) -> None:
+        _manifest(tmp_path, "plex")
+        _manifest(tmp_path, "traefik")
+        registry = ManifestRegistry()
+
+        with patch.object(
+            ServiceManifest, "from_yaml", wraps=ServiceManifest.from_yaml
+        ) as mock_parse:
+            first = registry.discover(tmp_path)
+            second = registry.discover(tmp_path)
+
+        assert mock_parse.call_count == 2
+        assert first == second
+        assert first is not second
+        assert first["plex"] is second["plex"]
+
+    def test_edited_manifest_is_reparsed(self, tmp_path: Path) -> None:
+        path = _manifest(tmp_path, "plex", "old")
+        registry = ManifestRegistry()
+        registry.discover(tmp_path)
+
+        path.write_text("name: plex\ndescription: 'new and longer'\n")
+
+        assert registry.discover(tmp_path)["plex"].description == "new and longer"
+
+    def test_added_and_removed_services(self, tmp_path: Path) -> None:
+        plex = _manifest(tmp_path, "plex")
+        registry = ManifestRegistry()
+        registry.discover(tmp_path)
+
+        _manifest(tmp_path, "jellyfin")
+        plex.unlink()
+
+        assert list(registry.discover(tmp_path)) == ["jellyfin"]
+
+    def test_invalid_manifest_is_skipped(self, tmp_path: Path) -> None:
+        _manifest(tmp_path, "plex")
+        (tmp_path / "broken").mkdir()
+        (tmp_path / "broken" / "service.yml").write_text("description: no name\n")
+
+        assert list(ManifestRegistry().discover(tmp_path)) == ["plex"]
+
+    def test_invalidate(self, tmp_path: Path) -> None:
+        path = _manifest(tmp_path, "plex", "aaa")
+        registry = ManifestRegistry()
+        registry.discover(tmp_path)
+        # Same size and mtime: only explicit invalidation notices
+        stat = path.stat()
+        path.write_text("name: plex\ndescription: 'bbb'\n")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        registry.invalidate(path.parent)
+
+        assert registry.discover(tmp_path)["plex"].description == "bbb"
+
+    def test_module_registry(self, tmp_path: Path) -> None:
+        _manifest(tmp_path, "plex")
+
+        assert list(discover_services(tmp_path)) == ["plex"]
+        invalidate_manifests(tmp_path)
+        assert list(discover_services(tmp_path)) == ["plex"]
+
+
 class TestGetServicesByCategory:
     def test_get_services_by_category(self) -> None:
         by_category = get_services_by_category()
@@ -1,10 +1,24 @@
+import os
 import subprocess
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from nexus.utils import run_command
+from nexus.utils import (
+    VaultError,
+    VaultSession,
+    decrypt_vault,
+    format_size,
+    get_vault_password,
+    load_state,
+    read_vault,
+    run_command,
+    save_state,
+    stream_command,
+    stream_command_output,
+    write_prometheus_textfile,
+)
 
 
 class TestRunCommand:
@@ -76,3 +90,289 @@ class TestRunCommand:
 
         call_kwargs = mock_run.call_args[1]
         assert call_kwargs["stdin"] == mock_stdin
+
+
+class TestStreamCommand:
+    def test_stream_command_yields_lines(self) -> None:
+        lines = list(stream_command(["printf", "a\\nb\\n"]))
+
+        assert lines == ["a", "b"]
+
+    def test_stream_command_raises_on_failure(self) -> None:
+        with pytest.raises(subprocess.CalledProcessError):
+            list(stream_command(["false"]))
+
+    def test_stream_command_check_false(self) -> None:
+        assert list(stream_command(["false"], check=False)) == []
+
+    def test_stream_command_merges_stderr(self) -> None:
+        lines = list(stream_command(["sh", "-c", "echo err >&2"], merge_stderr=True))
+
+        assert lines == ["err"]
+
+    def test_stream_command_early_exit_kills_process(self) -> None:
+        stream = stream_command(["yes"])
+
+        assert next(stream) == "y"
+        stream.close()
+
+    def test_stream_command_output_keeps_streams_apart(self) -> None:
+        lines = list(
+            stream_command_output(["sh", "-c", "echo out; echo err >&2; echo more"])
+        )
+
+        assert [line for line in lines if line[0] == "stdout"] == [
+            ("stdout", "out"),
+            ("stdout", "more"),
+        ]
+        assert [line for line in lines if line[0] == "stderr"] == [("stderr", "err")]
+
+    def test_stream_command_output_raises_on_failure(self) -> None:
+        with pytest.raises(subprocess.CalledProcessError):
+            list(stream_command_output(["sh", "-c", "echo err >&2; exit 1"]))
+
+    def test_stream_command_output_early_exit_kills_process(self) -> None:
+        stream = stream_command_output(["yes"])
+
+        assert next(stream) == ("stdout", "y")
+        stream.close()
+
+
+class TestState:
+    def test_save_and_load_state(self, tmp_path: Path) -> None:
+        path = tmp_path / "nested" / "state.json"
+
+        save_state(path, {"a": 1})
+
+        assert load_state(path) == {"a": 1}
+        assert not list(path.parent.glob(".*.tmp"))
+
+    def test_load_state_missing(self, tmp_path: Path) -> None:
+        assert load_state(tmp_path / "missing.json") == {}
+
+    def test_load_state_corrupt(self, tmp_path: Path) -> None:
+        path = tmp_path / "state.json"
+        path.write_text("{not json")
+
+        assert load_state(path) == {}
+
+
+class TestWritePrometheusTextfile:
+    def test_write_prometheus_textfile(self, tmp_path: Path) -> None:
+        path = tmp_path / "textfile" / "test.prom"
+
+        write_prometheus_textfile(
+            path,
+            [
+                ("nexus_up", "Whether it is up.", [({}, 1)]),
+                ("nexus_size", "Size.", [({"repo": 'r"2', "plan": "a"}, 2.5)]),
+            ],
+        )
+
+        assert path.read_text() == (
+            "# HELP nexus_up Whether it is up.\n"
+            "# TYPE nexus_up gauge\n"
+            "nexus_up 1\n"
+            "# HELP nexus_size Size.\n"
+            "# TYPE nexus_size gauge\n"
+            'nexus_size{plan="a",repo="r\\"2"} 2.5\n'
+        )
+
+
+class TestFormatSize:
+    def test_format_size(self) -> None:
+        assert format_size(512) == "512.0B"
+        assert format_size(1536) == "1.5K"
+        assert format_size(107374182400) == "100.0G"
+
+
+# Encrypted with `ansible-vault encrypt` and the password "hunter2"
+VAULT_TEXT = """$ANSIBLE_VAULT;1.1;AES256
+36666332623536316431643935633037386631653732356365646232326230623739623933333534
+6431303730333136643236323135663130303462363331620a326563363763393330633166353362
+66613163336665363130643433346661663266633564306662333865386639653034326164333562
+6162636536366638630a383661313263653737336266303466343363623937636464656536653239
+30343739666238346162383631656262363063646363613162363936376566303131333631613138
+66626138656132386264316237623730303031306537653961623334373234653637633033623762
+316562306338393036353633313964633733
+"""
+
+
+class TestDecryptVault:
+    def test_decrypts_ansible_vault(self) -> None:
+        plaintext = decrypt_vault(VAULT_TEXT, "hunter2")
+
+        assert plaintext == 'nexus_domain: example.org\nrestic_password: "s3cret"\n'
+
+    def test_wrong_password(self) -> None:
+        with pytest.raises(VaultError, match="wrong password"):
+            decrypt_vault(VAULT_TEXT, "hunter3")
+
+    def test_damaged_vault(self) -> None:
+        with pytest.raises(VaultError, match="Damaged vault"):
+            decrypt_vault(VAULT_TEXT[:-10], "hunter2")
+
+    def test_unsupported_cipher(self) -> None:
+        with pytest.raises(VaultError, match="Unsupported"):
+            decrypt_vault(VAULT_TEXT.replace("AES256", "AES"), "hunter2")
+
+    def test_labelled_vault(self) -> None:
+        vaulttext = VAULT_TEXT.replace("1.1;AES256", "1.2;AES256;prod")
+
+        assert decrypt_vault(vaulttext, "hunter2").startswith("nexus_domain")
+
+
+class TestVaultPassword:
+    @pytest.fixture(autouse=True)
+    def root(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+        monkeypatch.setattr("nexus.utils.ROOT_PATH", tmp_path)
+        monkeypatch.delenv("ANSIBLE_VAULT_PASSWORD_FILE", raising=False)
+        return tmp_path
+
+    def test_password_file_from_ansible_cfg(self, root: Path) -> None:
+        (root / "ansible.cfg").write_text(
+            "[defaults]\nvault_password_file = .vault_pass\n"
+        )
+        (root / ".vault_pass").write_text("hunter2\n")
+
+        assert get_vault_password() == "hunter2"
+
+    def test_env_takes_precedence(
+        self, root: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        (root / "ansible.cfg").write_text(
+            "[defaults]\nvault_password_file = .vault_pass\n"
+        )
+        (root / ".vault_pass").write_text("from-cfg")
+        (root / "env_pass").write_text("from-env")
+        monkeypatch.setenv("ANSIBLE_VAULT_PASSWORD_FILE", str(root / "env_pass"))
+
+        assert get_vault_password() == "from-env"
+
+    def test_executable_password_file(
+        self, root: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        script = root / "pass.sh"
+        script.write_text("#!/bin/sh\necho ' hunter2 '\n")
+        os.chmod(script, 0o700)
+        monkeypatch.setenv("ANSIBLE_VAULT_PASSWORD_FILE", str(script))
+
+        # Like Ansible, only the line ending is stripped from script output
+        assert get_vault_password() == " hunter2 "
+
+    def test_empty_password_file(
+        self, root: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        (root / "empty").write_text("\n")
+        monkeypatch.setenv("ANSIBLE_VAULT_PASSWORD_FILE", str(root / "empty"))
+
+        with pytest.raises(VaultError, match="empty"):
+            get_vault_password()
+
+    @patch("nexus.utils.getpass.getpass", return_value="typed")
+    def test_prompts_without_password_file(self, mock_getpass: MagicMock) -> None:
+        assert get_vault_password() == "typed"
+        mock_getpass.assert_called_once()
+
+    def test_relative_env_path_is_relative_to_cwd(
+        self,
+        root: Path,
+        tmp_path_factory: pytest.TempPathFactory,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        cwd = tmp_path_factory.mktemp("cwd")
+        (cwd / ".vault_pass").write_text("from-cwd")
+        (root / ".vault_pass").write_text("from-root")
+        monkeypatch.chdir(cwd)
+        monkeypatch.setenv("ANSIBLE_VAULT_PASSWORD_FILE", ".vault_pass")
+
+        assert get_vault_password() == "from-cwd"
+
+    @patch("nexus.utils.getpass.getpass")
+    def test_missing_password_file(
+        self, mock_getpass: MagicMock, root: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setenv("ANSIBLE_VAULT_PASSWORD_FILE", str(root / "missing"))
+
+        with pytest.raises(VaultError, match=r"not found: .*missing"):
+            get_vault_password()
+        mock_getpass.assert_not_called()
+
+
+class TestReadVault:
+    @patch("nexus.utils.get_vault_password", return_value="hunter2")
+    @patch("nexus.utils.run_command")
+    def test_decrypts_in_process(
+        self, mock_run: MagicMock, mock_password: MagicMock, tmp_path: Path
+    ) -> None:
+        path = tmp_path / "vault.yml"
+        path.write_text(VAULT_TEXT)
+
+        assert read_vault(path) == {
+            "nexus_domain": "example.org",
+            "restic_password": "s3cret",
+        }
+        mock_run.assert_not_called()
+
+    @patch("nexus.utils.get_vault_password")
+    def test_reads_unencrypted_vault(
+        self, mock_password: MagicMock, tmp_path: Path
+    ) -> None:
+        path = tmp_path / "vault.yml"
+        path.write_text("nexus_domain: example.org\n")
+
+        assert read_vault(path) == {"nexus_domain": "example.org"}
+        mock_password.assert_not_called()
+
+    def test_missing_vault(self, tmp_path: Path) -> None:
+        with pytest.raises(FileNotFoundError):
+            read_vault(tmp_path / "vault.yml")
+
+
+class TestVaultSession:
+    @patch("nexus.utils.read_vault")
+    def test_decrypts_once(self, mock_read_vault: MagicMock) -> None:
+        mock_read_vault.return_value = {"nexus_domain": "example.org"}
+        session = VaultSession()
+
+        assert session.get("nexus_domain") == "example.org"
+        assert session.read() == {"nexus_domain": "example.org"}
+        assert session.get("missing", "default") == "default"
+        mock_read_vault.assert_called_once_with(None)
+
+    @patch("nexus.utils.read_vault")
+    def test_failure_is_remembered(self, mock_read_vault: MagicMock) -> None:
+        mock_read_vault.side_effect = subprocess.CalledProcessError(1, "ansible-vault")
+        session = VaultSession()
+
+        with pytest.raises(subprocess.CalledProcessError):
+            session.read()
+        assert session.get("nexus_domain", "fallback") == "fallback"
+        mock_read_vault.assert_called_once()
+
+    @patch("nexus.utils.getpass.getpass", side_effect=EOFError)
+    @patch("nexus.utils._vault_password_file", return_value=None)
+    def test_prompt_without_input(
+        self, mock_file: MagicMock, mock_getpass: MagicMock, tmp_path: Path
+    ) -> None:
+        path = tmp_path / "vault.yml"
+        path.write_text(VAULT_TEXT)
+        session = VaultSession(path)
+
+        assert session.get("nexus_domain", "fallback") == "fallback"
+        assert session.get("nexus_domain", "fallback") == "fallback"
+        mock_getpass.assert_called_once()
+
+    @patch("nexus.utils.read_vault")
+    def test_clear_scrubs_contents(self, mock_read_vault: MagicMock) -> None:
+        mock_read_vault.return_value = {"tailscale_users": {"admins": ["a@b.c"]}}
+        session = VaultSession()
+        data = session.read()
+        users = data["tailscale_users"]
+
+        session.clear()
+
+        assert data == {}
+        assert users == {}
+        session.read()
+        assert mock_read_vault.call_count == 2
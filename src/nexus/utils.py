@@ -1,11 +1,21 @@
+import atexit
+import binascii
+import configparser
+import getpass
+import hashlib
+import hmac
+import json
 import logging
+import os
+import queue
 import subprocess
+import threading
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Any, Optional, TextIO, Union
 
-import yaml
-
 from nexus.config import ROOT_PATH, VAULT_PATH
+from nexus.loader import YAMLError, load_yaml
 
 
 def run_command(
@@ -14,6 +24,7 @@ def run_command(
     capture: bool = False,
     check: bool = True,
     stdin: Optional[Union[TextIO, int]] = None,
+    env: Optional[dict[str, str]] = None,
 ) -> subprocess.CompletedProcess[str]:
     """Execute a shell command with standardized error handling and logging.
 
@@ -26,6 +37,7 @@ def run_command(
         capture: If True, capture stdout/stderr into the result object.
         check: If True, raise CalledProcessError on non-zero exit code.
         stdin: File object or file descriptor to use as stdin for piping input.
+        env: Environment for the command. Defaults to this process's.
 
     Returns:
         The subprocess.CompletedProcess object containing return code and output.
@@ -43,6 +55,7 @@ def run_command(
             text=True,
             check=check,
             stdin=stdin,
+            env=env,
         )
         if capture and result.stdout:
             logging.debug(result.stdout)
@@ -54,12 +67,335 @@ def run_command(
         raise
 
 
+def stream_command(
+    command: list[str],
+    cwd: Optional[Path] = None,
+    check: bool = True,
+    merge_stderr: bool = False,
+) -> Iterator[str]:
+    """Execute a command and yield its output line by line as it is produced.
+
+    Unlike run_command with capture=True, output is never buffered in full,
+    which keeps memory flat for long-running or very chatty commands. If the
+    caller stops iterating early, the process is killed.
+
+    Args:
+        command: The command to run as a list of strings.
+        cwd: The working directory for the command. Defaults to ROOT_PATH.
+        check: If True, raise CalledProcessError on non-zero exit code once
+            all output has been consumed.
+        merge_stderr: If True, interleave stderr into the yielded lines.
+            Otherwise stderr is inherited from the parent process.
+
+    Yields:
+        Each line of stdout with the trailing newline removed.
+
+    Raises:
+        subprocess.CalledProcessError: If the command fails and check is True.
+    """
+    logging.debug(f"Streaming: {' '.join(command)} in {cwd or ROOT_PATH}")
+
+    with subprocess.Popen(
+        command,
+        cwd=cwd or ROOT_PATH,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT if merge_stderr else None,
+        text=True,
+    ) as proc:
+        assert proc.stdout is not None
+        try:
+            for line in proc.stdout:
+                yield line.rstrip("\n")
+        except GeneratorExit:
+            proc.kill()
+            raise
+
+    if check and proc.returncode != 0:
+        logging.error(f"Command failed: {' '.join(command)}")
+        raise subprocess.CalledProcessError(proc.returncode, command)
+
+
+def stream_command_output(
+    command: list[str],
+    cwd: Optional[Path] = None,
+    check: bool = True,
+) -> Iterator[tuple[str, str]]:
+    """Execute a command and yield its stdout and stderr lines as produced.
+
+    Like stream_command, but keeps the two streams apart, so a caller can
+    tell the command's own diagnostics from its output. Each pipe is read
+    by its own thread into a small bounded queue, so memory stays flat.
+
+    Args:
+        command: The command to run as a list of strings.
+        cwd: The working directory for the command. Defaults to ROOT_PATH.
+        check: If True, raise CalledProcessError on non-zero exit code once
+            all output has been consumed.
+
+    Yields:
+        Tuples of ("stdout" or "stderr", line with the trailing newline
+        removed). Lines of one stream keep their order; the two streams
+        are interleaved in the order lines arrive.
+
+    Raises:
+        subprocess.CalledProcessError: If the command fails and check is True.
+    """
+    logging.debug(f"Streaming: {' '.join(command)} in {cwd or ROOT_PATH}")
+
+    lines: queue.Queue[Optional[tuple[str, str]]] = queue.Queue(maxsize=1024)
+
+    def pump(name: str, pipe: TextIO) -> None:
+        for line in pipe:
+            lines.put((name, line.rstrip("\n")))
+        lines.put(None)
+
+    with subprocess.Popen(
+        command,
+        cwd=cwd or ROOT_PATH,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    ) as proc:
+        assert proc.stdout is not None and proc.stderr is not None
+        pumps = [
+            threading.Thread(target=pump, args=(name, pipe), daemon=True)
+            for name, pipe in (("stdout", proc.stdout), ("stderr", proc.stderr))
+        ]
+        for thread in pumps:
+            thread.start()
+        try:
+            open_streams = len(pumps)
+            while open_streams:
+                item = lines.get()
+                if item is None:
+                    open_streams -= 1
+                else:
+                    yield item
+        except GeneratorExit:
+            proc.kill()
+            # Unblock the pumps so they see EOF and exit
+            while any(thread.is_alive() for thread in pumps):
+                try:
+                    lines.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            raise
+
+    if check and proc.returncode != 0:
+        logging.error(f"Command failed: {' '.join(command)}")
+        raise subprocess.CalledProcessError(proc.returncode, command)
+
+
+def format_size(size_bytes: float) -> str:
+    """Format a byte count as a short human-readable string (e.g., "1.5G").
+
+    Args:
+        size_bytes: Number of bytes.
+
+    Returns:
+        Size with one decimal and a binary unit suffix.
+    """
+    size = float(size_bytes)
+    for unit in ["B", "K", "M", "G", "T", "P"]:
+        if abs(size) < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}E"
+
+
+def load_state(path: Path) -> dict[str, Any]:
+    """Load a JSON state file written by save_state.
+
+    Args:
+        path: Path to the state file.
+
+    Returns:
+        The parsed state, or an empty dict if the file is missing or corrupt.
+    """
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        logging.warning(f"Ignoring unreadable state file {path}: {e}")
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_state(path: Path, data: dict[str, Any]) -> None:
+    """Atomically write a JSON state file.
+
+    Writes to a temporary file alongside the target and renames it into
+    place, so an interrupted run never leaves a truncated file behind.
+
+    Args:
+        path: Path to the state file. Parent directories are created.
+        data: JSON-serializable state to persist.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def write_prometheus_textfile(
+    path: Path,
+    metrics: list[tuple[str, str, list[tuple[dict[str, str], float]]]],
+) -> None:
+    """Atomically write gauges in the Prometheus text exposition format.
+
+    The file is renamed into place so node-exporter's textfile collector
+    never scrapes a partially written file.
+
+    Args:
+        path: Destination .prom file, usually under TEXTFILE_PATH.
+        metrics: List of (name, help text, samples) tuples, where each
+            sample is a (labels, value) pair.
+    """
+    lines = []
+    for name, help_text, samples in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in samples:
+            label_str = ",".join(
+                f'{key}="{_escape_label(val)}"' for key, val in sorted(labels.items())
+            )
+            series = f"{name}{{{label_str}}}" if label_str else name
+            lines.append(f"{series} {value}")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+
+
+# Key derivation of the $ANSIBLE_VAULT;1.1;AES256 format
+VAULT_HEADER = "$ANSIBLE_VAULT"
+_VAULT_KDF_ITERATIONS = 10000
+_VAULT_KEY_LENGTH = 32
+_VAULT_IV_LENGTH = 16
+
+
+class VaultError(Exception):
+    """The vault could not be decrypted: wrong password or a damaged file."""
+
+
+def _vault_password_file() -> Optional[Path]:
+    configured = os.environ.get("ANSIBLE_VAULT_PASSWORD_FILE")
+    # Like Ansible, a relative path from the environment is relative to the
+    # working directory and one from ansible.cfg to the file's directory
+    base = Path.cwd()
+    if not configured:
+        config = configparser.ConfigParser()
+        config.read(ROOT_PATH / "ansible.cfg")
+        configured = config.get("defaults", "vault_password_file", fallback="")
+        base = ROOT_PATH
+    if not configured:
+        return None
+    path = base / Path(configured).expanduser()
+    if not path.is_file():
+        raise VaultError(f"Vault password file not found: {path}")
+    return path
+
+
+def get_vault_password() -> str:
+    """Return the vault password from the same sources ansible-vault uses.
+
+    ANSIBLE_VAULT_PASSWORD_FILE, then vault_password_file in ansible.cfg. An
+    executable password file is run and its output used, as Ansible does.
+    Without a password file, the password is prompted for.
+
+    Raises:
+        VaultError: If the configured password file is missing or yields an
+            empty password.
+        subprocess.CalledProcessError: If a password script fails.
+    """
+    path = _vault_password_file()
+    if not path:
+        return getpass.getpass("Vault password: ")
+
+    if os.access(path, os.X_OK):
+        password = run_command([str(path)], capture=True).stdout.strip("\r\n")
+    else:
+        password = path.read_text().strip()
+    if not password:
+        raise VaultError(f"Vault password file is empty: {path}")
+    return password
+
+
+def decrypt_vault(vaulttext: str, password: str) -> str:
+    """Decrypt an Ansible vault in-process.
+
+    Supports the AES256 cipher of vault format 1.1 and 1.2: PBKDF2-SHA256
+    derives the AES-CTR key, HMAC key and counter from the password and the
+    vault's salt, and the HMAC is checked before anything is decrypted.
+
+    Args:
+        vaulttext: Contents of the vault file, header included.
+        password: Vault password.
+
+    Returns:
+        The decrypted plaintext.
+
+    Raises:
+        VaultError: If the format is unsupported, the file is damaged, or the
+            password is wrong.
+    """
+    # Only loaded when a vault is actually decrypted
+    from cryptography.hazmat.primitives import padding
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+    header, _, body = vaulttext.strip().partition("\n")
+    fields = [f.strip() for f in header.split(";")]
+    if fields[0] != VAULT_HEADER or len(fields) < 3 or fields[2] != "AES256":
+        raise VaultError(f"Unsupported vault format: {header}")
+
+    try:
+        envelope = binascii.unhexlify("".join(body.split()))
+        salt_hex, hmac_hex, ciphertext_hex = envelope.split(b"\n", 2)
+        salt = binascii.unhexlify(salt_hex)
+        expected_hmac = binascii.unhexlify(hmac_hex)
+        ciphertext = binascii.unhexlify(ciphertext_hex)
+    except (binascii.Error, ValueError) as e:
+        raise VaultError(f"Damaged vault: {e}") from None
+
+    derived = hashlib.pbkdf2_hmac(
+        "sha256",
+        password.encode(),
+        salt,
+        _VAULT_KDF_ITERATIONS,
+        dklen=2 * _VAULT_KEY_LENGTH + _VAULT_IV_LENGTH,
+    )
+    cipher_key = derived[:_VAULT_KEY_LENGTH]
+    hmac_key = derived[_VAULT_KEY_LENGTH : 2 * _VAULT_KEY_LENGTH]
+    counter = derived[2 * _VAULT_KEY_LENGTH :]
+
+    actual_hmac = hmac.new(hmac_key, ciphertext, hashlib.sha256).digest()
+    if not hmac.compare_digest(actual_hmac, expected_hmac):
+        raise VaultError("Vault HMAC mismatch: wrong password or damaged vault")
+
+    decryptor = Cipher(algorithms.AES(cipher_key), modes.CTR(counter)).decryptor()
+    unpadder = padding.PKCS7(algorithms.AES.block_size).unpadder()
+    padded = decryptor.update(ciphertext) + decryptor.finalize()
+    try:
+        plaintext = unpadder.update(padded) + unpadder.finalize()
+    except ValueError:
+        raise VaultError("Damaged vault: bad padding") from None
+    return plaintext.decode()
+
+
 def read_vault(vault_path: Optional[Path] = None) -> dict[str, Any]:
     """Read and decrypt the Ansible vault file.
 
-    Uses ansible-vault to decrypt the vault.yml file and parse its contents.
-    Requires ansible-vault to be installed and the vault password to be
-    available (via --ask-vault-pass prompt or ANSIBLE_VAULT_PASSWORD_FILE).
+    Encrypted vaults are decrypted in-process with decrypt_vault(), using
+    the password from get_vault_password(), so no ansible-vault process
+    (and no import of Ansible) is needed.
 
     Args:
         vault_path: Path to the vault file. Defaults to VAULT_PATH.
@@ -70,31 +406,106 @@ def read_vault(vault_path: Optional[Path] = None) -> dict[str, Any]:
 
     Raises:
         FileNotFoundError: If the vault file does not exist.
-        subprocess.CalledProcessError: If ansible-vault decryption fails.
-        yaml.YAMLError: If the vault contents are not valid YAML.
+        VaultError: If decryption fails, e.g. because of a wrong password.
+        subprocess.CalledProcessError: If a vault password script fails.
+        YAMLError: If the vault contents are not valid YAML.
     """
     path = vault_path or VAULT_PATH
 
     if not path.exists():
         raise FileNotFoundError(f"Vault file not found: {path}")
 
-    # Check if vault is encrypted
-    with open(path) as f:
-        first_line = f.readline()
-
-    if first_line.startswith("$ANSIBLE_VAULT"):
-        # Encrypted - use ansible-vault to decrypt
+    vault_content = path.read_text()
+    if vault_content.startswith(VAULT_HEADER):
         logging.debug(f"Decrypting vault: {path}")
-        result = run_command(
-            ["ansible-vault", "view", str(path)],
-            capture=True,
-        )
-        vault_content = result.stdout
+        vault_content = decrypt_vault(vault_content, get_vault_password())
     else:
         # Unencrypted (development mode)
         logging.debug(f"Reading unencrypted vault: {path}")
-        with open(path) as f:
-            vault_content = f.read()
 
-    parsed: dict[str, Any] = yaml.safe_load(vault_content)
+    parsed: dict[str, Any] = load_yaml(vault_content)
     return parsed
+
+
+def _scrub(value: Any) -> None:
+    if isinstance(value, dict):
+        for item in value.values():
+            _scrub(item)
+        value.clear()
+    elif isinstance(value, list):
+        for item in value:
+            _scrub(item)
+        value.clear()
+
+
+class VaultSession:
+    """Decrypted vault contents, shared by everything in one process run.
+
+    The vault is decrypted on first use and kept in memory only. Later reads
+    return the same contents, so a deploy runs the vault's key derivation
+    once instead of once per consumer. A failed decryption is
+    remembered as well, so the password isn't prompted for again.
+
+    The contents are cleared when the process exits or clear() is called.
+    Python can't overwrite string memory, so this drops every reference the
+    session holds rather than zeroing it.
+
+    Args:
+        vault_path: Path to the vault file. Defaults to VAULT_PATH.
+    """
+
+    def __init__(self, vault_path: Optional[Path] = None) -> None:
+        self._vault_path = vault_path
+        self._data: Optional[dict[str, Any]] = None
+        self._error: Optional[Exception] = None
+        self._lock = threading.Lock()
+        atexit.register(self.clear)
+
+    def read(self) -> dict[str, Any]:
+        """Return the vault contents, decrypting the vault on first use.
+
+        Callers must not modify the returned dictionary; it is shared.
+
+        Raises:
+            EOFError: If the password prompt gets no input.
+            FileNotFoundError: If the vault file does not exist.
+            VaultError: If decryption fails.
+            subprocess.CalledProcessError: If a vault password script fails.
+            YAMLError: If the vault contents are not valid YAML.
+        """
+        with self._lock:
+            if self._error:
+                raise self._error
+            if self._data is None:
+                try:
+                    self._data = read_vault(self._vault_path) or {}
+                except (
+                    EOFError,
+                    FileNotFoundError,
+                    VaultError,
+                    subprocess.CalledProcessError,
+                    YAMLError,
+                ) as e:
+                    self._error = e
+                    raise
+            return self._data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return one vault value, or default if unset or the vault is unreadable."""
+        try:
+            return self.read().get(key, default)
+        except (
+            EOFError,
+            FileNotFoundError,
+            VaultError,
+            subprocess.CalledProcessError,
+            YAMLError,
+        ):
+            return default
+
+    def clear(self) -> None:
+        """Drop the decrypted contents; the next read decrypts again."""
+        with self._lock:
+            _scrub(self._data)
+            self._data = None
+            self._error = None
@@ -115,10 +115,14 @@ def deploy(
     skip_cloudflared: bool = False,
     no_tunnel: bool = False,
     dry_run: bool = False,
+    force: bool = False,
+    profile: Optional[str] = None,
     yes: bool = False,
 ) -> None:
     """Deploy Nexus services.
 
+    Stages and services unchanged since the last deploy are skipped.
+
     --services         Comma-separated list of services to deploy
     --preset           Service preset to deploy (core, home)
     --all              Deploy all services
@@ -127,6 +131,8 @@ def deploy(
     --skip-cloudflared Skip starting cloudflared
     --no-tunnel        Use legacy A records instead of Cloudflare Tunnel
     --dry-run          Preview changes without applying
+    --force            Redeploy everything, even if unchanged
+    --profile          Write a Chrome trace of the deploy stages to this file
     --yes              Skip confirmation prompts
 
     Examples:
@@ -159,10 +165,14 @@ def deploy(
         args.append("--no-tunnel")
     if dry_run:
         args.append("--dry-run")
+    if force:
+        args.append("--force")
+    if profile:
+        args.append(f"--profile {profile}")
     if yes:
         args.append("-y")
 
-    c.run(f"uv run python -m nexus.cli.deploy {' '.join(args)}")
+    c.run(f"uv run nexus deploy {' '.join(args)}")
 
 
 @task
@@ -184,6 +194,8 @@ def restart(
         all_services=all_services,
         skip_dns=True,
         skip_cloudflared=True,
+        # Restarting means recreating containers, changed or not
+        force=True,
         yes=True,
     )
 
@@ -202,13 +214,19 @@ def down(c: Context, remove_orphans: bool = True) -> None:
 
 
 @task
-def start(c: Context) -> None:
-    """Start containers via docker compose up -d.
+def start(c: Context, all_services: bool = False, dry_run: bool = False) -> None:
+    """Start containers via `nexus up`.
 
     Fast start — skips config generation, Ansible, and Terraform.
-    Runs against the generated docker-compose.yml in the project root.
+    Runs against the generated docker-compose.yml in the project root and
+    only recreates containers whose definition changed or that aren't running.
     """
-    c.run("docker compose up -d")
+    args = []
+    if all_services:
+        args.append("--all")
+    if dry_run:
+        args.append("--dry-run")
+    c.run(f"uv run nexus up {' '.join(args)}")
 
 
 # =============================================================================
@@ -230,7 +248,7 @@ def health(c: Context, domain: Optional[str] = None, verbose: bool = False) -> N
         args.append(f"--domain {domain}")
     if verbose:
         args.append("-v")
-    c.run(f"uv run python -m nexus.cli.health {' '.join(args)}")
+    c.run(f"uv run nexus health {' '.join(args)}")
 
 
 @task
@@ -240,6 +258,7 @@ def ops(
     weekly: bool = False,
     monthly: bool = False,
     all_tasks: bool = False,
+    textfile: bool = False,
 ) -> None:
     """Run operations/maintenance tasks.
 
@@ -249,6 +268,7 @@ def ops(
         weekly: Run weekly tasks.
         monthly: Run monthly tasks.
         all_tasks: Run all tasks.
+        textfile: Export task metrics for node-exporter.
     """
     args = []
     if daily:
@@ -259,7 +279,27 @@ def ops(
         args.append("--monthly")
     if all_tasks:
         args.append("--all")
-    c.run(f"uv run python -m nexus.cli.operations {' '.join(args)}")
+    if textfile:
+        args.append("--textfile")
+    c.run(f"uv run nexus ops {' '.join(args)}")
+
+
+@task
+def usage(c: Context, service: Optional[str] = None, cached: bool = False) -> None:
+    """Show disk usage per service, ranked by size.
+
+    Args:
+        c: Invoke context.
+        service: Only scan this service.
+        cached: Reuse cached listings of unchanged directories (quicker, but
+            misses files that grew in place).
+    """
+    args = ["usage"]
+    if service:
+        args.append(service)
+    if cached:
+        args.append("--cached")
+    c.run(f"uv run nexus ops {' '.join(args)}")
 
 
 # =============================================================================
@@ -268,39 +308,78 @@ def ops(
 
 
 @task
-def backup(c: Context, target: str = "all", dry_run: bool = False) -> None:
+def backup(
+    c: Context,
+    target: str = "all",
+    dry_run: bool = False,
+    mode: str = "direct",
+    no_prune: bool = False,
+    prune_only: bool = False,
+    textfile: bool = False,
+    metrics_only: bool = False,
+) -> None:
     """Back up all service data to restic repositories.
 
     Args:
         c: Invoke context.
         target: Which repositories to back up ("local", "r2", or "all").
         dry_run: Preview commands without executing.
+        mode: "direct" or "copy" (back up locally, replicate to R2).
+        no_prune: Skip pruning after the backup.
+        prune_only: Only prune, without taking a new backup.
+        textfile: Also export backup metrics for node-exporter.
+        metrics_only: Only refresh and export repository metrics.
     """
-    args = [f"--target {target}"]
+    args = [f"--target {target}", f"--mode {mode}"]
     if dry_run:
         args.append("--dry-run")
-    c.run(f"uv run python -m nexus.cli.backup {' '.join(args)}")
+    if no_prune:
+        args.append("--no-prune")
+    if prune_only:
+        args.append("--prune-only")
+    if textfile:
+        args.append("--textfile")
+    if metrics_only:
+        args.append("--metrics-only")
+    c.run(f"uv run nexus backup {' '.join(args)}")
 
 
 @task
-def backup_list(c: Context, target: str = "local") -> None:
+def backup_list(c: Context, target: str = "local", refresh: bool = False) -> None:
     """List available backups.
 
     Args:
         c: Invoke context.
         target: Repository to list snapshots from ("local" or "r2").
+        refresh: Refresh the snapshot catalog from the repository first.
     """
-    c.run(f"uv run python -m nexus.cli.backup_list --target {target}")
+    refresh_arg = " --refresh" if refresh else ""
+    c.run(f"uv run nexus backup-list --target {target}{refresh_arg}")
 
 
 @task
-def backup_verify(c: Context) -> None:
-    """Verify backup integrity.
+def backup_verify(
+    c: Context,
+    target: str = "all",
+    slices: int = 28,
+    sample_restore: bool = False,
+    service: str = "",
+) -> None:
+    """Verify backup integrity, reading the next data slice of each repo.
 
     Args:
         c: Invoke context.
+        target: Repository to verify ("local", "r2", or "all").
+        slices: Number of slices each repository's data is read in.
+        sample_restore: Also restore a service and compare it with live data.
+        service: Service for the sample restore (default: smallest).
     """
-    c.run("uv run python -m nexus.cli.backup_verify")
+    args = f" --target {target} --slices {slices}"
+    if sample_restore:
+        args += " --sample-restore"
+    if service:
+        args += f" --service {service}"
+    c.run(f"uv run nexus backup-verify{args}")
 
 
 @task
@@ -309,6 +388,10 @@ def restore(
     service: Optional[str] = None,
     snapshot: str = "latest",
     target: str = "local",
+    as_of: Optional[str] = None,
+    preview: bool = False,
+    incremental: bool = False,
+    parallel: int = 2,
     dry_run: bool = False,
     yes: bool = False,
 ) -> None:
@@ -322,17 +405,29 @@ def restore(
             run multiple times or use CLI directly for multiple services).
         snapshot: Snapshot ID to restore from (default: latest).
         target: Repository to restore from ("local" or "r2").
+        as_of: Restore the newest snapshot at or before this local time
+            (e.g., "2026-10-01 03:00").
+        preview: Show files and bytes per service without restoring.
+        incremental: Restore only changed files, stopping containers just
+            for the final swap.
+        parallel: Number of services restored at once.
         dry_run: Preview restore without executing.
         yes: Skip confirmation prompt.
     """
-    args = [f"--snapshot {snapshot}", f"--target {target}"]
+    args = [f"--snapshot {snapshot}", f"--target {target}", f"--parallel {parallel}"]
     if service:
         args.append(f"--service {service}")
+    if as_of:
+        args.append(f"--as-of '{as_of}'")
+    if preview:
+        args.append("--preview")
+    if incremental:
+        args.append("--incremental")
     if dry_run:
         args.append("--dry-run")
     if yes:
         args.append("--yes")
-    c.run(f"uv run python -m nexus.cli.restore {' '.join(args)}")
+    c.run(f"uv run nexus restore {' '.join(args)}")
 
 
 # =============================================================================
@@ -348,4 +443,4 @@ def alert_bot(c: Context, port: int = 8080) -> None:
         c: Invoke context.
         port: Port to run the webhook server on.
     """
-    c.run(f"uv run python -m nexus.cli.alert_bot --port {port}")
+    c.run(f"uv run nexus alert-bot --port {port}")